@@ -7,7 +7,7 @@ import platform
 import logging
 from pathlib import Path
 import tomllib
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterator
 from datetime import datetime
 
 # Try to import tomli_w for writing TOML files
@@ -19,10 +19,19 @@ except ImportError:
 
 from .. import IS_WINDOWS, IS_LINUX, IS_MAC, INSTALLER_DIR, RESOURCES_DIR
 from ..utils.game_id import get_display_name
+from ..utils.file_sync import sync_tree
+from ..utils.pegasus_metadata import write_metadata
 
 class InstallationManager:
     """Manages the Arcade Station installation process."""
     
+    # Per-game tables in installed_games.toml that are tuned by hand and
+    # must survive the installer regenerating the games list
+    PRESERVED_GAME_TABLES = ("launch", "performance", "prewarm")
+    
+    # Per-game details the wizard has no fields for, set by the game importer
+    PRESERVED_GAME_FIELDS = ("developer", "release")
+    
     def __init__(self):
         """Initialize the installation manager."""
         self.is_windows = IS_WINDOWS
@@ -30,6 +39,7 @@ class InstallationManager:
         self.is_mac = IS_MAC
         self.resources_dir = RESOURCES_DIR
         self.files_copied = False  # Track if files have been copied
+        self._asset_store_roots: Dict[str, str] = {}  # Install path to asset store directory
         
         # Get an instance of logger without reconfiguring the root logger
         self.logger = logging.getLogger("InstallationManager")
@@ -311,6 +321,9 @@ class InstallationManager:
             if config.get("itgmania", {}).get("enabled", False):
                 self._ensure_itgmania_integration(config, install_path)
             
+            # Replace duplicate banner copies with links into the asset store
+            self._dedupe_assets(install_path)
+            
             self.logger.info(f"Arcade Station installation completed successfully to {install_path}")
             return True
         
@@ -318,126 +331,24 @@ class InstallationManager:
             self.logger.error(f"Error during installation: {str(e)}", exc_info=True)
             return False
 
-    def _copy_project_files(self, install_path: str) -> None:
+    def _copy_project_files(self, install_path: str,
+                            progress: Optional[Callable[[int, int, int, int, str], None]] = None) -> None:
         """Copy project files to the installation directory.
         
+        Only files that changed since the last install are copied; see
+        utils/file_sync.py.
+        
         Args:
             install_path: Path to install directory
+            progress: Optional callback receiving (bytes_done, bytes_total,
+                      files_done, files_total, relative_path)
         """
         try:
-            import shutil
-            import os
-            from pathlib import Path
-            
-            # Get the current directory (where the installer is running from)
-            current_dir = Path(__file__).resolve().parent.parent.parent.parent.parent
-            
-            # Log the process
-            self.logger.info(f"Starting to copy all project files from {current_dir} to {install_path}")
-            
-            # Get all items in the current directory
-            all_items = list(current_dir.iterdir())
-            
-            # Tracking for logs
-            total_dirs_copied = 0
-            total_files_copied = 0
-            
-            # Copy each item
-            for item in all_items:
-                # Skip the installer for now to avoid copying it while it's running
-                if item.name == "installer":
-                    continue
-                    
-                dst_path = Path(install_path) / item.name
-                
-                self.logger.info(f"Copying {item.name} to {dst_path}")
-                
-                # Remove destination if it exists
-                if dst_path.exists():
-                    if dst_path.is_dir():
-                        shutil.rmtree(dst_path)
-                    else:
-                        os.remove(dst_path)
-                
-                # Copy directory or file with detailed logging
-                if item.is_dir():
-                    # Create custom copy function for counting items
-                    def copy_dir_recursive(src, dst):
-                        """Recursively copy a directory and its contents, updating counters.
-
-                        Args:
-                            src: Source directory path.
-                            dst: Destination directory path.
-                        """
-                        nonlocal total_dirs_copied, total_files_copied
-                        if os.path.isdir(src):
-                            total_dirs_copied += 1
-                            os.makedirs(dst, exist_ok=True)
-                            self.logger.info(f"Copying directory: {os.path.basename(src)}")
-                            items = os.listdir(src)
-                            for item in items:
-                                s = os.path.join(src, item)
-                                d = os.path.join(dst, item)
-                                copy_dir_recursive(s, d)
-                        else:
-                            total_files_copied += 1
-                            shutil.copy2(src, dst)
-                    
-                    # Use our custom copy function
-                    copy_dir_recursive(str(item), str(dst_path))
-                else:
-                    shutil.copy2(item, dst_path)
-                    total_files_copied += 1
+            # The project root is two levels above the installer package
+            current_dir = Path(INSTALLER_DIR).parent.parent
             
-            # Now copy the installer directory without the running executable
-            installer_src = current_dir / "installer"
-            installer_dst = Path(install_path) / "installer"
-            
-            if installer_src.exists():
-                self.logger.info("Copying installer files...")
-                
-                # Create the destination directory
-                os.makedirs(installer_dst, exist_ok=True)
-                
-                # Copy all files and subdirectories in installer
-                for item in installer_src.iterdir():
-                    dst_item = installer_dst / item.name
-                    try:
-                        if item.is_dir():
-                            # Custom function to copy installer directories
-                            def copy_installer_dir(src, dst):
-                                """Recursively copy installer directory and its contents, updating counters.
-
-                                Args:
-                                    src: Source directory path.
-                                    dst: Destination directory path.
-                                """
-                                nonlocal total_dirs_copied, total_files_copied
-                                os.makedirs(dst, exist_ok=True)
-                                total_dirs_copied += 1
-                                
-                                for item in os.listdir(src):
-                                    s = os.path.join(src, item)
-                                    d = os.path.join(dst, item)
-                                    
-                                    if os.path.isdir(s):
-                                        copy_installer_dir(s, d)
-                                    else:
-                                        try:
-                                            shutil.copy2(s, d)
-                                            total_files_copied += 1
-                                        except (PermissionError, OSError) as e:
-                                            self.logger.warning(f"Skipping locked file: {os.path.basename(s)}")
-                            
-                            copy_installer_dir(str(item), str(dst_item))
-                        else:
-                            try:
-                                shutil.copy2(item, dst_item)
-                                total_files_copied += 1
-                            except (PermissionError, OSError):
-                                self.logger.warning(f"Skipping locked file: {item.name}")
-                    except Exception as e:
-                        self.logger.error(f"Error copying {item.name}: {str(e)}")
+            self.logger.info(f"Syncing project files from {current_dir} to {install_path}")
+            stats = sync_tree(str(current_dir), install_path, progress=progress)
             
             # Ensure these specific directories exist even if not in source
             required_dirs = [
@@ -454,7 +365,10 @@ class InstallationManager:
                     self.logger.info(f"Creating required directory: {dir_path}")
                     os.makedirs(dir_full_path, exist_ok=True)
             
-            self.logger.info(f"Project files copied successfully: {total_dirs_copied} directories and {total_files_copied} files")
+            self.logger.info(
+                f"Project files synced: {stats['copied']} copied, {stats['skipped']} unchanged, "
+                f"{stats['removed']} removed, {stats['failed']} skipped in {stats['elapsed']:.1f}s"
+            )
             self.files_copied = True  # Mark files as copied
         except Exception as e:
             self.logger.error(f"Error copying project files: {str(e)}", exc_info=True)
@@ -473,6 +387,7 @@ class InstallationManager:
         # Create a fresh installed_games structure
         installed_games_path = os.path.join(config_dir, "installed_games.toml")
         installed_games = {"games": {}}
+        existing_games = {}
         
         # Load existing installed_games.toml only to preserve structure and metadata
         if os.path.exists(installed_games_path):
@@ -483,6 +398,7 @@ class InstallationManager:
                     for key, value in existing_config.items():
                         if key != "games":
                             installed_games[key] = value
+                    existing_games = existing_config.get("games", {})
             except Exception as e:
                 logging.warning(f"Failed to load existing installed_games.toml: {e}")
         
@@ -533,6 +449,15 @@ class InstallationManager:
                         "state": game_info.get("state", "o"),
                         "banner": game_info.get("banner", "")
                     }
+            
+            # Carry over hand-tuned per-game tables for games that are still configured
+            for game_id, game_entry in installed_games["games"].items():
+                existing_entry = existing_games.get(game_id)
+                if not isinstance(existing_entry, dict):
+                    continue
+                for key in self.PRESERVED_GAME_TABLES + self.PRESERVED_GAME_FIELDS:
+                    if key in existing_entry:
+                        game_entry[key] = existing_entry[key]
         
         # Generate default_config.toml
         log_dir = os.path.join(config_dir, "logs")
@@ -548,6 +473,55 @@ class InstallationManager:
             },
             "paths": {
                 "pegasus_base_path": "../../../pegasus-fe"
+            },
+            "game_mode": {
+                "enabled": True,
+                "poll_interval": 1.0,
+                "stretch_factor": 4.0,
+                "services": {
+                    "icloud": "pause",
+                    "itgmania_monitor": "lower_priority",
+                    "osd": "lower_priority",
+                    "streaming": "lower_priority",
+                    "upload": "stretch"
+                }
+            },
+            "prewarm": {
+                "enabled": True,
+                "max_bytes": 2147483648,
+                "bytes_per_second": 268435456,
+                "game_mode_bytes_per_second": 0,
+                "chunk_size": 1048576,
+                "max_files": 20000
+            },
+            "telemetry": {
+                "enabled": True,
+                "supervise": True,
+                "database_path": "",
+                "batch_size": 32,
+                "flush_interval": 1.0
+            },
+            "launch": {
+                "coalesce_window": 2.0,
+                "busy_policy": "reject",
+                "queue_timeout": 30.0
+            },
+            "assets": {
+                "store_path": "assets/store",
+                "link_mode": "auto"
+            },
+            "sounds": {
+                "enabled": True,
+                "backend": "auto",
+                "volume": 1.0,
+                "max_voices": 8,
+                "hotkey": "",
+                "reset": "",
+                "samples": {
+                    "click": os.path.join(config["install_path"], "assets", "sounds", "megatouch_click.wav"),
+                    "shutter": os.path.join(config["install_path"], "assets", "sounds", "megatouch_shutter.wav"),
+                    "yahoo": os.path.join(config["install_path"], "assets", "sounds", "megatouch_yahoo.wav")
+                }
             }
         }
         self._write_toml(os.path.join(config_dir, "default_config.toml"), default_config)
@@ -598,7 +572,19 @@ class InstallationManager:
         
         # Generate key_listener.toml
         key_listener = {
-            "key_mappings": config.get("key_listener", {}).get("key_mappings", {})
+            "key_mappings": config.get("key_listener", {}).get("key_mappings", {}),
+            "dispatcher": {
+                "max_workers": 2,
+                "debounce_seconds": 0.3,
+                "builtin_debounce_seconds": 2.0,
+                "stats_interval": 60.0,
+                "latency_window": 256,
+                "slow_threshold_ms": 1000.0
+            },
+            "input": {
+                "backends": ["keyboard"],
+                "joystick_poll_interval": 0.01
+            }
         }
         
         # If no key bindings were provided in the configuration, set default ones
@@ -654,7 +640,13 @@ class InstallationManager:
                 "mame": {
                     "executable_path": mame_path,
                     "executable": "mame.exe" if self.is_windows else "mame",
-                    "ini_path": config.get("mame_inipath", "")
+                    "ini_path": config.get("mame_inipath", ""),
+                    "launcher": "native"
+                },
+                "catalog": {
+                    "path": "assets/catalog/mame.db",
+                    "rom_paths": config.get("mame_rom_paths", []),
+                    "verify": True
                 }
             }
             self._write_toml(os.path.join(config_dir, "mame_config.toml"), mame_config)
@@ -666,17 +658,70 @@ class InstallationManager:
                 "file_location": config.get("screenshot", {}).get("file_location", os.path.join(config["install_path"], "screenshots")),
                 "file_name": "",
                 "quality": "High",
-                "sound_file": config.get("screenshot", {}).get("sound_file", os.path.join(config["install_path"], "assets", "sounds", "megatouch_yahoo.wav"))
+                "format": "jpeg",
+                "target_kb": 0,
+                "sound_file": config.get("screenshot", {}).get("sound_file", os.path.join(config["install_path"], "assets", "sounds", "megatouch_yahoo.wav")),
+                "resident": True,
+                "encode_workers": 0,
+                "frame_buffers": 8,
+                "burst_count": 5,
+                "burst_interval": 0.2
+            },
+            "replay": {
+                "enabled": False,
+                "monitor_index": config.get("screenshot", {}).get("monitor_index", 0),
+                "fps": 5,
+                "seconds": 10,
+                "max_width": 640,
+                "quality": 60,
+                "memory_budget_mb": 24,
+                "output": "gif"
             },
             "icloud_upload": {
                 "enabled": config.get("use_icloud", False),
                 "interval_seconds": 360,
                 "delete_after_upload": True,
+                "settle_seconds": 5,
+                "confirm_seconds": 120,
+                "index_path": "",
                 "apple_services_path": "C:/Program Files (x86)/Common Files/Apple/Internet Services/",
                 "processes_to_restart": [
                     "iCloudServices",
                     "iCloudPhotos"
                 ]
+            },
+            "upload": {
+                "enabled": False,
+                "backend": "local",
+                "upload_directory": "",
+                "concurrency": 3,
+                "chunk_kb": 4096,
+                "retries": 5,
+                "retry_base_seconds": 1.0,
+                "retry_max_seconds": 60.0,
+                "bandwidth_kbps": 0,
+                "game_bandwidth_kbps": 256,
+                "settle_seconds": 5,
+                "handoff_interval": 0,
+                "delete_after_upload": True,
+                "index_path": "",
+                "resume_path": "",
+                "local": {
+                    "path": ""
+                },
+                "webdav": {
+                    "url": "",
+                    "username": "",
+                    "password": ""
+                },
+                "s3": {
+                    "endpoint": "",
+                    "bucket": "",
+                    "region": "us-east-1",
+                    "prefix": "screenshots",
+                    "access_key": "",
+                    "secret_key": ""
+                }
             }
         }
         self._write_toml(os.path.join(config_dir, "screenshot_config.toml"), screenshot_config)
@@ -693,7 +738,10 @@ class InstallationManager:
                 "lights": {
                     "enabled": False,
                     "light_reset_executable_path": "",
-                    "light_mame_executable_path": ""
+                    "light_mame_executable_path": "",
+                    "service": True,
+                    "backend": "tools",
+                    "reset_hold": 0.3
                 },
                 "streaming": {
                     "webcam_management_enabled": False,
@@ -729,155 +777,127 @@ class InstallationManager:
     def _generate_pegasus_metadata(self, config: Dict[str, Any], metadata_dir: str) -> None:
         """Generate the Pegasus metadata files.
         
+        Entries are streamed to disk and the files are only replaced when
+        their content changed; see utils/pegasus_metadata.py. With
+        pegasus.split_by_system set, binary and MAME games go to separate
+        files.
+        
         Args:
             config: User configuration from the wizard
             metadata_dir: Directory to write the metadata files
         """
-        # Make sure the metadata directory exists
-        os.makedirs(metadata_dir, exist_ok=True)
+        split_by_system = bool(config.get("pegasus", {}).get("split_by_system", False))
+        # default_config.toml may have been rewritten since the last run
+        self._asset_store_roots.clear()
+        write_metadata(metadata_dir, self._iter_pegasus_games(config), split_by_system)
+    
+    def _iter_pegasus_games(self, config: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Produce the Pegasus entries for the configured games.
         
-        # Basic template for metadata.pegasus.txt
-        metadata_content = """collection: arcade_station
-shortname: arcade_station
-
-"""
+        ITGMania comes first, then the other binary games, then MAME games,
+        each in configuration order.
+        
+        Args:
+            config: User configuration from the wizard
+            
+        Yields:
+            tuple: (system, entry) where system is "binary" or "mame" and
+                   entry is accepted by pegasus_metadata.format_game()
+        """
+        launcher_path = os.path.join(config["install_path"], "src", "arcade_station", "launchers", "launch_game.py")
+        python_path = os.path.join(config["install_path"], ".venv", "Scripts", "pythonw.exe" if self.is_windows else "python")
+        default_itgmania_banner = "../../../../assets/images/banners/itgmania.png"
         
         # Track the games we've added to avoid duplicates
         added_game_ids = set()
         
         # Add ITGMania if configured
         # Check first in itgmania config, then in binary_games as fallback
-        itgmania_configured = False
-        if config.get("itgmania", {}).get("enabled", False):
-            itgmania_path = config["itgmania"].get("path", "")
-            
-            if itgmania_path:
-                launcher_path = os.path.join(config["install_path"], "src", "arcade_station", "launchers", "launch_game.py")
-                python_path = os.path.join(config["install_path"], ".venv", "Scripts", "pythonw.exe" if self.is_windows else "python")
-                
-                # Determine banner image path
-                banner_path = "../../../../assets/images/banners/itgmania.png"
-                if config["itgmania"].get("custom_image"):
-                    custom_banner = config["itgmania"].get("custom_image", "")
-                    if custom_banner:
-                        # For custom images, use absolute path
-                        banner_path = custom_banner.replace("\\", "/")
-                elif config["itgmania"].get("use_default_image", True):
-                    # For default image, use relative path
-                    banner_path = "../../../../assets/images/banners/itgmania.png"
-                
-                metadata_content += """game: ITGMania
-file: not\\using\\files\\to\\launch\\games\\ITGMania
-sortBy: a
-launch: 
-    "{}" 
-    "{}" 
-    "itgmania"
-assets.box_front: {}
-
-""".format(python_path, launcher_path, banner_path)
-                itgmania_configured = True
-                added_game_ids.add("itgmania")
+        if config.get("itgmania", {}).get("enabled", False) and config["itgmania"].get("path", ""):
+            banner_path = default_itgmania_banner
+            custom_banner = config["itgmania"].get("custom_image", "")
+            if custom_banner:
+                # For custom images, use absolute path
+                banner_path = custom_banner.replace("\\", "/")
+            
+            yield "binary", {
+                "name": "ITGMania",
+                "sort_by": "a",
+                "launch": [python_path, launcher_path, "itgmania"],
+                "fields": {"assets.box_front": banner_path}
+            }
+            added_game_ids.add("itgmania")
         
         # Add ITGMania from binary_games if not already added
-        if not itgmania_configured and config.get("binary_games", {}).get("itgmania"):
-            game_id = "itgmania"
+        if "itgmania" not in added_game_ids and config.get("binary_games", {}).get("itgmania"):
             game_info = config["binary_games"]["itgmania"]
             display_name = game_info.get("display_name", "ITGMania")
             
-            launcher_path = os.path.join(config["install_path"], "src", "arcade_station", "launchers", "launch_game.py")
-            python_path = os.path.join(config["install_path"], ".venv", "Scripts", "pythonw.exe" if self.is_windows else "python")
-            
             # Use absolute path for custom banner, relative for default
-            asset_path = game_info.get("banner", "")
-            if not asset_path:
-                asset_path = "../../../../assets/images/banners/itgmania.png"
-            else:
-                asset_path = asset_path.replace("\\", "/")
-            
-            metadata_content += """game: {}
-file: not\\using\\files\\to\\launch\\games\\{}
-sortBy: {}
-launch: 
-    "{}" 
-    "{}" 
-    "{}"
-assets.box_front: {}
-
-""".format(display_name, display_name, "a", python_path, launcher_path, game_id, asset_path)
-            added_game_ids.add(game_id)
+            asset_path = self._resolve_asset_reference(game_info.get("banner", ""), config["install_path"])
+            asset_path = asset_path.replace("\\", "/") if asset_path else default_itgmania_banner
+            
+            yield "binary", {
+                "name": display_name,
+                "sort_by": "a",
+                "launch": [python_path, launcher_path, "itgmania"],
+                "fields": {"assets.box_front": asset_path}
+            }
+            added_game_ids.add("itgmania")
         
         # Add other binary games if configured
-        if config.get("binary_games"):
-            launcher_path = os.path.join(config["install_path"], "src", "arcade_station", "launchers", "launch_game.py")
-            python_path = os.path.join(config["install_path"], ".venv", "Scripts", "pythonw.exe" if self.is_windows else "python")
-            
-            for idx, (game_id, game_info) in enumerate(config["binary_games"].items()):
-                # Skip ITGMania as it was already added above
-                if game_id == "itgmania" or game_id in added_game_ids:
-                    continue
-                    
-                display_name = game_info.get("display_name", get_display_name(game_id))
-                # Use absolute path for custom banner, omit if no banner
-                asset_path = game_info.get("banner", "")
-                if asset_path:
-                    asset_path = asset_path.replace("\\", "/")
-                    asset_line = f"assets.box_front: {asset_path}\n"
-                else:
-                    asset_line = ""
-                
-                sort_char = chr(ord('b') + idx)  # start with 'b' for binary games
-                
-                metadata_content += """game: {}
-file: not\\using\\files\\to\\launch\\games\\{}
-sortBy: {}
-launch: 
-    "{}" 
-    "{}" 
-    "{}"
-{}
-
-""".format(display_name, display_name, sort_char, python_path, launcher_path, game_id, asset_line)
-                added_game_ids.add(game_id)
+        for idx, (game_id, game_info) in enumerate(config.get("binary_games", {}).items()):
+            if game_id in added_game_ids:
+                continue
+            
+            # Use absolute path for custom banner, omit if no banner
+            asset_path = self._resolve_asset_reference(game_info.get("banner", ""), config["install_path"])
+            
+            yield "binary", {
+                "name": game_info.get("display_name", get_display_name(game_id)),
+                "sort_by": f"b{idx:05d}",  # after ITGMania, in configuration order
+                "launch": [python_path, launcher_path, game_id],
+                "fields": {
+                    "assets.box_front": asset_path.replace("\\", "/"),
+                    "developer": game_info.get("developer", ""),
+                    "release": game_info.get("release", "")
+                }
+            }
+            added_game_ids.add(game_id)
         
         # Add MAME games if configured
-        if config.get("mame_games"):
-            launcher_path = os.path.join(config["install_path"], "src", "arcade_station", "launchers", "launch_game.py")
-            python_path = os.path.join(config["install_path"], ".venv", "Scripts", "pythonw.exe" if self.is_windows else "python")
-            
-            for idx, (game_id, game_info) in enumerate(config["mame_games"].items()):
-                if game_id in added_game_ids:
-                    continue
-                    
-                display_name = game_info.get("display_name", game_id.replace("_", " ").title())
-                asset_path = game_info.get("banner", "")
-                if asset_path:
-                    # Convert absolute paths to relative if they're in the install directory
-                    if asset_path.startswith(config["install_path"]):
-                        asset_path = asset_path.replace(config["install_path"], "../..").replace("\\", "/")
-                    else:
-                        asset_path = asset_path.replace("\\", "/")
-                else:
-                    asset_path = "../../../../assets/images/banners/arcade_station.png"
-                
-                sort_char = chr(ord('m') + idx)  # start with 'm' for MAME games
-                
-                metadata_content += """game: {}
-file: not\\using\\files\\to\\launch\\games\\{}
-sortBy: {}
-launch: 
-    "{}" 
-    "{}" 
-    "{}"
-assets.box_front: {}
-
-""".format(display_name, display_name, sort_char, python_path, launcher_path, game_id, asset_path)
-                added_game_ids.add(game_id)
-        
-        # Write the metadata file, completely replacing any existing content
-        metadata_path = os.path.join(metadata_dir, "metadata.pegasus.txt")
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            f.write(metadata_content)
+        mame_games = config.get("mame_games", {})
+        catalog = self._load_mame_catalog(
+            config["install_path"],
+            [game_info.get("rom", "") for game_info in mame_games.values()]
+        ) if mame_games else {}
+        
+        for idx, (game_id, game_info) in enumerate(mame_games.items()):
+            if game_id in added_game_ids:
+                continue
+            
+            machine = catalog.get(game_info.get("rom", ""), {})
+            display_name = game_info.get("display_name") or machine.get("description") or game_id.replace("_", " ").title()
+            asset_path = self._resolve_asset_reference(game_info.get("banner", ""), config["install_path"])
+            if asset_path:
+                # Convert absolute paths to relative if they're in the install directory
+                if asset_path.startswith(config["install_path"]):
+                    asset_path = asset_path.replace(config["install_path"], "../..")
+                asset_path = asset_path.replace("\\", "/")
+            else:
+                asset_path = "../../../../assets/images/banners/arcade_station.png"
+            
+            yield "mame", {
+                "name": display_name,
+                "sort_by": f"m{idx:05d}",  # after the binary games
+                "launch": [python_path, launcher_path, game_id],
+                "fields": {
+                    "assets.box_front": asset_path,
+                    "developer": game_info.get("developer") or machine.get("manufacturer", ""),
+                    "release": game_info.get("release") or (machine.get("year", "") if (machine.get("year") or "").isdigit() else "")
+                }
+            }
+            added_game_ids.add(game_id)
     
     def _setup_windows_specific(self, config: Dict[str, Any], install_path: str) -> None:
         """Set up Windows-specific components.
@@ -1152,6 +1172,14 @@ Categories=Game;
         except ImportError:
             # Fallback to manual TOML writing
             self._write_toml_manually(file_path, data)
+        
+        # The station reads these files back with tomllib; catch a bad write
+        # here rather than at the first game launch
+        try:
+            with open(file_path, "rb") as f:
+                tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            self.logger.error(f"Generated {os.path.basename(file_path)} cannot be read back: {e}")
     
     def _write_toml_manually(self, file_path: str, data: Dict[str, Any], indent: int = 0) -> None:
         """Write a TOML file manually if tomli_w is not available.
@@ -1195,9 +1223,138 @@ Categories=Game;
                     file.write(f'{key} = "{value}"\n')
                 elif isinstance(value, bool):
                     file.write(f"{key} = {str(value).lower()}\n")
+                elif isinstance(value, list):
+                    # Python's repr of a list is not TOML once a string holds a backslash
+                    items = []
+                    for item in value:
+                        if isinstance(item, str):
+                            if any(path_key in key.lower() for path_key in ['path', 'banner', 'rom', 'state']):
+                                item = item.replace('\\', '/')
+                            items.append(f'"{item}"')
+                        elif isinstance(item, bool):
+                            items.append(str(item).lower())
+                        else:
+                            items.append(str(item))
+                    file.write(f"{key} = [{', '.join(items)}]\n")
                 else:
                     file.write(f"{key} = {value}\n")
     
+    def _load_mame_catalog(self, install_path: str, roms: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read titles, years and manufacturers from the MAME catalog.
+        
+        The catalog is built by mame_catalog.py, from the installer's MAME
+        page or after installation.
+        
+        Args:
+            install_path: Installation directory
+            roms: ROM set names to look up
+            
+        Returns:
+            dict: ROM set name to its catalog row; empty if there is no
+                  catalog
+        """
+        catalog_path = os.path.join(install_path, "assets", "catalog", "mame.db")
+        roms = [rom for rom in roms if rom]
+        if not roms or not os.path.exists(catalog_path):
+            return {}
+        try:
+            import sqlite3
+            
+            connection = sqlite3.connect(f"file:{Path(catalog_path).as_posix()}?mode=ro", uri=True)
+            connection.row_factory = sqlite3.Row
+            try:
+                rows = []
+                # Stay under SQLite's limit on statement parameters
+                for start in range(0, len(roms), 500):
+                    chunk = roms[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(connection.execute(
+                        f"SELECT name, description, year, manufacturer, cloneof FROM machines WHERE name IN ({placeholders})",
+                        chunk
+                    ))
+            finally:
+                connection.close()
+            return {row["name"]: dict(row) for row in rows}
+        except Exception as e:
+            # Metadata is still generated from the wizard's names alone
+            self.logger.warning(f"Could not read the MAME catalog: {e}")
+            return {}
+    
+    def _asset_store_root(self, install_path: str) -> str:
+        """Get the asset store directory from the installation's [assets] config.
+        
+        Relative store paths are resolved from the installation directory,
+        as asset_store.load_asset_config() does. The result is cached per
+        installation until the metadata is next generated.
+        
+        Args:
+            install_path: Installation directory
+            
+        Returns:
+            str: The asset store directory
+        """
+        roots = self._asset_store_roots
+        if install_path not in roots:
+            store_path = "assets/store"
+            try:
+                with open(os.path.join(install_path, "config", "default_config.toml"), "rb") as f:
+                    store_path = tomllib.load(f).get("assets", {}).get("store_path") or store_path
+            except (OSError, tomllib.TOMLDecodeError) as e:
+                self.logger.warning(f"Could not read the asset store path, using {store_path}: {e}")
+            roots[install_path] = os.path.join(install_path, store_path)
+        return roots[install_path]
+    
+    def _resolve_asset_reference(self, value: str, install_path: str) -> str:
+        """Turn a sha256: asset store reference into the stored file's path.
+        
+        Args:
+            value: A banner path or sha256:<hash> reference
+            install_path: Installation directory
+            
+        Returns:
+            str: The stored file's path, or value unchanged if it is not a
+                 reference or the object is not stored
+        """
+        if not value.startswith("sha256:"):
+            return value
+        digest = value[len("sha256:"):]
+        objects_dir = os.path.join(self._asset_store_root(install_path), "objects", digest[:2])
+        try:
+            for name in os.listdir(objects_dir):
+                if name.split(".", 1)[0] == digest:
+                    return os.path.join(objects_dir, name)
+        except OSError:
+            pass
+        self.logger.warning(f"Asset {value} is not in the asset store")
+        return value
+    
+    def _dedupe_assets(self, install_path: str) -> None:
+        """Link duplicate banner images to single copies in the asset store.
+        
+        Runs the installed asset_store.py with the installation's Python so
+        the store uses the installed configuration.
+        
+        Args:
+            install_path: Installation directory
+        """
+        try:
+            import subprocess
+            
+            if self.is_windows:
+                python_path = os.path.join(install_path, ".venv", "Scripts", "python.exe")
+            else:
+                python_path = os.path.join(install_path, ".venv", "bin", "python")
+            script_path = os.path.join(install_path, "src", "arcade_station", "core", "common", "asset_store.py")
+            if not (os.path.exists(python_path) and os.path.exists(script_path)):
+                self.logger.info("Asset store not available, skipping banner deduplication")
+                return
+            
+            result = subprocess.run([python_path, script_path, "dedupe"], capture_output=True, text=True, timeout=300)
+            self.logger.info(f"Banner deduplication: {result.stdout.strip() or result.stderr.strip()}")
+        except Exception as e:
+            # Non-fatal, the banners still work as separate copies
+            self.logger.warning(f"Banner deduplication failed: {e}")
+    
     def _ensure_itgmania_integration(self, config: Dict[str, Any], install_path: str) -> None:
         """Make sure ITGMania integration is set up properly.
         
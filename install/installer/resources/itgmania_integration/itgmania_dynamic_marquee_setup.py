@@ -82,6 +82,12 @@ except ImportError:
     load_toml_config = fallback_load_toml_config
     log_message = fallback_log_message
 
+# Share the banner's storage with the asset store when it is available
+try:
+    from arcade_station.core.common.asset_store import link_asset
+except ImportError:
+    link_asset = None
+
 
 def copy_shim_files(itgmania_path, custom_banner_path=None):
     """
@@ -179,8 +185,14 @@ def copy_shim_files(itgmania_path, custom_banner_path=None):
             else:
                 dest_png = dest_dir / "itgmania.png"
             
-            shutil.copy2(source_png, dest_png)
-            log_message(f"Copied banner image to {dest_png}", "SETUP")
+            if link_asset and link_asset(str(source_png), str(dest_png)):
+                log_message(f"Linked banner image to {dest_png}", "SETUP")
+            else:
+                # Replace rather than write through the old file, which may
+                # share its storage with other copies of the banner
+                dest_png.unlink(missing_ok=True)
+                shutil.copy2(source_png, dest_png)
+                log_message(f"Copied banner image to {dest_png}", "SETUP")
             
             # Create a config file with the banner path for the Lua script
             config_path = dest_dir / "ArcadeStationMarquee.config"
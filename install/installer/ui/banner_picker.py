@@ -0,0 +1,141 @@
+"""
+Banner suggestions for the game setup pages
+"""
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+from typing import Callable, List, Optional
+
+from .. import INSTALLER_DIR
+from ..utils.banner_index import BannerIndex, assign_banners
+
+# Banner library shipped with the project; copied into every installation
+PROJECT_BANNERS_DIR = os.path.join(os.path.dirname(os.path.dirname(INSTALLER_DIR)), "assets", "images", "banners")
+
+def get_banner_index(app) -> BannerIndex:
+    """Get the banner index, building it on first use.
+
+    The index covers the project's banner library and, when reconfiguring,
+    the banners already in the installation.
+
+    Args:
+        app: The main application instance
+
+    Returns:
+        BannerIndex: The shared index
+    """
+    install_path = app.user_config.get("install_path", "")
+    directories = [PROJECT_BANNERS_DIR]
+    if install_path:
+        installed_dir = os.path.join(install_path, "assets", "images", "banners")
+        if os.path.isdir(installed_dir) and os.path.abspath(installed_dir) != os.path.abspath(PROJECT_BANNERS_DIR):
+            directories.append(installed_dir)
+
+    cached = getattr(app, "_banner_index", None)
+    if cached is None or cached[0] != directories:
+        cached = (directories, BannerIndex.from_directories(directories))
+        app._banner_index = cached
+    return cached[1]
+
+def installed_banner_path(app, path: str) -> str:
+    """Point a banner from the project library at its installed copy.
+
+    Args:
+        app: The main application instance
+        path: Banner path from the index
+
+    Returns:
+        str: The installed copy's path if it exists, otherwise path
+             unchanged (the entries validate that the file exists)
+    """
+    install_path = app.user_config.get("install_path", "")
+    if install_path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(PROJECT_BANNERS_DIR):
+        installed = os.path.join(install_path, "assets", "images", "banners", os.path.basename(path))
+        if os.path.isfile(installed):
+            return installed
+    return path
+
+def choose_banner(app, game_id: str, display_name: str, rom: str,
+                  on_choose: Callable[[str], None], browse: Callable[[], None]) -> None:
+    """Offer ranked banner suggestions for a game, falling back to a file dialog.
+
+    Args:
+        app: The main application instance
+        game_id: The game's id
+        display_name: The game's display name
+        rom: The game's MAME ROM name, or "" for other games
+        on_choose: Called with the chosen banner path
+        browse: Opens the file dialog, used when there are no suggestions
+                or the user asks for it
+    """
+    suggestions = get_banner_index(app).suggest(game_id, display_name, rom, limit=8)
+    if not suggestions:
+        browse()
+        return
+
+    dialog = tk.Toplevel(app.root)
+    dialog.title("Choose Banner")
+    dialog.geometry("420x300")
+    dialog.transient(app.root)
+
+    ttk.Label(
+        dialog,
+        text=f"Suggested banners for {display_name or game_id or rom}:",
+        wraplength=380
+    ).pack(anchor="w", padx=10, pady=(10, 5))
+
+    listbox = tk.Listbox(dialog, height=8)
+    listbox.pack(fill="both", expand=True, padx=10)
+    for score, path in suggestions:
+        listbox.insert("end", f"{os.path.basename(path)}  ({score:.0%} match)")
+    listbox.selection_set(0)
+
+    def use_selected(*args):
+        selection = listbox.curselection()
+        if selection:
+            on_choose(installed_banner_path(app, suggestions[selection[0]][1]))
+        dialog.destroy()
+
+    def browse_instead():
+        dialog.destroy()
+        browse()
+
+    listbox.bind("<Double-Button-1>", use_selected)
+    button_frame = ttk.Frame(dialog)
+    button_frame.pack(fill="x", padx=10, pady=10)
+    ttk.Button(button_frame, text="Browse...", command=browse_instead).pack(side="left")
+    ttk.Button(button_frame, text="Use Banner", command=use_selected).pack(side="right")
+
+def suggest_all_banners(app, entries: List, rom_attribute: Optional[str] = None) -> None:
+    """Give every game entry without a banner its best match from the library.
+
+    Args:
+        app: The main application instance
+        entries: Game entries with id_var, name_var and banner_var
+        rom_attribute: Name of the entries' ROM variable, for MAME games
+    """
+    games = {}
+    by_id = {}
+    for entry in entries:
+        game_id = entry.id_var.get()
+        by_id[game_id] = entry
+        games[game_id] = {
+            "display_name": entry.name_var.get(),
+            "rom": getattr(entry, rom_attribute).get() if rom_attribute else "",
+            "banner": entry.banner_var.get().strip(),
+        }
+
+    missing = sum(1 for game in games.values() if not game["banner"])
+    if not missing:
+        messagebox.showinfo("Suggest Banners", "Every game already has a banner.")
+        return
+
+    assigned = assign_banners(get_banner_index(app), games)
+    for game_id, path in assigned.items():
+        by_id[game_id].banner_var.set(installed_banner_path(app, path))
+
+    messagebox.showinfo(
+        "Suggest Banners",
+        f"Assigned banners to {len(assigned)} of {missing} games without one. "
+        "Games without a close match were left unchanged."
+    )
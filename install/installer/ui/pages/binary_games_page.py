@@ -9,6 +9,7 @@ import tomllib
 import logging
 
 from .base_page import BasePage
+from ..banner_picker import choose_banner, suggest_all_banners
 from ...utils.game_id import generate_game_id, validate_game_id, get_display_name
 
 class GameEntry:
@@ -191,6 +192,17 @@ class GameEntry:
                 self.id_var.set(unique_id)
     
     def browse_banner(self):
+        """Pick a banner, offering the closest matches from the banner library first."""
+        choose_banner(
+            self.app,
+            self.id_var.get(),
+            self.name_var.get().strip(),
+            "",
+            self.banner_var.set,
+            self._browse_banner_file
+        )
+    
+    def _browse_banner_file(self):
         """Browse for a banner image."""
         filetypes = [
             ("Image files", "*.jpg *.jpeg *.png")
@@ -399,7 +411,15 @@ class BinaryGamesPage(BasePage):
             command=self.add_game,
             style="Accent.TButton"
         )
-        add_button.pack(expand=True, pady=5)
+        add_button.pack(side="left", expand=True, pady=5)
+        
+        # Fill in missing banners from the banner library
+        suggest_button = ttk.Button(
+            button_container,
+            text="Suggest Banners",
+            command=self.suggest_banners
+        )
+        suggest_button.pack(side="left", expand=True, pady=5)
     
     def add_game(self):
         """Add a new game entry."""
@@ -410,6 +430,10 @@ class BinaryGamesPage(BasePage):
         self.scrollable_frame.update_idletasks()
         self.entries_canvas.configure(scrollregion=self.entries_canvas.bbox("all"))
     
+    def suggest_banners(self):
+        """Assign the best matching library banner to every game without one."""
+        suggest_all_banners(self.app, self.game_entries)
+    
     def remove_game(self, entry):
         """Remove a game entry.
         
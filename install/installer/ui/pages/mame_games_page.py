@@ -2,6 +2,10 @@
 MAME games setup page for the Arcade Station Installer
 """
 import os
+import sys
+import json
+import threading
+import subprocess
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import uuid
@@ -9,6 +13,8 @@ import tomllib
 import logging
 
 from .base_page import BasePage
+from ..banner_picker import choose_banner, suggest_all_banners
+from ... import INSTALLER_DIR
 from ...utils.game_id import generate_game_id, validate_game_id, get_display_name
 
 class MameGameEntry:
@@ -180,6 +186,17 @@ class MameGameEntry:
         self.on_delete(self)
     
     def browse_banner(self):
+        """Pick a banner, offering the closest matches from the banner library first."""
+        choose_banner(
+            self.app,
+            self.id_var.get(),
+            self.name_var.get().strip(),
+            self.rom_var.get(),
+            self.banner_var.set,
+            self._browse_banner_file
+        )
+    
+    def _browse_banner_file(self):
         """Browse for a banner image."""
         filetypes = [
             ("Image files", "*.jpg *.jpeg *.png")
@@ -322,7 +339,8 @@ class MAMEGamesPage(BasePage):
         intro_text = ttk.Label(
             main_frame,
             text="Add arcade games that run using the MAME emulator. "
-                 "You'll need to provide the ROM name and save state for each game."
+                 "You'll need to provide the ROM name and save state for each game, "
+                 "or use Scan ROMs to pick from the sets MAME can run. "
                  "Select Next with the box unchecked to skip this page.",
             wraplength=500,
             justify="left"
@@ -399,6 +417,52 @@ class MAMEGamesPage(BasePage):
         )
         browse_ini_button.pack(side="right")
         
+        # ROM path, used by the ROM scan
+        rompath_frame = ttk.Frame(mame_config_frame)
+        rompath_frame.pack(fill="x", pady=5)
+        
+        rompath_label = ttk.Label(
+            rompath_frame,
+            text="ROM Path:",
+            width=15
+        )
+        rompath_label.pack(side="left", padx=(0, 5))
+        
+        self.rompath_var = tk.StringVar()
+        rompath_entry = ttk.Entry(
+            rompath_frame,
+            textvariable=self.rompath_var,
+            width=40
+        )
+        rompath_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        
+        browse_rom_button = ttk.Button(
+            rompath_frame,
+            text="Browse...",
+            command=self.browse_rompath
+        )
+        browse_rom_button.pack(side="right")
+        
+        # Scan for playable ROM sets
+        scan_frame = ttk.Frame(mame_config_frame)
+        scan_frame.pack(fill="x", pady=5)
+        
+        self.scan_button = ttk.Button(
+            scan_frame,
+            text="Scan ROMs...",
+            command=self.scan_roms
+        )
+        self.scan_button.pack(side="left")
+        
+        self.scan_status_var = tk.StringVar(value="Leave ROM Path empty to use the rompath from mame.ini")
+        scan_status = ttk.Label(
+            scan_frame,
+            textvariable=self.scan_status_var,
+            font=("Arial", 9),
+            foreground="#555555"
+        )
+        scan_status.pack(side="left", padx=10)
+        
         # Game Entries frame
         self.entries_frame = ttk.LabelFrame(
             main_frame,
@@ -456,7 +520,15 @@ class MAMEGamesPage(BasePage):
             command=self.add_game,
             style="Accent.TButton"  # Use a more prominent style
         )
-        add_button.pack(expand=True, pady=5)
+        add_button.pack(side="left", expand=True, pady=5)
+        
+        # Fill in missing banners from the banner library
+        suggest_button = ttk.Button(
+            button_container,
+            text="Suggest Banners",
+            command=self.suggest_banners
+        )
+        suggest_button.pack(side="left", expand=True, pady=5)
         
         # Set initial state
         self.toggle_mame_settings()
@@ -514,6 +586,146 @@ class MAMEGamesPage(BasePage):
         if dir_path:
             self.inipath_var.set(dir_path)
     
+    def browse_rompath(self):
+        """Browse for the MAME ROM directory."""
+        initial_dir = self.rompath_var.get() if self.rompath_var.get() else os.path.expanduser("~")
+        
+        dir_path = filedialog.askdirectory(
+            title="Select MAME ROM Directory",
+            initialdir=initial_dir
+        )
+        
+        if dir_path:
+            self.rompath_var.set(dir_path)
+    
+    def _mame_executable(self):
+        """Get the MAME executable from the MAME path field.
+        
+        Returns:
+            str: Path to the MAME executable
+        """
+        mame_path = self.path_var.get().strip()
+        if os.path.isdir(mame_path):
+            return os.path.join(mame_path, "mame.exe" if self.app.install_manager.is_windows else "mame")
+        return mame_path
+    
+    def scan_roms(self):
+        """Build the MAME catalog in the background and offer the playable sets."""
+        executable = self._mame_executable()
+        if not executable or not os.path.exists(executable):
+            messagebox.showerror(
+                "Invalid MAME Path",
+                "Please select the MAME executable or directory before scanning."
+            )
+            return
+        
+        project_dir = os.path.dirname(os.path.dirname(INSTALLER_DIR))
+        script_path = os.path.join(project_dir, "src", "arcade_station", "core", "common", "mame_catalog.py")
+        # Written where the installation reads it back when generating the
+        # Pegasus metadata, not into the source checkout
+        install_path = self.app.user_config.get("install_path") or project_dir
+        catalog_path = os.path.join(install_path, "assets", "catalog", "mame.db")
+        
+        scan_command = [sys.executable, script_path, "--catalog", catalog_path, "scan", "--mame", executable]
+        if self.inipath_var.get().strip():
+            scan_command += ["--ini-path", self.inipath_var.get().strip()]
+        if self.rompath_var.get().strip():
+            scan_command += ["--rom-path", self.rompath_var.get().strip()]
+        list_command = [sys.executable, script_path, "--catalog", catalog_path, "list", "--clones", "--json"]
+        
+        def run_scan():
+            # -listxml takes a while on a full MAME build; keep the window responsive
+            try:
+                scan = subprocess.run(scan_command, capture_output=True, text=True, timeout=900)
+                if scan.returncode != 0:
+                    raise RuntimeError(scan.stderr.strip() or "MAME scan failed")
+                listing = subprocess.run(list_command, capture_output=True, text=True, timeout=120, check=True)
+                games = json.loads(listing.stdout)
+                self.app.root.after(0, lambda: self._on_scan_finished(games, scan.stdout.strip()))
+            except Exception as e:
+                logging.warning(f"MAME ROM scan failed: {e}")
+                # e is unbound once the except block ends, before the callback runs
+                message = str(e)
+                self.app.root.after(0, lambda message=message: self._on_scan_finished(None, message))
+        
+        self.scan_button.configure(state="disabled")
+        self.scan_status_var.set("Scanning MAME and ROMs, this can take a minute...")
+        threading.Thread(target=run_scan, daemon=True).start()
+    
+    def _on_scan_finished(self, games, message):
+        """Show the result of a ROM scan.
+        
+        Args:
+            games: Playable sets from the catalog, or None if the scan failed
+            message: Summary or error message from the scan
+        """
+        self.scan_button.configure(state="normal")
+        if games is None:
+            self.scan_status_var.set("Scan failed")
+            messagebox.showerror("ROM Scan Failed", message)
+            return
+        
+        self.scan_status_var.set(message)
+        if not games:
+            messagebox.showinfo("ROM Scan", "No playable ROM sets were found.")
+            return
+        self.show_catalog_picker(games)
+    
+    def show_catalog_picker(self, games):
+        """Let the user pick scanned sets to add as game entries.
+        
+        Args:
+            games: Playable sets from the catalog, with name, description,
+                   year and cloneof
+        """
+        existing_roms = {entry.rom_var.get().strip() for entry in self.game_entries}
+        choices = [game for game in games if game["name"] not in existing_roms]
+        
+        dialog = tk.Toplevel(self.app.root)
+        dialog.title("Add MAME Games")
+        dialog.geometry("560x480")
+        dialog.transient(self.app.root)
+        
+        filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(dialog, textvariable=filter_var)
+        filter_entry.pack(fill="x", padx=10, pady=(10, 5))
+        
+        list_frame = ttk.Frame(dialog)
+        list_frame.pack(fill="both", expand=True, padx=10)
+        listbox = tk.Listbox(list_frame, selectmode="extended")
+        list_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=listbox.yview)
+        listbox.configure(yscrollcommand=list_scrollbar.set)
+        listbox.pack(side="left", fill="both", expand=True)
+        list_scrollbar.pack(side="right", fill="y")
+        
+        shown = []
+        
+        def refresh(*args):
+            text = filter_var.get().strip().lower()
+            shown[:] = [
+                game for game in choices
+                if not text or text in game["name"].lower() or text in (game["description"] or "").lower()
+            ]
+            listbox.delete(0, "end")
+            for game in shown:
+                clone = f" (clone of {game['cloneof']})" if game["cloneof"] else ""
+                listbox.insert("end", f"{game['description']} [{game['name']}] {game['year'] or ''}{clone}")
+        
+        def add_selected():
+            for index in listbox.curselection():
+                game = shown[index]
+                self.add_game()
+                entry = self.game_entries[-1]
+                entry.name_var.set(game["description"] or game["name"])
+                entry.rom_var.set(game["name"])
+            dialog.destroy()
+        
+        filter_var.trace_add("write", refresh)
+        refresh()
+        
+        ttk.Button(dialog, text="Add Selected", command=add_selected).pack(pady=10)
+        filter_entry.focus_set()
+    
     def add_game(self):
         """Add a new MAME game entry."""
         entry = MameGameEntry(self, self.games_frame, self.app, self.remove_game)
@@ -523,6 +735,10 @@ class MAMEGamesPage(BasePage):
         self.scrollable_frame.update_idletasks()
         self.entries_canvas.configure(scrollregion=self.entries_canvas.bbox("all"))
     
+    def suggest_banners(self):
+        """Assign the best matching library banner to every game without one."""
+        suggest_all_banners(self.app, self.game_entries, "rom_var")
+    
     def remove_game(self, entry):
         """Remove a MAME game entry.
         
@@ -600,6 +816,8 @@ class MAMEGamesPage(BasePage):
             del self.app.user_config["mame_path"]
         if "mame_inipath" in self.app.user_config:
             del self.app.user_config["mame_inipath"]
+        if "mame_rom_paths" in self.app.user_config:
+            del self.app.user_config["mame_rom_paths"]
         if "mame_games" in self.app.user_config:
             del self.app.user_config["mame_games"]
             
@@ -610,6 +828,9 @@ class MAMEGamesPage(BasePage):
             if self.inipath_var.get().strip():
                 self.app.user_config["mame_inipath"] = self.inipath_var.get().strip()
             
+            if self.rompath_var.get().strip():
+                self.app.user_config["mame_rom_paths"] = [self.rompath_var.get().strip()]
+            
             # Save game entries
             mame_games = {}
             for entry in self.game_entries:
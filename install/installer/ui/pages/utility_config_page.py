@@ -211,6 +211,15 @@ class UtilityConfigPage(BasePage):
             command=self.browse_lights_mame
         )
         browse_mame_button.pack(side="right")
+        
+        # Resident lights service - on by default
+        self.lights_service_var = tk.BooleanVar(value=True)
+        lights_service = ttk.Checkbutton(
+            self.lights_options_frame,
+            text="Keep a lights service running instead of starting the lights programs for every reset",
+            variable=self.lights_service_var
+        )
+        lights_service.pack(anchor="w", pady=5)
     
     def create_streaming_section(self, parent):
         """Create the streaming configuration section."""
@@ -895,7 +904,10 @@ class UtilityConfigPage(BasePage):
             utilities_config["lights"] = {
                 "enabled": self.enable_lights_var.get(),
                 "light_reset_executable_path": self.lights_reset_var.get() if self.enable_lights_var.get() else "",
-                "light_mame_executable_path": self.lights_mame_var.get() if self.enable_lights_var.get() else ""
+                "light_mame_executable_path": self.lights_mame_var.get() if self.enable_lights_var.get() else "",
+                "service": self.lights_service_var.get(),
+                "backend": "tools",
+                "reset_hold": 0.3
             }
         
         # Save streaming configuration
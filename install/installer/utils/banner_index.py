@@ -0,0 +1,295 @@
+"""Ranked banner suggestions from the banner library.
+
+Banner file names in assets/images/banners are short tags (ddr-a20-plus,
+itg2, notitg), while games are configured by id, display name or MAME ROM
+name. An inverted index over the tokens and character trigrams of every
+banner name lets each game be matched against the whole library without
+comparing it to every file:
+
+- Tokens match whole words and numbers, weighted by how rare they are in
+  the library, so "a20" counts for more than "ddr".
+- Trigrams of the name with separators removed match spellings the tokens
+  miss, like "5th Mix" against 5thmix.
+- Acronyms of consecutive words in the query ("Dance Dance Revolution"
+  gives ddr) match the abbreviations banner names use.
+
+Building the index for a few hundred banners and ranking a game against it
+both take well under a millisecond per item, so suggestions can be shown
+as soon as a banner is browsed for, and whole game catalogs can be assigned
+in one pass.
+"""
+import os
+import re
+import math
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Banners that are placeholders for any game, never suggested
+EXCLUDED_PREFIXES = ("arcade_station",)
+
+STOPWORDS = {"the", "of", "and"}
+
+# Lowest score bulk assignment accepts
+DEFAULT_MIN_SCORE = 0.5
+
+logger = logging.getLogger("InstallationManager")
+
+def _words(text: str, keep_stopwords: bool = False) -> List[str]:
+    """Split text into lowercase words at anything that is not a letter or digit.
+
+    Args:
+        text: Name, id or file name
+        keep_stopwords: Keep words like "the", which acronyms need
+
+    Returns:
+        list: Words in order
+    """
+    return [
+        word for word in re.split(r"[^a-z0-9]+", text.lower())
+        if word and (keep_stopwords or word not in STOPWORDS)
+    ]
+
+def tokenize(text: str, acronyms: bool = False) -> Set[str]:
+    """Turn a name into the tokens it is indexed and searched by.
+
+    Words are kept whole and also split where letters meet digits
+    (itg2 gives itg and 2). Single letters from such a split are dropped,
+    since a20 should not match every banner with an "a" in it.
+
+    Args:
+        text: Name, id or file name
+        acronyms: Also add the initials of every run of two to four
+                  consecutive words, and every pair of adjacent words
+                  joined ("5th Mix" gives 5thmix), for matching a query
+                  against names that abbreviate or run words together
+
+    Returns:
+        set: Tokens
+    """
+    words = _words(text)
+    tokens = set(words)
+    for word in words:
+        pieces = re.findall(r"[a-z]+|[0-9]+", word)
+        if len(pieces) > 1:
+            tokens.update(piece for piece in pieces if piece.isdigit() or len(piece) > 1)
+    if acronyms:
+        tokens.update(first + second for first, second in zip(words, words[1:]))
+        alpha = [word for word in _words(text, keep_stopwords=True) if word.isalpha()]
+        for size in range(2, 5):
+            for start in range(len(alpha) - size + 1):
+                tokens.add("".join(word[0] for word in alpha[start:start + size]))
+    return tokens
+
+def abbreviations(text: str) -> Set[str]:
+    """Spell a name with each run of two to four words shortened to its initials.
+
+    "In The Groove 3" gives itg3 and "Dance Dance Revolution Extreme"
+    gives ddrextreme, among others.
+
+    Args:
+        text: Name or id
+
+    Returns:
+        set: Compact abbreviated spellings
+    """
+    words = _words(text, keep_stopwords=True)
+    variants = set()
+    for size in range(2, 5):
+        for start in range(len(words) - size + 1):
+            run = words[start:start + size]
+            if all(word.isalpha() for word in run):
+                initials = "".join(word[0] for word in run)
+                variants.add("".join(words[:start]) + initials + "".join(words[start + size:]))
+    return variants
+
+def trigrams(text: str) -> Set[str]:
+    """Get the character trigrams of a name with its separators removed.
+
+    The name is padded with a space at each end, so short names like x2
+    still have trigrams and matching starts and ends count.
+
+    Args:
+        text: Name, id or file name
+
+    Returns:
+        set: Trigrams, empty if the name has no letters or digits
+    """
+    compact = "".join(_words(text))
+    if not compact:
+        return set()
+    padded = f" {compact} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class BannerIndex:
+    """Inverted token and trigram index over banner image files."""
+
+    def __init__(self, paths: Iterable[str]):
+        """Index banner files.
+
+        Args:
+            paths: Banner image files; later duplicates of a file name are
+                   ignored
+        """
+        self.paths: List[str] = []
+        self.compact: List[str] = []
+        self.tokens: List[Set[str]] = []
+        self.trigram_counts: List[int] = []
+        self.token_postings: Dict[str, List[int]] = {}
+        self.trigram_postings: Dict[str, List[int]] = {}
+
+        seen = set()
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0].lower()
+            if name in seen or name.startswith(EXCLUDED_PREFIXES):
+                continue
+            seen.add(name)
+            banner = len(self.paths)
+            self.paths.append(path)
+            self.compact.append("".join(_words(name)))
+            tokens = tokenize(name)
+            self.tokens.append(tokens)
+            for token in tokens:
+                self.token_postings.setdefault(token, []).append(banner)
+            grams = trigrams(name)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_postings.setdefault(gram, []).append(banner)
+
+        count = max(1, len(self.paths))
+        self.idf = {
+            token: math.log(1 + count / len(postings))
+            for token, postings in self.token_postings.items()
+        }
+        self._by_compact = {compact: banner for banner, compact in enumerate(self.compact)}
+
+    @classmethod
+    def from_directories(cls, directories: Iterable[str]) -> "BannerIndex":
+        """Index every image in the given directories and their subdirectories.
+
+        Args:
+            directories: Banner library directories, in order of preference
+
+        Returns:
+            BannerIndex: The index
+        """
+        started = time.perf_counter()
+        paths = []
+        for directory in directories:
+            for root, _, names in os.walk(directory):
+                paths.extend(
+                    os.path.join(root, name) for name in sorted(names)
+                    if name.lower().endswith(IMAGE_EXTENSIONS)
+                )
+        index = cls(paths)
+        logger.info(f"Indexed {len(index.paths)} banners in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return index
+
+    def _score_text(self, text: str, scores: Dict[int, float]) -> None:
+        """Score the banners that share a token or trigram with one name.
+
+        Args:
+            text: Game id, display name or ROM name
+            scores: Banner to best score so far, updated in place
+        """
+        compact = "".join(_words(text))
+        if not compact:
+            return
+        exact = self._by_compact.get(compact)
+        if exact is not None:
+            scores[exact] = 1.0
+        for variant in abbreviations(text):
+            abbreviated = self._by_compact.get(variant)
+            if abbreviated is not None and scores.get(abbreviated, 0.0) < 0.95:
+                scores[abbreviated] = 0.95
+
+        query_tokens = tokenize(text, acronyms=True)
+        shared_weight: Dict[int, float] = {}
+        for token in query_tokens:
+            for banner in self.token_postings.get(token, ()):
+                shared_weight[banner] = shared_weight.get(banner, 0.0) + self.idf[token]
+
+        query_grams = trigrams(text)
+        shared_grams: Dict[int, int] = {}
+        for gram in query_grams:
+            for banner in self.trigram_postings.get(gram, ()):
+                shared_grams[banner] = shared_grams.get(banner, 0) + 1
+
+        # Acronyms are alternatives to the words they stand for, not extra words
+        query_weight = sum(self.idf.get(token, 1.0) for token in tokenize(text)) or 1.0
+        for banner in set(shared_weight) | set(shared_grams):
+            banner_weight = sum(self.idf[token] for token in self.tokens[banner]) or 1.0
+            shared = shared_weight.get(banner, 0.0)
+            token_score = 0.7 * min(1.0, shared / banner_weight) + 0.3 * min(1.0, shared / query_weight)
+            dice = 2 * shared_grams.get(banner, 0) / ((len(query_grams) + self.trigram_counts[banner]) or 1)
+            score = 0.5 * token_score + 0.5 * dice
+            if score > scores.get(banner, 0.0):
+                scores[banner] = score
+
+    def suggest(self, game_id: str = "", display_name: str = "", rom: str = "",
+                limit: int = 5, min_score: float = 0.2) -> List[Tuple[float, str]]:
+        """Rank banners for a game.
+
+        Args:
+            game_id: The game's id
+            display_name: The game's display name
+            rom: The game's MAME ROM name, if any
+            limit: Maximum number of suggestions
+            min_score: Lowest score to return
+
+        Returns:
+            list: (score, path) tuples, best first; scores are 0 to 1
+        """
+        scores: Dict[int, float] = {}
+        for text in (game_id, display_name, rom):
+            if text:
+                self._score_text(text, scores)
+        ranked = sorted(
+            ((score, banner) for banner, score in scores.items() if score >= min_score),
+            key=lambda item: (-item[0], len(self.compact[item[1]]))
+        )
+        return [(round(score, 3), self.paths[banner]) for score, banner in ranked[:limit]]
+
+    def best(self, game_id: str = "", display_name: str = "", rom: str = "",
+             min_score: float = DEFAULT_MIN_SCORE) -> Optional[str]:
+        """Get the single best banner for a game.
+
+        Args:
+            game_id: The game's id
+            display_name: The game's display name
+            rom: The game's MAME ROM name, if any
+            min_score: Lowest score to accept
+
+        Returns:
+            str: Path of the best banner, or None if none scores high enough
+        """
+        suggestions = self.suggest(game_id, display_name, rom, limit=1, min_score=min_score)
+        return suggestions[0][1] if suggestions else None
+
+def assign_banners(index: BannerIndex, games: Dict[str, Dict[str, str]],
+                   min_score: float = DEFAULT_MIN_SCORE) -> Dict[str, str]:
+    """Pick a banner for every game that does not have one.
+
+    Args:
+        index: Banner index
+        games: Game id to a dict with display_name, rom and banner keys
+        min_score: Lowest score to accept
+
+    Returns:
+        dict: Game id to banner path, for the games that were matched
+    """
+    started = time.perf_counter()
+    assigned = {}
+    for game_id, game in games.items():
+        if game.get("banner"):
+            continue
+        path = index.best(game_id, game.get("display_name", ""), game.get("rom", ""), min_score)
+        if path:
+            assigned[game_id] = path
+    logger.info(
+        f"Assigned banners to {len(assigned)} of {len(games)} games "
+        f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    return assigned
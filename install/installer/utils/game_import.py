@@ -0,0 +1,474 @@
+"""Import games from LaunchBox and EmulationStation into an installation.
+
+Cabinets moving to Arcade Station often already have their games listed in
+a LaunchBox platform XML (LaunchBox/Data/Platforms/<Platform>.xml) or an
+EmulationStation gamelist.xml. This module reads those files and merges
+their games into the installation's installed_games.toml, then regenerates
+the Pegasus metadata:
+
+- Entries whose path is a ROM archive on an arcade system (LaunchBox
+  platform "Arcade", EmulationStation systems mame/arcade) become MAME
+  games, keyed by the archive name.
+- Entries whose path is a program or script become binary games.
+- Anything else (console ROMs for other emulators) is skipped, since
+  Arcade Station only launches programs and MAME sets.
+
+Artwork comes from the gamelist's marquee/image fields, or for LaunchBox
+from its Images/<Platform>/<type> folders. Release year and developer are
+carried over for the Pegasus metadata.
+
+Both formats are read with iterparse and every game element is cleared
+once read, so memory use depends on the number of games imported, not on
+the size of the XML. Existing games are matched by ROM or executable path
+and only have their empty fields filled in, instead of being duplicated.
+
+Run without --apply for a dry run that prints what would change:
+
+    python -m installer.utils.game_import FILE [FILE ...] --install-path DIR [--apply]
+"""
+import os
+import re
+import sys
+import time
+import tomllib
+import logging
+import argparse
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .game_id import generate_game_id, validate_game_id
+
+PROGRAM_EXTENSIONS = (".exe", ".bat", ".cmd", ".lnk", ".sh", ".appimage")
+ROM_EXTENSIONS = (".zip", ".7z")
+
+# Systems whose ROM archives are MAME sets
+MAME_SYSTEMS = {"arcade", "mame", "mame-libretro", "mame-mame4all", "mame-advmame"}
+
+# LaunchBox image folders, in order of preference for a banner
+LAUNCHBOX_IMAGE_TYPES = ("Banner", "Arcade - Marquee", "Clear Logo", "Box - Front")
+
+# gamelist.xml fields, in order of preference for a banner
+GAMELIST_IMAGE_FIELDS = ("marquee", "image", "thumbnail")
+
+# Fields compared when deciding whether an existing game changes
+COMPARED_FIELDS = ("display_name", "path", "rom", "banner", "developer", "release")
+
+logger = logging.getLogger("InstallationManager")
+
+def _text(element: ET.Element, tag: str) -> str:
+    """Get the stripped text of a child element.
+
+    Args:
+        element: Parent element
+        tag: Child tag
+
+    Returns:
+        str: The text, or "" if the child is missing or empty
+    """
+    return (element.findtext(tag) or "").strip()
+
+def _year(date: str) -> str:
+    """Extract a four-digit year from a LaunchBox or EmulationStation date.
+
+    Args:
+        date: Date such as 1998-10-01T00:00:00-05:00 or 19981001T000000
+
+    Returns:
+        str: The year, or "" if there is none
+    """
+    match = re.match(r"(\d{4})", date)
+    return match.group(1) if match else ""
+
+def _iter_elements(path: str, tag: str) -> Iterator[ET.Element]:
+    """Stream the elements with a tag from an XML file.
+
+    Each element is cleared, along with the root's reference to it, after
+    the caller has processed it.
+
+    Args:
+        path: XML file
+        tag: Tag of the elements to yield
+
+    Yields:
+        Element: Each complete element
+    """
+    root = None
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        if element.tag == tag:
+            yield element
+            element.clear()
+            root.clear()
+
+def classify(system: str, path: str) -> Optional[str]:
+    """Decide how Arcade Station would launch a game.
+
+    Args:
+        system: LaunchBox platform or EmulationStation system name
+        path: The game's file
+
+    Returns:
+        str: "mame", "binary", or None if the game cannot be launched
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PROGRAM_EXTENSIONS:
+        return "binary"
+    if extension in ROM_EXTENSIONS and system.lower() in MAME_SYSTEMS:
+        return "mame"
+    return None
+
+class LaunchBoxArtwork:
+    """Finds LaunchBox artwork by its folder and file naming convention."""
+
+    def __init__(self, launchbox_root: str):
+        """Create the lookup.
+
+        Args:
+            launchbox_root: The LaunchBox installation directory
+        """
+        self.root = launchbox_root
+        self._listings: Dict[str, Dict[str, str]] = {}
+
+    def _listing(self, directory: str) -> Dict[str, str]:
+        """List an image folder once, including its region subfolders.
+
+        Args:
+            directory: Image folder
+
+        Returns:
+            dict: Lowercase file name to full path
+        """
+        if directory not in self._listings:
+            files = {}
+            for folder, _, names in os.walk(directory):
+                for name in names:
+                    files.setdefault(name.lower(), os.path.join(folder, name))
+            self._listings[directory] = files
+        return self._listings[directory]
+
+    def find(self, platform: str, title: str) -> str:
+        """Find the best banner image for a game.
+
+        Args:
+            platform: LaunchBox platform
+            title: Game title
+
+        Returns:
+            str: Path to the image, or "" if there is none
+        """
+        # LaunchBox replaces characters that are not allowed in file names
+        stem = re.sub(r"[:'/\\?*\"<>|]", "_", title).lower()
+        for image_type in LAUNCHBOX_IMAGE_TYPES:
+            files = self._listing(os.path.join(self.root, "Images", platform, image_type))
+            for extension in (".png", ".jpg", ".jpeg"):
+                path = files.get(f"{stem}-01{extension}")
+                if path:
+                    return path
+        return ""
+
+def iter_launchbox(path: str) -> Iterator[Dict[str, str]]:
+    """Read games from a LaunchBox platform XML file.
+
+    Args:
+        path: The XML file, normally LaunchBox/Data/Platforms/<Platform>.xml
+
+    Yields:
+        dict: Game with title, system, path, developer, release and banner
+    """
+    # The XML lives two levels below the LaunchBox directory
+    launchbox_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(path))))
+    artwork = LaunchBoxArtwork(launchbox_root)
+    for game in _iter_elements(path, "Game"):
+        title = _text(game, "Title")
+        # LaunchBox writes Windows paths, relative to its own directory
+        application = _text(game, "ApplicationPath").replace("\\", "/")
+        platform = _text(game, "Platform")
+        if application and not (os.path.isabs(application) or re.match(r"[A-Za-z]:/", application)):
+            application = os.path.normpath(os.path.join(launchbox_root, application))
+        yield {
+            "title": title,
+            "system": platform,
+            "path": application,
+            "developer": _text(game, "Developer"),
+            "release": _year(_text(game, "ReleaseDate")),
+            "banner": artwork.find(platform, title) if title else "",
+        }
+
+def iter_gamelist(path: str, system: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """Read games from an EmulationStation gamelist.xml file.
+
+    Args:
+        path: The gamelist.xml file
+        system: System name; defaults to the name of the directory the file
+                is in (roms/mame/gamelist.xml or gamelists/mame/gamelist.xml)
+
+    Yields:
+        dict: Game with title, system, path, developer, release and banner
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    system = system or os.path.basename(base_dir)
+
+    def resolve(value: str) -> str:
+        if not value:
+            return ""
+        value = os.path.expanduser(value)
+        return value if os.path.isabs(value) else os.path.normpath(os.path.join(base_dir, value))
+
+    for game in _iter_elements(path, "game"):
+        game_path = resolve(_text(game, "path"))
+        banner = ""
+        for field in GAMELIST_IMAGE_FIELDS:
+            banner = resolve(_text(game, field))
+            if banner:
+                break
+        yield {
+            "title": _text(game, "name") or os.path.splitext(os.path.basename(game_path))[0],
+            "system": system,
+            "path": game_path,
+            "developer": _text(game, "developer"),
+            "release": _year(_text(game, "releasedate")),
+            "banner": banner,
+        }
+
+def iter_source(path: str) -> Iterator[Dict[str, str]]:
+    """Read games from a file in either format, detected from its root element.
+
+    Args:
+        path: A LaunchBox XML or EmulationStation gamelist.xml file
+
+    Yields:
+        dict: Games as produced by iter_launchbox() or iter_gamelist()
+
+    Raises:
+        ValueError: If the file is in neither format
+    """
+    root_tag = None
+    with open(path, "rb") as f:
+        for _, element in ET.iterparse(f, events=("start",)):
+            root_tag = element.tag
+            break
+    if root_tag is None:
+        raise ValueError(f"{path} is empty")
+
+    if root_tag == "LaunchBox":
+        return iter_launchbox(path)
+    if root_tag == "gameList":
+        return iter_gamelist(path)
+    raise ValueError(f"{path} is not a LaunchBox or EmulationStation game list (root element <{root_tag}>)")
+
+def plan_import(sources: Iterable[Dict[str, str]], existing: Dict[str, Dict[str, Any]],
+                playable_roms: Optional[set] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, list]]:
+    """Merge imported games into the configured games.
+
+    Args:
+        sources: Imported games from iter_source()
+        existing: The [games] table of installed_games.toml
+        playable_roms: Playable sets from the MAME catalog, used to warn
+                       about ROMs that will not run; None to skip the check
+
+    Returns:
+        tuple: (games, changes) where games is the merged [games] table and
+               changes has "added", "updated", "unchanged", "skipped" and
+               "warnings" lists
+    """
+    games = {game_id: dict(entry) for game_id, entry in existing.items()}
+    by_rom = {entry["rom"]: game_id for game_id, entry in games.items() if entry.get("rom")}
+    by_path = {os.path.normcase(entry["path"]): game_id for game_id, entry in games.items() if entry.get("path")}
+    changes: Dict[str, list] = {"added": [], "updated": [], "unchanged": [], "skipped": [], "warnings": []}
+
+    for source in sources:
+        kind = classify(source["system"], source["path"]) if source["path"] else None
+        if kind is None:
+            changes["skipped"].append((source["title"], f"{source['system'] or 'unknown system'}: {source['path'] or 'no path'}"))
+            continue
+
+        entry = {"display_name": source["title"]}
+        if kind == "mame":
+            entry["rom"] = os.path.splitext(os.path.basename(source["path"]))[0]
+            entry["state"] = "o"
+            game_id = by_rom.get(entry["rom"])
+            if playable_roms is not None and entry["rom"] not in playable_roms:
+                changes["warnings"].append((source["title"], f"ROM {entry['rom']} is not playable according to the MAME catalog"))
+        else:
+            entry["path"] = source["path"].replace("\\", "/")
+            game_id = by_path.get(os.path.normcase(entry["path"]))
+        for key in ("banner", "developer", "release"):
+            if source[key]:
+                entry[key] = source[key].replace("\\", "/") if key == "banner" else source[key]
+
+        if game_id is None:
+            game_id = generate_game_id(source["title"], games)
+            if not validate_game_id(game_id):
+                # Titles with no ASCII letters or digits
+                game_id = generate_game_id(entry.get("rom") or "game", games)
+            games[game_id] = entry
+            if kind == "mame":
+                by_rom[entry["rom"]] = game_id
+            else:
+                by_path[os.path.normcase(entry["path"])] = game_id
+            changes["added"].append((game_id, entry))
+            continue
+
+        current = games[game_id]
+        # Values already configured win; the import only fills in blanks
+        merged = dict(current)
+        for key, value in entry.items():
+            if not current.get(key):
+                merged[key] = value
+        differences = [
+            (key, current.get(key, ""), merged.get(key, ""))
+            for key in COMPARED_FIELDS if current.get(key, "") != merged.get(key, "")
+        ]
+        if differences:
+            games[game_id] = merged
+            changes["updated"].append((game_id, differences))
+        else:
+            changes["unchanged"].append(game_id)
+
+    return games, changes
+
+def format_changes(changes: Dict[str, list], limit: int = 50) -> str:
+    """Describe the changes an import makes, as a diff-like listing.
+
+    Args:
+        changes: Changes from plan_import()
+        limit: Maximum lines listed per kind of change
+
+    Returns:
+        str: The listing, ending with a summary line
+    """
+    lines = []
+    for game_id, entry in changes["added"][:limit]:
+        target = f"rom {entry['rom']}" if "rom" in entry else entry["path"]
+        lines.append(f"+ {game_id}: {entry['display_name']} ({target})")
+    for game_id, differences in changes["updated"][:limit]:
+        for key, old, new in differences:
+            lines.append(f"~ {game_id}.{key}: {old!r} -> {new!r}")
+    for title, reason in changes["skipped"][:limit]:
+        lines.append(f"- skipped {title}: {reason}")
+    for title, warning in changes["warnings"][:limit]:
+        lines.append(f"! {title}: {warning}")
+    for kind in ("added", "updated", "skipped", "warnings"):
+        if len(changes[kind]) > limit:
+            lines.append(f"  ... {len(changes[kind]) - limit} more {kind}")
+    lines.append(
+        f"{len(changes['added'])} added, {len(changes['updated'])} updated, "
+        f"{len(changes['unchanged'])} unchanged, {len(changes['skipped'])} skipped, "
+        f"{len(changes['warnings'])} warnings"
+    )
+    return "\n".join(lines)
+
+def load_playable_roms(install_path: str) -> Optional[set]:
+    """Read the playable set names from the installation's MAME catalog.
+
+    Args:
+        install_path: Installation directory
+
+    Returns:
+        set: Playable set names, or None if there is no catalog
+    """
+    catalog_path = os.path.join(install_path, "assets", "catalog", "mame.db")
+    if not os.path.exists(catalog_path):
+        return None
+    try:
+        import sqlite3
+        from pathlib import Path
+
+        connection = sqlite3.connect(f"file:{Path(catalog_path).as_posix()}?mode=ro", uri=True)
+        try:
+            return {row[0] for row in connection.execute("SELECT name FROM machines WHERE playable = 1")}
+        finally:
+            connection.close()
+    except Exception as e:
+        logger.warning(f"Could not read the MAME catalog: {e}")
+        return None
+
+def wizard_config(install_path: str, games: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the wizard configuration the Pegasus metadata generator expects.
+
+    Args:
+        install_path: Installation directory
+        games: The [games] table of installed_games.toml
+
+    Returns:
+        dict: Configuration with install_path, binary_games and mame_games
+    """
+    binary_games = {}
+    mame_games = {}
+    for game_id, entry in games.items():
+        if entry.get("rom"):
+            mame_games[game_id] = entry
+        elif entry.get("path"):
+            binary_games[game_id] = entry
+    return {"install_path": install_path, "binary_games": binary_games, "mame_games": mame_games}
+
+def import_games(paths: List[str], install_path: str, apply: bool = False,
+                 split_by_system: bool = False) -> Dict[str, list]:
+    """Import games into an installation.
+
+    Args:
+        paths: LaunchBox XML and gamelist.xml files
+        install_path: Installation directory
+        apply: Write installed_games.toml and the Pegasus metadata; if
+               False, only compute the changes
+        split_by_system: Write the Pegasus metadata as one file per system
+
+    Returns:
+        dict: Changes from plan_import()
+    """
+    # Imported here so the parsers can be used without the installer package
+    from ..config.installation import InstallationManager
+
+    games_path = os.path.join(install_path, "config", "installed_games.toml")
+    installed_games: Dict[str, Any] = {"games": {}}
+    if os.path.exists(games_path):
+        with open(games_path, "rb") as f:
+            installed_games = tomllib.load(f)
+        installed_games.setdefault("games", {})
+
+    def sources():
+        for path in paths:
+            yield from iter_source(path)
+
+    games, changes = plan_import(sources(), installed_games["games"], load_playable_roms(install_path))
+    if not apply or not (changes["added"] or changes["updated"]):
+        return changes
+
+    manager = InstallationManager()
+    installed_games["games"] = games
+    temp_path = f"{games_path}.{os.getpid()}.tmp"
+    manager._write_toml(temp_path, installed_games)
+    os.replace(temp_path, games_path)
+
+    config = wizard_config(install_path, games)
+    config["pegasus"] = {"split_by_system": split_by_system}
+    metadata_dir = os.path.join(install_path, "src", "pegasus-fe", "config", "metafiles")
+    manager._generate_pegasus_metadata(config, metadata_dir)
+    return changes
+
+def main() -> None:
+    """Import games from the command line."""
+    parser = argparse.ArgumentParser(description="Import LaunchBox or EmulationStation game lists into Arcade Station.")
+    parser.add_argument("files", nargs="+", help="LaunchBox platform XML or EmulationStation gamelist.xml files")
+    parser.add_argument("--install-path", required=True, help="Arcade Station installation directory")
+    parser.add_argument("--apply", action="store_true", help="Write the changes (default: dry run)")
+    parser.add_argument("--split-by-system", action="store_true", help="Write one Pegasus metadata file per system")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum changes listed per kind")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    started = time.perf_counter()
+    try:
+        changes = import_games(args.files, args.install_path, args.apply, args.split_by_system)
+    except (OSError, ValueError, ET.ParseError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(format_changes(changes, args.limit))
+    action = "Applied" if args.apply else "Dry run, nothing written"
+    print(f"{action} in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Streaming, atomic writer for Pegasus metadata files.
+
+Game entries are written to a temporary file one at a time as they are
+produced, so a catalog of thousands of MAME sets is never held as one
+string. The content is hashed while it is written; if it matches the file
+already in place the temporary file is discarded and the existing file,
+and its modification time, are left alone. Otherwise the new file replaces
+the old one with a single rename, so Pegasus never reads a half-written
+file.
+
+Entries can also be split into one file per system (binary, mame), named
+<system>.metadata.pegasus.txt, which Pegasus reads from the same metafiles
+directory. Every file declares the same collection, so the games still
+appear together.
+"""
+import os
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Tuple
+
+from .file_sync import file_digest
+
+METADATA_FILE = "metadata.pegasus.txt"
+SPLIT_SUFFIX = ".metadata.pegasus.txt"
+
+DEFAULT_COLLECTION = "arcade_station"
+
+logger = logging.getLogger("InstallationManager")
+
+def format_game(game: Dict[str, Any]) -> str:
+    """Format one game entry.
+
+    Args:
+        game: Entry with name, sort_by, launch (list of command arguments)
+              and optional fields (dict of further keys such as
+              assets.box_front, developer or release; empty values are
+              left out)
+
+    Returns:
+        str: The entry, followed by a blank line
+    """
+    lines = [
+        f"game: {game['name']}",
+        f"file: not\\using\\files\\to\\launch\\games\\{game['name']}",
+        f"sortBy: {game['sort_by']}",
+        "launch: ",
+        " \n".join(f'    "{argument}"' for argument in game["launch"]),
+    ]
+    lines.extend(f"{key}: {value}" for key, value in game.get("fields", {}).items() if value)
+    return "\n".join(lines) + "\n\n"
+
+class MetadataFile:
+    """A metadata file being written to a temporary path."""
+
+    def __init__(self, path: str, collection: str = DEFAULT_COLLECTION):
+        """Start writing a metadata file.
+
+        Args:
+            path: Final path of the file
+            collection: Collection name and short name for the header
+        """
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self.games = 0
+        self._digest = hashlib.blake2b(digest_size=20)
+        self._file = open(self.temp_path, "w", encoding="utf-8", newline="\n")
+        self._write(f"collection: {collection}\nshortname: {collection}\n\n")
+
+    def _write(self, text: str) -> None:
+        """Write text and add it to the running hash.
+
+        Args:
+            text: Text to write
+        """
+        self._file.write(text)
+        self._digest.update(text.encode("utf-8"))
+
+    def add_game(self, game: Dict[str, Any]) -> None:
+        """Append a game entry.
+
+        Args:
+            game: Entry as accepted by format_game()
+        """
+        self._write(format_game(game))
+        self.games += 1
+
+    def commit(self) -> bool:
+        """Put the file in place unless the existing file is identical.
+
+        Returns:
+            bool: True if the file was replaced, False if it was unchanged
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if file_digest(self.path) == self._digest.hexdigest():
+            os.remove(self.temp_path)
+            return False
+        os.replace(self.temp_path, self.path)
+        return True
+
+    def abort(self) -> None:
+        """Discard the temporary file."""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+def write_metadata(metadata_dir: str, games: Iterable[Tuple[str, Dict[str, Any]]],
+                   split_by_system: bool = False, collection: str = DEFAULT_COLLECTION) -> Dict[str, bool]:
+    """Stream game entries into the metadata file or files.
+
+    Metadata files from an earlier layout (the single file when splitting,
+    or per-system files when not) are removed.
+
+    Args:
+        metadata_dir: Pegasus metafiles directory
+        games: (system, entry) tuples, in the order they should be written
+        split_by_system: Write one file per system instead of one file
+        collection: Collection every file declares
+
+    Returns:
+        dict: Path of each file written to True if it changed, or False if
+              it was already up to date
+    """
+    os.makedirs(metadata_dir, exist_ok=True)
+    files: Dict[str, MetadataFile] = {}
+    try:
+        for system, game in games:
+            key = system if split_by_system else ""
+            metadata_file = files.get(key)
+            if metadata_file is None:
+                name = f"{system}{SPLIT_SUFFIX}" if split_by_system else METADATA_FILE
+                metadata_file = files[key] = MetadataFile(os.path.join(metadata_dir, name), collection)
+            metadata_file.add_game(game)
+        if not files:
+            # Pegasus still needs the collection to exist
+            files[""] = MetadataFile(os.path.join(metadata_dir, METADATA_FILE), collection)
+        results = {metadata_file.path: metadata_file.commit() for metadata_file in files.values()}
+    except BaseException:
+        for metadata_file in files.values():
+            metadata_file.abort()
+        raise
+
+    for name in os.listdir(metadata_dir):
+        path = os.path.join(metadata_dir, name)
+        if (name == METADATA_FILE or name.endswith(SPLIT_SUFFIX)) and path not in results:
+            try:
+                os.remove(path)
+                logger.info(f"Removed stale metadata file {name}")
+            except OSError as e:
+                logger.warning(f"Could not remove stale metadata file {name}: {e}")
+
+    for metadata_file in files.values():
+        state = "written" if results[metadata_file.path] else "unchanged"
+        logger.info(f"{os.path.basename(metadata_file.path)}: {metadata_file.games} games, {state}")
+    return results
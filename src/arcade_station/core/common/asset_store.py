@@ -0,0 +1,705 @@
+"""
+Asset Store Module for Arcade Station.
+
+This module keeps every unique banner or marquee image once, under the
+SHA-256 of its content, and links it into the places that need it. The same
+banner often exists in assets/images/banners, in custom paths from
+installed_games.toml, in ITGMania's theme Modules directory and in backup
+installs; linking those copies to one stored object saves the disk space
+and gives every image a stable key that does not change when it is moved or
+renamed.
+
+Objects live in assets/store/objects/<first two hex digits>/<hash><ext>
+and are read-only. Places are linked to an object with, in order of
+preference (link_mode "auto"):
+
+- reflink: a copy-on-write clone (btrfs/XFS on Linux, APFS on macOS), so
+  editing one place never changes the others
+- copy: a plain copy, when the filesystem cannot clone
+
+Hardlinks are never used. Places are user-editable banners, and a place
+that shared its storage with an object would change the object whenever it
+was edited in place. Placed files are written to a temporary file and
+renamed over the destination, never written through.
+
+Images can be referenced by hash anywhere a path is accepted, for example
+banner = "sha256:<hash>" in installed_games.toml; resolve_asset() turns a
+reference into a path.
+
+The store keeps an index of the paths it has hashed, keyed by size and
+mtime, so repeat lookups do not re-read files. Settings are read from the
+[assets] section of default_config.toml.
+
+Usage:
+    python asset_store.py add PATH [PATH ...]
+    python asset_store.py lookup HASH
+    python asset_store.py link HASH DESTINATION
+    python asset_store.py dedupe [DIRECTORY ...]
+    python asset_store.py gc
+    python asset_store.py stats
+"""
+
+import os
+import sys
+import json
+import shutil
+import ctypes
+import ctypes.util
+import hashlib
+import argparse
+import threading
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import load_toml_config, log_message
+
+# Installation directory that relative store paths are resolved from
+BASE_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+
+ASSET_INDEX_FILE = "index.json"
+HASH_PREFIX = "sha256:"
+
+# Defaults used when default_config.toml does not configure the store
+DEFAULT_ASSET_SETTINGS = {
+    "store_path": "assets/store",
+    "link_mode": "auto",
+}
+
+VALID_LINK_MODES = ("auto", "reflink", "copy")
+
+# Permission bits cleared on stored objects
+WRITE_PERMISSIONS = 0o222
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".avif")
+
+# Linux ioctl that clones a whole file (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+def load_asset_config():
+    """
+    Load the [assets] settings from default_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_ASSET_SETTINGS present,
+              and store_path made absolute.
+    """
+    settings = dict(DEFAULT_ASSET_SETTINGS)
+    try:
+        config = load_toml_config('default_config.toml').get('assets', {})
+    except Exception as e:
+        log_message(f"Failed to load asset store configuration: {e}", "ASSETS")
+        config = {}
+
+    for key in settings:
+        if key in config:
+            settings[key] = config[key]
+
+    if settings["link_mode"] == "hardlink":
+        log_message("Hardlinks can corrupt stored assets and are no longer used, using 'auto'", "ASSETS")
+        settings["link_mode"] = "auto"
+    elif settings["link_mode"] not in VALID_LINK_MODES:
+        log_message(f"Unknown link mode '{settings['link_mode']}', using 'auto'", "ASSETS")
+        settings["link_mode"] = "auto"
+
+    settings["store_path"] = os.path.join(BASE_DIRECTORY, settings["store_path"])
+    return settings
+
+def hash_file(path):
+    """
+    Hash a file's content.
+
+    Args:
+        path (str): The file to hash.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def reflink(source, destination):
+    """
+    Clone a file with copy-on-write, where the filesystem supports it.
+
+    Args:
+        source (str): Existing file.
+        destination (str): New file to create; must not exist.
+
+    Returns:
+        bool: True if the clone was created.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            import fcntl
+            with open(source, 'rb') as src, open(destination, 'xb') as dst:
+                try:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                    return True
+                except OSError:
+                    pass
+            os.remove(destination)
+        except OSError:
+            pass
+        return False
+
+    if sys.platform == "darwin":
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            return libc.clonefile(os.fsencode(source), os.fsencode(destination), 0) == 0
+        except (OSError, AttributeError):
+            return False
+
+    return False
+
+class AssetStore:
+    """
+    Content-addressed store of image assets.
+
+    Attributes:
+        root (str): The store directory.
+        link_mode (str): One of VALID_LINK_MODES.
+    """
+
+    def __init__(self, root, link_mode="auto"):
+        """
+        Open a store, creating it on first use.
+
+        Args:
+            root (str): The store directory.
+            link_mode (str): How places are linked to objects.
+        """
+        self.root = root
+        self.link_mode = link_mode
+        self.index_path = os.path.join(root, ASSET_INDEX_FILE)
+        self._lock = threading.RLock()
+        self._paths = {}
+        self._links = {}
+        self._dirty = False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._paths = dict(data.get("paths", {}))
+            self._links = {digest: list(paths) for digest, paths in data.get("links", {}).items()}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        """
+        Write the index if it changed.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"paths": self._paths, "links": self._links}, f, indent=1)
+                os.replace(temp_path, self.index_path)
+                self._dirty = False
+            except OSError as e:
+                log_message(f"Failed to write asset index {self.index_path}: {e}", "ASSETS")
+
+    def digest_of(self, path):
+        """
+        Get the content hash of a file, reusing the indexed hash while the
+        file's size and mtime are unchanged.
+
+        Args:
+            path (str): The file.
+
+        Returns:
+            str: Hex SHA-256 digest, or None if the file cannot be read.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._paths.get(path)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                return cached[2]
+
+        try:
+            digest = hash_file(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._paths[path] = [stat.st_size, stat.st_mtime_ns, digest]
+            self._dirty = True
+        return digest
+
+    def object_path(self, digest, extension=""):
+        """
+        Get where an object is stored.
+
+        Args:
+            digest (str): Hex SHA-256 digest.
+            extension (str): File extension including the dot.
+
+        Returns:
+            str: Path of the object file.
+        """
+        return os.path.join(self.root, "objects", digest[:2], digest + extension.lower())
+
+    def lookup(self, digest):
+        """
+        Find a stored object by hash.
+
+        Args:
+            digest (str): Hex SHA-256 digest, with or without the sha256: prefix.
+
+        Returns:
+            str: Path of the object, or None if it is not stored.
+        """
+        if digest.startswith(HASH_PREFIX):
+            digest = digest[len(HASH_PREFIX):]
+        directory = os.path.join(self.root, "objects", digest[:2])
+        try:
+            for name in os.listdir(directory):
+                if name.split(".", 1)[0] == digest:
+                    return os.path.join(directory, name)
+        except OSError:
+            pass
+        return None
+
+    def _place(self, source, destination, read_only=False):
+        """
+        Create destination as an independent file with the content of source.
+
+        Args:
+            source (str): Existing file.
+            destination (str): File to create; must not exist.
+            read_only (bool): Remove write permission, for stored objects.
+                              Otherwise the owner may write the file.
+
+        Returns:
+            str: "reflink" or "copy".
+        """
+        if self.link_mode in ("auto", "reflink") and reflink(source, destination):
+            method = "reflink"
+        else:
+            shutil.copy2(source, destination)
+            method = "copy"
+        mode = os.stat(destination).st_mode & 0o7777
+        os.chmod(destination, mode & ~WRITE_PERMISSIONS if read_only else mode | 0o200)
+        return method
+
+    def _detach(self, object_path):
+        """
+        Give an object its own storage if it still shares it with another
+        name, as objects stored by older versions could.
+
+        Args:
+            object_path (str): The stored object.
+
+        Returns:
+            None
+        """
+        try:
+            if os.stat(object_path).st_nlink <= 1:
+                return
+        except OSError:
+            return
+
+        temp_path = f"{object_path}.{os.getpid()}.tmp"
+        try:
+            self._place(object_path, temp_path, read_only=True)
+            # Windows will not replace a read-only file
+            os.chmod(object_path, 0o600)
+            os.replace(temp_path, object_path)
+        except OSError as e:
+            log_message(f"Failed to detach {object_path}: {e}", "ASSETS")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def add(self, path):
+        """
+        Store a file's content, if it is not stored already.
+
+        Args:
+            path (str): The file to store.
+
+        Returns:
+            str: Hex SHA-256 digest of the file, or None if it cannot be read.
+        """
+        digest = self.digest_of(path)
+        if digest is None:
+            return None
+
+        existing = self.lookup(digest)
+        if existing:
+            self._detach(existing)
+            return digest
+
+        object_path = self.object_path(digest, os.path.splitext(path)[1])
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        temp_path = f"{object_path}.{os.getpid()}.tmp"
+        try:
+            self._place(path, temp_path, read_only=True)
+            os.replace(temp_path, object_path)
+        except OSError as e:
+            log_message(f"Failed to store {path}: {e}", "ASSETS")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return None
+
+        self._record_link(digest, path)
+        log_message(f"Stored {path} as {digest[:12]}", "ASSETS")
+        return digest
+
+    def _record_link(self, digest, path):
+        with self._lock:
+            links = self._links.setdefault(digest, [])
+            path = os.path.abspath(path)
+            if path not in links:
+                links.append(path)
+                self._dirty = True
+
+    def link(self, digest, destination):
+        """
+        Make destination a link to a stored object.
+
+        A destination that already has the same content is left alone;
+        otherwise it is replaced atomically.
+
+        Args:
+            digest (str): Hex SHA-256 digest, with or without the sha256: prefix.
+            destination (str): Path to create or replace.
+
+        Returns:
+            str: How the destination was linked ("reflink", "copy" or
+                 "existing"), or None if the object is not stored.
+        """
+        if digest.startswith(HASH_PREFIX):
+            digest = digest[len(HASH_PREFIX):]
+        object_path = self.lookup(digest)
+        if object_path is None:
+            log_message(f"Asset {digest[:12]} is not in the store", "ASSETS")
+            return None
+        self._detach(object_path)
+
+        destination = os.path.abspath(destination)
+        try:
+            if os.path.samefile(object_path, destination):
+                self._record_link(digest, destination)
+                return "existing"
+        except OSError:
+            pass
+
+        if self.digest_of(destination) == digest:
+            method = self._relink(object_path, destination)
+        else:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            temp_path = f"{destination}.{os.getpid()}.tmp"
+            try:
+                method = self._place(object_path, temp_path)
+                os.replace(temp_path, destination)
+            except OSError as e:
+                log_message(f"Failed to link {digest[:12]} to {destination}: {e}", "ASSETS")
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                return None
+
+        self._record_link(digest, destination)
+        return method
+
+    def _relink(self, object_path, destination):
+        """
+        Replace a duplicate copy with a clone of the object.
+
+        Args:
+            object_path (str): The stored object.
+            destination (str): A file with the same content.
+
+        Returns:
+            str: How the destination is now linked.
+        """
+        temp_path = f"{destination}.{os.getpid()}.tmp"
+        try:
+            method = self._place(object_path, temp_path)
+            if method == "copy":
+                # Replacing a copy with a copy saves nothing
+                os.remove(temp_path)
+                return "existing"
+            shutil.copystat(destination, temp_path)
+            os.replace(temp_path, destination)
+            return method
+        except OSError as e:
+            log_message(f"Failed to relink {destination}: {e}", "ASSETS")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return "existing"
+
+    def dedupe(self, paths):
+        """
+        Store each file and replace duplicates with links to one object.
+
+        Args:
+            paths (iterable): Files to deduplicate.
+
+        Returns:
+            dict: Counts of files seen, files linked and bytes saved.
+        """
+        result = {"files": 0, "linked": 0, "saved_bytes": 0}
+        for path in paths:
+            digest = self.add(path)
+            if digest is None:
+                continue
+            result["files"] += 1
+            object_path = self.lookup(digest)
+            try:
+                if os.path.samefile(object_path, path):
+                    continue
+            except OSError:
+                continue
+            if self._relink(object_path, os.path.abspath(path)) == "reflink":
+                result["linked"] += 1
+                result["saved_bytes"] += os.path.getsize(path)
+            self._record_link(digest, path)
+        self.save()
+        return result
+
+    def gc(self):
+        """
+        Remove objects that no recorded place links to any more.
+
+        Returns:
+            int: Number of objects removed.
+        """
+        removed = 0
+        objects_dir = os.path.join(self.root, "objects")
+        for directory, _, names in os.walk(objects_dir):
+            for name in names:
+                digest = name.split(".", 1)[0]
+                with self._lock:
+                    links = [path for path in self._links.get(digest, []) if self.digest_of(path) == digest]
+                    if links != self._links.get(digest, []):
+                        self._dirty = True
+                    if links:
+                        self._links[digest] = links
+                    else:
+                        self._links.pop(digest, None)
+                if not links:
+                    try:
+                        # Windows will not remove a read-only file
+                        os.chmod(os.path.join(directory, name), 0o600)
+                        os.remove(os.path.join(directory, name))
+                        removed += 1
+                    except OSError as e:
+                        log_message(f"Failed to remove unused asset {name}: {e}", "ASSETS")
+
+        with self._lock:
+            stale = [path for path in self._paths if not os.path.exists(path)]
+            for path in stale:
+                del self._paths[path]
+            self._dirty = self._dirty or bool(stale)
+        self.save()
+        return removed
+
+    def stats(self):
+        """
+        Summarize the store.
+
+        Returns:
+            dict: Number of objects, their total size, number of linked places.
+        """
+        objects = 0
+        size = 0
+        for directory, _, names in os.walk(os.path.join(self.root, "objects")):
+            for name in names:
+                objects += 1
+                size += os.path.getsize(os.path.join(directory, name))
+        with self._lock:
+            places = sum(len(paths) for paths in self._links.values())
+        return {"objects": objects, "bytes": size, "places": places}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_asset_store():
+    """
+    Get the configured asset store, opening it on first use.
+
+    Returns:
+        AssetStore: The store.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            settings = load_asset_config()
+            _store = AssetStore(settings["store_path"], settings["link_mode"])
+        return _store
+
+def is_asset_reference(value):
+    """
+    Check whether a configured value refers to an asset by hash.
+
+    Args:
+        value (str): A path or sha256: reference.
+
+    Returns:
+        bool: True for a sha256: reference.
+    """
+    return isinstance(value, str) and value.startswith(HASH_PREFIX)
+
+def resolve_asset(value):
+    """
+    Turn a path or sha256: reference into a path.
+
+    Args:
+        value (str): A path, or sha256:<hash> of a stored asset.
+
+    Returns:
+        str: The path, the stored object for a reference, or None if a
+             referenced object is not stored.
+    """
+    if not is_asset_reference(value):
+        return value
+    path = get_asset_store().lookup(value)
+    if path is None:
+        log_message(f"Asset {value} is not in the store", "ASSETS")
+    return path
+
+def asset_key(path):
+    """
+    Get a stable cache key for an image.
+
+    Args:
+        path (str): A path or sha256: reference.
+
+    Returns:
+        str: sha256:<hash> of the content, or None if the file cannot be read.
+    """
+    if is_asset_reference(path):
+        return path
+    digest = get_asset_store().digest_of(path)
+    return HASH_PREFIX + digest if digest else None
+
+def link_asset(source, destination):
+    """
+    Put an image at destination, sharing storage with the other copies
+    where the filesystem can clone files.
+
+    Args:
+        source (str): A path or sha256: reference of the image.
+        destination (str): Where the image is needed.
+
+    Returns:
+        bool: True if destination now holds the image.
+    """
+    store = get_asset_store()
+    digest = source[len(HASH_PREFIX):] if is_asset_reference(source) else store.add(source)
+    method = store.link(digest, destination) if digest else None
+    store.save()
+    return method is not None
+
+def default_dedupe_paths():
+    """
+    List the images that usually have duplicates: the banners directory and
+    every banner configured in installed_games.toml.
+
+    Returns:
+        list: Image paths.
+    """
+    paths = []
+    banners_dir = os.path.join(BASE_DIRECTORY, "assets", "images", "banners")
+    for directory, _, names in os.walk(banners_dir):
+        paths.extend(os.path.join(directory, name) for name in names if name.lower().endswith(IMAGE_EXTENSIONS))
+
+    try:
+        games = load_toml_config('installed_games.toml').get('games', {})
+    except Exception:
+        games = {}
+    for game in games.values():
+        banner = game.get('banner', '') if isinstance(game, dict) else ''
+        if banner and not is_asset_reference(banner) and os.path.isfile(banner):
+            paths.append(banner)
+
+    return list(dict.fromkeys(os.path.abspath(path) for path in paths))
+
+def main():
+    """
+    Manage the asset store from the command line.
+
+    Command-line Arguments:
+        add: Store files and print their hashes.
+        lookup: Print the stored path of a hash.
+        link: Link a stored hash to a destination path.
+        dedupe: Replace duplicate images with links (defaults to the banners).
+        gc: Remove objects nothing links to.
+        stats: Print the size of the store.
+
+    Returns:
+        None. Exits with status code 1 if a lookup or link fails.
+    """
+    parser = argparse.ArgumentParser(description='Manage the content-addressed asset store.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    add = subparsers.add_parser('add', help='Store files and print their hashes')
+    add.add_argument('paths', nargs='+')
+    lookup = subparsers.add_parser('lookup', help='Print the stored path of a hash')
+    lookup.add_argument('digest')
+    link = subparsers.add_parser('link', help='Link a stored hash to a destination')
+    link.add_argument('digest')
+    link.add_argument('destination')
+    dedupe = subparsers.add_parser('dedupe', help='Replace duplicate images with links')
+    dedupe.add_argument('directories', nargs='*')
+    subparsers.add_parser('gc', help='Remove objects nothing links to')
+    subparsers.add_parser('stats', help='Print the size of the store')
+    args = parser.parse_args()
+
+    store = get_asset_store()
+    if args.command == 'add':
+        for path in args.paths:
+            digest = store.add(path)
+            print(f"{HASH_PREFIX}{digest}  {path}" if digest else f"failed  {path}")
+        store.save()
+    elif args.command == 'lookup':
+        path = store.lookup(args.digest)
+        if path is None:
+            sys.exit(1)
+        print(path)
+    elif args.command == 'link':
+        method = store.link(args.digest, args.destination)
+        store.save()
+        if method is None:
+            sys.exit(1)
+        print(f"{method}: {args.destination}")
+    elif args.command == 'dedupe':
+        if args.directories:
+            paths = [
+                os.path.join(directory, name)
+                for root in args.directories
+                for directory, _, names in os.walk(root)
+                for name in names if name.lower().endswith(IMAGE_EXTENSIONS)
+            ]
+        else:
+            paths = default_dedupe_paths()
+        result = store.dedupe(paths)
+        print(f"{result['files']} images, {result['linked']} linked, {result['saved_bytes'] / 1024:.0f} KiB saved")
+    elif args.command == 'gc':
+        print(f"Removed {store.gc()} unused objects")
+    elif args.command == 'stats':
+        stats = store.stats()
+        print(f"{stats['objects']} objects, {stats['bytes'] / 1024:.0f} KiB, linked from {stats['places']} places")
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,9 @@ import tomllib
 import platform
 import subprocess
 import psutil
-import keyboard
 import sys
 import time
+import tempfile
 
 def open_header(script_name):
     """
@@ -125,6 +125,21 @@ def load_toml_config(file_name):
     with open(config_path, 'rb') as file:
         return tomllib.load(file)
 
+def get_runtime_directory():
+    """
+    Get the directory used for station-wide runtime state.
+    
+    Runtime state (such as the current game mode) is shared between the
+    separate Arcade Station processes through small files in this directory.
+    It lives in the system temporary directory so it is cleared on reboot.
+    
+    Returns:
+        str: Absolute path to the runtime directory, created if missing.
+    """
+    runtime_dir = os.path.join(tempfile.gettempdir(), "arcade_station")
+    os.makedirs(runtime_dir, exist_ok=True)
+    return runtime_dir
+
 def load_key_mappings_from_toml(toml_file_path):
     """
     Load keyboard shortcut mappings from a specified TOML configuration file.
@@ -154,8 +169,14 @@ def start_listening_to_keybinds_from_toml(toml_file_path):
     """
     Set up keyboard shortcut listeners based on mappings in a TOML file.
     
-    Registers hotkeys that trigger either application launches or the
-    kill processes functionality. Runs indefinitely until interrupted.
+    Registers hotkeys with a dispatcher that runs their actions on a small
+    worker pool, so the input hook is never blocked by a launch. Each
+    hotkey is debounced and repeated presses are coalesced while its
+    action runs. Built-in actions such as reset run in-process. Presses
+    come from the input backends configured in the [input] section
+    (keyboard hook, evdev, joystick or replay). When the resident
+    screenshot service or the instant replay buffer is enabled, the main
+    thread runs their Qt event loop instead of sleeping. Runs indefinitely until interrupted.
     
     Args:
         toml_file_path (str): Path to the TOML file containing key mappings.
@@ -163,28 +184,53 @@ def start_listening_to_keybinds_from_toml(toml_file_path):
     Note:
         This function blocks execution until interrupted with Ctrl+C.
     """
+    # Imported here because these modules depend on this one
+    from arcade_station.core.common.hotkey_dispatcher import (
+        create_dispatcher_from_mappings,
+        load_dispatcher_config
+    )
+    from arcade_station.listeners.input_backends import create_backends, load_input_config
+    
     # Load key mappings from the TOML file
     key_mappings = load_key_mappings_from_toml(toml_file_path)
     log_message(f"Loaded key mappings: {key_mappings}", "MENU")
 
     # Register hotkeys based on the mappings
-    for hotkey, action in key_mappings.items():
-        # Resolve the action path relative to the base directory
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        action_path = os.path.abspath(os.path.join(base_dir, action))
-        
-        if action == "kill_processes":
-            script_path = os.path.join(os.path.dirname(__file__), 'kill_all_and_reset_pegasus.py')
-            keyboard.add_hotkey(hotkey, lambda: launch_script(script_path))
-        else:
-            keyboard.add_hotkey(hotkey, lambda action_path=action_path: start_app(action_path))
+    dispatcher = create_dispatcher_from_mappings(key_mappings, load_dispatcher_config(toml_file_path))
+    backends = create_backends(load_input_config(toml_file_path))
+    for backend in backends:
+        backend.bind(key_mappings, dispatcher.trigger)
+        backend.start()
+        log_message(f"Started {backend.name} input backend", "MENU")
+
+    # Screenshots and the replay buffer need a Qt event loop on the main thread; run one if either is enabled
+    screenshot_service = None
+    try:
+        from arcade_station.core.common import screenshot_service
+        from arcade_station.core.common.replay_buffer import start_replay_buffer
+        screenshot_started = screenshot_service.start_screenshot_service() is not None
+        replay_started = start_replay_buffer() is not None
+        if not screenshot_started and not replay_started:
+            screenshot_service = None
+    except ImportError as e:
+        log_message(f"Screenshot service unavailable: {e}", "MENU")
+        screenshot_service = None
 
     log_message("Listener started. Press Ctrl+C to stop.", "MENU")
     try:
-        # Block forever, waiting for hotkeys
-        keyboard.wait()
+        if screenshot_service:
+            screenshot_service.run_event_loop()
+        else:
+            # Block forever, waiting for hotkeys; wake regularly so Ctrl+C is seen on Windows
+            while True:
+                time.sleep(1)
     except KeyboardInterrupt:
-        log_message("Listener stopped.", "MENU")
+        pass
+
+    log_message("Listener stopped.", "MENU")
+    for backend in backends:
+        backend.stop()
+    dispatcher.shutdown()
 
 def kill_processes_from_toml(toml_file_path):
     """
@@ -403,11 +449,12 @@ def start_app(executable_path):
         executable_path (str): Path to the executable or script to launch.
         
     Returns:
-        None
+        subprocess.Popen: The started process, or None if nothing was started.
         
     Note:
         PowerShell scripts and VBScripts are only supported on Windows systems.
     """
+    process = None
     try:
         os_type = determine_operating_system()
         log_message(f"Starting process [{executable_path}] on {os_type}...", "MENU")
@@ -416,7 +463,7 @@ def start_app(executable_path):
         if executable_path.endswith('.ps1'):
             if os_type == "Windows":
                 # Use PowerShell to execute the script
-                subprocess.Popen(['powershell.exe', '-ExecutionPolicy', 'Bypass', '-File', executable_path])
+                process = subprocess.Popen(['powershell.exe', '-ExecutionPolicy', 'Bypass', '-File', executable_path])
             else:
                 log_message("PowerShell scripts are not supported on non-Windows systems.", "MENU")
         # Check if the file is a VBScript
@@ -424,27 +471,29 @@ def start_app(executable_path):
             if os_type == "Windows":
                 # Use Windows Script Host to run VBScript invisibly
                 # The 0 parameter means "hide the window"
-                subprocess.Popen(['wscript.exe', executable_path], creationflags=subprocess.CREATE_NO_WINDOW)
+                process = subprocess.Popen(['wscript.exe', executable_path], creationflags=subprocess.CREATE_NO_WINDOW)
             else:
                 log_message("VBScript is not supported on non-Windows systems.", "MENU")
         # Check if the file is a Python script
         elif executable_path.endswith('.py'):
             # Use launch_script for Python files to ensure hidden console
-            launch_script(executable_path)
+            process = launch_script(executable_path)
         else:
             # Logic to handle different operating systems for other executables
             if os_type == "Windows":
                 # Log additional details for debugging
                 log_message(f"Launching Windows executable with shell=True: {executable_path}", "MENU_DEBUG")
-                subprocess.Popen(f'start "" "{executable_path}"', shell=True)
+                process = subprocess.Popen(f'start "" "{executable_path}"', shell=True)
             elif os_type == "Darwin":
-                subprocess.Popen(['open', executable_path])
+                process = subprocess.Popen(['open', executable_path])
             else:
-                subprocess.Popen(['xdg-open', executable_path])
+                process = subprocess.Popen(['xdg-open', executable_path])
                 
         log_message(f"Launched process [{executable_path}].", "MENU")
     except Exception as e:
         log_message(f"Failed to start process: {e}", "MENU")
+    
+    return process
 
 def kill_process_by_identifier(identifier):
     """
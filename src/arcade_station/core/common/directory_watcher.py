@@ -0,0 +1,226 @@
+"""
+Directory Watcher Module for Arcade Station.
+
+This module lets long-running services sleep until a directory changes
+instead of polling it. Watchers use inotify on Linux and
+FindFirstChangeNotification on Windows through ctypes. Other platforms, or
+systems where the notification cannot be created, fall back to waking at a
+fixed rescan interval.
+
+Watchers only report that something changed; callers rescan the state
+they care about.
+"""
+
+import os
+import sys
+import errno
+import ctypes
+import select
+import threading
+
+from arcade_station.core.common.core_functions import log_message
+
+# Seconds between rescans where no change notification API is available
+FALLBACK_RESCAN_INTERVAL = 60.0
+
+class DirectoryWatcher:
+    """
+    Fallback watcher that wakes up at a fixed rescan interval.
+
+    Subclasses wait on operating system change notifications instead.
+
+    Attributes:
+        event_driven (bool): Whether wait() returns as soon as something changes.
+    """
+
+    event_driven = False
+
+    def __init__(self, directory, fallback_interval=FALLBACK_RESCAN_INTERVAL):
+        """
+        Watch a directory.
+
+        Args:
+            directory (str): The directory to watch.
+            fallback_interval (float): Seconds between rescans for the fallback.
+        """
+        self.directory = directory
+        self.fallback_interval = fallback_interval
+        self._closed = threading.Event()
+
+    def add(self, path):
+        """
+        Also watch a subdirectory, for watchers that are not recursive.
+
+        Args:
+            path (str): Absolute path of the subdirectory.
+
+        Returns:
+            None
+        """
+
+    def wait(self, timeout=None):
+        """
+        Block until the directory may have changed or the timeout expires.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. None waits
+                                       until a change.
+
+        Returns:
+            bool: True if a change was seen, False on timeout.
+        """
+        interval = self.fallback_interval if timeout is None else min(timeout, self.fallback_interval)
+        self._closed.wait(max(0.0, interval))
+        return timeout is None or interval < timeout
+
+    def close(self):
+        """
+        Release the watch.
+
+        Returns:
+            None
+        """
+        self._closed.set()
+
+class InotifyWatcher(DirectoryWatcher):
+    """
+    Linux watcher built on inotify through ctypes.
+    """
+
+    event_driven = True
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, directory):
+        """
+        Create the inotify instance and watch the directory.
+
+        Args:
+            directory (str): The directory to watch.
+
+        Raises:
+            OSError: If inotify is unavailable.
+        """
+        super().__init__(directory)
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._watched = set()
+        self.add(directory)
+
+    def add(self, path):
+        if path in self._watched:
+            return
+        if self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            log_message(f"Failed to watch {path}: {os.strerror(error)}", "WATCH")
+            return
+        self._watched.add(path)
+
+    def wait(self, timeout=None):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # Drain every pending event; the manager rescans instead of decoding them
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    break
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno != errno.EINTR:
+                    break
+        return True
+
+    def close(self):
+        super().close()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+class WindowsChangeWatcher(DirectoryWatcher):
+    """
+    Windows watcher built on FindFirstChangeNotificationW through ctypes.
+    """
+
+    event_driven = True
+
+    FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+    FILE_NOTIFY_CHANGE_DIR_NAME = 0x00000002
+    FILE_NOTIFY_CHANGE_SIZE = 0x00000008
+    FILE_NOTIFY_CHANGE_LAST_WRITE = 0x00000010
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+    WAIT_OBJECT_0 = 0
+    INFINITE = 0xFFFFFFFF
+
+    def __init__(self, directory):
+        """
+        Start a recursive change notification for the directory.
+
+        Args:
+            directory (str): The directory to watch.
+
+        Raises:
+            OSError: If the notification cannot be created.
+        """
+        super().__init__(directory)
+        self._kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self._kernel32.FindFirstChangeNotificationW.restype = ctypes.c_void_p
+        self._kernel32.FindFirstChangeNotificationW.argtypes = [ctypes.c_wchar_p, ctypes.c_int, ctypes.c_uint]
+        self._kernel32.FindNextChangeNotification.argtypes = [ctypes.c_void_p]
+        self._kernel32.FindCloseChangeNotification.argtypes = [ctypes.c_void_p]
+        self._kernel32.WaitForSingleObject.argtypes = [ctypes.c_void_p, ctypes.c_uint]
+        self._kernel32.WaitForSingleObject.restype = ctypes.c_uint
+
+        mask = (
+            self.FILE_NOTIFY_CHANGE_FILE_NAME | self.FILE_NOTIFY_CHANGE_DIR_NAME
+            | self.FILE_NOTIFY_CHANGE_SIZE | self.FILE_NOTIFY_CHANGE_LAST_WRITE
+        )
+        self._handle = self._kernel32.FindFirstChangeNotificationW(directory, True, mask)
+        if not self._handle or self._handle == self.INVALID_HANDLE_VALUE:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def wait(self, timeout=None):
+        milliseconds = self.INFINITE if timeout is None else max(0, int(timeout * 1000))
+        if self._kernel32.WaitForSingleObject(self._handle, milliseconds) != self.WAIT_OBJECT_0:
+            return False
+        self._kernel32.FindNextChangeNotification(self._handle)
+        return True
+
+    def close(self):
+        super().close()
+        if self._handle:
+            self._kernel32.FindCloseChangeNotification(self._handle)
+            self._handle = None
+
+def create_watcher(directory, fallback_interval=FALLBACK_RESCAN_INTERVAL):
+    """
+    Create the best available watcher for a directory.
+
+    Args:
+        directory (str): The directory to watch.
+        fallback_interval (float): Seconds between rescans if change
+                                   notifications are unavailable.
+
+    Returns:
+        DirectoryWatcher: An event-driven watcher, or the rescan fallback.
+    """
+    try:
+        if sys.platform.startswith('linux'):
+            return InotifyWatcher(directory)
+        if sys.platform == "win32":
+            return WindowsChangeWatcher(directory)
+    except (OSError, AttributeError) as e:
+        log_message(f"Change notifications unavailable for {directory}, rescanning every {fallback_interval:g}s: {e}", "WATCH")
+    return DirectoryWatcher(directory, fallback_interval)
@@ -22,6 +22,7 @@ import logging
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
 from arcade_station.core.common.core_functions import load_toml_config, log_message, launch_script
+from arcade_station.core.common.asset_store import resolve_asset
 
 # Global variable to hold the window instance
 window_instance = None
@@ -263,13 +264,15 @@ def display_image(image_path, background_color='black'):
     the image display.
     
     Args:
-        image_path (str): Path to the image file to display.
+        image_path (str): Path to the image file to display, or a sha256:
+                          reference to an image in the asset store.
         background_color (str): Color name or hex code for the window background.
                                Defaults to 'black'.
     
     Returns:
         subprocess.Popen: The process object for the launched image display script.
     """
+    image_path = resolve_asset(image_path) or image_path
     log_message(f"Displaying image: {image_path} on monitor with background color: {background_color}", "BANNER")
 
     # Load display configuration
@@ -0,0 +1,697 @@
+"""
+Game Mode Module for Arcade Station.
+
+This module maintains a station-wide "game active" state and lets background
+services react to it. The launcher sets the state once a game owns the
+screen and the reset scripts clear it. Background services register with a
+policy that decides what they do while a game is running:
+
+- pause: the service's sleep() blocks until the game ends
+- stretch: the service's sleep() intervals are multiplied by stretch_factor
+- lower_priority: the service lowers its own process priority for the session
+  (on Linux and macOS only when it is permitted to raise it again afterwards)
+- none: the service ignores game mode
+
+Helper applications that are not part of Arcade Station (the OSD and
+streaming tools) can be registered by process name so a resident Arcade
+Station process lowers their priority on their behalf.
+
+The launcher publishes the current session (game id, game process id,
+telemetry session id and start time) to a small JSON file in the runtime
+directory, and clears it when the game exits or the station is reset.
+get_current_session() answers from a cached copy that is re-read only when
+the file changes, and treats a session whose process has died as over, so
+services never have to scan the process list to find out whether a game is
+running. on_session_change() delivers every change as it happens; the
+watcher behind it sleeps on directory change notifications rather than
+polling. Policies are configured in the [game_mode] section of
+default_config.toml.
+"""
+
+import os
+import json
+import time
+import threading
+import psutil
+
+from arcade_station.core.common.core_functions import (
+    get_runtime_directory,
+    load_toml_config,
+    log_message
+)
+from arcade_station.core.common.directory_watcher import create_watcher
+
+GAME_MODE_FILE = "game_mode.json"
+
+# Policies used when default_config.toml does not configure a service
+DEFAULT_SERVICE_POLICIES = {
+    "icloud": "pause",
+    "itgmania_monitor": "lower_priority",
+    "osd": "lower_priority",
+    "streaming": "lower_priority",
+    "upload": "stretch",
+}
+
+VALID_POLICIES = ("pause", "stretch", "lower_priority", "none")
+
+def load_game_mode_config():
+    """
+    Load the [game_mode] settings from default_config.toml.
+
+    Returns:
+        dict: Settings with enabled, poll_interval, stretch_factor and services keys.
+    """
+    try:
+        config = load_toml_config('default_config.toml').get('game_mode', {})
+    except Exception as e:
+        log_message(f"Failed to load game mode configuration: {e}", "GAME_MODE")
+        config = {}
+
+    services = dict(DEFAULT_SERVICE_POLICIES)
+    services.update(config.get('services', {}))
+
+    return {
+        "enabled": config.get('enabled', True),
+        "poll_interval": float(config.get('poll_interval', 1.0)),
+        "stretch_factor": float(config.get('stretch_factor', 4.0)),
+        "services": services,
+    }
+
+def get_game_mode_path():
+    """
+    Get the path of the shared game mode state file.
+
+    Returns:
+        str: Absolute path to the state file.
+    """
+    return os.path.join(get_runtime_directory(), GAME_MODE_FILE)
+
+def _write_state(state):
+    """
+    Atomically replace the game mode state file.
+
+    Args:
+        state (dict): The state to write.
+
+    Returns:
+        None
+    """
+    path = get_game_mode_path()
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+# Last state read from the state file, keyed by the file's stat signature
+_state_cache = {"signature": None, "state": {"active": False}}
+_state_cache_lock = threading.Lock()
+
+def _state_signature():
+    """
+    Get a cheap change signature for the state file.
+
+    Returns:
+        tuple: (mtime_ns, size, inode), or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(get_game_mode_path())
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except OSError:
+        return None
+
+def read_game_mode():
+    """
+    Read the current game mode state.
+
+    The file is only parsed when its stat signature changes, so repeated
+    calls cost a single stat.
+
+    Returns:
+        dict: The state, with at least an "active" key. An unreadable or
+              missing state file is treated as no game running.
+    """
+    signature = _state_signature()
+    with _state_cache_lock:
+        if signature is not None and signature == _state_cache["signature"]:
+            return dict(_state_cache["state"])
+
+    state = {"active": False}
+    try:
+        with open(get_game_mode_path(), 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        if isinstance(loaded, dict):
+            state = loaded
+    except (OSError, ValueError):
+        pass
+
+    with _state_cache_lock:
+        _state_cache["signature"] = signature
+        _state_cache["state"] = state
+    return dict(state)
+
+def _process_matches(pid, created_at):
+    """
+    Check that a published game process is still the one that was launched.
+
+    Args:
+        pid (int): Process id of the game.
+        created_at (float): The process creation time when it was published,
+                            or None to only check that the pid exists.
+
+    Returns:
+        bool: True if the process is still running.
+    """
+    try:
+        process = psutil.Process(pid)
+        return created_at is None or abs(process.create_time() - created_at) < 1.0
+    except psutil.AccessDenied:
+        return True
+    except psutil.Error:
+        return False
+
+def get_current_session():
+    """
+    Get the game session the launcher published.
+
+    Returns:
+        dict: game_id, pid, session_id and started_at of the running game,
+              or None if no game is running. A session whose game process
+              has exited without a reset is reported as over.
+    """
+    state = read_game_mode()
+    if not state.get("active"):
+        return None
+
+    pid = state.get("pid")
+    if pid and not _process_matches(pid, state.get("pid_created")):
+        return None
+
+    return {
+        "game_id": state.get("game_id"),
+        "pid": pid,
+        "session_id": state.get("session_id"),
+        "started_at": state.get("started_at", state.get("since")),
+    }
+
+def is_game_active():
+    """
+    Check whether a game is currently running on the station.
+
+    Returns:
+        bool: True if the launcher has published a session that is still running.
+    """
+    return get_current_session() is not None
+
+def set_game_active(game_id, pid=None, session_id=None, started_at=None):
+    """
+    Publish the running game so background services throttle themselves.
+
+    Args:
+        game_id (str): The game that now owns the screen.
+        pid (int, optional): Process id of the game.
+        session_id (str, optional): Telemetry session id of the launch.
+        started_at (float, optional): When the launch started. Defaults to now.
+
+    Returns:
+        None
+    """
+    now = time.time()
+    pid_created = None
+    if pid:
+        try:
+            pid_created = psutil.Process(pid).create_time()
+        except psutil.Error:
+            pass
+
+    try:
+        _write_state({
+            "active": True,
+            "game_id": game_id,
+            "pid": pid,
+            "pid_created": pid_created,
+            "session_id": session_id,
+            "started_at": started_at or now,
+            "since": now,
+        })
+        log_message(f"Game mode entered for [{game_id}] (PID: {pid})", "GAME_MODE")
+    except Exception as e:
+        log_message(f"Failed to set game mode: {e}", "GAME_MODE")
+
+def clear_game_active(reason="reset", pid=None):
+    """
+    Mark the station as idle so background services resume normal behaviour.
+
+    Args:
+        reason (str): Why the game mode ended, recorded in the state file.
+        pid (int, optional): Only clear the session of this game process,
+                             leaving a newer session untouched.
+
+    Returns:
+        None
+    """
+    try:
+        previous = read_game_mode()
+        if pid is not None and previous.get("pid") != pid:
+            return
+        _write_state({"active": False, "game_id": previous.get("game_id"), "since": time.time(), "reason": reason})
+        if previous.get("active"):
+            log_message(f"Game mode cleared ({reason})", "GAME_MODE")
+    except Exception as e:
+        log_message(f"Failed to clear game mode: {e}", "GAME_MODE")
+
+# Nice value background processes are lowered to on Linux and macOS
+LOWERED_NICE = 10
+
+def _can_restore_nice(previous):
+    """
+    Check whether this process may set a nice value back down to previous.
+
+    Raising a nice value is always allowed on POSIX, but lowering it again
+    needs root (or CAP_SYS_NICE) or an RLIMIT_NICE that reaches it.
+
+    Args:
+        previous (int): The nice value to restore.
+
+    Returns:
+        bool: True if the restore would be permitted.
+    """
+    if os.geteuid() == 0:
+        return True
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NICE)
+    except (ImportError, AttributeError, ValueError, OSError):
+        # macOS has no RLIMIT_NICE and only root may lower a nice value
+        return False
+    if soft == resource.RLIM_INFINITY:
+        return True
+    # RLIMIT_NICE allows nice values down to 20 - limit
+    return 20 - soft <= previous
+
+def _lower_priority(process):
+    """
+    Lower the priority of a process and return its previous priority.
+
+    On Linux and macOS the process is left alone when its priority could
+    not be restored after the game, so it never stays lowered for good.
+
+    Args:
+        process (psutil.Process): The process to lower.
+
+    Returns:
+        int: The previous priority value, or None if it was not changed.
+    """
+    try:
+        previous = process.nice()
+        if hasattr(psutil, "BELOW_NORMAL_PRIORITY_CLASS"):
+            process.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+        elif previous >= LOWERED_NICE:
+            return None
+        elif not _can_restore_nice(previous):
+            log_message(f"Not lowering priority of process {process.pid}: "
+                        f"restoring nice {previous} afterwards is not permitted", "GAME_MODE")
+            return None
+        else:
+            process.nice(LOWERED_NICE)
+        return previous
+    except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+        log_message(f"Failed to lower priority of process {process.pid}: {e}", "GAME_MODE")
+        return None
+
+def _restore_priority(process, previous):
+    """
+    Restore a process priority saved by _lower_priority().
+
+    Args:
+        process (psutil.Process): The process to restore.
+        previous (int): The priority returned by _lower_priority().
+
+    Returns:
+        None
+    """
+    try:
+        process.nice(previous)
+    except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+        log_message(f"Failed to restore priority of process {process.pid}: {e}", "GAME_MODE")
+
+class BackgroundService:
+    """
+    A background service that adapts its behaviour while a game is running.
+
+    Services call sleep() instead of time.sleep() between work cycles so the
+    configured policy can pause or stretch them during a game session.
+
+    Attributes:
+        name (str): The service name, used to look up its policy.
+        policy (str): One of VALID_POLICIES.
+        game_active (bool): Whether the station is currently in game mode.
+    """
+
+    def __init__(self, name, policy, stretch_factor=4.0, on_game_start=None, on_game_end=None):
+        """
+        Create a background service.
+
+        Args:
+            name (str): The service name.
+            policy (str): One of VALID_POLICIES.
+            stretch_factor (float): Interval multiplier for the "stretch" policy.
+            on_game_start (callable, optional): Called when a game session starts.
+            on_game_end (callable, optional): Called when a game session ends.
+        """
+        if policy not in VALID_POLICIES:
+            log_message(f"Unknown game mode policy '{policy}' for {name}, ignoring game mode", "GAME_MODE")
+            policy = "none"
+
+        self.name = name
+        self.policy = policy
+        self.stretch_factor = stretch_factor
+        self.game_active = False
+        self._on_game_start = on_game_start
+        self._on_game_end = on_game_end
+        self._condition = threading.Condition()
+        self._saved_priority = None
+
+    def sleep(self, seconds):
+        """
+        Sleep between work cycles, honouring the service's game mode policy.
+
+        Args:
+            seconds (float): The normal interval to sleep.
+
+        Returns:
+            None
+        """
+        if self.policy == "stretch" and self.game_active:
+            seconds *= self.stretch_factor
+
+        deadline = time.monotonic() + seconds
+        with self._condition:
+            while True:
+                remaining = deadline - time.monotonic()
+                paused = self.policy == "pause" and self.game_active
+                if remaining <= 0 and not paused:
+                    return
+                self._condition.wait(timeout=remaining if remaining > 0 else None)
+
+    def _game_started(self):
+        """
+        Apply the service's policy at the start of a game session.
+
+        Returns:
+            None
+        """
+        if self.policy == "lower_priority":
+            self._saved_priority = _lower_priority(psutil.Process())
+        if self._on_game_start:
+            self._on_game_start()
+
+    def _game_ended(self):
+        """
+        Restore the service's normal behaviour at the end of a game session.
+
+        Returns:
+            None
+        """
+        if self.policy == "lower_priority" and self._saved_priority is not None:
+            _restore_priority(psutil.Process(), self._saved_priority)
+            self._saved_priority = None
+        if self._on_game_end:
+            self._on_game_end()
+
+    def set_game_active(self, active):
+        """
+        Notify the service of a game mode transition.
+
+        Args:
+            active (bool): True when a game session starts, False when it ends.
+
+        Returns:
+            None
+        """
+        if active == self.game_active or self.policy == "none":
+            self.game_active = active
+            return
+
+        log_message(f"Service [{self.name}] {'entering' if active else 'leaving'} game mode ({self.policy})", "GAME_MODE")
+        try:
+            if active:
+                self._game_started()
+            else:
+                self._game_ended()
+        except Exception as e:
+            log_message(f"Error applying game mode to [{self.name}]: {e}", "GAME_MODE")
+
+        with self._condition:
+            self.game_active = active
+            self._condition.notify_all()
+
+class ExternalProcessService(BackgroundService):
+    """
+    Game mode handling for helper applications that are not Arcade Station code.
+
+    The priority of every running process with a matching name is lowered
+    when a game starts and restored when it ends.
+    """
+
+    def __init__(self, name, process_names, policy="lower_priority"):
+        """
+        Create a service for external helper processes.
+
+        Args:
+            name (str): The service name.
+            process_names (list): Executable names to throttle (case-insensitive).
+            policy (str): Only "lower_priority" has an effect on external processes.
+        """
+        super().__init__(name, policy)
+        self.process_names = {os.path.basename(p).lower() for p in process_names if p}
+        self._saved_priorities = {}
+
+    def _game_started(self):
+        """
+        Lower the priority of every matching helper process.
+
+        Returns:
+            None
+        """
+        if self.policy != "lower_priority":
+            return
+        for proc in psutil.process_iter(['name']):
+            name = (proc.info['name'] or "").lower()
+            if name in self.process_names:
+                previous = _lower_priority(proc)
+                if previous is not None:
+                    self._saved_priorities[proc.pid] = (proc, previous)
+
+    def _game_ended(self):
+        """
+        Restore the priority of every helper process lowered at game start.
+
+        Returns:
+            None
+        """
+        for proc, previous in self._saved_priorities.values():
+            _restore_priority(proc, previous)
+        self._saved_priorities = {}
+
+class GameModeWatcher(threading.Thread):
+    """
+    Daemon thread that watches the shared state file and notifies services.
+
+    The thread sleeps on change notifications for the runtime directory.
+    While a session is running it also wakes every poll_interval to notice
+    a game process that exited without a reset.
+
+    Attributes:
+        session (dict): The current session, as from get_current_session().
+    """
+
+    def __init__(self, poll_interval=1.0):
+        """
+        Create the watcher.
+
+        Args:
+            poll_interval (float): Seconds between liveness checks of a
+                                   running game, and between checks of the
+                                   state file where change notifications
+                                   are unavailable.
+        """
+        super().__init__(name="GameModeWatcher", daemon=True)
+        self.poll_interval = poll_interval
+        self.services = []
+        self.listeners = []
+        self._lock = threading.Lock()
+        self.session = get_current_session()
+        self._active = self.session is not None
+
+    def add_service(self, service):
+        """
+        Subscribe a service to game mode transitions.
+
+        Args:
+            service (BackgroundService): The service to notify.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.services.append(service)
+        service.set_game_active(self._active)
+
+    def add_listener(self, callback):
+        """
+        Subscribe a callback to session changes.
+
+        Args:
+            callback (callable): Called with the new session, or None when
+                                 the session ends.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.listeners.append(callback)
+
+    def _check(self):
+        """
+        Notify services and listeners if the session changed.
+
+        Returns:
+            None
+        """
+        session = get_current_session()
+        if session == self.session:
+            return
+        self.session = session
+
+        with self._lock:
+            listeners = list(self.listeners)
+            services = list(self.services)
+        for callback in listeners:
+            try:
+                callback(session)
+            except Exception as e:
+                log_message(f"Error in game session listener: {e}", "GAME_MODE")
+
+        active = session is not None
+        if active != self._active:
+            self._active = active
+            for service in services:
+                service.set_game_active(active)
+
+    def run(self):
+        """
+        Wait for changes to the state file and notify services of transitions.
+
+        Returns:
+            None
+        """
+        watcher = create_watcher(os.path.dirname(get_game_mode_path()), self.poll_interval)
+        while True:
+            self._check()
+            watcher.wait(self.poll_interval if self.session is not None else None)
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+def _get_watcher(poll_interval):
+    """
+    Get the process-wide watcher, starting it on first use.
+
+    Args:
+        poll_interval (float): Seconds between liveness checks of a running game.
+
+    Returns:
+        GameModeWatcher: The running watcher.
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = GameModeWatcher(poll_interval)
+            _watcher.start()
+        return _watcher
+
+def on_session_change(callback):
+    """
+    Call a function whenever a game session starts or ends.
+
+    Args:
+        callback (callable): Called from the watcher thread with the new
+                             session, or None when the session ends.
+
+    Returns:
+        None
+    """
+    _get_watcher(load_game_mode_config()["poll_interval"]).add_listener(callback)
+
+def register_background_service(name, policy=None, on_game_start=None, on_game_end=None):
+    """
+    Register a background service to follow the station's game mode.
+
+    Args:
+        name (str): The service name, used to look up its configured policy.
+        policy (str, optional): Override the configured policy.
+        on_game_start (callable, optional): Called when a game session starts.
+        on_game_end (callable, optional): Called when a game session ends.
+
+    Returns:
+        BackgroundService: The service; call its sleep() between work cycles.
+    """
+    config = load_game_mode_config()
+    if not config["enabled"]:
+        policy = "none"
+    elif policy is None:
+        policy = config["services"].get(name, "none")
+
+    service = BackgroundService(name, policy, config["stretch_factor"], on_game_start, on_game_end)
+    if policy != "none":
+        _get_watcher(config["poll_interval"]).add_service(service)
+        log_message(f"Registered background service [{name}] with game mode policy: {policy}", "GAME_MODE")
+    return service
+
+def register_external_processes(name, process_names):
+    """
+    Register helper applications whose priority is lowered during games.
+
+    Args:
+        name (str): The service name, used to look up its configured policy.
+        process_names (list): Executable names of the helper processes.
+
+    Returns:
+        ExternalProcessService: The registered service, or None if disabled.
+    """
+    config = load_game_mode_config()
+    policy = config["services"].get(name, "none")
+    process_names = [p for p in process_names if p]
+    if not config["enabled"] or policy != "lower_priority" or not process_names:
+        return None
+
+    service = ExternalProcessService(name, process_names, policy)
+    _get_watcher(config["poll_interval"]).add_service(service)
+    log_message(f"Registered external processes for [{name}]: {sorted(service.process_names)}", "GAME_MODE")
+    return service
+
+def throttle_station_helpers():
+    """
+    Register the configured OSD and streaming applications for game mode.
+
+    Reads executable paths from utility_config.toml. Intended to be called
+    from a resident Arcade Station process such as the key listener.
+
+    Returns:
+        None
+    """
+    try:
+        utility_config = load_toml_config('utility_config.toml')
+    except Exception as e:
+        log_message(f"Failed to load utility configuration for game mode: {e}", "GAME_MODE")
+        return
+
+    osd_config = utility_config.get('osd', {})
+    if osd_config.get('enabled', False):
+        register_external_processes("osd", [osd_config.get('sound_osd_executable', '')])
+
+    streaming_config = utility_config.get('streaming', {})
+    register_external_processes("streaming", [
+        streaming_config.get('obs_executable', ''),
+        streaming_config.get('webcam_management_executable', ''),
+    ])
@@ -0,0 +1,336 @@
+"""
+Hotkey Dispatcher Module for Arcade Station.
+
+This module runs hotkey actions on a small worker pool so the keyboard hook
+thread only records the press and returns. Each hotkey is debounced, and
+presses that arrive while the hotkey's action is still running are
+coalesced into that run, so holding or mashing a key (for example the reset
+combination) cannot start the same action several times at once.
+
+Built-in actions such as reset, kill all and screenshot run in-process
+instead of starting a new Python interpreter for every press. Key mappings that point
+at the matching scripts are recognized automatically, and the built-ins can
+also be mapped directly with a ``builtin:`` prefix:
+
+    [key_mappings]
+    "ctrl+space" = "builtin:reset"
+    "ctrl+=" = "builtin:screenshot_burst"
+
+Every press is timed from the hook event to the end of its action; see
+hotkey_latency.py for the statistics this produces.
+
+Dispatcher settings are read from the [dispatcher] section of
+key_listener.toml.
+"""
+
+import os
+import time
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from arcade_station.core.common.core_functions import (
+    load_toml_config,
+    log_message,
+    start_app
+)
+from arcade_station.core.common.hotkey_latency import LatencyTrace, LatencyTracker
+from arcade_station.core.common.sound_engine import get_sound_engine, load_sound_config
+
+# Defaults used when key_listener.toml does not configure the dispatcher
+DEFAULT_DISPATCHER_SETTINGS = {
+    "max_workers": 2,
+    "debounce_seconds": 0.3,
+    "builtin_debounce_seconds": 2.0,
+    "stats_interval": 60.0,
+    "latency_window": 256,
+    "slow_threshold_ms": 1000.0,
+}
+
+# Built-in actions, run in-process as module:function
+BUILTIN_ACTIONS = {
+    "reset": "arcade_station.core.common.kill_all_and_reset_pegasus:main",
+    "kill_all": "arcade_station.core.common.kill_all:main",
+    "screenshot": "arcade_station.core.common.screenshot_service:request_screenshot",
+    "screenshot_burst": "arcade_station.core.common.screenshot_service:request_burst_screenshot",
+    "screenshot_all_monitors": "arcade_station.core.common.screenshot_service:request_all_monitors_screenshot",
+    "save_replay": "arcade_station.core.common.replay_buffer:save_replay",
+}
+
+# Built-ins that tear down station processes; they never overlap and use the
+# longer built-in debounce
+EXCLUSIVE_BUILTINS = ("reset", "kill_all")
+
+# Scripts that are replaced by a built-in action when mapped to a hotkey
+BUILTIN_SCRIPTS = {
+    "kill_all_and_reset_pegasus.py": "reset",
+    "kill_all.py": "kill_all",
+    "monitor_screenshot.py": "screenshot",
+}
+
+BUILTIN_PREFIX = "builtin:"
+
+_builtin_lock = threading.Lock()
+
+def load_dispatcher_config(toml_file_path='key_listener.toml'):
+    """
+    Load the [dispatcher] settings from the key listener configuration.
+
+    Args:
+        toml_file_path (str): Name of the key listener TOML file.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_DISPATCHER_SETTINGS present,
+              plus a "debounce" dict of per-hotkey overrides.
+    """
+    try:
+        config = load_toml_config(toml_file_path).get('dispatcher', {})
+    except Exception as e:
+        log_message(f"Failed to load dispatcher configuration: {e}", "MENU")
+        config = {}
+
+    settings = dict(DEFAULT_DISPATCHER_SETTINGS)
+    for key in settings:
+        if key in config:
+            settings[key] = config[key]
+    settings["debounce"] = dict(config.get('debounce', {}))
+    return settings
+
+def _load_builtin(name):
+    """
+    Import the function behind a built-in action.
+
+    Args:
+        name (str): Built-in action name from BUILTIN_ACTIONS.
+
+    Returns:
+        callable: The action function.
+    """
+    module_name, function_name = BUILTIN_ACTIONS[name].split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+def resolve_action(action):
+    """
+    Turn a key mapping value into a callable and a built-in flag.
+
+    Args:
+        action (str): The value from [key_mappings] - a built-in name with
+                      the builtin: prefix, the legacy "kill_processes"
+                      action, or a path relative to the src directory.
+
+    Returns:
+        tuple: (callable, builtin_name) where builtin_name is None for
+               actions that start an external script or application.
+    """
+    if action.startswith(BUILTIN_PREFIX):
+        name = action[len(BUILTIN_PREFIX):]
+    elif action == "kill_processes":
+        name = "reset"
+    else:
+        name = BUILTIN_SCRIPTS.get(os.path.basename(action))
+
+    if name in BUILTIN_ACTIONS:
+        # Import on first use so the listener starts without loading every action
+        def run_builtin(name=name):
+            if name not in EXCLUSIVE_BUILTINS:
+                return _load_builtin(name)()
+            if not _builtin_lock.acquire(blocking=False):
+                log_message(f"Another built-in action is running, skipping {name}", "MENU")
+                return None
+            try:
+                return _load_builtin(name)()
+            finally:
+                _builtin_lock.release()
+        return run_builtin, name
+
+    if action.startswith(BUILTIN_PREFIX):
+        log_message(f"Unknown built-in action: {action}", "MENU")
+        return None, None
+
+    # Resolve the action path relative to the base directory
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    action_path = os.path.abspath(os.path.join(base_dir, action))
+    return (lambda: start_app(action_path)), None
+
+class HotkeyDispatcher:
+    """
+    Run hotkey actions off the keyboard hook thread.
+
+    trigger() is called from the hook thread and only checks the hotkey's
+    debounce and running state before handing the action to the worker pool.
+    """
+
+    def __init__(self, max_workers=2, debounce_seconds=0.3, tracker=None, feedback_sound=None):
+        """
+        Create the dispatcher and its worker pool.
+
+        Args:
+            max_workers (int): Number of worker threads.
+            debounce_seconds (float): Default minimum time between two
+                                      accepted presses of the same hotkey.
+            tracker (LatencyTracker, optional): Receives a latency trace for
+                                                every accepted press.
+            feedback_sound (str, optional): Sound engine sample played for
+                                            every accepted press.
+        """
+        self.debounce_seconds = debounce_seconds
+        self.tracker = tracker
+        self.feedback_sound = feedback_sound
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="hotkey")
+        self._lock = threading.Lock()
+        self._actions = {}
+
+    def register(self, hotkey, action, debounce_seconds=None):
+        """
+        Register an action for a hotkey.
+
+        Args:
+            hotkey (str): The hotkey combination.
+            action (callable): Function to run when the hotkey is pressed.
+            debounce_seconds (float, optional): Debounce for this hotkey.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._actions[hotkey] = {
+                "action": action,
+                "debounce": self.debounce_seconds if debounce_seconds is None else debounce_seconds,
+                "last": 0.0,
+                "running": False,
+            }
+
+    def trigger(self, hotkey, hook_time=None):
+        """
+        Handle a hotkey press from the keyboard hook thread.
+
+        Args:
+            hotkey (str): The hotkey that was pressed.
+            hook_time (float, optional): perf_counter() time of the input
+                                         event, if known.
+
+        Returns:
+            bool: True if the action was queued, False if the press was
+                  debounced or coalesced into a running action.
+        """
+        trace = LatencyTrace(hotkey, hook_time)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._actions.get(hotkey)
+            if entry is None:
+                return False
+            if entry["running"] or now - entry["last"] < entry["debounce"]:
+                return False
+            entry["last"] = now
+            entry["running"] = True
+
+        self._executor.submit(self._run, hotkey, entry, trace)
+        return True
+
+    def _run(self, hotkey, entry, trace):
+        """
+        Run a hotkey's action on a worker thread.
+
+        Args:
+            hotkey (str): The hotkey that was pressed.
+            entry (dict): The hotkey's registration.
+            trace (LatencyTrace): Timestamps for this press.
+
+        Returns:
+            None
+        """
+        trace.mark("dispatch")
+        if self.feedback_sound:
+            get_sound_engine().play(self.feedback_sound)
+
+        result = None
+        try:
+            log_message(f"Running action for hotkey [{hotkey}]", "MENU")
+            result = entry["action"]()
+        except Exception as e:
+            log_message(f"Action for hotkey [{hotkey}] failed: {e}", "MENU")
+        finally:
+            with self._lock:
+                entry["running"] = False
+
+        # External actions return their process; time it until it exits
+        if result is not None and hasattr(result, "wait"):
+            trace.mark("spawn")
+            threading.Thread(target=self._complete_on_exit, args=(result, trace), daemon=True).start()
+        else:
+            self._complete(trace)
+
+    def _complete(self, trace):
+        """
+        Mark a press as complete and hand it to the latency tracker.
+
+        Args:
+            trace (LatencyTrace): Timestamps for the press.
+
+        Returns:
+            None
+        """
+        trace.mark("complete")
+        if self.tracker:
+            self.tracker.record(trace)
+
+    def _complete_on_exit(self, process, trace):
+        """
+        Wait for an action's process to exit, then complete its trace.
+
+        Args:
+            process (subprocess.Popen): The process the action started.
+            trace (LatencyTrace): Timestamps for the press.
+
+        Returns:
+            None
+        """
+        try:
+            process.wait()
+        except Exception:
+            pass
+        self._complete(trace)
+
+    def shutdown(self):
+        """
+        Stop the worker pool after running actions finish.
+
+        Returns:
+            None
+        """
+        self._executor.shutdown(wait=True)
+        if self.tracker:
+            self.tracker.dump()
+
+def create_dispatcher_from_mappings(key_mappings, settings=None):
+    """
+    Build a dispatcher for a set of key mappings.
+
+    Args:
+        key_mappings (dict): Hotkey to action mappings from key_listener.toml.
+        settings (dict, optional): Settings from load_dispatcher_config().
+
+    Returns:
+        HotkeyDispatcher: The dispatcher with every valid mapping registered.
+    """
+    if settings is None:
+        settings = load_dispatcher_config()
+
+    tracker = LatencyTracker(settings["latency_window"], settings["slow_threshold_ms"])
+    tracker.start_periodic_dump(settings["stats_interval"])
+    feedback_sound = load_sound_config()["hotkey"] or None
+    if feedback_sound:
+        # Load the samples now so the first press does not wait for decoding
+        get_sound_engine()
+    dispatcher = HotkeyDispatcher(settings["max_workers"], settings["debounce_seconds"], tracker, feedback_sound)
+    for hotkey, action in key_mappings.items():
+        function, builtin_name = resolve_action(action)
+        if function is None:
+            continue
+        debounce = settings["debounce"].get(hotkey)
+        if debounce is None and builtin_name in EXCLUSIVE_BUILTINS:
+            debounce = settings["builtin_debounce_seconds"]
+        dispatcher.register(hotkey, function, debounce)
+        log_message(f"Registered hotkey [{hotkey}] -> {builtin_name or action}", "MENU")
+
+    return dispatcher
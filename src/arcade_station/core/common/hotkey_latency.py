@@ -0,0 +1,337 @@
+"""
+Hotkey Latency Module for Arcade Station.
+
+This module measures how long each hotkey binding takes from the key press
+to the end of its action. Every press is timestamped at four points:
+
+- hook: the input hook delivered the press to the dispatcher
+- dispatch: a worker thread picked up the action
+- spawn: the action's process was started (external actions only)
+- complete: the action finished, or its process exited
+
+A rolling window of recent presses is kept per binding. The listener writes
+percentiles and a histogram for each stage to a stats file in the runtime
+directory at a fixed interval, and presses slower than a threshold are
+logged with their stage breakdown.
+
+Usage:
+    python hotkey_latency.py
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+from collections import deque
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import get_runtime_directory, log_message
+
+LATENCY_STATS_FILE = "hotkey_latency.json"
+
+# Upper bounds of the histogram buckets in milliseconds; slower presses go in a final bucket
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Stage intervals reported for every binding, as (name, start mark, end mark)
+STAGE_INTERVALS = (
+    ("queue", "hook", "dispatch"),
+    ("spawn", "dispatch", "spawn"),
+    ("run", "spawn", "complete"),
+    ("total", "hook", "complete"),
+)
+
+class LatencyTrace:
+    """
+    Timestamps for a single hotkey press.
+
+    Attributes:
+        hotkey (str): The binding that was pressed.
+        marks (dict): Mapping of mark name to time.perf_counter() value.
+    """
+
+    def __init__(self, hotkey, hook_time=None):
+        """
+        Start a trace at the moment the hook delivered the press.
+
+        Args:
+            hotkey (str): The binding that was pressed.
+            hook_time (float, optional): perf_counter() time of the hook
+                                         event, if the input backend
+                                         recorded it earlier.
+        """
+        self.hotkey = hotkey
+        self.marks = {"hook": hook_time if hook_time is not None else time.perf_counter()}
+
+    def mark(self, stage):
+        """
+        Record the time a stage was reached.
+
+        Args:
+            stage (str): "dispatch", "spawn" or "complete".
+
+        Returns:
+            None
+        """
+        self.marks[stage] = time.perf_counter()
+
+    def intervals(self):
+        """
+        Get the duration of each stage interval in milliseconds.
+
+        Actions that never spawn a process measure "run" from dispatch.
+
+        Returns:
+            dict: Mapping of interval name to milliseconds.
+        """
+        marks = dict(self.marks)
+        if "spawn" not in marks and "dispatch" in marks:
+            marks["spawn"] = marks["dispatch"]
+
+        result = {}
+        for name, start, end in STAGE_INTERVALS:
+            if start in marks and end in marks:
+                result[name] = (marks[end] - marks[start]) * 1000.0
+        return result
+
+def _percentile(values, percent):
+    """
+    Calculate a percentile of a sorted list using the nearest rank.
+
+    Args:
+        values (list): Sorted numbers.
+        percent (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or None if values is empty.
+    """
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, math.ceil(percent / 100.0 * len(values)) - 1))
+    return values[rank]
+
+def _histogram(values):
+    """
+    Count values into the latency histogram buckets.
+
+    Args:
+        values (list): Durations in milliseconds.
+
+    Returns:
+        dict: Mapping of bucket label ("<=5ms", ">5000ms") to count.
+    """
+    counts = {f"<={bound}ms": 0 for bound in HISTOGRAM_BUCKETS_MS}
+    counts[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+    for value in values:
+        for bound in HISTOGRAM_BUCKETS_MS:
+            if value <= bound:
+                counts[f"<={bound}ms"] += 1
+                break
+        else:
+            counts[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+    return counts
+
+class LatencyTracker:
+    """
+    Rolling per-binding latency statistics.
+
+    Attributes:
+        window (int): Number of recent presses kept per binding.
+        slow_threshold_ms (float): Presses slower than this are logged.
+    """
+
+    def __init__(self, window=256, slow_threshold_ms=1000.0):
+        """
+        Create an empty tracker.
+
+        Args:
+            window (int): Number of recent presses kept per binding.
+            slow_threshold_ms (float): Total latency that gets a press logged.
+        """
+        self.window = window
+        self.slow_threshold_ms = slow_threshold_ms
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self._dumped_version = 0
+
+    def record(self, trace):
+        """
+        Add a completed press to its binding's window.
+
+        Args:
+            trace (LatencyTrace): The completed trace.
+
+        Returns:
+            None
+        """
+        intervals = trace.intervals()
+        with self._lock:
+            samples = self._samples.setdefault(trace.hotkey, deque(maxlen=self.window))
+            samples.append(intervals)
+            self._counts[trace.hotkey] = self._counts.get(trace.hotkey, 0) + 1
+            self._version += 1
+
+        total = intervals.get("total", 0.0)
+        if total >= self.slow_threshold_ms:
+            breakdown = ", ".join(f"{name}={value:.1f}ms" for name, value in intervals.items())
+            log_message(f"Slow hotkey [{trace.hotkey}]: {breakdown}", "HOTKEY")
+
+    def snapshot(self):
+        """
+        Summarize the current window for every binding.
+
+        Returns:
+            dict: Mapping of binding to a dict with "presses" (all time),
+                  "window" (samples summarized) and one entry per stage
+                  interval holding p50, p95, max and histogram.
+        """
+        with self._lock:
+            samples = {hotkey: list(values) for hotkey, values in self._samples.items()}
+            counts = dict(self._counts)
+
+        summary = {}
+        for hotkey, entries in samples.items():
+            binding = {"presses": counts.get(hotkey, 0), "window": len(entries)}
+            for name, _, _ in STAGE_INTERVALS:
+                values = sorted(entry[name] for entry in entries if name in entry)
+                if not values:
+                    continue
+                binding[name] = {
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                    "max": values[-1],
+                    "histogram": _histogram(values),
+                }
+            summary[hotkey] = binding
+        return summary
+
+    def dump(self, path=None):
+        """
+        Write the current statistics to the stats file if they changed.
+
+        Args:
+            path (str, optional): File to write. Defaults to the stats file
+                                  in the runtime directory.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        with self._lock:
+            if self._version == self._dumped_version:
+                return False
+            version = self._version
+
+        path = path or get_stats_path()
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"updated": time.time(), "bindings": self.snapshot()}, f, indent=2)
+            os.replace(temp_path, path)
+        except OSError as e:
+            log_message(f"Failed to write hotkey latency stats: {e}", "HOTKEY")
+            return False
+
+        with self._lock:
+            self._dumped_version = version
+        return True
+
+    def start_periodic_dump(self, interval):
+        """
+        Dump the statistics from a daemon thread at a fixed interval.
+
+        Args:
+            interval (float): Seconds between dumps. 0 disables dumping.
+
+        Returns:
+            threading.Thread: The dump thread, or None if disabled.
+        """
+        if not interval or interval <= 0:
+            return None
+
+        def dump_loop():
+            while True:
+                time.sleep(interval)
+                self.dump()
+
+        thread = threading.Thread(target=dump_loop, name="HotkeyLatencyDump", daemon=True)
+        thread.start()
+        return thread
+
+def get_stats_path():
+    """
+    Get the path of the hotkey latency stats file.
+
+    Returns:
+        str: Absolute path to the stats file.
+    """
+    return os.path.join(get_runtime_directory(), LATENCY_STATS_FILE)
+
+def print_stats(stats):
+    """
+    Print hotkey latency statistics as a table.
+
+    Args:
+        stats (dict): Contents of the stats file.
+
+    Returns:
+        None
+    """
+    def ms(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    updated = stats.get("updated")
+    if updated:
+        print(f"Updated: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(updated))}")
+
+    print(f"{'Binding':<16} {'Presses':>7} {'Stage':<6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for hotkey, binding in sorted(stats.get("bindings", {}).items()):
+        first = True
+        for name, _, _ in STAGE_INTERVALS:
+            stage = binding.get(name)
+            if not stage:
+                continue
+            label = hotkey if first else ""
+            presses = binding["presses"] if first else ""
+            print(f"{label:<16} {presses:>7} {name:<6} {ms(stage['p50']):>9} {ms(stage['p95']):>9} {ms(stage['max']):>9}")
+            first = False
+
+def main():
+    """
+    Print the latest hotkey latency statistics written by the listener.
+
+    Command-line Arguments:
+        --file: Read a specific stats file.
+        --histogram: Also print the total latency histogram per binding.
+
+    Returns:
+        None. Exits with status code 1 if no statistics are available.
+    """
+    parser = argparse.ArgumentParser(description='Show hotkey latency statistics from the key listener.')
+    parser.add_argument('--file', default=None, help='Path to the stats file')
+    parser.add_argument('--histogram', action='store_true', help='Print the total latency histogram per binding')
+    args = parser.parse_args()
+
+    path = args.file or get_stats_path()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"No hotkey latency statistics available at {path}: {e}")
+        sys.exit(1)
+
+    print_stats(stats)
+
+    if args.histogram:
+        for hotkey, binding in sorted(stats.get("bindings", {}).items()):
+            histogram = binding.get("total", {}).get("histogram", {})
+            buckets = ", ".join(f"{label}: {count}" for label, count in histogram.items() if count)
+            print(f"{hotkey}: {buckets}")
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ from arcade_station.core.common.core_functions import (
     log_message
 )
 from arcade_station.core.common.light_control import reset_lights, kill_specific_lights_process
+from arcade_station.core.common.game_mode import clear_game_active
+from arcade_station.core.common.session_store import record_reset
 
 def main():
     """
@@ -22,8 +24,9 @@ def main():
     
     Executes a series of cleanup operations in sequence:
     1. Terminates all processes listed in processes_to_kill.toml
-    2. Resets lighting effects to default state
-    3. Kills specific processes (LightsTest and marquee image display)
+    2. Clears the station-wide game mode state and records the reset
+    3. Resets lighting effects to default state
+    4. Kills specific processes (LightsTest and marquee image display)
     
     All operations are logged for debugging purposes.
     
@@ -33,12 +36,15 @@ def main():
     # Kill all processes that might interfere
     log_message("Killing processes", "RESET")
     kill_processes_from_toml('processes_to_kill.toml')
+    clear_game_active("kill_all")
+    record_reset("kill_all")
     
     log_message("Resetting lights", "RESET")
-    reset_lights()
-    
-    log_message("Killing specific lights process", "RESET")
-    kill_specific_lights_process("LightsTest")
+    # The lights service ends LightsTest on its own once the reset has run
+    if not reset_lights():
+        # Only kill LightsTest if it's still running, not mame2lit
+        log_message("Killing specific lights process", "RESET")
+        kill_specific_lights_process("LightsTest")
     
     log_message("Killing marquee image process", "RESET")
     kill_process_by_identifier("marquee_image")
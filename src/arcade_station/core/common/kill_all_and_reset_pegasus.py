@@ -32,6 +32,9 @@ from arcade_station.core.common.core_functions import (
 )
 from arcade_station.core.common.light_control import reset_lights, kill_specific_lights_process
 from arcade_station.core.common.display_image import display_image_from_config
+from arcade_station.core.common.game_mode import clear_game_active
+from arcade_station.core.common.session_store import record_reset
+from arcade_station.core.common.sound_engine import play_event_sound
 
 def main():
     """
@@ -39,10 +42,11 @@ def main():
     
     Executes a series of cleanup and restart operations in sequence:
     1. Terminates all processes listed in processes_to_kill.toml
-    2. Resets lighting effects to default state
-    3. Kills specific processes (LightsTest, marquee image, previous Pegasus)
-    4. Displays default marquee image if dynamic marquee is enabled
-    5. Attempts to restart Pegasus frontend with fallback methods
+    2. Clears the station-wide game mode state and records the reset
+    3. Resets lighting effects to default state
+    4. Kills specific processes (LightsTest, marquee image, previous Pegasus)
+    5. Displays default marquee image if dynamic marquee is enabled
+    6. Attempts to restart Pegasus frontend with fallback methods
     
     The function includes error handling and logging for each step,
     with multiple fallback methods for restarting Pegasus if the primary
@@ -51,16 +55,22 @@ def main():
     Returns:
         None. All operations are logged for debugging purposes.
     """
+    play_event_sound("reset")
+
     # Kill all processes that might interfere with a clean restart
     log_message("Killing processes that might interfere with a clean restart", "RESET")
     kill_processes_from_toml('processes_to_kill.toml')
     
-    log_message("Resetting lights", "RESET")
-    reset_lights()
+    # The game is gone, so background services can resume normal behaviour
+    clear_game_active("reset")
+    record_reset("reset")
     
-    # Only kill LightsTest if it's still running, not mame2lit
-    log_message("Killing specific lights process", "RESET")
-    kill_specific_lights_process("LightsTest")
+    log_message("Resetting lights", "RESET")
+    # The lights service ends LightsTest on its own once the reset has run
+    if not reset_lights():
+        # Only kill LightsTest if it's still running, not mame2lit
+        log_message("Killing specific lights process", "RESET")
+        kill_specific_lights_process("LightsTest")
     
     log_message("Killing marquee image process", "RESET")
     kill_process_by_identifier("marquee_image")
@@ -17,7 +17,6 @@ Options:
 import os
 import sys
 import argparse
-import psutil
 import shutil
 import subprocess
 
@@ -183,47 +182,6 @@ def launch_by_type(binary_type):
         log_message(f"Unknown binary type: {binary_type}", "ERROR")
         return False
 
-def set_process_priority(pid, priority_level="high"):
-    """
-    Set the priority level of a process.
-    
-    Args:
-        pid (int): Process ID
-        priority_level (str): Priority level (low, below_normal, normal, above_normal, high, realtime)
-        
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    try:
-        if not pid:
-            log_message("Cannot set priority - invalid process ID", "GAME")
-            return False
-            
-        process = psutil.Process(pid)
-        
-        # Map priority levels to psutil constants
-        priority_map = {
-            "low": psutil.IDLE_PRIORITY_CLASS,
-            "below_normal": psutil.BELOW_NORMAL_PRIORITY_CLASS,
-            "normal": psutil.NORMAL_PRIORITY_CLASS,
-            "above_normal": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
-            "high": psutil.HIGH_PRIORITY_CLASS,
-            "realtime": psutil.REALTIME_PRIORITY_CLASS
-        }
-        
-        # Set priority
-        if priority_level in priority_map:
-            process.nice(priority_map[priority_level])
-            log_message(f"Set process {pid} priority to {priority_level}", "GAME")
-            return True
-        else:
-            log_message(f"Invalid priority level: {priority_level}", "GAME")
-            return False
-            
-    except Exception as e:
-        log_message(f"Failed to set process priority: {e}", "GAME")
-        return False
-
 def main():
     """
     Main entry point for the binary launcher script.
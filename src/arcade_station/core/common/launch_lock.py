@@ -0,0 +1,278 @@
+"""
+Launch Lock Module for Arcade Station.
+
+This module serializes game launches across the whole station. Pegasus starts
+a new launch_game.py for every press of Start, so a player mashing the button
+can have several launchers racing through the banner, the frontend teardown
+and the game spawn at once.
+
+A launch first takes an exclusive lock on a file in the runtime directory.
+The lock is held through an operating system file lock (flock on Linux and
+macOS, msvcrt.locking on Windows), so it is released by the kernel if the
+launcher crashes and never has to be cleaned up by hand. Requests are then
+coalesced:
+
+- a request for the game that is already launching is dropped
+- a request for the game launched within the last coalesce_window seconds
+  is dropped, unless that launch failed
+- a request for a different game while a launch is in flight is rejected
+  or queued behind it, depending on busy_policy
+
+Settings are read from the [launch] section of default_config.toml.
+"""
+
+import os
+import sys
+import json
+import time
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+from arcade_station.core.common.core_functions import (
+    get_runtime_directory,
+    load_toml_config,
+    log_message
+)
+
+LAUNCH_LOCK_FILE = "launch.lock"
+LAUNCH_RECORD_FILE = "last_launch.json"
+
+# Defaults used when default_config.toml does not configure launch serialization
+DEFAULT_LAUNCH_LOCK_SETTINGS = {
+    "coalesce_window": 2.0,
+    "busy_policy": "reject",
+    "queue_timeout": 30.0,
+}
+
+VALID_BUSY_POLICIES = ("reject", "queue")
+
+def load_launch_lock_config():
+    """
+    Load the [launch] settings from default_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_LAUNCH_LOCK_SETTINGS present.
+    """
+    settings = dict(DEFAULT_LAUNCH_LOCK_SETTINGS)
+    try:
+        config = load_toml_config('default_config.toml').get('launch', {})
+    except Exception as e:
+        log_message(f"Failed to load launch configuration: {e}", "GAME_LAUNCH")
+        config = {}
+
+    for key, value in config.items():
+        if key in settings:
+            settings[key] = value
+
+    if settings["busy_policy"] not in VALID_BUSY_POLICIES:
+        log_message(f"Unknown busy_policy '{settings['busy_policy']}', using 'reject'", "GAME_LAUNCH")
+        settings["busy_policy"] = "reject"
+
+    return settings
+
+def _try_lock(fd):
+    """
+    Try to take an exclusive lock on an open file without blocking.
+
+    Args:
+        fd (int): Open file descriptor.
+
+    Returns:
+        bool: True if the lock was taken.
+    """
+    try:
+        if sys.platform == "win32":
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def _unlock(fd):
+    """
+    Release a lock taken by _try_lock().
+
+    Args:
+        fd (int): Open file descriptor.
+
+    Returns:
+        None
+    """
+    try:
+        if sys.platform == "win32":
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+def _record_path():
+    """
+    Get the path of the file describing the most recent launch.
+
+    Returns:
+        str: Absolute path to the launch record.
+    """
+    return os.path.join(get_runtime_directory(), LAUNCH_RECORD_FILE)
+
+def read_launch_record():
+    """
+    Read the most recent launch request.
+
+    Returns:
+        dict: The record with "game", "time" and "pid" keys, or an empty
+              dict if no launch has been recorded.
+    """
+    try:
+        with open(_record_path(), 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if isinstance(record, dict):
+            return record
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def _write_launch_record(game_name):
+    """
+    Record the launch that now holds the lock.
+
+    Args:
+        game_name (str): The game being launched.
+
+    Returns:
+        None
+    """
+    path = _record_path()
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"game": game_name, "time": time.time(), "pid": os.getpid()}, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        log_message(f"Failed to write launch record: {e}", "GAME_LAUNCH")
+
+def _clear_launch_record():
+    """
+    Withdraw this process's launch record so a retry is not coalesced with it.
+
+    Returns:
+        None
+    """
+    if read_launch_record().get("pid") != os.getpid():
+        return
+    try:
+        os.remove(_record_path())
+    except OSError:
+        pass
+
+class LaunchLock:
+    """
+    Held station-wide launch lock.
+
+    Returned by acquire_launch_lock(); call release() once the launch stages
+    are complete. Also usable as a context manager.
+    """
+
+    def __init__(self, fd, game_name):
+        """
+        Wrap an already locked file descriptor.
+
+        Args:
+            fd (int): Locked file descriptor.
+            game_name (str): The game being launched.
+        """
+        self._fd = fd
+        self.game_name = game_name
+
+    def release(self, launched=True):
+        """
+        Release the lock so the next launch can proceed.
+
+        Args:
+            launched (bool): False if the game failed to start. The launch
+                             record is then withdrawn, so retrying the same
+                             game is not dropped as a repeat request.
+
+        Returns:
+            None
+        """
+        if self._fd is None:
+            return
+        if not launched:
+            _clear_launch_record()
+        _unlock(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release(launched=exc_type is None)
+
+def _is_duplicate(game_name, window):
+    """
+    Check whether the most recent launch makes this request redundant.
+
+    Args:
+        game_name (str): The requested game.
+        window (float): Seconds within which a repeat request is dropped.
+
+    Returns:
+        bool: True if the same game was launched within the window.
+    """
+    record = read_launch_record()
+    return record.get("game") == game_name and time.time() - record.get("time", 0) < window
+
+def acquire_launch_lock(game_name, settings=None):
+    """
+    Take the station-wide launch lock for a game, coalescing repeat requests.
+
+    Args:
+        game_name (str): The game being launched.
+        settings (dict, optional): Settings from load_launch_lock_config().
+
+    Returns:
+        LaunchLock: The held lock, or None if the request was dropped as a
+                    duplicate or rejected because another launch is in flight.
+    """
+    if settings is None:
+        settings = load_launch_lock_config()
+
+    try:
+        fd = os.open(os.path.join(get_runtime_directory(), LAUNCH_LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o666)
+    except OSError as e:
+        # Never block a launch because the lock file is unavailable
+        log_message(f"Failed to open launch lock, launching without it: {e}", "GAME_LAUNCH")
+        return LaunchLock(None, game_name)
+
+    if not _try_lock(fd):
+        in_flight = read_launch_record().get("game")
+        if in_flight == game_name or settings["busy_policy"] == "reject":
+            log_message(f"Launch of [{in_flight}] in progress, dropping request for [{game_name}]", "GAME_LAUNCH")
+            os.close(fd)
+            return None
+
+        log_message(f"Launch of [{in_flight}] in progress, queueing [{game_name}]", "GAME_LAUNCH")
+        deadline = time.monotonic() + settings["queue_timeout"]
+        while not _try_lock(fd):
+            if time.monotonic() >= deadline:
+                log_message(f"Timed out waiting to launch [{game_name}]", "GAME_LAUNCH")
+                os.close(fd)
+                return None
+            time.sleep(0.05)
+
+    if _is_duplicate(game_name, settings["coalesce_window"]):
+        log_message(f"[{game_name}] was launched within {settings['coalesce_window']}s, dropping request", "GAME_LAUNCH")
+        _unlock(fd)
+        os.close(fd)
+        return None
+
+    _write_launch_record(game_name)
+    return LaunchLock(fd, game_name)
@@ -0,0 +1,273 @@
+"""
+MAME Launcher Module for Arcade Station.
+
+This module starts MAME directly from Python, without the start_mame.ps1
+PowerShell helper. The command line is built from mame_config.toml and the
+game's ROM and save state, and the emulator is spawned as a direct child so
+the launcher can track readiness, apply the performance profile and focus
+the window itself. It works the same way on Windows, Linux and macOS.
+
+The PowerShell helper remains available on Windows by setting
+``launcher = "powershell"`` in the [mame] section of mame_config.toml.
+
+The --check option validates mame_config.toml as written by the installer.
+With --stub it also launches a stub MAME that records its command line, so
+the launch path can be exercised and timed without MAME installed (Linux
+and macOS).
+
+Usage:
+    python launch_mame.py <rom> [--state STATE]
+    python launch_mame.py --check [--stub] [<rom>] [--state STATE]
+"""
+
+import os
+import sys
+import time
+import shutil
+import json
+import argparse
+import tempfile
+import subprocess
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import load_mame_config, log_message
+
+# Types of the settings the [mame] section may contain
+MAME_SETTING_TYPES = {
+    "executable_path": str,
+    "executable": str,
+    "ini_path": str,
+    "launcher": str,
+    "working_dir": str,
+    "extra_arguments": list,
+}
+
+VALID_LAUNCHERS = ("native", "powershell")
+
+# Stand-in for the MAME binary: records its arguments and working directory
+STUB_MAME_SCRIPT = '''import os, sys, json
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_args.json"), "w") as f:
+    json.dump({"args": sys.argv[1:], "cwd": os.getcwd()}, f)
+'''
+
+def resolve_mame_executable(mame_config):
+    """
+    Determine the full path of the MAME executable from its configuration.
+
+    Args:
+        mame_config (dict): The [mame] section of mame_config.toml.
+
+    Returns:
+        str: Full path to the MAME executable. If no directory is configured,
+             the executable is looked up on the PATH.
+    """
+    executable = mame_config.get('executable') or ("mame.exe" if sys.platform == "win32" else "mame")
+    executable_path = mame_config.get('executable_path', '')
+
+    # If executable_path includes the executable name, strip it
+    if executable_path.endswith(executable):
+        executable_path = os.path.dirname(executable_path)
+
+    if executable_path:
+        return os.path.abspath(os.path.join(executable_path, executable))
+
+    return shutil.which(executable) or executable
+
+def build_mame_command(rom, state=None, mame_config=None):
+    """
+    Build the MAME command line and working directory for a game.
+
+    Args:
+        rom (str): The ROM set name to run.
+        state (str, optional): Save state slot to load on start.
+        mame_config (dict, optional): The [mame] section of mame_config.toml.
+                                      Loaded from disk if not provided.
+
+    Returns:
+        tuple: (args, working_dir) where args is the argument list for
+               subprocess.Popen and working_dir is the directory MAME
+               should run from.
+    """
+    if mame_config is None:
+        mame_config = load_mame_config()['mame']
+
+    executable = resolve_mame_executable(mame_config)
+    args = [executable]
+
+    ini_path = mame_config.get('ini_path', '')
+    if ini_path:
+        args.extend(['-inipath', ini_path])
+
+    args.extend(mame_config.get('extra_arguments', []))
+    args.append(rom)
+
+    if state:
+        args.extend(['-state', state])
+
+    # MAME resolves relative rompaths and inis against its working directory
+    working_dir = mame_config.get('working_dir') or os.path.dirname(executable) or os.getcwd()
+
+    return args, working_dir
+
+def launch_mame(rom, state=None, mame_config=None):
+    """
+    Start MAME for a game as a direct child process.
+
+    Args:
+        rom (str): The ROM set name to run.
+        state (str, optional): Save state slot to load on start.
+        mame_config (dict, optional): The [mame] section of mame_config.toml.
+
+    Returns:
+        subprocess.Popen: The MAME process, or None if it could not be started.
+    """
+    args, working_dir = build_mame_command(rom, state, mame_config)
+    log_message(f"Starting MAME: {' '.join(args)} (cwd: {working_dir})", "GAME_LAUNCH")
+
+    # Keep MAME's console window hidden on Windows; its game window still shows
+    creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+    try:
+        process = subprocess.Popen(
+            args,
+            cwd=working_dir,
+            stdin=subprocess.DEVNULL,
+            creationflags=creationflags
+        )
+        log_message(f"MAME started with PID: {process.pid}", "GAME_LAUNCH")
+        return process
+    except Exception as e:
+        log_message(f"Failed to start MAME: {e}", "GAME_LAUNCH")
+        return None
+
+def check_mame_config(config):
+    """
+    Check that mame_config.toml has the layout the launcher expects.
+
+    Args:
+        config (dict): The parsed mame_config.toml.
+
+    Returns:
+        list: Descriptions of the problems found; empty if there are none.
+    """
+    mame_config = config.get('mame')
+    if not isinstance(mame_config, dict):
+        return ["mame_config.toml has no [mame] section"]
+
+    problems = []
+    for key, value in mame_config.items():
+        expected = MAME_SETTING_TYPES.get(key)
+        if expected is None:
+            problems.append(f"Unknown setting mame.{key}")
+        elif not isinstance(value, expected):
+            problems.append(f"mame.{key} should be a {expected.__name__}, not {type(value).__name__}")
+
+    launcher = mame_config.get('launcher', 'native')
+    if isinstance(launcher, str) and launcher not in VALID_LAUNCHERS:
+        problems.append(f"mame.launcher is '{launcher}', expected one of {', '.join(VALID_LAUNCHERS)}")
+
+    extra_arguments = mame_config.get('extra_arguments', [])
+    if isinstance(extra_arguments, list) and not all(isinstance(arg, str) for arg in extra_arguments):
+        problems.append("mame.extra_arguments should only contain strings")
+
+    return problems
+
+def run_stub_check(rom, state, mame_config):
+    """
+    Launch a stub MAME with the configured settings and check the command
+    line it receives.
+
+    Args:
+        rom (str): The ROM set name to pass.
+        state (str): Save state slot to pass, or None.
+        mame_config (dict): The [mame] section of mame_config.toml.
+
+    Returns:
+        bool: True if the stub received the expected arguments.
+    """
+    if sys.platform == "win32":
+        log_message("The stub MAME check runs on Linux and macOS only", "GAME_LAUNCH")
+        return False
+
+    with tempfile.TemporaryDirectory() as stub_dir:
+        stub_path = os.path.join(stub_dir, "mame")
+        with open(stub_path, "w", encoding="utf-8") as f:
+            f.write(f"#!{sys.executable}\n{STUB_MAME_SCRIPT}")
+        os.chmod(stub_path, 0o755)
+
+        # Keep the configured arguments and ini path, swap in the stub binary
+        stub_config = dict(mame_config, executable_path=stub_dir, executable="mame", working_dir=stub_dir)
+        expected, _ = build_mame_command(rom, state, stub_config)
+
+        start = time.perf_counter()
+        process = launch_mame(rom, state, stub_config)
+        if not process:
+            return False
+        spawned = time.perf_counter()
+        process.wait()
+        finished = time.perf_counter()
+
+        try:
+            with open(os.path.join(stub_dir, "stub_args.json"), "r", encoding="utf-8") as f:
+                received = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Stub MAME did not record its arguments: {e}")
+            return False
+
+    print(f"Spawned stub MAME in {(spawned - start) * 1000:.1f} ms, exited after {(finished - start) * 1000:.1f} ms")
+    if received["args"] != expected[1:]:
+        print(f"Stub MAME received {received['args']}, expected {expected[1:]}")
+        return False
+    if os.path.realpath(received["cwd"]) != os.path.realpath(stub_dir):
+        print(f"Stub MAME ran in {received['cwd']}, expected {stub_dir}")
+        return False
+    return True
+
+def main():
+    """
+    Start MAME for a ROM from the command line and report spawn time.
+
+    Command-line Arguments:
+        rom: The ROM set name to run.
+        --state: Optional save state slot to load.
+        --check: Validate mame_config.toml instead of starting MAME.
+        --stub: With --check, also launch a stub MAME.
+
+    Returns:
+        None. Exits with status code 1 if MAME could not be started or a
+        check failed.
+    """
+    parser = argparse.ArgumentParser(description='Launch MAME directly with the configured settings.')
+    parser.add_argument('rom', nargs='?', help='ROM set name to run')
+    parser.add_argument('--state', default=None, help='Save state slot to load')
+    parser.add_argument('--check', action='store_true', help='Validate mame_config.toml')
+    parser.add_argument('--stub', action='store_true', help='With --check, launch a stub MAME')
+    args = parser.parse_args()
+
+    if args.check:
+        try:
+            config = load_mame_config()
+        except Exception as e:
+            print(f"Cannot read mame_config.toml: {e}")
+            sys.exit(1)
+        problems = check_mame_config(config)
+        for problem in problems:
+            print(problem)
+        if problems or args.stub and not run_stub_check(args.rom or "stubrom", args.state, config['mame']):
+            sys.exit(1)
+        print("mame_config.toml is valid")
+        return
+
+    if not args.rom:
+        parser.error("a ROM set name is required")
+
+    start = time.perf_counter()
+    process = launch_mame(args.rom, args.state)
+    if not process:
+        sys.exit(1)
+    print(f"Spawned MAME (PID {process.pid}) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
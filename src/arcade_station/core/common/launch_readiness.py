@@ -0,0 +1,397 @@
+"""
+Launch Readiness Module for Arcade Station.
+
+This module replaces fixed post-launch sleeps with readiness signals. After a
+game is spawned, the launcher waits for the game process to be alive, then for
+it to show a top-level window or reach a CPU/I/O activity threshold, and only
+then hands focus to the game and tears down the frontend.
+
+Per-game timeouts and thresholds are read from an optional ``launch`` table
+under each game in installed_games.toml, for example:
+
+    [games.itgmania.launch]
+    alive_timeout = 10
+    ready_timeout = 30
+    cpu_seconds_threshold = 1.5
+
+Every launch records the duration of each stage in a LaunchTimeline so slow
+stages can be identified from the logs.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import psutil
+
+from arcade_station.core.common.core_functions import log_message
+
+# Defaults used when a game does not override them in installed_games.toml
+DEFAULT_LAUNCH_SETTINGS = {
+    "alive_timeout": 10.0,
+    "ready_timeout": 30.0,
+    "poll_interval": 0.05,
+    "require_window": False,
+    "cpu_seconds_threshold": 1.0,
+    "io_bytes_threshold": 32 * 1024 * 1024,
+}
+
+def get_launch_settings(game_config):
+    """
+    Merge a game's launch overrides with the default readiness settings.
+
+    Args:
+        game_config (dict): The game's entry from installed_games.toml.
+
+    Returns:
+        dict: Launch settings with every key from DEFAULT_LAUNCH_SETTINGS present.
+    """
+    settings = dict(DEFAULT_LAUNCH_SETTINGS)
+    overrides = game_config.get('launch', {}) if isinstance(game_config, dict) else {}
+
+    for key, value in overrides.items():
+        if key not in settings:
+            log_message(f"Ignoring unknown launch setting: {key}", "GAME_LAUNCH")
+            continue
+        settings[key] = value
+
+    return settings
+
+class LaunchTimeline:
+    """
+    Record the duration of each stage of a game launch.
+
+    Stages are marked in order as they complete; the duration of a stage is
+    the time elapsed since the previous mark (or since the timeline started).
+
+    Attributes:
+        game_name (str): The game being launched.
+        stages (list): List of (stage_name, duration_seconds) tuples.
+        outcome (str): Short description of how the launch finished.
+    """
+
+    def __init__(self, game_name):
+        """
+        Start a new timeline for a game launch.
+
+        Args:
+            game_name (str): The game being launched.
+        """
+        self.game_name = game_name
+        self.stages = []
+        self.outcome = "pending"
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._last = self._start
+
+    def mark(self, stage):
+        """
+        Mark the end of a stage and record its duration.
+
+        Args:
+            stage (str): Name of the stage that just completed.
+
+        Returns:
+            float: The duration of the stage in seconds.
+        """
+        now = time.perf_counter()
+        duration = now - self._last
+        self._last = now
+        self.stages.append((stage, duration))
+        return duration
+
+    def total(self):
+        """
+        Get the total time elapsed since the timeline started.
+
+        Returns:
+            float: Seconds since the launch started.
+        """
+        return self._last - self._start
+
+    def durations(self):
+        """
+        Get the recorded stage durations as a dictionary.
+
+        Returns:
+            dict: Mapping of stage name to duration in seconds.
+        """
+        return dict(self.stages)
+
+    def log_summary(self):
+        """
+        Write the recorded stage durations to the log.
+
+        Returns:
+            None
+        """
+        stage_text = ", ".join(f"{stage}={duration:.3f}s" for stage, duration in self.stages)
+        log_message(
+            f"Launch timings for [{self.game_name}] ({self.outcome}): {stage_text}, total={self.total():.3f}s",
+            "GAME_LAUNCH"
+        )
+
+def _paths_match(path_a, path_b):
+    """
+    Compare two executable paths in a platform-appropriate way.
+
+    Args:
+        path_a (str): First path.
+        path_b (str): Second path.
+
+    Returns:
+        bool: True if both paths point to the same file.
+    """
+    if not path_a or not path_b:
+        return False
+    return os.path.normcase(os.path.realpath(path_a)) == os.path.normcase(os.path.realpath(path_b))
+
+def find_game_process(executable_path, parent_pid=None, started_after=None, timeout=10.0, poll_interval=0.05):
+    """
+    Locate the process running a game executable.
+
+    Used when the game was started through an intermediate launcher (such as
+    PowerShell) and the launcher's own process handle is not the game. The
+    children of parent_pid are checked first, then every running process.
+
+    Args:
+        executable_path (str): Full path to the game executable.
+        parent_pid (int, optional): PID of the process that started the game.
+        started_after (float, optional): Ignore processes created before this
+                                         epoch timestamp.
+        timeout (float): Maximum number of seconds to wait for the process.
+        poll_interval (float): Seconds to wait between checks.
+
+    Returns:
+        psutil.Process: The game process, or None if it did not appear in time.
+    """
+    deadline = time.monotonic() + timeout
+    executable_name = os.path.basename(executable_path).lower()
+
+    while time.monotonic() < deadline:
+        candidates = []
+        if parent_pid:
+            try:
+                candidates = psutil.Process(parent_pid).children(recursive=True)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                candidates = []
+
+        if not candidates:
+            candidates = psutil.process_iter(['name'])
+
+        for proc in candidates:
+            try:
+                name = (proc.info['name'] if hasattr(proc, 'info') else proc.name()) or ""
+                if name.lower() != executable_name:
+                    continue
+                if started_after and proc.create_time() < started_after - 1:
+                    continue
+                exe = proc.exe()
+                if exe and not _paths_match(exe, executable_path):
+                    continue
+                return proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+        time.sleep(poll_interval)
+
+    return None
+
+def wait_for_process_alive(pid, timeout=10.0, poll_interval=0.05):
+    """
+    Wait until a process exists and is running.
+
+    Args:
+        pid (int): Process ID to wait for.
+        timeout (float): Maximum number of seconds to wait.
+        poll_interval (float): Seconds to wait between checks.
+
+    Returns:
+        psutil.Process: The running process, or None if it never came up or
+                        exited before the timeout.
+    """
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            process = psutil.Process(pid)
+            if process.is_running() and process.status() != psutil.STATUS_ZOMBIE:
+                return process
+        except psutil.NoSuchProcess:
+            return None
+        except psutil.AccessDenied:
+            return psutil.Process(pid)
+        time.sleep(poll_interval)
+
+    return None
+
+def _process_family_pids(process):
+    """
+    Get the PIDs of a process and all of its descendants.
+
+    Args:
+        process (psutil.Process): The root process.
+
+    Returns:
+        set: PIDs of the process and its children.
+    """
+    pids = {process.pid}
+    try:
+        pids.update(child.pid for child in process.children(recursive=True))
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+    return pids
+
+def find_top_level_window(process):
+    """
+    Find a visible top-level window owned by a process or one of its children.
+
+    Args:
+        process (psutil.Process): The game process.
+
+    Returns:
+        int: The window handle on Windows, or 0 if no window was found.
+             None on platforms where top-level windows cannot be enumerated
+             without extra dependencies.
+    """
+    if sys.platform != "win32":
+        return None
+
+    try:
+        user32 = ctypes.windll.user32
+        pids = _process_family_pids(process)
+        found = []
+        GW_OWNER = 4
+
+        enum_proc_type = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p)
+
+        def enum_windows_callback(hwnd, _):
+            if not user32.IsWindowVisible(hwnd) or user32.GetWindow(hwnd, GW_OWNER):
+                return True
+            window_pid = ctypes.c_ulong()
+            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(window_pid))
+            if window_pid.value in pids:
+                found.append(hwnd)
+                return False
+            return True
+
+        user32.EnumWindows(enum_proc_type(enum_windows_callback), 0)
+        return found[0] if found else 0
+    except Exception as e:
+        log_message(f"Failed to enumerate windows: {e}", "GAME_LAUNCH")
+        return None
+
+def has_top_level_window(process):
+    """
+    Check whether a process (or one of its children) owns a visible top-level window.
+
+    Args:
+        process (psutil.Process): The game process.
+
+    Returns:
+        bool: True or False on Windows. None on platforms where top-level
+              windows cannot be enumerated without extra dependencies, in
+              which case callers should rely on activity thresholds.
+    """
+    hwnd = find_top_level_window(process)
+    return None if hwnd is None else bool(hwnd)
+
+def focus_process_window(process):
+    """
+    Bring a game's top-level window to the foreground.
+
+    Restores the window if it is minimized and makes it the foreground
+    window. Only supported on Windows; other platforms leave focus to the
+    window manager.
+
+    Args:
+        process (psutil.Process): The game process.
+
+    Returns:
+        bool: True if the window was brought to the foreground, False otherwise.
+    """
+    hwnd = find_top_level_window(process)
+    if not hwnd:
+        return False
+
+    try:
+        SW_RESTORE = 9
+        ASFW_ANY = -1
+        user32 = ctypes.windll.user32
+        user32.AllowSetForegroundWindow(ASFW_ANY)
+        if user32.IsIconic(hwnd):
+            user32.ShowWindow(hwnd, SW_RESTORE)
+        focused = bool(user32.SetForegroundWindow(hwnd))
+        log_message(f"Focused window of process {process.pid}: {focused}", "GAME_LAUNCH")
+        return focused
+    except Exception as e:
+        log_message(f"Failed to focus game window: {e}", "GAME_LAUNCH")
+        return False
+
+def _activity_reached(process, settings):
+    """
+    Check whether a process has reached the configured CPU or I/O activity threshold.
+
+    Args:
+        process (psutil.Process): The game process.
+        settings (dict): Launch settings from get_launch_settings().
+
+    Returns:
+        str: "cpu" or "io" if a threshold was reached, otherwise None.
+    """
+    try:
+        cpu_times = process.cpu_times()
+        if cpu_times.user + cpu_times.system >= settings["cpu_seconds_threshold"]:
+            return "cpu"
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+
+    # io_counters() is not available on macOS
+    if hasattr(process, "io_counters"):
+        try:
+            io = process.io_counters()
+            if io.read_bytes + io.write_bytes >= settings["io_bytes_threshold"]:
+                return "io"
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+    return None
+
+def wait_for_game_ready(process, settings):
+    """
+    Wait until a game process is ready to take over the screen.
+
+    A game is considered ready once it owns a visible top-level window or,
+    unless require_window is set, once it has used enough CPU time or
+    performed enough I/O to indicate it is past startup.
+
+    Args:
+        process (psutil.Process): The game process.
+        settings (dict): Launch settings from get_launch_settings().
+
+    Returns:
+        str: The signal that ended the wait - "window", "cpu", "io",
+             "timeout" (still running but no signal seen), or "exited".
+    """
+    deadline = time.monotonic() + settings["ready_timeout"]
+    poll_interval = settings["poll_interval"]
+
+    while time.monotonic() < deadline:
+        try:
+            if not process.is_running() or process.status() == psutil.STATUS_ZOMBIE:
+                return "exited"
+        except psutil.NoSuchProcess:
+            return "exited"
+
+        window = has_top_level_window(process)
+        if window:
+            return "window"
+
+        if not settings["require_window"] or window is None:
+            signal = _activity_reached(process, settings)
+            if signal:
+                return signal
+
+        time.sleep(poll_interval)
+
+    return "timeout"
@@ -4,6 +4,11 @@ Light Control Module for Arcade Station.
 This module provides functionality for managing arcade cabinet lighting systems,
 including process management for LightsTest and mame2lit applications, and
 lighting control operations.
+
+When the service setting in the [lights] section of utility_config.toml is
+on, resets and the MAME lights are handed to the resident lights service
+(lights_service.py), which is started on first use. The functions below
+fall back to running the tools directly if the service cannot be reached.
 """
 
 import subprocess
@@ -11,7 +16,8 @@ import platform
 import psutil
 import time
 import os
-from arcade_station.core.common.core_functions import load_toml_config, launch_script, log_message
+from arcade_station.core.common.core_functions import log_message
+from arcade_station.core.common.lights_service import LightsError, load_lights_config, send_command
 
 def kill_lights_processes():
     """
@@ -60,30 +66,60 @@ def kill_specific_lights_process(process_name):
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
             log_message(f"Error killing specific lights process: {e}", "LIGHTS")
 
+def send_to_lights_service(lights_config, command, **arguments):
+    """
+    Hand a lights command to the resident lights service.
+    
+    Args:
+        lights_config (dict): Settings from load_lights_config().
+        command (str): Command name, such as reset or set_pattern.
+        **arguments: Command arguments, such as pattern.
+    
+    Returns:
+        bool: True if the service carried out the command, False if the
+              service is disabled or could not be reached.
+    """
+    if not lights_config['service']:
+        return False
+    try:
+        state = send_command(command, lights_config, **arguments)
+    except LightsError as e:
+        log_message(f"Lights service rejected {command}: {e}", "LIGHTS")
+        return False
+    if state is None:
+        log_message(f"Lights service unavailable, running {command} directly", "LIGHTS")
+        return False
+    log_message(f"Lights service handled {command}: {state.get('pattern')}", "LIGHTS")
+    return True
+
 def reset_lights():
     """
     Reset the arcade cabinet lights to their default state.
     
-    Uses LightsTest.exe to reset the lighting system if enabled in the
-    configuration. The process is run briefly and then terminated to
-    ensure the lights are reset without leaving the process running.
+    Sends a reset to the lights service if lights are enabled and the
+    service is on. Otherwise uses LightsTest.exe directly: the process is
+    run briefly and then terminated to ensure the lights are reset without
+    leaving the process running.
     
-    The function:
+    The direct fallback:
     1. Terminates any existing LightsTest processes
     2. Checks if lights are enabled in the configuration
     3. Runs LightsTest.exe briefly if enabled
     4. Ensures the process is properly terminated
     
     Returns:
-        None. All operations are logged for debugging purposes.
+        bool: True if the lights service handled the reset, in which case
+              the service ends LightsTest itself and callers must not kill it.
     """
+    lights_config = load_lights_config()
+    enabled = lights_config['enabled']
+    if enabled and send_to_lights_service(lights_config, "reset"):
+        return True
+    
     # Only kill LightsTest, not mame2lit
     kill_specific_lights_process("LightsTest")
     
-    config = load_toml_config('utility_config.toml')
-    lights_config = config.get('lights', {})
-    executable_path = lights_config.get('light_reset_executable_path')
-    enabled = lights_config.get('enabled', False)
+    executable_path = lights_config['light_reset_executable_path']
 
     if enabled and executable_path and platform.system() == 'Windows':
         try:
@@ -93,7 +129,7 @@ def reset_lights():
                                      creationflags=subprocess.CREATE_NO_WINDOW,
                                      shell=False)
             # Allow it to run briefly
-            time.sleep(0.3)
+            time.sleep(lights_config['reset_hold'])
             # Force kill the process
             if process.poll() is None:  # If process is still running
                 process.kill()  # Force kill instead of terminate
@@ -105,16 +141,19 @@ def reset_lights():
             log_message(f"Failed to reset lights: {e}", "LIGHTS")
             # Still try to kill any remaining processes
             kill_specific_lights_process("LightsTest")
+    return False
 
 def launch_mame_lights():
     """
     Launch the MAME-specific lighting control application.
     
-    Starts mame2lit.exe if lights are enabled in the configuration and
-    the system is running Windows. This function is specifically for
-    MAME-based games that support lighting control.
+    Switches the lights service to the "mame" pattern if lights are enabled
+    and the service is on; the service keeps one mame2lit.exe running
+    across games. Otherwise starts mame2lit.exe directly on Windows. This
+    function is specifically for MAME-based games that support lighting
+    control.
     
-    The function:
+    The direct fallback:
     1. Checks if lights are enabled in the configuration
     2. Terminates any existing mame2lit processes
     3. Launches a new instance of mame2lit.exe
@@ -123,10 +162,12 @@ def launch_mame_lights():
     Returns:
         None. All operations are logged for debugging purposes.
     """
-    config = load_toml_config('utility_config.toml')
-    lights_config = config.get('lights', {})
-    mame_executable_path = lights_config.get('light_mame_executable_path')
-    enabled = lights_config.get('enabled', False)
+    lights_config = load_lights_config()
+    enabled = lights_config['enabled']
+    if enabled and send_to_lights_service(lights_config, "set_pattern", pattern="mame"):
+        return
+    
+    mame_executable_path = lights_config['light_mame_executable_path']
 
     if enabled and mame_executable_path and platform.system() == 'Windows':
         try:
@@ -0,0 +1,810 @@
+"""
+Lights Service Module for Arcade Station.
+
+This module keeps one resident process in charge of the cabinet lights, so
+a reset no longer starts LightsTest.exe, sleeps and then scans the process
+list to kill it, and a MAME game no longer restarts mame2lit.exe.
+
+The service owns a lights backend and takes commands from the other
+Arcade Station processes over a local multiprocessing.connection channel:
+
+- reset: put the lights back to their idle state
+- set_pattern: switch to a named pattern ("mame" hands the lamps to MAME's
+  outputs, "off" is the same as a reset, others come from the
+  [lights.patterns] table)
+- state: report what the lights are showing
+- ping, shutdown
+
+Two backends are available:
+
+- tools: drives the existing LightsTest.exe and mame2lit.exe. The service
+  keeps their process handles, so LightsTest is killed by handle after
+  reset_hold seconds on a timer instead of blocking the caller, and
+  mame2lit is only started again if it is not already running.
+- simulated: keeps the lamp state in memory, with an optional write_delay
+  per command to stand in for the serial device. It runs anywhere and is
+  what the bench command uses to measure command latency on Linux.
+
+The service listens on a named pipe on Windows and a Unix socket elsewhere;
+both connect without the delayed-ACK stall a loopback TCP handshake has.
+It publishes the address and a random authentication key in
+lights_service.json in the runtime directory. Clients read that file for every command, so a restarted
+service is picked up without any configuration. Settings are read from the
+[lights] section of utility_config.toml; light_control.py starts the
+service on first use and falls back to running the tools directly if it
+cannot be reached.
+
+Usage:
+    python lights_service.py serve [--backend tools|simulated]
+    python lights_service.py reset
+    python lights_service.py pattern NAME [--lamp NAME=VALUE ...]
+    python lights_service.py state
+    python lights_service.py stop
+    python lights_service.py bench [--count N] [--write-delay SECONDS]
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import secrets
+import argparse
+import platform
+import threading
+import subprocess
+import statistics
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import (
+    get_runtime_directory,
+    launch_script,
+    load_toml_config,
+    log_message
+)
+
+ENDPOINT_FILE = "lights_service.json"
+
+# Defaults used when utility_config.toml does not set a key
+DEFAULT_LIGHTS_SETTINGS = {
+    "enabled": False,
+    "light_reset_executable_path": "",
+    "light_mame_executable_path": "",
+    "service": True,
+    "backend": "tools",
+    "reset_hold": 0.3,
+    "start_timeout": 3.0,
+    "reply_timeout": 2.0,
+    "write_delay": 0.0,
+    "patterns": {},
+}
+
+VALID_BACKENDS = ("tools", "simulated")
+
+# Patterns every backend understands
+BUILTIN_PATTERNS = ("off", "mame")
+
+class LightsError(Exception):
+    """Raised when a lights command cannot be carried out."""
+
+def load_lights_config():
+    """
+    Load the [lights] settings from utility_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_LIGHTS_SETTINGS present.
+    """
+    settings = dict(DEFAULT_LIGHTS_SETTINGS)
+    try:
+        config = load_toml_config('utility_config.toml').get('lights', {})
+    except Exception as e:
+        log_message(f"Failed to load lights configuration: {e}", "LIGHTS")
+        config = {}
+
+    for key, value in config.items():
+        if key in settings:
+            settings[key] = value
+    if settings["backend"] not in VALID_BACKENDS:
+        log_message(f"Unknown lights backend '{settings['backend']}', using tools", "LIGHTS")
+        settings["backend"] = "tools"
+    return settings
+
+def resolve_tool_path(path):
+    """
+    Resolve a configured lights executable to an absolute path.
+
+    Relative paths are resolved from this module's directory, matching the
+    paths in the shipped utility_config.toml.
+
+    Args:
+        path (str): The configured path.
+
+    Returns:
+        str: Absolute path, or "" if none is configured.
+    """
+    if not path or not path.strip():
+        return ""
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), path))
+
+class SimulatedBackend:
+    """Lights backend that keeps the lamp state in memory."""
+
+    name = "simulated"
+
+    def __init__(self, settings):
+        """
+        Create the backend.
+
+        Args:
+            settings (dict): Lights settings; write_delay and patterns are used.
+        """
+        self.write_delay = float(settings.get("write_delay", 0.0))
+        self.patterns = settings.get("patterns", {})
+        self.lamps = {}
+        self.writes = 0
+
+    def _write(self, lamps):
+        """
+        Stand in for a write to the lighting device.
+
+        Args:
+            lamps (dict): Lamp name to value.
+        """
+        if self.write_delay > 0:
+            time.sleep(self.write_delay)
+        self.lamps = dict(lamps)
+        self.writes += 1
+
+    def reset(self):
+        """Turn every lamp off."""
+        self._write({name: 0 for name in self.lamps})
+
+    def set_pattern(self, pattern, lamps=None):
+        """
+        Show a pattern.
+
+        Args:
+            pattern (str): "off", "mame" or a name from [lights.patterns].
+            lamps (dict, optional): Lamp values to apply on top of the pattern.
+        """
+        if pattern == "off":
+            self.reset()
+        elif pattern == "mame":
+            # MAME's outputs would drive the lamps from here on
+            self._write(dict(lamps or {}))
+        elif pattern in self.patterns or lamps:
+            values = dict(self.patterns.get(pattern, {}))
+            values.update(lamps or {})
+            self._write(values)
+        else:
+            raise LightsError(f"Unknown lights pattern: {pattern}")
+
+    def state(self):
+        """
+        Describe the backend state.
+
+        Returns:
+            dict: Lamp values and the number of device writes.
+        """
+        return {"lamps": dict(self.lamps), "writes": self.writes}
+
+    def close(self):
+        """Nothing to release."""
+
+class ToolsBackend:
+    """Lights backend that drives LightsTest.exe and mame2lit.exe."""
+
+    name = "tools"
+
+    def __init__(self, settings):
+        """
+        Create the backend and clear out tools left over from earlier runs.
+
+        Args:
+            settings (dict): Lights settings; the executable paths and
+                             reset_hold are used.
+        """
+        from arcade_station.core.common.light_control import kill_lights_processes
+
+        self.reset_path = resolve_tool_path(settings.get("light_reset_executable_path", ""))
+        self.mame_path = resolve_tool_path(settings.get("light_mame_executable_path", ""))
+        self.reset_hold = float(settings.get("reset_hold", 0.3))
+        self.reset_process = None
+        self.reset_deadline = 0.0
+        self.mame_process = None
+        self._lock = threading.Lock()
+        # One scan at startup; after this the service only touches its own children
+        kill_lights_processes()
+
+    def _start(self, path):
+        """
+        Start a lights tool without a console window.
+
+        Args:
+            path (str): Executable path.
+
+        Returns:
+            subprocess.Popen: The tool's process.
+        """
+        if not path or not os.path.exists(path):
+            raise LightsError(f"Lights executable not found at: {path}")
+        creationflags = subprocess.CREATE_NO_WINDOW if platform.system() == 'Windows' else 0
+        return subprocess.Popen([path], creationflags=creationflags, shell=False)
+
+    @staticmethod
+    def _stop(process):
+        """
+        Kill a tool process if it is still running.
+
+        Args:
+            process (subprocess.Popen): The process, or None.
+        """
+        if process is not None and process.poll() is None:
+            process.kill()
+            try:
+                process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def _finish_reset(self, wait=True):
+        """
+        Kill LightsTest once it has had reset_hold seconds to run.
+
+        Must be called with the lock held.
+
+        Args:
+            wait (bool): Sleep until the deadline instead of returning early.
+        """
+        if self.reset_process is None:
+            return
+        remaining = self.reset_deadline - time.monotonic()
+        if remaining > 0:
+            if not wait:
+                return
+            time.sleep(remaining)
+        self._stop(self.reset_process)
+        self.reset_process = None
+
+    def _finish_reset_later(self, process):
+        """
+        Timer callback that ends a reset if it is still the current one.
+
+        Args:
+            process (subprocess.Popen): The LightsTest process the timer was set for.
+        """
+        with self._lock:
+            if self.reset_process is process:
+                self._finish_reset()
+
+    def reset(self):
+        """
+        Start LightsTest and schedule it to be killed after reset_hold seconds.
+
+        mame2lit is stopped first so LightsTest can open the COM port. The
+        call returns as soon as LightsTest is started.
+        """
+        with self._lock:
+            self._stop(self.mame_process)
+            self.mame_process = None
+            # A reset still in progress is cut short by the new one
+            self._stop(self.reset_process)
+            process = self.reset_process = self._start(self.reset_path)
+            self.reset_deadline = time.monotonic() + self.reset_hold
+        timer = threading.Timer(self.reset_hold, self._finish_reset_later, args=(process,))
+        timer.daemon = True
+        timer.start()
+
+    def set_pattern(self, pattern, lamps=None):
+        """
+        Show a pattern.
+
+        Args:
+            pattern (str): "off" or "mame"; the tools cannot set single lamps.
+            lamps (dict, optional): Not supported by this backend.
+        """
+        if pattern == "off":
+            self.reset()
+            return
+        if pattern != "mame" or lamps:
+            raise LightsError(f"The tools backend only supports the {', '.join(BUILTIN_PATTERNS)} patterns")
+        with self._lock:
+            # LightsTest and mame2lit share the COM port
+            self._finish_reset()
+            if self.mame_process is not None and self.mame_process.poll() is None:
+                return
+            self.mame_process = self._start(self.mame_path)
+            log_message(f"MAME lights launched with PID: {self.mame_process.pid}", "LIGHTS")
+
+    def state(self):
+        """
+        Describe the backend state.
+
+        Returns:
+            dict: Process ids of the running tools.
+        """
+        with self._lock:
+            self._finish_reset(wait=False)
+            return {
+                "reset_pid": self.reset_process.pid if self.reset_process else None,
+                "mame_pid": self.mame_process.pid if self.mame_process and self.mame_process.poll() is None else None,
+            }
+
+    def close(self):
+        """Stop both tools."""
+        with self._lock:
+            self._finish_reset()
+            self._stop(self.mame_process)
+            self.mame_process = None
+
+BACKENDS = {
+    "tools": ToolsBackend,
+    "simulated": SimulatedBackend,
+}
+
+def get_endpoint_path():
+    """
+    Get the path of the file the service publishes its address in.
+
+    Returns:
+        str: Absolute path to the endpoint file.
+    """
+    return os.path.join(get_runtime_directory(), ENDPOINT_FILE)
+
+def new_service_address():
+    """
+    Pick the address for a service run by this process.
+
+    Returns:
+        tuple: (address, family) for multiprocessing.connection.Listener.
+    """
+    if platform.system() == 'Windows':
+        return rf'\\.\pipe\arcade_station_lights_{os.getpid()}', 'AF_PIPE'
+    path = os.path.join(get_runtime_directory(), f"lights_{os.getpid()}.sock")
+    if os.path.exists(path):
+        # Left behind by an earlier process with the same id
+        os.remove(path)
+    return path, 'AF_UNIX'
+
+def read_endpoint():
+    """
+    Read the running service's address and key.
+
+    Returns:
+        tuple: (address, authkey bytes), or None if no service has
+               published an endpoint.
+    """
+    try:
+        with open(get_endpoint_path(), 'r', encoding='utf-8') as f:
+            endpoint = json.load(f)
+        return endpoint["address"], bytes.fromhex(endpoint["authkey"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+class LightsService:
+    """Resident owner of the lights backend, serving commands over a local channel."""
+
+    def __init__(self, backend, publish=True):
+        """
+        Start listening for commands.
+
+        Args:
+            backend: SimulatedBackend or ToolsBackend instance.
+            publish (bool): Write the endpoint file so clients can find the service.
+        """
+        self.backend = backend
+        self.authkey = secrets.token_bytes(32)
+        address, self.family = new_service_address()
+        self.listener = Listener(address, family=self.family, authkey=self.authkey)
+        self.address = self.listener.address
+        self.pattern = "off"
+        self.commands = 0
+        self.updated = None
+        self.publish = publish
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        if publish:
+            path = get_endpoint_path()
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "address": self.address,
+                    "authkey": self.authkey.hex(),
+                    "pid": os.getpid(),
+                    "backend": backend.name,
+                }, f)
+            os.replace(temp_path, path)
+        log_message(f"Lights service listening on {self.address} "
+                    f"with the {backend.name} backend", "LIGHTS")
+
+    def handle(self, request):
+        """
+        Carry out one command.
+
+        Args:
+            request (dict): Command with a "command" key and its arguments.
+
+        Returns:
+            dict: Reply with ok and either state or error.
+        """
+        command = request.get("command") if isinstance(request, dict) else None
+        try:
+            with self._lock:
+                if command == "reset":
+                    self.backend.reset()
+                    self.pattern = "off"
+                elif command == "set_pattern":
+                    pattern = request.get("pattern") or "off"
+                    self.backend.set_pattern(pattern, request.get("lamps"))
+                    self.pattern = pattern
+                elif command == "shutdown":
+                    self._stopping.set()
+                elif command not in ("ping", "state"):
+                    raise LightsError(f"Unknown lights command: {command}")
+                if command in ("reset", "set_pattern"):
+                    self.commands += 1
+                    self.updated = time.time()
+                state = {
+                    "backend": self.backend.name,
+                    "pattern": self.pattern,
+                    "commands": self.commands,
+                    "updated": self.updated,
+                }
+                state.update(self.backend.state())
+            return {"ok": True, "state": state}
+        except Exception as e:
+            log_message(f"Lights command {command} failed: {e}", "LIGHTS")
+            return {"ok": False, "error": str(e)}
+
+    def _serve_connection(self, connection):
+        """
+        Answer commands on one connection until the client closes it.
+
+        Args:
+            connection: multiprocessing.connection.Connection.
+        """
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                connection.send(self.handle(request))
+                if self._stopping.is_set():
+                    self.close()
+                    return
+
+    def serve_forever(self):
+        """Accept connections until a shutdown command or close()."""
+        while not self._stopping.is_set():
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # Closed listener, or a client that failed authentication
+                if self._stopping.is_set():
+                    break
+                continue
+            threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+    def close(self):
+        """Stop accepting commands, release the backend and withdraw the endpoint."""
+        self._stopping.set()
+        # Wake the accept() in serve_forever; closing the listener alone does not
+        try:
+            if self.family == 'AF_UNIX':
+                with socket.socket(socket.AF_UNIX) as wake:
+                    wake.settimeout(1)
+                    wake.connect(self.address)
+            else:
+                open(self.address, 'rb').close()
+        except OSError:
+            pass
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        with self._lock:
+            self.backend.close()
+        if self.publish and read_endpoint() == (self.address, self.authkey):
+            try:
+                os.remove(get_endpoint_path())
+            except OSError:
+                pass
+
+class LightsClient:
+    """Connection to the lights service."""
+
+    def __init__(self, address, authkey, reply_timeout=2.0):
+        """
+        Connect to the service.
+
+        Args:
+            address (str): Pipe name or socket path of the service.
+            authkey (bytes): The service's authentication key.
+            reply_timeout (float): Seconds to wait for each reply.
+        """
+        self.connection = Client(address, authkey=authkey)
+        self.reply_timeout = reply_timeout
+
+    def request(self, command, **arguments):
+        """
+        Send a command and wait for the reply.
+
+        Args:
+            command (str): reset, set_pattern, state, ping or shutdown.
+            **arguments: Command arguments, such as pattern and lamps.
+
+        Returns:
+            dict: The service state after the command.
+        """
+        self.connection.send(dict(arguments, command=command))
+        if not self.connection.poll(self.reply_timeout):
+            raise LightsError(f"No reply from the lights service to {command}")
+        reply = self.connection.recv()
+        if not reply.get("ok"):
+            raise LightsError(reply.get("error", f"Lights command {command} failed"))
+        return reply["state"]
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def connect(reply_timeout=2.0):
+    """
+    Connect to the running lights service.
+
+    Returns:
+        LightsClient: The connection, or None if no service is running.
+    """
+    endpoint = read_endpoint()
+    if endpoint is None:
+        return None
+    try:
+        return LightsClient(endpoint[0], endpoint[1], reply_timeout)
+    except (OSError, EOFError, AuthenticationError):
+        # Stale endpoint file from a service that is gone
+        return None
+
+def start_service(start_timeout=3.0):
+    """
+    Start the lights service in the background and wait for it to listen.
+
+    Args:
+        start_timeout (float): Seconds to wait for the service.
+
+    Returns:
+        LightsClient: A connection to the new service, or None if it did
+                      not come up in time.
+    """
+    log_message("Starting lights service", "LIGHTS")
+    launch_script(os.path.abspath(__file__), identifier="lights_service", extra_args=["serve"])
+    deadline = time.monotonic() + start_timeout
+    while time.monotonic() < deadline:
+        client = connect()
+        if client is not None:
+            return client
+        time.sleep(0.05)
+    log_message(f"Lights service did not start within {start_timeout}s", "LIGHTS")
+    return None
+
+def send_command(command, settings=None, start=True, **arguments):
+    """
+    Send one command to the lights service, starting it if needed.
+
+    Args:
+        command (str): reset, set_pattern, state, ping or shutdown.
+        settings (dict, optional): Lights settings. Defaults to load_lights_config().
+        start (bool): Start the service if it is not running.
+        **arguments: Command arguments, such as pattern and lamps.
+
+    Returns:
+        dict: The service state after the command, or None if the service
+              could not be reached.
+    """
+    settings = settings or load_lights_config()
+    client = connect(settings["reply_timeout"])
+    if client is None and start:
+        client = start_service(settings["start_timeout"])
+    if client is None:
+        return None
+    client.reply_timeout = settings["reply_timeout"]
+    try:
+        with client:
+            return client.request(command, **arguments)
+    except (OSError, EOFError) as e:
+        log_message(f"Lights service connection failed: {e}", "LIGHTS")
+        return None
+
+def serve(backend_name=None):
+    """
+    Run the lights service until it is told to shut down.
+
+    Exits straight away if another service is already answering.
+
+    Args:
+        backend_name (str, optional): Backend to use instead of the configured one.
+    """
+    settings = load_lights_config()
+    existing = connect()
+    if existing is not None:
+        with existing:
+            try:
+                existing.request("ping")
+                log_message("Lights service is already running", "LIGHTS")
+                return
+            except (LightsError, OSError, EOFError):
+                pass
+
+    backend = BACKENDS[backend_name or settings["backend"]](settings)
+    service = LightsService(backend)
+
+    def stop(*args):
+        service.close()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        log_message("Lights service stopped", "LIGHTS")
+
+def _percentiles(samples):
+    """
+    Summarize latency samples.
+
+    Args:
+        samples (list): Durations in seconds.
+
+    Returns:
+        str: p50, p95, p99 and max in milliseconds.
+    """
+    ordered = sorted(samples)
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+    return (f"p50 {statistics.median(ordered) * 1000:7.3f} ms  p95 {pick(0.95):7.3f} ms  "
+            f"p99 {pick(0.99):7.3f} ms  max {ordered[-1] * 1000:7.3f} ms")
+
+def run_bench(count=500, write_delay=0.0):
+    """
+    Measure light command latency against the simulated backend.
+
+    Runs the service in this process without publishing it,
+    then times commands sent over a new connection each (as the reset
+    scripts do) and over one kept-open connection. For comparison it times
+    starting a process, which every reset used to cost before the 0.3s
+    sleep and the process scan.
+
+    Args:
+        count (int): Commands per measurement.
+        write_delay (float): Simulated device write time in seconds.
+
+    Returns:
+        bool: True if every command succeeded and the final state is right.
+    """
+    settings = dict(DEFAULT_LIGHTS_SETTINGS, write_delay=write_delay,
+                    patterns={"attract": {"start": 1, "coin": 1}})
+    service = LightsService(SimulatedBackend(settings), publish=False)
+    thread = threading.Thread(target=service.serve_forever, daemon=True)
+    thread.start()
+    ok = True
+    try:
+        samples = []
+        for i in range(count):
+            started = time.perf_counter()
+            with LightsClient(service.address, service.authkey) as client:
+                client.request("reset")
+            samples.append(time.perf_counter() - started)
+        print(f"{'reset, new connection':28} {_percentiles(samples)}")
+
+        with LightsClient(service.address, service.authkey) as client:
+            for label, command, arguments in (
+                ("reset, kept connection", "reset", {}),
+                ("set_pattern attract", "set_pattern", {"pattern": "attract"}),
+                ("set_pattern mame", "set_pattern", {"pattern": "mame"}),
+            ):
+                samples = []
+                for i in range(count):
+                    started = time.perf_counter()
+                    client.request(command, **arguments)
+                    samples.append(time.perf_counter() - started)
+                print(f"{label:28} {_percentiles(samples)}")
+
+            client.request("set_pattern", pattern="attract", lamps={"p1": 1})
+            state = client.request("state")
+            expected = {"start": 1, "coin": 1, "p1": 1}
+            if state["lamps"] != expected or state["pattern"] != "attract":
+                print(f"FAIL state {state}")
+                ok = False
+            try:
+                client.request("set_pattern", pattern="missing")
+                print("FAIL unknown pattern was accepted")
+                ok = False
+            except LightsError:
+                pass
+            print(f"Commands handled: {state['commands']}, device writes: {state['writes']}")
+
+        samples = []
+        for i in range(min(count, 20)):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            samples.append(time.perf_counter() - started)
+        print(f"{'process start (old reset)':28} {_percentiles(samples)}")
+    finally:
+        service.close()
+        thread.join(timeout=2)
+    print("All checks passed" if ok else "Checks failed")
+    return ok
+
+def main():
+    """
+    Run or talk to the lights service from the command line.
+
+    Command-line Arguments:
+        serve: Run the service.
+        reset: Reset the lights.
+        pattern: Show a named pattern.
+        state: Print the service state.
+        stop: Shut the service down.
+        bench: Measure command latency with the simulated backend.
+
+    Returns:
+        None. Exits with status code 1 if a command or bench check fails.
+    """
+    parser = argparse.ArgumentParser(description='Resident lights controller.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help='Run the service')
+    serve_parser.add_argument('--backend', choices=VALID_BACKENDS, default=None,
+                              help='Backend (default: from utility_config.toml)')
+    serve_parser.add_argument('--identifier', help='Process identifier, set by launch_script')
+    subparsers.add_parser('reset', help='Reset the lights')
+    pattern = subparsers.add_parser('pattern', help='Show a named pattern')
+    pattern.add_argument('name')
+    pattern.add_argument('--lamp', action='append', default=[], metavar='NAME=VALUE',
+                         help='Lamp value, may be repeated')
+    subparsers.add_parser('state', help='Print the service state')
+    subparsers.add_parser('stop', help='Shut the service down')
+    bench = subparsers.add_parser('bench', help='Measure command latency with the simulated backend')
+    bench.add_argument('--count', type=int, default=500)
+    bench.add_argument('--write-delay', type=float, default=0.0, help='Simulated device write time in seconds')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.backend)
+        return
+    if args.command == 'bench':
+        if not run_bench(args.count, args.write_delay):
+            sys.exit(1)
+        return
+
+    arguments = {}
+    command = {"reset": "reset", "state": "state", "stop": "shutdown", "pattern": "set_pattern"}[args.command]
+    if args.command == 'pattern':
+        lamps = {}
+        for item in args.lamp:
+            name, _, value = item.partition('=')
+            lamps[name] = int(value) if value.lstrip('-').isdigit() else value
+        arguments = {"pattern": args.name, "lamps": lamps or None}
+    try:
+        state = send_command(command, start=args.command in ('reset', 'pattern'), **arguments)
+    except LightsError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    if state is None:
+        print("Lights service is not running", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(state, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1191 @@
+"""
+MAME Catalog Module for Arcade Station.
+
+This module builds a catalog of the MAME sets that can actually be played
+on this machine, so MAME games can be picked from a list instead of typing
+each ROM name by hand.
+
+The catalog is built in two steps:
+
+1. The configured MAME binary is run with -listxml and its output is
+   parsed as it streams in, one <machine> element at a time. Each element
+   is cleared once its fields are read, so the 200+ MB document never sits
+   in memory. Titles, years, manufacturers, parent/clone links and the
+   ROMs and disks each set needs are stored in a SQLite database.
+2. The ROM directories are listed and every zip, 7z or directory is matched
+   to its set. Zip members are checked against the CRCs from -listxml, and
+   CHDs against the disks a set needs. A set is playable when its own files
+   are complete and the parent or BIOS sets it borrows ROMs from are too.
+
+Rescans are incremental: -listxml is only run again when the MAME binary
+changes, and only the ROM files whose size or modification time changed are
+opened again.
+
+The catalog feeds the installer's MAME page and the Pegasus metadata
+generator. Settings are read from the [catalog] section of mame_config.toml;
+ROM directories default to the rompath in mame.ini.
+
+The stub-mame command prints generated -listxml output like a real MAME
+binary, and the bench command scans it against a generated ROM directory,
+so the scanner can be exercised without MAME or any ROMs.
+
+Usage:
+    python mame_catalog.py scan [--force] [--mame PATH] [--ini-path DIR] [--rom-path DIR ...]
+    python mame_catalog.py list [--clones] [--json]
+    python mame_catalog.py search TEXT
+    python mame_catalog.py stub-mame [--machines N] -listxml
+    python mame_catalog.py bench [--machines N]
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import sqlite3
+import zipfile
+import argparse
+import tempfile
+import subprocess
+import xml.etree.ElementTree as ET
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+try:
+    from arcade_station.core.common.core_functions import load_mame_config, log_message
+    from arcade_station.core.common.launch_mame import resolve_mame_executable
+except ImportError:
+    # The installer scans before the station's dependencies (psutil) are
+    # installed, so the catalog falls back to the standard library
+    import tomllib
+
+    def log_message(message, category="INFO"):
+        """
+        Fallback logging function if the station modules cannot be imported.
+        Writes to stderr so it never mixes with list --json output.
+
+        Args:
+            message (str): The message to log.
+            category (str): The log category.
+        """
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [{category}] {message}", file=sys.stderr)
+
+    def load_mame_config():
+        """
+        Fallback loader for mame_config.toml.
+
+        Returns:
+            dict: The configuration.
+        """
+        with open(os.path.join(BASE_DIRECTORY, "config", "mame_config.toml"), "rb") as f:
+            return tomllib.load(f)
+
+    def resolve_mame_executable(mame_config):
+        """
+        Fallback for launch_mame.resolve_mame_executable().
+
+        Args:
+            mame_config (dict): The [mame] section of mame_config.toml.
+
+        Returns:
+            str: Full path to the MAME executable, or its name on the PATH.
+        """
+        executable = mame_config.get('executable') or ("mame.exe" if sys.platform == "win32" else "mame")
+        executable_path = mame_config.get('executable_path', '')
+        if executable_path.endswith(executable):
+            executable_path = os.path.dirname(executable_path)
+        if executable_path:
+            return os.path.abspath(os.path.join(executable_path, executable))
+        return shutil.which(executable) or executable
+
+# Installation directory that a relative catalog path is resolved from
+BASE_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+
+CATALOG_VERSION = 1
+
+# Defaults used when mame_config.toml has no [catalog] section
+DEFAULT_CATALOG_SETTINGS = {
+    "path": "assets/catalog/mame.db",
+    "rom_paths": [],
+    "verify": True,
+}
+
+# Machines inserted per executemany() call while ingesting -listxml
+INSERT_BATCH_SIZE = 2000
+
+ARCHIVE_EXTENSIONS = (".zip", ".7z")
+
+# Set statuses that let a machine run
+GOOD_STATUSES = ("none", "complete", "present")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    """
+    CREATE TABLE IF NOT EXISTS machines (
+        name TEXT PRIMARY KEY,
+        description TEXT,
+        year TEXT,
+        manufacturer TEXT,
+        cloneof TEXT,
+        romof TEXT,
+        sourcefile TEXT,
+        isbios INTEGER,
+        isdevice INTEGER,
+        ismechanical INTEGER,
+        runnable INTEGER,
+        driver_status TEXT,
+        rom_count INTEGER,
+        disk_count INTEGER,
+        merges INTEGER,
+        set_status TEXT,
+        playable INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS requirements (
+        machine TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        crc TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sets (
+        name TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        path TEXT NOT NULL,
+        size INTEGER,
+        mtime_ns INTEGER,
+        members TEXT,
+        PRIMARY KEY (name, kind)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_requirements_machine ON requirements (machine)",
+    "CREATE INDEX IF NOT EXISTS idx_machines_cloneof ON machines (cloneof)",
+    "CREATE INDEX IF NOT EXISTS idx_machines_playable ON machines (playable, description)",
+    "CREATE INDEX IF NOT EXISTS idx_machines_year ON machines (year)",
+)
+
+class CatalogError(Exception):
+    """
+    Raised when -listxml cannot be run or parsed.
+    """
+
+def load_catalog_config():
+    """
+    Load the [catalog] settings from mame_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_CATALOG_SETTINGS present,
+              path made absolute, and the [mame] section under "mame".
+    """
+    settings = dict(DEFAULT_CATALOG_SETTINGS)
+    try:
+        config = load_mame_config()
+    except Exception as e:
+        log_message(f"Failed to load MAME configuration: {e}", "CATALOG")
+        config = {}
+
+    for key, value in config.get('catalog', {}).items():
+        if key in settings:
+            settings[key] = value
+
+    settings["path"] = os.path.join(BASE_DIRECTORY, settings["path"])
+    settings["mame"] = config.get('mame', {})
+    return settings
+
+def mame_working_directory(mame_config):
+    """
+    Determine the directory MAME resolves relative paths from.
+
+    Args:
+        mame_config (dict): The [mame] section of mame_config.toml.
+
+    Returns:
+        str: The configured working_dir, or the executable's directory.
+    """
+    return mame_config.get('working_dir') or os.path.dirname(resolve_mame_executable(mame_config))
+
+def read_ini_rompath(mame_config):
+    """
+    Read the rompath setting from mame.ini.
+
+    mame.ini is looked for in each directory of ini_path, then in the MAME
+    working directory.
+
+    Args:
+        mame_config (dict): The [mame] section of mame_config.toml.
+
+    Returns:
+        list: Absolute ROM directories, or an empty list if no mame.ini
+              sets rompath.
+    """
+    working_dir = mame_working_directory(mame_config)
+    ini_dirs = [d for d in mame_config.get('ini_path', '').split(';') if d]
+    ini_dirs.append(working_dir)
+
+    for ini_dir in ini_dirs:
+        ini_file = os.path.join(working_dir, ini_dir, "mame.ini")
+        try:
+            with open(ini_file, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    parts = line.strip().split(None, 1)
+                    if len(parts) == 2 and parts[0] == "rompath":
+                        return [
+                            os.path.abspath(os.path.join(working_dir, path.strip()))
+                            for path in parts[1].strip('"').split(';') if path.strip()
+                        ]
+        except OSError:
+            continue
+    return []
+
+def resolve_rom_paths(settings):
+    """
+    Determine the ROM directories to scan.
+
+    Args:
+        settings (dict): Settings from load_catalog_config().
+
+    Returns:
+        list: The configured rom_paths, the rompath from mame.ini, or the
+              roms directory next to MAME, in that order of preference.
+    """
+    if settings.get("rom_paths"):
+        return [os.path.abspath(path) for path in settings["rom_paths"]]
+    return read_ini_rompath(settings["mame"]) or [os.path.join(mame_working_directory(settings["mame"]), "roms")]
+
+def executable_signature(path):
+    """
+    Describe a MAME binary so a changed binary can be detected.
+
+    Args:
+        path (str): Path to the MAME executable.
+
+    Returns:
+        str: Path, size and modification time, or the path alone if the
+             file cannot be found (for example a command on the PATH).
+    """
+    try:
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    except OSError:
+        return path
+
+def _flag(element, attribute):
+    """
+    Read a yes/no attribute of a -listxml element.
+
+    Args:
+        element (xml.etree.ElementTree.Element): The element.
+        attribute (str): The attribute name.
+
+    Returns:
+        int: 1 if the attribute is "yes", otherwise 0.
+    """
+    return 1 if element.get(attribute) == "yes" else 0
+
+def iter_machines(stream):
+    """
+    Parse -listxml output one machine at a time.
+
+    Each <machine> (or <game>, in older MAME versions) is read and then
+    cleared, and removed from the root element, so memory use does not grow
+    with the size of the document.
+
+    Args:
+        stream (file): A binary file object with the XML document.
+
+    Yields:
+        dict: The machine's fields, with "roms" as a list of (name, crc)
+              tuples and "disks" as a list of names, both limited to the
+              files the set must hold itself.
+    """
+    root = None
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        if element.tag not in ("machine", "game"):
+            continue
+
+        roms = []
+        disks = []
+        rom_count = 0
+        disk_count = 0
+        merges = 0
+        driver_status = ""
+        for child in element:
+            if child.tag in ("rom", "disk"):
+                if child.get("status") == "nodump" or child.get("optional") == "yes":
+                    continue
+                if child.tag == "rom":
+                    rom_count += 1
+                else:
+                    disk_count += 1
+                if child.get("merge"):
+                    merges = 1
+                elif child.tag == "rom":
+                    roms.append((child.get("name", ""), (child.get("crc") or "").lower()))
+                else:
+                    disks.append(child.get("name", ""))
+            elif child.tag == "driver":
+                driver_status = child.get("status", "")
+
+        yield {
+            "name": element.get("name"),
+            "description": element.findtext("description", ""),
+            "year": element.findtext("year", ""),
+            "manufacturer": element.findtext("manufacturer", ""),
+            "cloneof": element.get("cloneof"),
+            "romof": element.get("romof"),
+            "sourcefile": element.get("sourcefile", ""),
+            "isbios": _flag(element, "isbios"),
+            "isdevice": _flag(element, "isdevice"),
+            "ismechanical": _flag(element, "ismechanical"),
+            "runnable": 0 if element.get("runnable") == "no" else 1,
+            "driver_status": driver_status,
+            "rom_count": rom_count,
+            "disk_count": disk_count,
+            "merges": merges,
+            "roms": roms,
+            "disks": disks,
+        }
+
+        element.clear()
+        if root is not None:
+            root.clear()
+
+def _read_members(path, kind):
+    """
+    List what a ROM file or directory holds.
+
+    Args:
+        path (str): Path to the zip, 7z or directory.
+        kind (str): "zip", "7z" or "dir".
+
+    Returns:
+        list: Lowercase CRC32s for a zip, lowercase file names for a
+              directory, or None for a 7z (not verified) or an unreadable
+              file.
+    """
+    try:
+        if kind == "zip":
+            with zipfile.ZipFile(path) as archive:
+                return sorted({f"{info.CRC:08x}" for info in archive.infolist()})
+        if kind == "dir":
+            return sorted(name.lower() for name in os.listdir(path))
+    except (OSError, zipfile.BadZipFile) as e:
+        log_message(f"Cannot read ROM set {path}: {e}", "CATALOG")
+    return None
+
+class MameCatalog:
+    """
+    SQLite catalog of MAME machines and the ROM sets present on disk.
+
+    Attributes:
+        path (str): Path to the SQLite database.
+    """
+
+    def __init__(self, path):
+        """
+        Open the catalog, creating its schema if needed.
+
+        Args:
+            path (str): Path to the SQLite database.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=5.0)
+        self._connection.row_factory = sqlite3.Row
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+    def close(self):
+        """
+        Close the database.
+
+        Returns:
+            None
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_meta(self, key, default=None):
+        """
+        Read a value from the meta table.
+
+        Args:
+            key (str): The key.
+            default: Value returned if the key is not set.
+
+        Returns:
+            str: The stored value, or default.
+        """
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, values):
+        """
+        Store values in the meta table, in the current transaction.
+
+        Args:
+            values (dict): Keys and values to store.
+
+        Returns:
+            None
+        """
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()]
+        )
+
+    def ingest(self, command):
+        """
+        Replace the machine list with the output of a -listxml command.
+
+        Args:
+            command (list): The MAME command line, without -listxml.
+
+        Returns:
+            int: Number of machines read.
+
+        Raises:
+            CatalogError: If MAME cannot be started, its output is not
+                          valid XML, or it lists no machines.
+        """
+        creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        try:
+            process = subprocess.Popen(
+                list(command) + ["-listxml"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=1024 * 1024,
+                creationflags=creationflags
+            )
+        except OSError as e:
+            raise CatalogError(f"Cannot run {command[0]}: {e}")
+
+        machine_rows = []
+        requirement_rows = []
+        count = 0
+        connection = self._connection
+        try:
+            with connection:
+                connection.execute("DELETE FROM machines")
+                connection.execute("DELETE FROM requirements")
+                for machine in iter_machines(process.stdout):
+                    count += 1
+                    machine_rows.append((
+                        machine["name"], machine["description"], machine["year"], machine["manufacturer"],
+                        machine["cloneof"], machine["romof"], machine["sourcefile"], machine["isbios"],
+                        machine["isdevice"], machine["ismechanical"], machine["runnable"],
+                        machine["driver_status"], machine["rom_count"], machine["disk_count"], machine["merges"]
+                    ))
+                    requirement_rows.extend((machine["name"], "rom", name, crc) for name, crc in machine["roms"])
+                    requirement_rows.extend((machine["name"], "disk", name, None) for name in machine["disks"])
+                    if len(machine_rows) >= INSERT_BATCH_SIZE:
+                        self._insert_machines(machine_rows, requirement_rows)
+                        machine_rows, requirement_rows = [], []
+                self._insert_machines(machine_rows, requirement_rows)
+                if count == 0:
+                    raise CatalogError(f"{command[0]} -listxml listed no machines")
+        except ET.ParseError as e:
+            raise CatalogError(f"Cannot parse -listxml output: {e}")
+        finally:
+            process.stdout.close()
+            process.wait()
+
+        return count
+
+    def _insert_machines(self, machine_rows, requirement_rows):
+        """
+        Insert a batch of parsed machines, in the current transaction.
+
+        Args:
+            machine_rows (list): Rows for the machines table.
+            requirement_rows (list): Rows for the requirements table.
+
+        Returns:
+            None
+        """
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO machines (name, description, year, manufacturer, cloneof, romof, "
+            "sourcefile, isbios, isdevice, ismechanical, runnable, driver_status, rom_count, disk_count, merges) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            machine_rows
+        )
+        self._connection.executemany(
+            "INSERT INTO requirements (machine, kind, name, crc) VALUES (?, ?, ?, ?)",
+            requirement_rows
+        )
+
+    def scan_sets(self, rom_paths, verify=True):
+        """
+        Update the list of ROM files and directories found on disk.
+
+        Only entries whose size or modification time changed since the last
+        scan are opened. A name found in more than one ROM directory is
+        taken from the first, as MAME does.
+
+        Args:
+            rom_paths (list): ROM directories, in MAME's search order.
+            verify (bool): Read zip CRCs and directory listings. If False,
+                           sets are only checked for presence.
+
+        Returns:
+            set: Names of the sets that were added, changed or removed.
+        """
+        found = {}
+        for rom_path in rom_paths:
+            try:
+                entries = list(os.scandir(rom_path))
+            except OSError as e:
+                log_message(f"Cannot read ROM directory {rom_path}: {e}", "CATALOG")
+                continue
+            for entry in entries:
+                name, extension = os.path.splitext(entry.name)
+                try:
+                    if entry.is_dir():
+                        key = (entry.name.lower(), "dir")
+                    elif extension.lower() in ARCHIVE_EXTENSIONS:
+                        key = (name.lower(), extension.lower()[1:])
+                    else:
+                        continue
+                    if key not in found:
+                        stat = entry.stat()
+                        found[key] = (entry.path, stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+
+        known = {
+            (row["name"], row["kind"]): (row["path"], row["size"], row["mtime_ns"])
+            for row in self._connection.execute("SELECT name, kind, path, size, mtime_ns FROM sets")
+        }
+
+        changed = set()
+        with self._connection:
+            for key in set(known) - set(found):
+                self._connection.execute("DELETE FROM sets WHERE name = ? AND kind = ?", key)
+                changed.add(key[0])
+            for key, signature in found.items():
+                if known.get(key) == signature:
+                    continue
+                members = _read_members(signature[0], key[1]) if verify else None
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO sets (name, kind, path, size, mtime_ns, members) VALUES (?, ?, ?, ?, ?, ?)",
+                    key + signature + (json.dumps(members) if members is not None else None,)
+                )
+                changed.add(key[0])
+        return changed
+
+    def _set_status(self, machine, requirements, sets):
+        """
+        Check whether a machine's own files are on disk.
+
+        Args:
+            machine (sqlite3.Row): The machine.
+            requirements (list): (kind, name, crc) tuples the set must hold.
+            sets (dict): Set name to {kind: members or None}.
+
+        Returns:
+            str: "none" if the machine needs no files of its own,
+                 "complete" if every file was found, "present" if the set
+                 exists but could not be verified, "incomplete" if files
+                 are missing, or "missing" if there is no set at all.
+        """
+        if not requirements:
+            return "none"
+
+        # A merged set keeps its clones' ROMs in the parent's archive
+        candidates = [sets.get(machine["name"], {})]
+        if machine["cloneof"]:
+            candidates.append(sets.get(machine["cloneof"], {}))
+
+        roms = [(name.lower(), crc) for kind, name, crc in requirements if kind == "rom"]
+        disks = [name.lower() + ".chd" for kind, name, _ in requirements if kind == "disk"]
+        status = "missing"
+        for found in candidates:
+            if not found:
+                continue
+            archives = [found[kind] for kind in ("zip", "7z", "dir") if kind in found]
+            if any(members is None for members in archives):
+                return "present"
+
+            have = set()
+            for members in archives:
+                have.update(members)
+            directory = set(found.get("dir") or ())
+            roms_ok = all((crc and crc in have) or name in have for name, crc in roms)
+            disks_ok = all(disk in directory for disk in disks)
+            if roms_ok and disks_ok:
+                return "complete"
+            status = "incomplete"
+        return status
+
+    def update_status(self, names=None):
+        """
+        Recompute the set status of machines from the scanned files.
+
+        Args:
+            names (set, optional): Set names whose files changed. Machines
+                                   with one of these names, and their
+                                   clones, are updated. All machines are
+                                   updated if omitted.
+
+        Returns:
+            int: Number of machines updated.
+        """
+        connection = self._connection
+        sets = {}
+        for row in connection.execute("SELECT name, kind, members FROM sets"):
+            sets.setdefault(row["name"], {})[row["kind"]] = json.loads(row["members"]) if row["members"] else None
+
+        if names is None:
+            machines = connection.execute("SELECT name, cloneof FROM machines").fetchall()
+        else:
+            machines = []
+            names = list(names)
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                machines.extend(connection.execute(
+                    f"SELECT name, cloneof FROM machines WHERE name IN ({placeholders}) OR cloneof IN ({placeholders})",
+                    chunk + chunk
+                ))
+
+        requirements = {}
+        if names is None:
+            for row in connection.execute("SELECT machine, kind, name, crc FROM requirements"):
+                requirements.setdefault(row[0], []).append((row[1], row[2], row[3]))
+
+        updates = []
+        for machine in machines:
+            if names is None:
+                needed = requirements.get(machine["name"], [])
+            else:
+                needed = [
+                    tuple(row) for row in
+                    connection.execute("SELECT kind, name, crc FROM requirements WHERE machine = ?", (machine["name"],))
+                ]
+            updates.append((self._set_status(machine, needed, sets), machine["name"]))
+
+        with connection:
+            connection.executemany("UPDATE machines SET set_status = ? WHERE name = ?", updates)
+        return len(updates)
+
+    def update_playable(self):
+        """
+        Mark which machines can run with the sets on disk.
+
+        A machine is playable when it is a runnable game (not a BIOS,
+        device or mechanical machine, and not a preliminary driver), its
+        own set is good, and, if it borrows ROMs, the set it borrows from is
+        playable-complete as well, following romof links up to the BIOS.
+
+        Returns:
+            int: Number of playable machines.
+        """
+        connection = self._connection
+        machines = {
+            row["name"]: row for row in
+            connection.execute("SELECT name, romof, merges, isbios, isdevice, ismechanical, runnable, "
+                               "driver_status, set_status, playable FROM machines")
+        }
+
+        files_ok = {}
+
+        def has_files(name, depth=0):
+            if name in files_ok:
+                return files_ok[name]
+            machine = machines.get(name)
+            ok = machine is not None and machine["set_status"] in GOOD_STATUSES
+            if ok and machine["merges"] and machine["romof"]:
+                ok = depth < 8 and has_files(machine["romof"], depth + 1)
+            files_ok[name] = ok
+            return ok
+
+        updates = []
+        playable_count = 0
+        for name, machine in machines.items():
+            playable = int(
+                bool(machine["runnable"]) and not machine["isbios"] and not machine["isdevice"]
+                and not machine["ismechanical"] and machine["driver_status"] != "preliminary"
+                and has_files(name)
+            )
+            playable_count += playable
+            if playable != machine["playable"]:
+                updates.append((playable, name))
+
+        with connection:
+            connection.executemany("UPDATE machines SET playable = ? WHERE name = ?", updates)
+        return playable_count
+
+    def scan(self, command, rom_paths, force=False, verify=True):
+        """
+        Bring the catalog up to date with the MAME binary and ROM directories.
+
+        Args:
+            command (list): The MAME command line, without -listxml.
+            rom_paths (list): ROM directories, in MAME's search order.
+            force (bool): Run -listxml even if the binary has not changed.
+            verify (bool): Check zip CRCs and CHDs, not just set names.
+
+        Returns:
+            dict: machines (int, 0 if -listxml was not run), changed_sets,
+                  playable and per-step timings in seconds.
+
+        Raises:
+            CatalogError: If -listxml fails.
+        """
+        stats = {}
+        signature = executable_signature(command[0])
+        listxml_needed = (
+            force
+            or self.get_meta("executable") != signature
+            or self.get_meta("version") != str(CATALOG_VERSION)
+            or self.get_meta("verify") != str(verify)
+        )
+
+        started = time.perf_counter()
+        stats["machines"] = self.ingest(command) if listxml_needed else 0
+        stats["listxml_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if listxml_needed:
+            # A new binary can change what every set needs, so start over
+            with self._connection:
+                self._connection.execute("DELETE FROM sets")
+        changed = self.scan_sets(rom_paths, verify)
+        stats["changed_sets"] = len(changed)
+        stats["files_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if listxml_needed:
+            self.update_status()
+        elif changed:
+            self.update_status(changed)
+        stats["playable"] = self.update_playable()
+        stats["status_seconds"] = time.perf_counter() - started
+
+        with self._connection:
+            self._set_meta({
+                "version": CATALOG_VERSION,
+                "executable": signature,
+                "verify": verify,
+                "rom_paths": json.dumps(rom_paths),
+                "scanned_at": time.time(),
+            })
+        log_message(
+            f"Catalog scan: {stats['machines'] or 'cached'} machines, {stats['changed_sets']} changed sets, "
+            f"{stats['playable']} playable", "CATALOG"
+        )
+        return stats
+
+    def playable(self, include_clones=True):
+        """
+        List the playable machines.
+
+        Args:
+            include_clones (bool): Include clones as well as parents.
+
+        Returns:
+            list: Dicts with name, description, year, manufacturer and
+                  cloneof, sorted by description.
+        """
+        sql = "SELECT name, description, year, manufacturer, cloneof FROM machines WHERE playable = 1"
+        if not include_clones:
+            sql += " AND cloneof IS NULL"
+        return [dict(row) for row in self._connection.execute(sql + " ORDER BY description")]
+
+    def get(self, name):
+        """
+        Look up one machine.
+
+        Args:
+            name (str): The set name.
+
+        Returns:
+            dict: The machine's catalog row, or None if it is not listed.
+        """
+        row = self._connection.execute("SELECT * FROM machines WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def lookup(self, names):
+        """
+        Look up several machines at once.
+
+        Args:
+            names (iterable): Set names.
+
+        Returns:
+            dict: Set name to catalog row, for the names that are listed.
+        """
+        names = list(names)
+        result = {}
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._connection.execute(f"SELECT * FROM machines WHERE name IN ({placeholders})", chunk):
+                result[row["name"]] = dict(row)
+        return result
+
+    def clones(self, name):
+        """
+        List the clones of a parent set.
+
+        Args:
+            name (str): The parent set name.
+
+        Returns:
+            list: Dicts with name, description, year and playable.
+        """
+        return [
+            dict(row) for row in self._connection.execute(
+                "SELECT name, description, year, playable FROM machines WHERE cloneof = ? ORDER BY name", (name,)
+            )
+        ]
+
+    def search(self, text, limit=50, playable_only=True):
+        """
+        Find machines by set name or title.
+
+        Args:
+            text (str): Text contained in the name or description.
+            limit (int): Maximum number of results.
+            playable_only (bool): Only return playable machines.
+
+        Returns:
+            list: Dicts with name, description, year, cloneof and playable.
+        """
+        pattern = f"%{text}%"
+        sql = ("SELECT name, description, year, cloneof, playable FROM machines "
+               "WHERE (name LIKE ? OR description LIKE ?)")
+        if playable_only:
+            sql += " AND playable = 1"
+        sql += " ORDER BY cloneof IS NOT NULL, description LIMIT ?"
+        return [dict(row) for row in self._connection.execute(sql, (pattern, pattern, limit))]
+
+def scan_catalog(force=False, mame_path=None, rom_paths=None, catalog_path=None, ini_path=None):
+    """
+    Scan with the configured MAME binary and ROM directories.
+
+    Args:
+        force (bool): Run -listxml even if the binary has not changed.
+        mame_path (str, optional): MAME executable to use instead of the
+                                   configured one.
+        rom_paths (list, optional): ROM directories to use instead of the
+                                    configured ones.
+        catalog_path (str, optional): Catalog database to use instead of
+                                      the configured one.
+        ini_path (str, optional): MAME ini directory to read rompath from,
+                                  used with mame_path.
+
+    Returns:
+        dict: Scan statistics from MameCatalog.scan().
+    """
+    settings = load_catalog_config()
+    if mame_path:
+        # The installer scans before mame_config.toml is written
+        settings["mame"] = {
+            "executable_path": os.path.dirname(os.path.abspath(mame_path)),
+            "executable": os.path.basename(mame_path),
+            "ini_path": ini_path or "",
+        }
+    command = [mame_path or resolve_mame_executable(settings["mame"])]
+    rom_paths = rom_paths or resolve_rom_paths(settings)
+    with MameCatalog(catalog_path or settings["path"]) as catalog:
+        return catalog.scan(command, rom_paths, force, bool(settings["verify"]))
+
+def _fixture_crc(text):
+    """
+    Derive a stable CRC32 for a generated ROM.
+
+    Args:
+        text (str): Any string identifying the ROM.
+
+    Returns:
+        str: Eight lowercase hex digits.
+    """
+    return f"{zlib.crc32(text.encode()):08x}"
+
+def write_fixture_listxml(out, machines=2000):
+    """
+    Write generated -listxml output shaped like MAME's.
+
+    The document has a BIOS, a device, a mechanical machine and a
+    preliminary driver, followed by game families of one parent and three
+    clones. Every eighth parent boots from the BIOS, every sixteenth needs a
+    CHD, and clones share one ROM with their parent.
+
+    Args:
+        out (file): Binary file object to write to.
+        machines (int): Number of game machines to generate.
+
+    Returns:
+        None
+    """
+    def escape(text):
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;")
+
+    out.write(b'<?xml version="1.0"?>\n<!DOCTYPE mame [\n<!ELEMENT mame (machine+)>\n'
+              b'<!ATTLIST mame build CDATA #IMPLIED>\n]>\n<mame build="0.999 (stub)">\n')
+    out.write(
+        b'\t<machine name="fixbios" sourcefile="fixture.cpp" isbios="yes">\n'
+        b'\t\t<description>Fixture BIOS</description>\n\t\t<year>1990</year>\n'
+        b'\t\t<manufacturer>Stub</manufacturer>\n'
+        + f'\t\t<rom name="bios.bin" size="131072" crc="{_fixture_crc("fixbios/bios")}"/>\n'.encode()
+        + b'\t</machine>\n'
+        b'\t<machine name="fixdev" sourcefile="fixdev.cpp" isdevice="yes" runnable="no">\n'
+        b'\t\t<description>Fixture Device</description>\n\t</machine>\n'
+        b'\t<machine name="fixmech" sourcefile="fixture.cpp" ismechanical="yes">\n'
+        b'\t\t<description>Fixture Pinball</description>\n\t\t<year>1985</year>\n\t</machine>\n'
+        b'\t<machine name="fixprelim" sourcefile="fixture.cpp">\n'
+        b'\t\t<description>Fixture Preliminary</description>\n\t\t<year>1999</year>\n'
+        b'\t\t<driver status="preliminary"/>\n\t</machine>\n'
+    )
+
+    for index in range(machines):
+        name = f"game{index:05d}"
+        parent = f"game{index - index % 4:05d}"
+        is_clone = name != parent
+        family = index // 4
+        uses_bios = family % 8 == 0
+        uses_disk = family % 16 == 0
+
+        attributes = f'name="{name}" sourcefile="fixture{family % 50}.cpp"'
+        if is_clone:
+            attributes += f' cloneof="{parent}" romof="{parent}"'
+        elif uses_bios:
+            attributes += ' romof="fixbios"'
+
+        title = f"Fixture Game {family} & Friends" + (f" (Set {index % 4 + 1})" if is_clone else "")
+        lines = [
+            f'\t<machine {attributes}>',
+            f'\t\t<description>{escape(title)}</description>',
+            f'\t\t<year>{1980 + family % 30}</year>',
+            f'\t\t<manufacturer>Stub {family % 7}</manufacturer>',
+        ]
+        if uses_bios:
+            lines.append('\t\t<biosset name="default" description="Fixture BIOS"/>')
+            lines.append(f'\t\t<rom name="bios.bin" merge="bios.bin" size="131072" crc="{_fixture_crc("fixbios/bios")}"/>')
+        if is_clone:
+            lines.append(f'\t\t<rom name="shared.bin" merge="shared.bin" size="65536" crc="{_fixture_crc(parent + "/shared")}"/>')
+            lines.append(f'\t\t<rom name="{name}.bin" size="65536" crc="{_fixture_crc(name + "/own")}"/>')
+        else:
+            lines.append(f'\t\t<rom name="shared.bin" size="65536" crc="{_fixture_crc(name + "/shared")}"/>')
+            lines.append(f'\t\t<rom name="prog.bin" size="262144" crc="{_fixture_crc(name + "/prog")}"/>')
+            lines.append('\t\t<rom name="pal.bin" size="260" status="nodump"/>')
+        if uses_disk:
+            if is_clone:
+                lines.append(f'\t\t<disk name="{parent}" merge="{parent}" sha1="0"/>')
+            else:
+                lines.append(f'\t\t<disk name="{name}" sha1="0"/>')
+        lines.append('\t\t<chip type="cpu" name="Z80" clock="4000000"/>')
+        lines.append('\t\t<input players="2" coins="2"><control type="joy" ways="8"/></input>')
+        lines.append('\t\t<driver status="good" emulation="good"/>')
+        lines.append('\t</machine>\n')
+        out.write("\n".join(lines).encode())
+
+    out.write(b'</mame>\n')
+
+def write_fixture_roms(rom_path, machines):
+    """
+    Create ROM zips and CHD directories for part of the fixture machines.
+
+    Two of every three families have a parent zip, and the first clone of
+    each family has its own zip. The fourth family in every group of twelve
+    has a parent zip with prog.bin missing, the BIOS zip exists, and every
+    CHD the parents need exists.
+
+    Args:
+        rom_path (str): Directory to create the sets in.
+        machines (int): Number of game machines in the fixture.
+
+    Returns:
+        None
+    """
+    def write_zip(name, members):
+        with zipfile.ZipFile(os.path.join(rom_path, f"{name}.zip"), "w", zipfile.ZIP_STORED) as archive:
+            for member, key in members:
+                # Content chosen so the member's CRC matches the fixture
+                archive.writestr(member, key.encode())
+
+    os.makedirs(rom_path, exist_ok=True)
+    write_zip("fixbios", [("bios.bin", "fixbios/bios")])
+    for index in range(0, machines, 4):
+        family = index // 4
+        name = f"game{index:05d}"
+        if family % 3 == 2:
+            continue
+        members = [("shared.bin", f"{name}/shared")]
+        if family % 12 != 3:
+            members.append(("prog.bin", f"{name}/prog"))
+        write_zip(name, members)
+        if index + 1 < machines:
+            write_zip(f"game{index + 1:05d}", [(f"game{index + 1:05d}.bin", f"game{index + 1:05d}/own")])
+        if family % 16 == 0:
+            os.makedirs(os.path.join(rom_path, name), exist_ok=True)
+            open(os.path.join(rom_path, name, f"{name}.chd"), "wb").close()
+
+def _peak_memory_mb():
+    """
+    Report the peak resident memory of this process.
+
+    Returns:
+        float: Peak RSS in MiB, or 0 where the resource module is missing.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_bench(machines=20000):
+    """
+    Scan the stub MAME against generated ROM sets and print the results.
+
+    Runs a full scan, an unchanged rescan and a rescan after one set is
+    replaced, and checks the statuses of a few known sets.
+
+    Args:
+        machines (int): Number of game machines the stub lists.
+
+    Returns:
+        bool: True if every check passed.
+    """
+    work_dir = tempfile.mkdtemp(prefix="mame_catalog_bench_")
+    try:
+        rom_path = os.path.join(work_dir, "roms")
+        write_fixture_roms(rom_path, machines)
+        command = [sys.executable, os.path.abspath(__file__), "stub-mame", "--machines", str(machines)]
+
+        with MameCatalog(os.path.join(work_dir, "mame.db")) as catalog:
+            for label in ("full scan", "unchanged rescan"):
+                stats = catalog.scan(command, [rom_path])
+                print(f"{label:18} listxml {stats['listxml_seconds']:6.2f}s  files {stats['files_seconds']:6.2f}s  "
+                      f"status {stats['status_seconds']:6.2f}s  {stats['changed_sets']:5} changed  "
+                      f"{stats['playable']} playable")
+
+            # Complete the incomplete set from family 3
+            name = "game00012"
+            os.remove(os.path.join(rom_path, f"{name}.zip"))
+            with zipfile.ZipFile(os.path.join(rom_path, f"{name}.zip"), "w") as archive:
+                archive.writestr("shared.bin", f"{name}/shared".encode())
+                archive.writestr("prog.bin", f"{name}/prog".encode())
+            stats = catalog.scan(command, [rom_path])
+            print(f"{'one set replaced':18} listxml {stats['listxml_seconds']:6.2f}s  files {stats['files_seconds']:6.2f}s  "
+                  f"status {stats['status_seconds']:6.2f}s  {stats['changed_sets']:5} changed  "
+                  f"{stats['playable']} playable")
+            print(f"Peak memory: {_peak_memory_mb():.0f} MiB")
+
+            expected = {
+                "game00000": 1,  # parent with BIOS and CHD
+                "game00001": 1,  # clone with its own zip
+                "game00002": 0,  # clone with no zip of its own
+                "game00004": 1,  # plain parent
+                "game00008": 0,  # family without any sets
+                "game00012": 1,  # replaced set
+                "game00060": 0,  # parent with prog.bin missing
+                "game00061": 0,  # clone of an incomplete parent
+                "fixbios": 0,
+                "fixdev": 0,
+                "fixmech": 0,
+                "fixprelim": 0,
+            }
+            rows = catalog.lookup(expected)
+            failures = [
+                f"{name}: playable={rows.get(name, {}).get('playable')} set_status={rows.get(name, {}).get('set_status')}"
+                for name, playable in expected.items()
+                if rows.get(name, {}).get("playable") != playable
+            ]
+            for failure in failures:
+                print(f"FAIL {failure}")
+            print("All checks passed" if not failures else f"{len(failures)} checks failed")
+            return not failures
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def main():
+    """
+    Scan and query the MAME catalog from the command line.
+
+    Command-line Arguments:
+        scan: Update the catalog from MAME and the ROM directories.
+        list: Print the playable sets.
+        search: Find sets by name or title.
+        stub-mame: Print generated -listxml output, like a MAME binary.
+        bench: Scan the stub MAME against generated ROM sets.
+
+    Returns:
+        None. Exits with status code 1 if a scan or bench check fails.
+    """
+    parser = argparse.ArgumentParser(description='Build and query the catalog of playable MAME sets.')
+    parser.add_argument('--catalog', default=None, help='Catalog database (default: from mame_config.toml)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    scan = subparsers.add_parser('scan', help='Update the catalog from MAME and the ROM directories')
+    scan.add_argument('--force', action='store_true', help='Run -listxml even if MAME has not changed')
+    scan.add_argument('--mame', default=None, help='MAME executable (default: from mame_config.toml)')
+    scan.add_argument('--rom-path', action='append', default=None, help='ROM directory, may be repeated')
+    scan.add_argument('--ini-path', default=None, help='MAME ini directory, used with --mame')
+    listing = subparsers.add_parser('list', help='Print the playable sets')
+    listing.add_argument('--clones', action='store_true', help='Include clones')
+    listing.add_argument('--json', action='store_true', help='Print JSON')
+    search = subparsers.add_parser('search', help='Find sets by name or title')
+    search.add_argument('text')
+    search.add_argument('--all', action='store_true', help='Include sets that are not playable')
+    stub = subparsers.add_parser('stub-mame', help='Print generated -listxml output')
+    stub.add_argument('--machines', type=int, default=2000)
+    bench = subparsers.add_parser('bench', help='Scan the stub MAME against generated ROM sets')
+    bench.add_argument('--machines', type=int, default=20000)
+    args, extra = parser.parse_known_args()
+
+    if args.command == 'stub-mame':
+        if "-listxml" in extra:
+            write_fixture_listxml(sys.stdout.buffer, args.machines)
+        return
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+
+    if args.command == 'bench':
+        if not run_bench(args.machines):
+            sys.exit(1)
+        return
+
+    if args.command == 'scan':
+        try:
+            stats = scan_catalog(args.force, args.mame, args.rom_path, args.catalog, args.ini_path)
+        except CatalogError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print(f"{stats['machines'] or 'Cached'} machines, {stats['changed_sets']} changed sets, "
+              f"{stats['playable']} playable")
+        return
+
+    with MameCatalog(args.catalog or load_catalog_config()["path"]) as catalog:
+        if args.command == 'list':
+            games = catalog.playable(args.clones)
+            if args.json:
+                print(json.dumps(games, indent=2))
+            else:
+                for game in games:
+                    print(f"{game['name']:16} {game['year'] or '????':5} {game['description']}")
+        elif args.command == 'search':
+            for game in catalog.search(args.text, playable_only=not args.all):
+                marker = "" if game["playable"] else "  (not playable)"
+                print(f"{game['name']:16} {game['year'] or '????':5} {game['description']}{marker}")
+
+if __name__ == "__main__":
+    main()
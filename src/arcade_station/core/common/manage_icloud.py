@@ -2,8 +2,9 @@
 Module for managing iCloud photo uploads and services.
 
 This module provides functionality to restart iCloud services on Windows and
-manage the upload directory. It runs as a background thread, periodically
-restarting iCloud services and cleaning the upload directory.
+manage the upload directory. It runs as a background thread that restarts the
+iCloud services when new files arrive and deletes files once their upload is
+confirmed, using the upload manager to track each file.
 """
 import os
 import sys
@@ -21,6 +22,8 @@ from arcade_station.core.common.core_functions import (
     log_message,
     load_toml_config
 )
+from arcade_station.core.common.game_mode import get_current_session, register_background_service
+from arcade_station.core.common.upload_manager import DEFAULT_UPLOAD_SETTINGS, UploadManager
 
 # Import Windows-specific modules for focus management
 if sys.platform == "win32":
@@ -98,65 +101,69 @@ def restart_process(process_name, process_path):
         log_message(f"Error restarting process {process_name}: {e}", "ICLOUD")
         return False
 
-def clean_directory(directory, delete_files=True):
+def restart_icloud_services(paths, apple_services_path, processes_to_restart):
     """
-    Clean a directory by deleting all files within it.
-    
-    This function recursively traverses the specified directory and removes
-    all files found within it. It's designed to clean up iCloud upload
-    directories after photos have been uploaded.
-    
-    The function:
-    1. Verifies the directory exists
-    2. Recursively walks through all subdirectories
-    3. Deletes each file encountered
-    4. Logs all operations and any failures
-    
+    Hand a batch of files to iCloud by restarting its services.
+
+    iCloud picks up everything in the upload folder when its services start,
+    so restarting them hands off every file in the batch. The foreground
+    window is saved beforehand and restored afterwards so a running
+    frontend keeps focus.
+
     Args:
-        directory (str): Path to the directory to clean
-        delete_files (bool): Whether to actually delete files (True) or just
-                            count them (False). Useful for dry runs.
-    
+        paths (list): Absolute paths of the files to upload.
+        apple_services_path (str): Directory containing the iCloud executables.
+        processes_to_restart (list): iCloud process names to restart.
+
     Returns:
-        int: Number of files deleted (or would have been deleted if delete_files
-             is False). Returns 0 if the directory doesn't exist or an error occurs.
+        list: The paths that were handed off, empty if the handoff was deferred.
     """
-    if not delete_files:
-        log_message(f"File deletion disabled, skipping cleanup of {directory}", "ICLOUD")
-        return 0
-        
-    try:
-        if not os.path.exists(directory):
-            log_message(f"Upload directory does not exist: {directory}", "ICLOUD")
-            return 0
-            
-        log_message(f"Cleaning directory: {directory}", "ICLOUD")
-        count = 0
-        
-        for root, _, files in os.walk(directory):
-            for file in files:
-                try:
-                    file_path = os.path.join(root, file)
-                    os.remove(file_path)
-                    log_message(f"Deleted file: {file_path}", "ICLOUD")
-                    count += 1
-                except Exception as e:
-                    log_message(f"Failed to delete {file}: {e}", "ICLOUD")
-        
-        log_message(f"Deleted {count} files from {directory}", "ICLOUD")
-        return count
-    except Exception as e:
-        log_message(f"Error cleaning directory {directory}: {e}", "ICLOUD")
-        return 0
+    # The launcher publishes the running game; no process scan is needed
+    session = get_current_session()
+    if session:
+        log_message(f"Game session running ({session['game_id']}, PID: {session['pid']}), deferring iCloud handoff", "ICLOUD")
+        return []
+
+    # Save the current foreground window before performing operations
+    foreground_hwnd = None
+    if has_focus_modules:
+        try:
+            foreground_hwnd = ctypes.windll.user32.GetForegroundWindow()
+        except Exception as e:
+            log_message(f"Failed to get foreground window: {e}", "ICLOUD")
+
+    log_message(f"Restarting iCloud services for {len(paths)} files", "ICLOUD")
+    for process in processes_to_restart:
+        restart_process(process, apple_services_path)
+        time.sleep(1)  # Give a short delay between process restarts
+
+    # Restore focus to the original window if possible
+    if has_focus_modules and foreground_hwnd:
+        try:
+            ctypes.windll.user32.SetForegroundWindow(foreground_hwnd)
+
+            # Force Windows to refresh focus by simulating Alt key press
+            ALT_KEY = 0x12
+            KEYEVENTF_KEYUP = 0x0002
+            ctypes.windll.user32.keybd_event(ALT_KEY, 0, 0, 0)  # Alt press
+            time.sleep(0.1)
+            ctypes.windll.user32.keybd_event(ALT_KEY, 0, KEYEVENTF_KEYUP, 0)  # Alt release
+
+            log_message("Restored original window focus", "ICLOUD")
+        except Exception as e:
+            log_message(f"Failed to restore window focus: {e}", "ICLOUD")
+
+    return list(paths)
 
 def icloud_manager():
     """
     Main function to manage iCloud processes and files.
     
-    This function runs in an infinite loop, periodically:
-    1. Restarting specified iCloud service processes
-    2. Waiting for a defined interval to allow uploads to complete
-    3. Cleaning the upload directory (optionally deleting files)
+    Watches the upload directory and, when new files have settled, restarts
+    the iCloud services so they upload them. Each file is tracked through
+    new, handed off and confirmed states in a persistent index, and only
+    confirmed files are deleted. Between events the manager sleeps on
+    directory change notifications rather than polling.
     
     Configuration is read from screenshot_config.toml [icloud_upload] section.
     """
@@ -178,13 +185,15 @@ def icloud_manager():
     upload_directory = icloud_config.get('upload_directory', 
                                  r"C:\Users\me\Pictures\Uploads")
     interval_seconds = int(icloud_config.get('interval_seconds', 360))
-    delete_after_upload = icloud_config.get('delete_after_upload', True)
     
     # Use a minimum safe interval
     minimum_interval = 300  # 5 minutes
     if interval_seconds < minimum_interval:
         log_message(f"Interval too short ({interval_seconds}s), setting to {minimum_interval}s", "ICLOUD")
         interval_seconds = minimum_interval
+
+    settings = {key: icloud_config[key] for key in DEFAULT_UPLOAD_SETTINGS if key in icloud_config}
+    settings["handoff_interval"] = interval_seconds
     
     # Log configuration
     log_message("iCloud manager configuration:", "ICLOUD")
@@ -192,95 +201,18 @@ def icloud_manager():
     log_message(f"  Processes to restart: {processes_to_restart}", "ICLOUD")
     log_message(f"  Upload directory: {upload_directory}", "ICLOUD")
     log_message(f"  Interval: {interval_seconds} seconds", "ICLOUD")
-    log_message(f"  Delete after upload: {delete_after_upload}", "ICLOUD")
+    log_message(f"  Delete after upload: {settings.get('delete_after_upload', DEFAULT_UPLOAD_SETTINGS['delete_after_upload'])}", "ICLOUD")
     
-    # For detecting game activity to avoid interruptions
-    last_cycle_time = time.time() - interval_seconds  # Allow immediate first run
-    
-    # Main loop
-    while True:
-        try:
-            # Check if enough time has passed since last cycle
-            current_time = time.time()
-            time_since_last = current_time - last_cycle_time
-            
-            if time_since_last < interval_seconds:
-                # Not time for a cycle yet, sleep for a bit and check again
-                time.sleep(min(10, interval_seconds - time_since_last))
-                continue
-            
-            # Check if any game processes are currently active (avoid interrupting gameplay)
-            game_active = False
-            try:
-                if sys.platform == "win32":
-                    # Check for common game processes
-                    import psutil
-                    game_processes = ["mame", "game.exe", "steam.exe", "retroarch.exe"]
-                    for proc in psutil.process_iter(['name']):
-                        proc_name = proc.info['name'].lower()
-                        if any(game in proc_name for game in game_processes):
-                            log_message(f"Game process detected ({proc_name}), deferring iCloud cycle", "ICLOUD")
-                            game_active = True
-                            break
-            except Exception as e:
-                log_message(f"Error checking for game processes: {e}", "ICLOUD")
-                
-            if game_active:
-                # Games are active, sleep and try again later
-                time.sleep(60)  # Check again in a minute
-                continue
-                
-            # Save the current foreground window before performing operations
-            foreground_hwnd = None
-            if has_focus_modules:
-                try:
-                    foreground_hwnd = ctypes.windll.user32.GetForegroundWindow()
-                    log_message("Saved current foreground window handle for later restoration", "ICLOUD")
-                except Exception as e:
-                    log_message(f"Failed to get foreground window: {e}", "ICLOUD")
-            
-            log_message("Starting processing cycle", "ICLOUD")
-            
-            # Update last cycle time
-            last_cycle_time = time.time()
-            
-            # Restart each process
-            for process in processes_to_restart:
-                restart_process(process, apple_services_path)
-                time.sleep(1)  # Give a short delay between process restarts
-            
-            # Wait for a shorter interval during this cycle since we already waited
-            wait_time = min(120, interval_seconds // 3)  # No more than 2 minutes
-            log_message(f"Waiting {wait_time} seconds before cleaning directory", "ICLOUD")
-            time.sleep(wait_time)
-            
-            # Clean the upload directory
-            deleted_count = clean_directory(upload_directory, delete_after_upload)
-            log_message(f"Deleted {deleted_count} files", "ICLOUD")
-            
-            # Restore focus to the original window if possible
-            if has_focus_modules and foreground_hwnd:
-                try:
-                    # Restore the original foreground window
-                    ctypes.windll.user32.SetForegroundWindow(foreground_hwnd)
-                    
-                    # Force Windows to refresh focus by simulating Alt key press
-                    ALT_KEY = 0x12
-                    KEYEVENTF_KEYUP = 0x0002
-                    ctypes.windll.user32.keybd_event(ALT_KEY, 0, 0, 0)  # Alt press
-                    time.sleep(0.1)
-                    ctypes.windll.user32.keybd_event(ALT_KEY, 0, KEYEVENTF_KEYUP, 0)  # Alt release
-                    
-                    log_message("Restored original window focus", "ICLOUD")
-                except Exception as e:
-                    log_message(f"Failed to restore window focus: {e}", "ICLOUD")
-            
-            log_message("Processing cycle completed", "ICLOUD")
-            
-        except Exception as e:
-            log_message(f"Error in processing cycle: {e}", "ICLOUD")
-            # Sleep for a bit before trying again
-            time.sleep(30)
+    # Pause (or otherwise throttle) the manager while a game is running
+    service = register_background_service("icloud")
+
+    manager = UploadManager(
+        upload_directory,
+        lambda paths: restart_icloud_services(paths, apple_services_path, processes_to_restart),
+        settings,
+        service=service
+    )
+    manager.run()
 
 def start_icloud_manager_thread():
     """
@@ -4,63 +4,77 @@ Monitor Screenshot Module for Arcade Station.
 This module provides functionality for capturing screenshots from specific monitors
 in the Arcade Station system. It supports:
 - Configurable monitor selection
+- Burst capture and all-monitor capture
 - Adjustable image quality settings
 - Optional sound effects on capture
 - Cross-platform compatibility (Windows, macOS, Linux)
+
+The key listener normally takes screenshots through the resident service in
+screenshot_service.py; this script is the one-shot fallback.
 """
 
 import sys
 import os
+import time
+import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QScreen
-import tomllib
-import subprocess
 
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
 from arcade_station.core.common.core_functions import log_message
-
-def load_config(config_path='config/screenshot_config.toml'):
-    """
-    Load screenshot configuration from a TOML file.
-    
-    Args:
-        config_path (str): Path to the configuration file. Defaults to
-                          'config/screenshot_config.toml'.
-    
-    Returns:
-        dict: Configuration dictionary containing screenshot settings.
-    """
-    with open(config_path, 'rb') as f:
-        return tomllib.load(f)
-
-def take_screenshot_from_config():
+from arcade_station.core.common.sound_engine import get_sound_engine
+from arcade_station.core.common.screenshot_service import (
+    grab_screens,
+    load_screenshot_config,
+    play_shutter,
+    resolve_image_format,
+    resolve_sound_file,
+    save_screenshot,
+    screenshot_stem
+)
+
+def take_screenshot_from_config(burst_count=1, burst_interval=None, all_monitors=False):
     """
     Take a screenshot using settings from the configuration file.
     
     Reads the screenshot configuration and calls take_screenshot() with
     the configured parameters. This is the main entry point for taking
-    screenshots with default settings.
+    screenshots with default settings when the key listener's resident
+    screenshot service is not running.
+    
+    Args:
+        burst_count (int): Number of frames to take.
+        burst_interval (float, optional): Seconds between burst frames.
+                                          Defaults to the configured interval.
+        all_monitors (bool): Capture every monitor for each frame.
     
     Returns:
-        None. The screenshot is saved to the configured location.
+        None. The screenshots are saved to the configured location.
     """
-    config = load_config()
-    monitor_index = config['screenshot']['monitor_index']
-    file_location = config['screenshot']['file_location']
-    file_name = config['screenshot']['file_name'] or datetime.now().strftime('%Y-%m-%d %H-%M-%S')
-    quality = config['screenshot']['quality']
-    take_screenshot(monitor_index, file_location, file_name, quality, config)
-
-def take_screenshot(monitor_index=0, file_location='.', file_name=None, quality='High', config=None):
+    settings = load_screenshot_config()
+    take_screenshot(
+        settings['monitor_index'],
+        settings['file_location'],
+        settings['file_name'],
+        settings['quality'],
+        {'screenshot': settings},
+        burst_count=burst_count,
+        burst_interval=settings['burst_interval'] if burst_interval is None else burst_interval,
+        all_monitors=all_monitors
+    )
+
+def take_screenshot(monitor_index=0, file_location='.', file_name=None, quality='High', config=None,
+                    burst_count=1, burst_interval=0.2, all_monitors=False):
     """
     Take a screenshot of a specific monitor and save it to a file.
     
     This function captures a screenshot from the specified monitor using PyQt5,
-    saves it as a JPEG file with the specified quality, and optionally plays
-    a sound effect upon completion.
+    saves it with the configured format (JPEG by default) and the specified
+    quality, and optionally plays a sound effect while the file is written. Frames are encoded in parallel
+    while later burst frames are still being captured.
     
     Args:
         monitor_index (int): Index of the monitor to capture (0-based).
@@ -68,74 +82,75 @@ def take_screenshot(monitor_index=0, file_location='.', file_name=None, quality=
         file_location (str): Directory where the screenshot will be saved.
                             Defaults to current directory.
         file_name (str): Name of the screenshot file (without extension).
-                        If None, uses current timestamp.
+                        If None, uses the current time with milliseconds.
         quality (str): Image quality setting ('High', 'Medium', 'Low').
-                      Affects JPEG compression level.
-        config (dict): Configuration dictionary containing sound file settings.
-                      If None, no sound will be played.
+                      Affects the compression level.
+        config (dict): Configuration dictionary containing sound file, format
+                      and target size settings. If None, no sound will be
+                      played and the screenshot is saved as JPEG.
+        burst_count (int): Number of frames to take. Defaults to 1.
+        burst_interval (float): Seconds between burst frames.
+        all_monitors (bool): Capture every monitor for each frame.
     
     Returns:
         None. The screenshot is saved to disk and a sound may be played.
     """
-    app = QApplication(sys.argv)
-    screens = app.screens()
-    if not screens:
-        log_message("No screens detected. Ensure you are running in a GUI-capable environment.", "SCREENSHOT")
-        return
-
-    if monitor_index >= len(screens):
-        log_message(f"Monitor index {monitor_index} is out of range. Defaulting to primary monitor.", "SCREENSHOT")
-        monitor_index = 0
-
-    screen = screens[monitor_index]
-    screenshot = screen.grabWindow(0)
-
-    # Set default file name if not provided
-    if not file_name:
-        file_name = datetime.now().strftime('%Y-%m-%d %H-%M-%S')
-
-    # Determine file path
-    file_path = os.path.join(file_location, f"{file_name}.png")
-
-    # Save the screenshot with adjustable quality
-    if quality == 'High':
-        screenshot.save(file_path.replace('.png', '.jpg'), 'JPEG', quality=95)
-    elif quality == 'Medium':
-        screenshot.save(file_path.replace('.png', '.jpg'), 'JPEG', quality=75)
-    elif quality == 'Low':
-        screenshot.save(file_path.replace('.png', '.jpg'), 'JPEG', quality=50)
-
-    log_message(f"Screenshot saved to {file_path}", "SCREENSHOT")
-
-    # Resolve the sound file path to an absolute path
-    sound_file = os.path.abspath(os.path.join(os.path.dirname(__file__), config['screenshot'].get('sound_file', '')))
-
-    # Debug: Print the resolved sound file path
-    log_message(f"Resolved sound file path: {sound_file}", "SCREENSHOT")
-
-    # Play sound if specified and exists
-    if sound_file and os.path.exists(sound_file) and config['screenshot'].get('sound_file', '').strip():
-        try:
-            if sys.platform.startswith('win'):
-                # Use hidden PowerShell window to play sound
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = 0  # 0 means SW_HIDE
-                subprocess.run(
-                    ['powershell', '-WindowStyle', 'Hidden', '-c', f'(New-Object Media.SoundPlayer "{sound_file}").PlaySync();'],
-                    startupinfo=startupinfo,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-            elif sys.platform.startswith('darwin'):
-                subprocess.run(['afplay', sound_file])
-            elif sys.platform.startswith('linux'):
-                subprocess.run(['mpg123', sound_file])
-        except Exception as e:
-            log_message(f"Error playing sound: {e}", "SCREENSHOT")
-    else:
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    screenshot_config = (config or {}).get('screenshot', {})
+    settings = {
+        'quality': quality,
+        'format': resolve_image_format(screenshot_config.get('format', 'jpeg')),
+        'target_kb': screenshot_config.get('target_kb', 0),
+    }
+
+    # Play the shutter sound while the images are captured and encoded
+    sound_file = resolve_sound_file(screenshot_config.get('sound_file', ''))
+    if not sound_file:
         log_message("No sound file specified or file not found.", "SCREENSHOT")
+    play_shutter(sound_file)
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as executor:
+        next_frame = time.monotonic()
+        for frame_number in range(max(1, burst_count)):
+            time.sleep(max(0.0, next_frame - time.monotonic()))
+            next_frame += burst_interval
+
+            captured_at = datetime.now()
+            frames = grab_screens(monitor_index, all_monitors)
+            if not frames:
+                break
+            for index, image in frames:
+                suffix = f"-monitor{index + 1}" if all_monitors else ""
+                if burst_count > 1:
+                    suffix += f"-{frame_number + 1:02d}"
+                executor.submit(save_screenshot, image, file_location, screenshot_stem(file_name, captured_at, suffix), settings)
+
+    # Let the sound finish before the process exits
+    if sound_file:
+        get_sound_engine().wait(10.0)
 
     app.quit()
 
+def main():
+    """
+    Take a screenshot with the configured settings.
+
+    Command-line Arguments:
+        --burst: Number of frames to take.
+        --interval: Seconds between burst frames.
+        --all-monitors: Capture every monitor for each frame.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description='Take a screenshot of the configured monitor.')
+    parser.add_argument('--burst', type=int, default=1, help='Number of frames to take')
+    parser.add_argument('--interval', type=float, default=None, help='Seconds between burst frames')
+    parser.add_argument('--all-monitors', action='store_true', help='Capture every monitor for each frame')
+    args, _ = parser.parse_known_args()
+
+    take_screenshot_from_config(args.burst, args.interval, args.all_monitors)
+
 if __name__ == "__main__":
-    take_screenshot_from_config() 
\ No newline at end of file
+    main()
@@ -0,0 +1,512 @@
+"""
+Prewarm Module for Arcade Station.
+
+This module reads a game's files into the operating system's page cache
+before the game is launched, so a cold launch is not dominated by disk reads.
+The executable, MAME ROM sets and CHDs, and any extra data directories
+configured for the game are read in a single bounded background thread.
+
+Where available, posix_fadvise(WILLNEED) is used so the kernel performs the
+readahead without copying data into Python; elsewhere the files are read in
+chunks into a reusable buffer.
+
+Only one game is prewarmed at a time. Selecting a game writes a selection
+token to the runtime directory, and any prewarm started for a previous
+selection (in this or another process) stops as soon as it sees the token
+change. Reads are limited to an I/O budget (total bytes and bytes per second)
+with a separate, lower rate while a game is running so prewarming never
+competes with it.
+
+Settings are read from the [prewarm] section of default_config.toml, and extra
+paths from an optional ``prewarm`` table under each game in
+installed_games.toml, for example:
+
+    [games.itgmania.prewarm]
+    paths = [
+      "C:/Games/ITGmania/Songs",
+    ]
+
+Usage:
+    python prewarm.py <game_name>
+    python prewarm.py --cancel
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import (
+    get_runtime_directory,
+    load_game_config,
+    load_mame_config,
+    load_toml_config,
+    log_message
+)
+from arcade_station.core.common.game_mode import is_game_active
+from arcade_station.core.common.launch_mame import resolve_mame_executable
+
+PREWARM_SELECTION_FILE = "prewarm_selection.json"
+
+# Defaults used when default_config.toml does not configure prewarming
+DEFAULT_PREWARM_SETTINGS = {
+    "enabled": True,
+    "max_bytes": 2 * 1024 * 1024 * 1024,
+    "bytes_per_second": 256 * 1024 * 1024,
+    "game_mode_bytes_per_second": 0,
+    "chunk_size": 1024 * 1024,
+    "max_files": 20000,
+}
+
+MAME_ROM_EXTENSIONS = (".zip", ".7z")
+
+def load_prewarm_config():
+    """
+    Load the [prewarm] settings from default_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_PREWARM_SETTINGS present.
+    """
+    settings = dict(DEFAULT_PREWARM_SETTINGS)
+    try:
+        config = load_toml_config('default_config.toml').get('prewarm', {})
+    except Exception as e:
+        log_message(f"Failed to load prewarm configuration: {e}", "PREWARM")
+        config = {}
+
+    for key, value in config.items():
+        if key in settings:
+            settings[key] = value
+
+    return settings
+
+def get_mame_rom_paths(rom):
+    """
+    Find the ROM set and CHD files for a MAME game.
+
+    The rompath is read from mame.ini in the configured ini path. If it is
+    not set, the roms folder next to the MAME executable is used.
+
+    Args:
+        rom (str): The ROM set name.
+
+    Returns:
+        list: Existing ROM archives and CHD directories for the game.
+    """
+    try:
+        mame_settings = load_mame_config()['mame']
+    except Exception as e:
+        log_message(f"Failed to load MAME configuration: {e}", "PREWARM")
+        return []
+
+    executable_path = mame_settings.get('executable_path', '')
+    executable = mame_settings.get('executable', '')
+    if executable and executable_path.endswith(executable):
+        executable_path = os.path.dirname(executable_path)
+
+    rom_dirs = []
+    ini_file = os.path.join(mame_settings.get('ini_path', '') or executable_path, 'mame.ini')
+    try:
+        with open(ini_file, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                parts = line.strip().split(None, 1)
+                if len(parts) == 2 and parts[0] == 'rompath':
+                    rom_dirs = [entry.strip().strip('"') for entry in parts[1].split(';') if entry.strip()]
+                    break
+    except OSError:
+        pass
+
+    if not rom_dirs:
+        rom_dirs = ['roms']
+
+    paths = []
+    for rom_dir in rom_dirs:
+        # Relative rompaths are resolved against MAME's working directory
+        if not os.path.isabs(rom_dir):
+            rom_dir = os.path.join(executable_path, rom_dir)
+        candidates = [os.path.join(rom_dir, rom + ext) for ext in MAME_ROM_EXTENSIONS]
+        candidates.append(os.path.join(rom_dir, rom))
+        paths.extend(path for path in candidates if os.path.exists(path))
+
+    return paths
+
+def get_prewarm_paths(game_config):
+    """
+    Get the files and directories to prewarm for a game.
+
+    Args:
+        game_config (dict or str): The game's entry from installed_games.toml.
+
+    Returns:
+        list: Paths to prewarm, most important first.
+    """
+    paths = []
+
+    if isinstance(game_config, dict) and 'rom' in game_config:
+        try:
+            mame_settings = load_mame_config()['mame']
+            paths.append(resolve_mame_executable(mame_settings))
+        except Exception as e:
+            log_message(f"Failed to resolve MAME executable: {e}", "PREWARM")
+        paths.extend(get_mame_rom_paths(game_config['rom']))
+    else:
+        game_path = game_config.get('path', '') if isinstance(game_config, dict) else game_config
+        if game_path:
+            paths.append(game_path)
+
+    if isinstance(game_config, dict):
+        paths.extend(game_config.get('prewarm', {}).get('paths', []))
+
+    return [path for path in paths if path and os.path.exists(path)]
+
+def _iter_files(paths, max_files):
+    """
+    Yield the files under a list of paths, up to a maximum count.
+
+    Args:
+        paths (list): Files and directories to walk.
+        max_files (int): Maximum number of files to yield.
+
+    Yields:
+        str: Path of each file.
+    """
+    count = 0
+    for path in paths:
+        if os.path.isfile(path):
+            walker = [(os.path.dirname(path), [], [os.path.basename(path)])]
+        else:
+            walker = os.walk(path)
+
+        for root, _, files in walker:
+            for name in files:
+                if count >= max_files:
+                    return
+                count += 1
+                yield os.path.join(root, name)
+
+def get_selection_path():
+    """
+    Get the path of the shared prewarm selection file.
+
+    Returns:
+        str: Absolute path to the selection file.
+    """
+    return os.path.join(get_runtime_directory(), PREWARM_SELECTION_FILE)
+
+def read_selection():
+    """
+    Read the current prewarm selection.
+
+    Returns:
+        dict: The selection with "game" and "token" keys, or an empty
+              selection if none has been made.
+    """
+    try:
+        with open(get_selection_path(), 'r', encoding='utf-8') as f:
+            selection = json.load(f)
+        if isinstance(selection, dict):
+            return selection
+    except (OSError, ValueError):
+        pass
+    return {"game": None, "token": None}
+
+def select_game(game_name):
+    """
+    Record a new selection, cancelling any prewarm for the previous one.
+
+    Args:
+        game_name (str): The selected game, or None to clear the selection.
+
+    Returns:
+        str: The token identifying this selection.
+    """
+    token = uuid.uuid4().hex
+    path = get_selection_path()
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"game": game_name, "token": token}, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        log_message(f"Failed to write prewarm selection: {e}", "PREWARM")
+    return token
+
+class Prewarmer(threading.Thread):
+    """
+    Background thread that reads a game's files into the page cache.
+
+    Attributes:
+        game_name (str): The game being prewarmed.
+        bytes_warmed (int): Bytes prewarmed so far.
+        files_warmed (int): Files prewarmed so far.
+        outcome (str): "running", "complete", "budget", "cancelled" or
+                       "superseded" once the thread finishes.
+    """
+
+    # Seconds between checks of the selection token and game mode state
+    CHECK_INTERVAL = 0.25
+
+    def __init__(self, game_name, paths, settings, token):
+        """
+        Create a prewarm thread for a game.
+
+        Args:
+            game_name (str): The game being prewarmed.
+            paths (list): Files and directories to prewarm.
+            settings (dict): Settings from load_prewarm_config().
+            token (str): The selection token this prewarm belongs to.
+        """
+        super().__init__(name=f"prewarm-{game_name}", daemon=True)
+        self.game_name = game_name
+        self.paths = paths
+        self.settings = settings
+        self.token = token
+        self.bytes_warmed = 0
+        self.files_warmed = 0
+        self.outcome = "running"
+        self._cancelled = threading.Event()
+        self._buffer = None
+        self._last_check = 0.0
+        self._selection_mtime = None
+        self._rate = settings["bytes_per_second"]
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+
+    def cancel(self):
+        """
+        Stop prewarming as soon as the current chunk finishes.
+
+        Returns:
+            None
+        """
+        self._cancelled.set()
+
+    def _superseded(self):
+        """
+        Check whether a newer selection has replaced this one.
+
+        Returns:
+            bool: True if the selection token no longer matches.
+        """
+        try:
+            mtime = os.stat(get_selection_path()).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._selection_mtime:
+            return False
+        self._selection_mtime = mtime
+        return read_selection().get("token") != self.token
+
+    def _refresh(self):
+        """
+        Periodically re-check cancellation, the selection and game mode.
+
+        Returns:
+            bool: False if prewarming should stop.
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.CHECK_INTERVAL:
+            return not self._cancelled.is_set()
+        self._last_check = now
+
+        if self._superseded():
+            self.outcome = "superseded"
+            return False
+
+        rate = self.settings["game_mode_bytes_per_second"] if is_game_active() else self.settings["bytes_per_second"]
+        if rate != self._rate:
+            self._rate = rate
+            self._window_start = now
+            self._window_bytes = 0
+
+        return not self._cancelled.is_set()
+
+    def _throttle(self, nbytes):
+        """
+        Wait as needed to keep reads within the current rate budget.
+
+        A rate of 0 pauses prewarming until the rate changes or the prewarm
+        is cancelled.
+
+        Args:
+            nbytes (int): Bytes about to be read.
+
+        Returns:
+            bool: False if prewarming should stop.
+        """
+        while self._refresh():
+            if self._rate and self._rate > 0:
+                elapsed = time.monotonic() - self._window_start
+                wait = (self._window_bytes + nbytes) / self._rate - elapsed
+                if wait <= 0:
+                    self._window_bytes += nbytes
+                    return True
+                self._cancelled.wait(min(wait, self.CHECK_INTERVAL))
+            else:
+                self._cancelled.wait(self.CHECK_INTERVAL)
+        return False
+
+    def _warm_file(self, path, remaining):
+        """
+        Read one file into the page cache within the remaining byte budget.
+
+        Args:
+            path (str): File to prewarm.
+            remaining (int): Bytes left in the total budget.
+
+        Returns:
+            bool: False if prewarming should stop.
+        """
+        chunk_size = self.settings["chunk_size"]
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        except OSError:
+            return True
+
+        try:
+            size = os.fstat(fd).st_size
+            offset = 0
+            while offset < size:
+                length = min(chunk_size, size - offset, remaining - self.bytes_warmed)
+                if length <= 0:
+                    self.outcome = "budget"
+                    return False
+                if not self._throttle(length):
+                    return False
+
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(fd, offset, length, os.POSIX_FADV_WILLNEED)
+                else:
+                    if self._buffer is None:
+                        self._buffer = bytearray(chunk_size)
+                    os.lseek(fd, offset, os.SEEK_SET)
+                    if not self._read_into(fd, memoryview(self._buffer)[:length]):
+                        break
+
+                offset += length
+                self.bytes_warmed += length
+        except OSError as e:
+            log_message(f"Failed to prewarm {path}: {e}", "PREWARM")
+        finally:
+            os.close(fd)
+
+        self.files_warmed += 1
+        return True
+
+    @staticmethod
+    def _read_into(fd, view):
+        """
+        Read from a file descriptor into a reusable buffer.
+
+        Args:
+            fd (int): Open file descriptor.
+            view (memoryview): Buffer to fill.
+
+        Returns:
+            int: Number of bytes read.
+        """
+        data = os.read(fd, len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def run(self):
+        """
+        Prewarm every file for the game until done, cancelled or over budget.
+
+        Returns:
+            None
+        """
+        start = time.perf_counter()
+        max_bytes = self.settings["max_bytes"]
+
+        for path in _iter_files(self.paths, self.settings["max_files"]):
+            if not self._warm_file(path, max_bytes):
+                break
+        else:
+            self.outcome = "complete"
+
+        if self.outcome == "running":
+            self.outcome = "cancelled"
+
+        log_message(
+            f"Prewarm for [{self.game_name}] {self.outcome}: {self.files_warmed} files, "
+            f"{self.bytes_warmed / (1024 * 1024):.1f} MB in {time.perf_counter() - start:.2f}s",
+            "PREWARM"
+        )
+
+def start_prewarm(game_name, game_config=None):
+    """
+    Select a game and start prewarming its files in the background.
+
+    Any prewarm running for a previous selection stops on its own once it
+    sees the new selection token.
+
+    Args:
+        game_name (str): The game to prewarm, as named in installed_games.toml.
+        game_config (dict, optional): The game's configuration entry. Loaded
+                                      from disk if not provided.
+
+    Returns:
+        Prewarmer: The running prewarm thread, or None if prewarming is
+                   disabled or there is nothing to prewarm.
+    """
+    settings = load_prewarm_config()
+    token = select_game(game_name)
+
+    if not settings["enabled"]:
+        return None
+
+    if game_config is None:
+        game_config = load_game_config().get('games', {}).get(game_name)
+        if game_config is None:
+            log_message(f"Game '{game_name}' not found in configuration, nothing to prewarm", "PREWARM")
+            return None
+
+    if isinstance(game_config, dict) and not game_config.get('prewarm', {}).get('enabled', True):
+        return None
+
+    paths = get_prewarm_paths(game_config)
+    if not paths:
+        return None
+
+    log_message(f"Prewarming [{game_name}]: {paths}", "PREWARM")
+    prewarmer = Prewarmer(game_name, paths, settings, token)
+    prewarmer.start()
+    return prewarmer
+
+def main():
+    """
+    Prewarm a game from the command line, or cancel the current prewarm.
+
+    Intended to be called when a game is highlighted in the frontend. The
+    process stays alive until prewarming finishes or the selection changes.
+
+    Command-line Arguments:
+        game_name: The game to prewarm.
+        --cancel: Clear the selection so any running prewarm stops.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Prewarm a game's files into the page cache.")
+    parser.add_argument('game_name', nargs='?', help='Game to prewarm, as named in installed_games.toml')
+    parser.add_argument('--cancel', action='store_true', help='Stop any running prewarm')
+    args = parser.parse_args()
+
+    if args.cancel or not args.game_name:
+        select_game(None)
+        return
+
+    prewarmer = start_prewarm(args.game_name)
+    if prewarmer:
+        prewarmer.join()
+        print(f"{prewarmer.outcome}: {prewarmer.files_warmed} files, {prewarmer.bytes_warmed} bytes")
+
+if __name__ == "__main__":
+    main()
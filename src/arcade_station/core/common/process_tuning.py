@@ -0,0 +1,383 @@
+"""
+Process Tuning Module for Arcade Station.
+
+This module applies per-game performance profiles to game processes right
+after they are spawned. A profile can set the scheduling priority, CPU
+affinity, I/O priority and optional timer/scheduler hints, and each setting
+is translated to whatever the current operating system supports.
+
+Profiles are read from an optional ``performance`` table under each game in
+installed_games.toml, for example:
+
+    [games.itgmania.performance]
+    priority = "high"
+    cpu_affinity = [2, 3]
+    io_priority = "high"
+    disable_power_throttling = true
+
+Settings that the platform does not support, or that the station lacks the
+privileges to apply, are logged and skipped without failing the launch.
+"""
+
+import os
+import sys
+import ctypes
+import psutil
+
+from arcade_station.core.common.core_functions import log_message
+
+# Profile applied when a game does not define its own
+DEFAULT_PERFORMANCE_PROFILE = {
+    "priority": "high",
+}
+
+# Unix nice values equivalent to the Windows priority classes
+UNIX_NICE_VALUES = {
+    "low": 19,
+    "below_normal": 10,
+    "normal": 0,
+    "above_normal": -5,
+    "high": -10,
+    "realtime": -20,
+}
+
+# Windows priority class names as exposed by psutil
+WINDOWS_PRIORITY_CLASSES = {
+    "low": "IDLE_PRIORITY_CLASS",
+    "below_normal": "BELOW_NORMAL_PRIORITY_CLASS",
+    "normal": "NORMAL_PRIORITY_CLASS",
+    "above_normal": "ABOVE_NORMAL_PRIORITY_CLASS",
+    "high": "HIGH_PRIORITY_CLASS",
+    "realtime": "REALTIME_PRIORITY_CLASS",
+}
+
+# Linux scheduling policies by profile name
+LINUX_SCHEDULERS = {
+    "other": "SCHED_OTHER",
+    "batch": "SCHED_BATCH",
+    "idle": "SCHED_IDLE",
+    "fifo": "SCHED_FIFO",
+    "rr": "SCHED_RR",
+}
+
+def get_performance_profile(game_config):
+    """
+    Build the performance profile for a game.
+
+    Args:
+        game_config (dict): The game's entry from installed_games.toml.
+
+    Returns:
+        dict: The default profile updated with the game's ``performance`` table.
+    """
+    profile = dict(DEFAULT_PERFORMANCE_PROFILE)
+    if isinstance(game_config, dict):
+        profile.update(game_config.get('performance', {}))
+    return profile
+
+def parse_cpu_affinity(value):
+    """
+    Convert an affinity setting into a list of CPU indexes.
+
+    Accepts a list of CPU indexes, an integer bitmask, or a bitmask string
+    such as "0x0C" or "0b1100".
+
+    Args:
+        value (list | int | str): The configured affinity.
+
+    Returns:
+        list: Sorted CPU indexes, or an empty list if the value is empty.
+
+    Raises:
+        ValueError: If the value cannot be interpreted as an affinity.
+    """
+    if isinstance(value, (list, tuple)):
+        return sorted({int(cpu) for cpu in value})
+
+    if isinstance(value, str):
+        value = int(value, 0)
+
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return [cpu for cpu in range(value.bit_length()) if value >> cpu & 1]
+
+    raise ValueError(f"Invalid CPU affinity: {value!r}")
+
+def set_process_priority(pid, priority="high"):
+    """
+    Set the scheduling priority of a process on any supported platform.
+
+    On Windows the named priority classes are used. On Linux and macOS the
+    name is mapped to a nice value; an integer is used as a nice value as-is.
+
+    Args:
+        pid (int): Process ID of the target process.
+        priority (str | int): "low", "below_normal", "normal", "above_normal",
+                              "high", "realtime", or a Unix nice value.
+
+    Returns:
+        bool: True if priority was set successfully, False otherwise.
+    """
+    try:
+        if not pid:
+            return False
+
+        process = psutil.Process(pid)
+
+        if sys.platform == "win32":
+            class_name = WINDOWS_PRIORITY_CLASSES.get(priority)
+            if not class_name:
+                log_message(f"Invalid priority level for Windows: {priority}", "GAME")
+                return False
+            process.nice(getattr(psutil, class_name))
+        else:
+            nice_value = priority if isinstance(priority, int) else UNIX_NICE_VALUES.get(priority)
+            if nice_value is None:
+                log_message(f"Invalid priority level: {priority}", "GAME")
+                return False
+            process.nice(nice_value)
+
+        log_message(f"Set process {pid} priority to {priority}", "GAME")
+        return True
+    except Exception as e:
+        log_message(f"Failed to set process priority: {e}", "GAME")
+        return False
+
+def set_cpu_affinity(pid, affinity):
+    """
+    Pin a process to a set of CPUs.
+
+    Args:
+        pid (int): Process ID of the target process.
+        affinity (list | int | str): CPU indexes or a bitmask (see parse_cpu_affinity).
+
+    Returns:
+        bool: True if the affinity was applied, False otherwise.
+    """
+    try:
+        cpus = parse_cpu_affinity(affinity)
+        if not cpus:
+            return False
+
+        process = psutil.Process(pid)
+        # cpu_affinity() is not available on macOS
+        if not hasattr(process, "cpu_affinity"):
+            log_message("CPU affinity is not supported on this platform", "GAME")
+            return False
+
+        available = set(range(psutil.cpu_count() or 1))
+        cpus = [cpu for cpu in cpus if cpu in available]
+        if not cpus:
+            log_message(f"None of the configured CPUs exist: {affinity}", "GAME")
+            return False
+
+        process.cpu_affinity(cpus)
+        log_message(f"Set process {pid} CPU affinity to {cpus}", "GAME")
+        return True
+    except Exception as e:
+        log_message(f"Failed to set CPU affinity: {e}", "GAME")
+        return False
+
+def set_io_priority(pid, io_priority):
+    """
+    Set the I/O priority of a process.
+
+    Args:
+        pid (int): Process ID of the target process.
+        io_priority (str): "idle", "low", "normal" or "high". On Linux "realtime"
+                           is also accepted and maps to the real-time I/O class.
+
+    Returns:
+        bool: True if the I/O priority was applied, False otherwise.
+    """
+    try:
+        process = psutil.Process(pid)
+        # ionice() is not available on macOS
+        if not hasattr(process, "ionice"):
+            log_message("I/O priority is not supported on this platform", "GAME")
+            return False
+
+        if sys.platform == "win32":
+            windows_levels = {
+                "idle": psutil.IOPRIO_VERYLOW,
+                "low": psutil.IOPRIO_LOW,
+                "normal": psutil.IOPRIO_NORMAL,
+                "high": psutil.IOPRIO_HIGH,
+            }
+            if io_priority not in windows_levels:
+                log_message(f"Invalid I/O priority for Windows: {io_priority}", "GAME")
+                return False
+            process.ionice(windows_levels[io_priority])
+        else:
+            linux_levels = {
+                "idle": (psutil.IOPRIO_CLASS_IDLE, None),
+                "low": (psutil.IOPRIO_CLASS_BE, 7),
+                "normal": (psutil.IOPRIO_CLASS_BE, 4),
+                "high": (psutil.IOPRIO_CLASS_BE, 0),
+                "realtime": (psutil.IOPRIO_CLASS_RT, 4),
+            }
+            if io_priority not in linux_levels:
+                log_message(f"Invalid I/O priority: {io_priority}", "GAME")
+                return False
+            io_class, value = linux_levels[io_priority]
+            process.ionice(io_class, value)
+
+        log_message(f"Set process {pid} I/O priority to {io_priority}", "GAME")
+        return True
+    except Exception as e:
+        log_message(f"Failed to set I/O priority: {e}", "GAME")
+        return False
+
+def set_scheduler_policy(pid, scheduler, scheduler_priority=0):
+    """
+    Set the Linux scheduling policy of a process.
+
+    Args:
+        pid (int): Process ID of the target process.
+        scheduler (str): "other", "batch", "idle", "fifo" or "rr".
+        scheduler_priority (int): Static priority for "fifo" and "rr" (1-99).
+
+    Returns:
+        bool: True if the policy was applied, False otherwise.
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        log_message("Scheduler policies are not supported on this platform", "GAME")
+        return False
+
+    try:
+        policy_name = LINUX_SCHEDULERS.get(scheduler)
+        if not policy_name or not hasattr(os, policy_name):
+            log_message(f"Invalid scheduler policy: {scheduler}", "GAME")
+            return False
+
+        if scheduler in ("fifo", "rr"):
+            priority = max(1, min(99, int(scheduler_priority) or 1))
+        else:
+            priority = 0
+
+        os.sched_setscheduler(pid, getattr(os, policy_name), os.sched_param(priority))
+        log_message(f"Set process {pid} scheduler to {scheduler} ({priority})", "GAME")
+        return True
+    except Exception as e:
+        log_message(f"Failed to set scheduler policy: {e}", "GAME")
+        return False
+
+def set_timer_slack(pid, timer_slack_ns):
+    """
+    Set the Linux timer slack of a process.
+
+    A small timer slack makes sleeps and timers in the game wake closer to
+    their deadline, at the cost of more wakeups.
+
+    Args:
+        pid (int): Process ID of the target process.
+        timer_slack_ns (int): Timer slack in nanoseconds (0 restores the default).
+
+    Returns:
+        bool: True if the timer slack was applied, False otherwise.
+    """
+    slack_path = f"/proc/{pid}/timerslack_ns"
+    if not os.path.exists(slack_path):
+        log_message("Timer slack is not supported on this platform", "GAME")
+        return False
+
+    try:
+        with open(slack_path, "w") as f:
+            f.write(str(int(timer_slack_ns)))
+        log_message(f"Set process {pid} timer slack to {timer_slack_ns}ns", "GAME")
+        return True
+    except Exception as e:
+        log_message(f"Failed to set timer slack: {e}", "GAME")
+        return False
+
+def disable_power_throttling(pid):
+    """
+    Opt a Windows process out of power throttling (EcoQoS).
+
+    Disables execution speed throttling and ensures the process's own timer
+    resolution requests are honoured even when its window is not visible.
+
+    Args:
+        pid (int): Process ID of the target process.
+
+    Returns:
+        bool: True if throttling was disabled, False otherwise.
+    """
+    if sys.platform != "win32":
+        log_message("Power throttling control is only supported on Windows", "GAME")
+        return False
+
+    class PROCESS_POWER_THROTTLING_STATE(ctypes.Structure):
+        _fields_ = [
+            ("Version", ctypes.c_ulong),
+            ("ControlMask", ctypes.c_ulong),
+            ("StateMask", ctypes.c_ulong),
+        ]
+
+    PROCESS_SET_INFORMATION = 0x0200
+    PROCESS_POWER_THROTTLING = 4  # ProcessPowerThrottling information class
+    EXECUTION_SPEED = 0x1
+    IGNORE_TIMER_RESOLUTION = 0x4
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_SET_INFORMATION, False, pid)
+    if not handle:
+        log_message(f"Failed to open process {pid} to disable power throttling", "GAME")
+        return False
+
+    try:
+        # A control bit with a cleared state bit turns that throttling off
+        state = PROCESS_POWER_THROTTLING_STATE(1, EXECUTION_SPEED | IGNORE_TIMER_RESOLUTION, 0)
+        ok = kernel32.SetProcessInformation(
+            handle, PROCESS_POWER_THROTTLING, ctypes.byref(state), ctypes.sizeof(state)
+        )
+        if ok:
+            log_message(f"Disabled power throttling for process {pid}", "GAME")
+        else:
+            log_message(f"Failed to disable power throttling for process {pid}", "GAME")
+        return bool(ok)
+    finally:
+        kernel32.CloseHandle(handle)
+
+def apply_performance_profile(pid, profile):
+    """
+    Apply every setting in a performance profile to a process.
+
+    Each setting is applied independently, so an unsupported or denied
+    setting does not prevent the others from taking effect.
+
+    Args:
+        pid (int): Process ID of the target process.
+        profile (dict): Profile from get_performance_profile(). Recognised keys
+                        are priority, cpu_affinity, io_priority, scheduler,
+                        scheduler_priority, timer_slack_ns and
+                        disable_power_throttling.
+
+    Returns:
+        dict: Mapping of each applied setting to True/False for success.
+    """
+    results = {}
+    if not pid:
+        return results
+
+    if "priority" in profile:
+        results["priority"] = set_process_priority(pid, profile["priority"])
+
+    if profile.get("cpu_affinity") not in (None, [], ""):
+        results["cpu_affinity"] = set_cpu_affinity(pid, profile["cpu_affinity"])
+
+    if profile.get("io_priority"):
+        results["io_priority"] = set_io_priority(pid, profile["io_priority"])
+
+    if profile.get("scheduler"):
+        results["scheduler"] = set_scheduler_policy(
+            pid, profile["scheduler"], profile.get("scheduler_priority", 0)
+        )
+
+    if "timer_slack_ns" in profile:
+        results["timer_slack_ns"] = set_timer_slack(pid, profile["timer_slack_ns"])
+
+    if profile.get("disable_power_throttling"):
+        results["disable_power_throttling"] = disable_power_throttling(pid)
+
+    log_message(f"Applied performance profile to process {pid}: {results}", "GAME")
+    return results
@@ -0,0 +1,485 @@
+"""
+Replay Buffer Module for Arcade Station.
+
+This module keeps the last few seconds of one monitor in memory so a player
+can save a clip after a great run. It runs inside the key listener next to
+the resident screenshot service.
+
+A QTimer on the GUI thread grabs the chosen monitor at a low frame rate.
+Each grab is handed to a single encoder thread, which downscales it and
+encodes it as JPEG into the next slot of a preallocated ring buffer. The
+ring has a fixed memory budget split into equal slots, one per frame, so
+memory never grows while the station runs; a frame that does not fit its
+slot is re-encoded at a lower quality or dropped. If the encoder falls
+behind, new grabs are skipped instead of queueing up.
+
+The save_replay built-in writes the buffer to the screenshot directory as
+an animated GIF or WebP (when Pillow is installed) or as a numbered JPEG
+sequence.
+
+Settings are read from the [replay] section of screenshot_config.toml. The
+benchmark measures the capture cost on this machine:
+
+Usage:
+    python replay_buffer.py --benchmark 30
+"""
+
+import io
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+from datetime import datetime
+from collections import deque
+
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtWidgets import QApplication
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import load_toml_config, log_message
+from arcade_station.core.common.screenshot_service import (
+    display_available,
+    encode_image,
+    load_screenshot_config,
+    screenshot_stem
+)
+
+# Defaults used when screenshot_config.toml does not configure the replay buffer
+DEFAULT_REPLAY_SETTINGS = {
+    "enabled": False,
+    "monitor_index": 0,
+    "fps": 5,
+    "seconds": 10,
+    "max_width": 640,
+    "quality": 60,
+    "memory_budget_mb": 24,
+    "output": "gif",
+}
+
+VALID_OUTPUTS = ("gif", "webp", "sequence")
+
+# Quality used when a frame does not fit its slot at the configured quality
+FALLBACK_QUALITY = 30
+
+# Number of recent grab and encode timings kept for the benchmark
+TIMING_WINDOW = 4096
+
+def load_replay_config():
+    """
+    Load the [replay] settings from screenshot_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_REPLAY_SETTINGS present.
+    """
+    settings = dict(DEFAULT_REPLAY_SETTINGS)
+    try:
+        config = load_toml_config('screenshot_config.toml').get('replay', {})
+    except Exception as e:
+        log_message(f"Failed to load replay configuration: {e}", "REPLAY")
+        config = {}
+
+    for key, value in config.items():
+        if key in settings:
+            settings[key] = value
+
+    if settings["output"] not in VALID_OUTPUTS:
+        log_message(f"Unknown replay output '{settings['output']}', using 'sequence'", "REPLAY")
+        settings["output"] = "sequence"
+
+    return settings
+
+class FrameRing:
+    """
+    Fixed-size circular buffer of encoded frames.
+
+    The whole budget is allocated once and split into equal slots. write()
+    overwrites the oldest slot; snapshot() copies the frames out in order.
+    """
+
+    def __init__(self, capacity, budget_bytes):
+        """
+        Allocate the ring.
+
+        Args:
+            capacity (int): Number of frame slots.
+            budget_bytes (int): Total bytes for all slots.
+        """
+        self.capacity = max(1, capacity)
+        self.slot_size = budget_bytes // self.capacity
+        self._data = bytearray(self.slot_size * self.capacity)
+        self._lengths = [0] * self.capacity
+        self._times = [0.0] * self.capacity
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def write(self, encoded, timestamp):
+        """
+        Store an encoded frame in the next slot.
+
+        Args:
+            encoded (bytes): The encoded frame.
+            timestamp (float): When the frame was grabbed.
+
+        Returns:
+            bool: True if the frame fit its slot and was stored.
+        """
+        size = len(encoded)
+        if size > self.slot_size:
+            return False
+
+        with self._lock:
+            offset = self._next * self.slot_size
+            self._data[offset:offset + size] = encoded
+            self._lengths[self._next] = size
+            self._times[self._next] = timestamp
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        return True
+
+    def snapshot(self):
+        """
+        Copy the stored frames out of the ring, oldest first.
+
+        Returns:
+            list: (timestamp, bytes) pairs.
+        """
+        with self._lock:
+            start = (self._next - self._count) % self.capacity
+            frames = []
+            for i in range(self._count):
+                slot = (start + i) % self.capacity
+                offset = slot * self.slot_size
+                frames.append((self._times[slot], bytes(self._data[offset:offset + self._lengths[slot]])))
+        return frames
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+class ReplayBuffer:
+    """
+    Low frame rate capture of one monitor into a FrameRing.
+
+    start() and the capture timer run on the GUI thread; downscaling and
+    encoding run on one encoder thread.
+
+    Attributes:
+        settings (dict): Settings from load_replay_config().
+        ring (FrameRing): The encoded frames.
+        stats (dict): Frame counts and timings, used by the benchmark.
+    """
+
+    _STOP = object()
+
+    def __init__(self, settings):
+        """
+        Allocate the ring and create the capture timer.
+
+        Args:
+            settings (dict): Settings from load_replay_config().
+        """
+        self.settings = settings
+        capacity = max(1, int(settings["fps"] * settings["seconds"]))
+        self.ring = FrameRing(capacity, int(settings["memory_budget_mb"] * 1024 * 1024))
+        self.stats = {
+            "grabbed": 0,
+            "skipped": 0,
+            "stored": 0,
+            "dropped": 0,
+            "bytes": 0,
+            # Recent timings only; the buffer runs for the life of the listener
+            "grab_ms": deque(maxlen=TIMING_WINDOW),
+            "encode_ms": deque(maxlen=TIMING_WINDOW),
+        }
+        # One pending frame at most, so a slow encoder skips grabs instead of queueing them
+        self._queue = queue.Queue(maxsize=1)
+        self._encoder = threading.Thread(target=self._encode_loop, name="ReplayEncoder", daemon=True)
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.CoarseTimer)
+        self._timer.timeout.connect(self._grab)
+
+    def start(self):
+        """
+        Start capturing. Must be called on the GUI thread.
+
+        Returns:
+            None
+        """
+        self._encoder.start()
+        self._timer.start(max(1, int(1000 / self.settings["fps"])))
+        log_message(
+            f"Replay buffer started: {self.ring.capacity} frames at {self.settings['fps']} fps, "
+            f"{self.ring.slot_size // 1024} KiB per frame",
+            "REPLAY"
+        )
+
+    def stop(self):
+        """
+        Stop capturing and end the encoder thread.
+
+        Returns:
+            None
+        """
+        self._timer.stop()
+        if self._encoder.is_alive():
+            self._queue.put(self._STOP)
+            self._encoder.join(5.0)
+
+    def _grab(self):
+        """
+        Grab the monitor and pass the image to the encoder. Runs on the GUI thread.
+
+        Returns:
+            None
+        """
+        if self._queue.full():
+            self.stats["skipped"] += 1
+            return
+
+        started = time.perf_counter()
+        screens = QApplication.screens()
+        if not screens:
+            return
+        screen = screens[min(self.settings["monitor_index"], len(screens) - 1)]
+        image = screen.grabWindow(0).toImage()
+        self.stats["grab_ms"].append((time.perf_counter() - started) * 1000.0)
+        self.stats["grabbed"] += 1
+
+        try:
+            self._queue.put_nowait((time.time(), image))
+        except queue.Full:
+            self.stats["skipped"] += 1
+
+    def _encode_loop(self):
+        """
+        Downscale and encode grabbed frames into the ring.
+
+        Returns:
+            None
+        """
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+
+            timestamp, image = item
+            started = time.perf_counter()
+            if image.width() > self.settings["max_width"]:
+                image = image.scaledToWidth(self.settings["max_width"], Qt.FastTransformation)
+
+            encoded = encode_image(image, "jpeg", self.settings["quality"])
+            if len(encoded) > self.ring.slot_size:
+                encoded = encode_image(image, "jpeg", min(FALLBACK_QUALITY, self.settings["quality"]))
+
+            if self.ring.write(encoded, timestamp):
+                self.stats["stored"] += 1
+                self.stats["bytes"] += len(encoded)
+            else:
+                self.stats["dropped"] += 1
+            self.stats["encode_ms"].append((time.perf_counter() - started) * 1000.0)
+
+def write_replay(frames, directory, output="gif", fps=5):
+    """
+    Write replay frames to disk.
+
+    Args:
+        frames (list): (timestamp, JPEG bytes) pairs from FrameRing.snapshot().
+        directory (str): Directory to write to. Empty means the current directory.
+        output (str): "gif", "webp" or "sequence".
+        fps (float): Playback rate for animated output.
+
+    Returns:
+        str: Path of the animation or sequence directory, or None on failure.
+    """
+    if not frames:
+        log_message("Replay buffer is empty, nothing to save", "REPLAY")
+        return None
+
+    directory = directory or '.'
+    stem = f"replay {screenshot_stem(captured_at=datetime.fromtimestamp(frames[-1][0]))}"
+
+    if output in ("gif", "webp"):
+        try:
+            from PIL import Image
+        except ImportError:
+            log_message("Pillow is not installed, saving the replay as an image sequence", "REPLAY")
+            output = "sequence"
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if output == "sequence":
+            path = os.path.join(directory, stem)
+            os.makedirs(path, exist_ok=True)
+            for index, (_, data) in enumerate(frames, start=1):
+                with open(os.path.join(path, f"frame_{index:04d}.jpg"), 'wb') as f:
+                    f.write(data)
+        else:
+            path = os.path.join(directory, f"{stem}.{output}")
+            images = [Image.open(io.BytesIO(data)) for _, data in frames]
+            images[0].save(
+                path,
+                save_all=True,
+                append_images=images[1:],
+                duration=int(1000 / fps),
+                loop=0
+            )
+    except Exception as e:
+        log_message(f"Failed to save replay: {e}", "REPLAY")
+        return None
+
+    log_message(f"Replay of {len(frames)} frames saved to {path}", "REPLAY")
+    return path
+
+_replay = None
+
+def start_replay_buffer(settings=None):
+    """
+    Start the replay buffer on the calling thread if it is enabled.
+
+    Must be called from the main thread, which then has to run the Qt event
+    loop (see screenshot_service.run_event_loop()).
+
+    Args:
+        settings (dict, optional): Settings from load_replay_config().
+
+    Returns:
+        ReplayBuffer: The running buffer, or None if it is disabled or no
+                      display is available.
+    """
+    global _replay
+    if _replay is not None:
+        return _replay
+
+    if settings is None:
+        settings = load_replay_config()
+    if not settings["enabled"] or not display_available():
+        return None
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    _replay = ReplayBuffer(settings)
+    _replay.start()
+    app.aboutToQuit.connect(_replay.stop)
+    return _replay
+
+def save_replay():
+    """
+    Save the replay buffer to the screenshot directory.
+
+    The frames are copied out of the ring and written from a background
+    thread, so capture continues while the file is written.
+
+    Returns:
+        None
+    """
+    if _replay is None:
+        log_message("Replay buffer is not running, enable it in the [replay] section of screenshot_config.toml", "REPLAY")
+        return
+
+    frames = _replay.ring.snapshot()
+    directory = load_screenshot_config()["file_location"]
+    settings = _replay.settings
+    threading.Thread(
+        target=write_replay,
+        args=(frames, directory, settings["output"], settings["fps"]),
+        name="ReplayWriter",
+        daemon=True
+    ).start()
+
+def _summarize(values):
+    """
+    Format the median, 95th percentile and maximum of a list of timings.
+
+    Args:
+        values (list): Timings in milliseconds.
+
+    Returns:
+        str: The summary, or "-" for an empty list.
+    """
+    if not values:
+        return "-"
+    values = sorted(values)
+    p50 = values[len(values) // 2]
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    return f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {values[-1]:.1f} ms"
+
+def run_benchmark(duration, settings):
+    """
+    Run the replay buffer for a while and report what it costs.
+
+    CPU is measured for the whole process, so it includes the Qt grab, the
+    encoder thread and the event loop.
+
+    Args:
+        duration (float): Seconds to run.
+        settings (dict): Settings from load_replay_config().
+
+    Returns:
+        tuple: (result, replay) where result is a dict with cpu_percent (of
+               one core), frame counts and timing summaries, and replay is
+               the stopped ReplayBuffer.
+    """
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    replay = ReplayBuffer(settings)
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    replay.start()
+    QTimer.singleShot(int(duration * 1000), app.quit)
+    app.exec_()
+    replay.stop()
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+
+    stats = replay.stats
+    result = {
+        "cpu_percent": cpu / wall * 100.0,
+        "grabbed": stats["grabbed"],
+        "skipped": stats["skipped"],
+        "stored": stats["stored"],
+        "dropped": stats["dropped"],
+        "average_frame_kib": stats["bytes"] / stats["stored"] / 1024 if stats["stored"] else 0.0,
+        "slot_kib": replay.ring.slot_size / 1024,
+        "grab": _summarize(stats["grab_ms"]),
+        "encode": _summarize(stats["encode_ms"]),
+    }
+    return result, replay
+
+def main():
+    """
+    Benchmark the replay buffer on this machine.
+
+    Command-line Arguments:
+        --benchmark: Seconds to run the replay buffer for.
+        --save: Save the captured frames when the benchmark ends.
+
+    Returns:
+        None. Exits with status code 1 if no display is available.
+    """
+    parser = argparse.ArgumentParser(description='Measure the CPU cost of the instant replay buffer.')
+    parser.add_argument('--benchmark', type=float, default=30.0, help='Seconds to run the replay buffer for')
+    parser.add_argument('--save', action='store_true', help='Save the captured frames when the benchmark ends')
+    args = parser.parse_args()
+
+    if not display_available():
+        print("No display available.")
+        sys.exit(1)
+
+    settings = load_replay_config()
+    result, replay = run_benchmark(args.benchmark, settings)
+    print(f"Monitor {settings['monitor_index']} at {settings['fps']} fps, max width {settings['max_width']}, quality {settings['quality']}")
+    print(f"CPU: {result['cpu_percent']:.1f}% of one core")
+    print(f"Frames: {result['grabbed']} grabbed, {result['stored']} stored, {result['dropped']} too large, {result['skipped']} skipped")
+    print(f"Frame size: {result['average_frame_kib']:.1f} KiB average, {result['slot_kib']:.1f} KiB slot")
+    print(f"Grab (GUI thread): {result['grab']}")
+    print(f"Downscale and encode: {result['encode']}")
+
+    if args.save:
+        write_replay(replay.ring.snapshot(), load_screenshot_config()["file_location"], settings["output"], settings["fps"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,727 @@
+"""
+Screenshot Service Module for Arcade Station.
+
+This module keeps screenshot capture resident in the key listener instead of
+starting monitor_screenshot.py, and a new QApplication, for every press.
+
+A capture request from any thread is queued to the Qt GUI thread, which only
+grabs the monitor and copies the pixels out. Encoding and saving run on a
+worker pool and the shutter sound is played by the in-process sound engine,
+so the GUI thread is free for the next grab straight away and consecutive shots can
+fire back-to-back.
+
+Besides single shots the service supports two capture modes:
+
+- burst: N frames of the configured monitor at a fixed interval, timed by a
+  QTimer on the GUI thread
+- all monitors: every screen grabbed back-to-back in one GUI thread pass
+
+Raw frames are copied into a pool of preallocated buffers so a burst does
+not allocate a full frame per shot, and each buffer goes back to the pool
+once its frame is encoded. File names carry milliseconds and are reserved
+with an exclusive create, so two shots never overwrite each other.
+
+Screenshots are written as JPEG, PNG, WebP or AVIF (when the Qt image
+plugin for it is installed). With target_kb set, the encoder searches for
+the highest quality that keeps the file within that size, which keeps
+uploads from cabinets on slow venue networks small.
+
+The service is enabled with the resident setting in the [screenshot] section
+of screenshot_config.toml. When it is not running (resident disabled, no
+display, or PyQt5 missing from the listener), requests fall back to starting
+monitor_screenshot.py.
+"""
+
+import os
+import sys
+import signal
+import itertools
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageWriter
+from PyQt5.QtWidgets import QApplication
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import launch_script, load_toml_config, log_message
+from arcade_station.core.common.sound_engine import get_sound_engine
+
+# Defaults used when screenshot_config.toml does not set a key
+DEFAULT_SCREENSHOT_SETTINGS = {
+    "monitor_index": 0,
+    "file_location": "",
+    "file_name": "",
+    "quality": "High",
+    "format": "jpeg",
+    "target_kb": 0,
+    "sound_file": "",
+    "resident": True,
+    "encode_workers": 0,
+    "frame_buffers": 8,
+    "burst_count": 5,
+    "burst_interval": 0.2,
+}
+
+# Encoder quality for each quality setting; numbers from 0 to 100 are also accepted
+QUALITY_LEVELS = {
+    "High": 95,
+    "Medium": 75,
+    "Low": 50,
+}
+
+# Output formats as (Qt format name, file extension)
+IMAGE_FORMATS = {
+    "jpeg": ("JPEG", "jpg"),
+    "png": ("PNG", "png"),
+    "webp": ("WEBP", "webp"),
+    "avif": ("AVIF", "avif"),
+}
+
+# Formats whose quality setting does not change the image, only the compression effort
+LOSSLESS_FORMATS = ("png",)
+
+# Lowest quality the target size search will go to
+MIN_TARGET_QUALITY = 10
+
+def load_screenshot_config():
+    """
+    Load the [screenshot] settings from screenshot_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_SCREENSHOT_SETTINGS present.
+    """
+    settings = dict(DEFAULT_SCREENSHOT_SETTINGS)
+    try:
+        config = load_toml_config('screenshot_config.toml').get('screenshot', {})
+    except Exception as e:
+        log_message(f"Failed to load screenshot configuration: {e}", "SCREENSHOT")
+        config = {}
+
+    for key, value in config.items():
+        if key in settings:
+            settings[key] = value
+    return settings
+
+def resolve_sound_file(sound_file):
+    """
+    Resolve the configured sound file to an absolute path.
+
+    Relative paths are resolved from this module's directory, matching the
+    paths written by earlier versions of the configuration.
+
+    Args:
+        sound_file (str): The configured sound file.
+
+    Returns:
+        str: Absolute path to an existing sound file, or None.
+    """
+    if not sound_file or not sound_file.strip():
+        return None
+    path = os.path.abspath(os.path.join(os.path.dirname(__file__), sound_file))
+    return path if os.path.exists(path) else None
+
+def screenshot_stem(file_name=None, captured_at=None, suffix=""):
+    """
+    Build the file name, without extension, for a captured frame.
+
+    Args:
+        file_name (str, optional): Configured file name. Defaults to the
+                                   capture time with milliseconds.
+        captured_at (datetime, optional): When the frame was grabbed.
+        suffix (str): Appended to the name, such as a monitor or burst frame.
+
+    Returns:
+        str: The file name stem.
+    """
+    if not file_name:
+        file_name = (captured_at or datetime.now()).strftime('%Y-%m-%d %H-%M-%S.%f')[:-3]
+    return f"{file_name}{suffix}"
+
+def reserve_screenshot_path(file_location, stem, extension="jpg"):
+    """
+    Claim a screenshot path that no other shot can use.
+
+    The file is created empty with an exclusive create; if the name is taken
+    a counter is appended until a free name is found.
+
+    Args:
+        file_location (str): Directory for screenshots. Empty means the
+                             current directory.
+        stem (str): File name without extension.
+        extension (str): File extension without the dot.
+
+    Returns:
+        str: The reserved path.
+    """
+    directory = file_location or '.'
+    os.makedirs(directory, exist_ok=True)
+    for attempt in itertools.count():
+        name = stem if attempt == 0 else f"{stem}-{attempt}"
+        path = os.path.join(directory, f"{name}.{extension}")
+        try:
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+            return path
+        except FileExistsError:
+            continue
+
+def resolve_quality(quality):
+    """
+    Turn a quality setting into an encoder quality.
+
+    Args:
+        quality (str or int): 'High', 'Medium', 'Low' or a number from 0 to 100.
+
+    Returns:
+        int: Quality from 0 to 100.
+    """
+    if isinstance(quality, (int, float)):
+        return max(0, min(100, int(quality)))
+    return QUALITY_LEVELS.get(quality, QUALITY_LEVELS['High'])
+
+def resolve_image_format(image_format):
+    """
+    Pick the output format, falling back to JPEG if Qt cannot write it.
+
+    WebP and AVIF need Qt image format plugins that are not part of every
+    PyQt5 install.
+
+    Args:
+        image_format (str): "jpeg", "png", "webp" or "avif".
+
+    Returns:
+        str: A key of IMAGE_FORMATS that Qt can write.
+    """
+    image_format = (image_format or "jpeg").lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if image_format not in IMAGE_FORMATS:
+        log_message(f"Unknown screenshot format '{image_format}', using JPEG", "SCREENSHOT")
+        return "jpeg"
+
+    supported = {bytes(name).decode().upper() for name in QImageWriter.supportedImageFormats()}
+    if IMAGE_FORMATS[image_format][0] not in supported:
+        log_message(f"Qt cannot write {image_format.upper()} on this system, using JPEG", "SCREENSHOT")
+        return "jpeg"
+    return image_format
+
+def encode_image(image, image_format="jpeg", quality=95):
+    """
+    Encode a QImage in memory.
+
+    Args:
+        image (QImage): The image.
+        image_format (str): A key of IMAGE_FORMATS.
+        quality (int): Quality from 0 to 100.
+
+    Returns:
+        bytes: The encoded image, or empty bytes if encoding failed.
+    """
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, IMAGE_FORMATS[image_format][0], quality)
+    buffer.close()
+    return bytes(data)
+
+def encode_to_target(image, image_format, target_bytes, max_quality=95):
+    """
+    Encode an image at the highest quality that fits a size budget.
+
+    Binary searches the quality range, so a target costs about seven
+    encodes. Lossless formats are encoded once at maximum compression.
+
+    Args:
+        image (QImage): The image.
+        image_format (str): A key of IMAGE_FORMATS.
+        target_bytes (int): Maximum file size.
+        max_quality (int): Highest quality to try.
+
+    Returns:
+        tuple: (data, quality) for the chosen encode. If even the lowest
+               quality is over budget, the lowest quality encode is returned.
+    """
+    if image_format in LOSSLESS_FORMATS:
+        # Qt maps PNG quality to compression effort; 0 is the smallest file
+        return encode_image(image, image_format, 0), 0
+
+    best = None
+    low, high = MIN_TARGET_QUALITY, max(MIN_TARGET_QUALITY, max_quality)
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode_image(image, image_format, quality)
+        if data and len(data) <= target_bytes:
+            best = (data, quality)
+            low = quality + 1
+        else:
+            high = quality - 1
+
+    if best is None:
+        return encode_image(image, image_format, MIN_TARGET_QUALITY), MIN_TARGET_QUALITY
+    return best
+
+def save_image(image, file_path, quality='High', image_format="jpeg", target_bytes=0):
+    """
+    Encode a captured image and write it to disk.
+
+    Safe to call from worker threads because it only touches a QImage.
+
+    Args:
+        image (QImage): The captured image.
+        file_path (str): Destination path.
+        quality (str or int): 'High', 'Medium', 'Low' or 0 to 100. The
+                              highest quality tried when target_bytes is set.
+        image_format (str): A key of IMAGE_FORMATS that Qt can write.
+        target_bytes (int): Size budget for the file; 0 disables the search.
+
+    Returns:
+        bool: True if the file was written.
+    """
+    quality = resolve_quality(quality)
+    if target_bytes:
+        data, quality = encode_to_target(image, image_format, target_bytes, quality)
+        if len(data) > target_bytes:
+            log_message(f"Screenshot is {len(data) // 1024} KiB at the lowest quality, over the {target_bytes // 1024} KiB target", "SCREENSHOT")
+    else:
+        data = encode_image(image, image_format, quality)
+
+    try:
+        if not data:
+            raise OSError(f"{image_format.upper()} encoding failed")
+        with open(file_path, 'wb') as f:
+            f.write(data)
+    except OSError as e:
+        log_message(f"Failed to save screenshot to {file_path}: {e}", "SCREENSHOT")
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        return False
+
+    log_message(f"Screenshot saved to {file_path} ({len(data) // 1024} KiB, quality {quality})", "SCREENSHOT")
+    return True
+
+def save_screenshot(image, file_location, stem, settings):
+    """
+    Reserve a file for a screenshot and save it with the configured codec.
+
+    Args:
+        image (QImage): The captured image.
+        file_location (str): Directory for screenshots.
+        stem (str): File name without extension.
+        settings (dict): Settings from load_screenshot_config(), with
+                         "format" already passed through resolve_image_format().
+
+    Returns:
+        bool: True if the file was written.
+    """
+    image_format = settings["format"]
+    file_path = reserve_screenshot_path(file_location, stem, IMAGE_FORMATS[image_format][1])
+    return save_image(image, file_path, settings["quality"], image_format, int(settings["target_kb"] * 1024))
+
+def play_shutter(sound_file):
+    """
+    Start the shutter sound without waiting for it.
+
+    The file is decoded once by the sound engine and played from memory on
+    later shots.
+
+    Args:
+        sound_file (str): Absolute path to the sound file, or None.
+
+    Returns:
+        bool: True if playback started.
+    """
+    if not sound_file:
+        return False
+    return get_sound_engine().play_file(sound_file)
+
+def display_available():
+    """
+    Check whether Qt can open a display in this session.
+
+    Returns:
+        bool: False on Linux sessions with no X11 or Wayland display and no
+              explicit Qt platform, True everywhere else.
+    """
+    if not sys.platform.startswith('linux'):
+        return True
+    return any(os.environ.get(name) for name in ("DISPLAY", "WAYLAND_DISPLAY", "QT_QPA_PLATFORM"))
+
+def grab_screens(monitor_index=0, all_monitors=False):
+    """
+    Grab one or every monitor. Must run on the GUI thread.
+
+    Every screen is grabbed back-to-back before any conversion, so an
+    all-monitors capture shows the same moment on each screen.
+
+    Args:
+        monitor_index (int): Index of the monitor to capture.
+        all_monitors (bool): Capture every monitor instead.
+
+    Returns:
+        list: (monitor index, QImage) pairs; empty if no screen is available.
+    """
+    screens = QApplication.screens()
+    if not screens:
+        log_message("No screens detected. Ensure you are running in a GUI-capable environment.", "SCREENSHOT")
+        return []
+
+    if all_monitors:
+        pixmaps = [screen.grabWindow(0) for screen in screens]
+        # QPixmap is tied to the GUI thread; QImage can be handed to the workers
+        return [(index, pixmap.toImage()) for index, pixmap in enumerate(pixmaps)]
+
+    if monitor_index >= len(screens):
+        log_message(f"Monitor index {monitor_index} is out of range. Defaulting to primary monitor.", "SCREENSHOT")
+        monitor_index = 0
+    return [(monitor_index, screens[monitor_index].grabWindow(0).toImage())]
+
+def largest_frame_bytes():
+    """
+    Get the size of the largest raw frame any screen can produce.
+
+    Returns:
+        int: Bytes in a 32-bit frame of the largest screen.
+    """
+    largest = 0
+    for screen in QApplication.screens():
+        geometry = screen.geometry()
+        ratio = screen.devicePixelRatio()
+        largest = max(largest, int(geometry.width() * ratio) * int(geometry.height() * ratio) * 4)
+    return largest
+
+class RawFrame:
+    """
+    An uncompressed frame held in a pool buffer.
+
+    Attributes:
+        buffer (bytearray): Pixel data; may be larger than the frame.
+        width (int): Width in pixels.
+        height (int): Height in pixels.
+        bytes_per_line (int): Length of one pixel row in bytes.
+        image_format (QImage.Format): Pixel format of the data.
+        captured_at (datetime): When the frame was grabbed.
+        suffix (str): File name suffix for the frame.
+    """
+
+    def __init__(self, buffer, width, height, bytes_per_line, image_format, captured_at, suffix=""):
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.bytes_per_line = bytes_per_line
+        self.image_format = image_format
+        self.captured_at = captured_at
+        self.suffix = suffix
+
+    def to_image(self):
+        """
+        Wrap the buffer in a QImage without copying it.
+
+        The buffer must stay out of the pool while the image is in use.
+
+        Returns:
+            QImage: The frame.
+        """
+        return QImage(self.buffer, self.width, self.height, self.bytes_per_line, self.image_format)
+
+class FramePool:
+    """
+    Preallocated buffers for raw frames.
+
+    store() runs on the GUI thread and release() on the encoder threads. If
+    every buffer is in use a temporary one is allocated, so capture never
+    waits for encoding.
+    """
+
+    def __init__(self, count, frame_bytes):
+        """
+        Allocate the buffers.
+
+        Args:
+            count (int): Number of buffers.
+            frame_bytes (int): Size of each buffer, the largest frame.
+        """
+        self.frame_bytes = frame_bytes
+        self._free = [bytearray(frame_bytes) for _ in range(count)]
+        self._lock = threading.Lock()
+
+    def store(self, image, captured_at, suffix=""):
+        """
+        Copy a grabbed image into a free buffer.
+
+        Args:
+            image (QImage): The grabbed image.
+            captured_at (datetime): When the image was grabbed.
+            suffix (str): File name suffix for the frame.
+
+        Returns:
+            RawFrame: The frame holding the copied pixels.
+        """
+        size = image.sizeInBytes()
+        buffer = None
+        if size <= self.frame_bytes:
+            with self._lock:
+                if self._free:
+                    buffer = self._free.pop()
+        if buffer is None:
+            log_message("Screenshot frame pool exhausted, allocating a temporary buffer", "SCREENSHOT")
+            buffer = bytearray(size)
+
+        bits = image.constBits()
+        bits.setsize(size)
+        memoryview(buffer)[:size] = memoryview(bits)
+        return RawFrame(buffer, image.width(), image.height(), image.bytesPerLine(), image.format(), captured_at, suffix)
+
+    def release(self, frame):
+        """
+        Return a frame's buffer to the pool.
+
+        Args:
+            frame (RawFrame): A frame from store().
+
+        Returns:
+            None
+        """
+        if len(frame.buffer) != self.frame_bytes:
+            return
+        with self._lock:
+            self._free.append(frame.buffer)
+
+class ScreenshotService(QObject):
+    """
+    Resident screenshot capture.
+
+    request() may be called from any thread. The grabs themselves always run
+    on the thread that owns the QApplication.
+    """
+
+    capture_requested = pyqtSignal(int, bool)
+
+    def __init__(self, settings):
+        """
+        Create the service, its frame pool and its encoder pool.
+
+        Args:
+            settings (dict): Settings from load_screenshot_config().
+        """
+        super().__init__()
+        self.settings = dict(settings)
+        self.settings["format"] = resolve_image_format(settings["format"])
+        self.sound_file = resolve_sound_file(settings["sound_file"])
+        if self.sound_file:
+            # Decode the shutter sound now so the first shot plays it from memory
+            get_sound_engine().load(self.sound_file, self.sound_file)
+        self.pool = FramePool(max(1, int(settings["frame_buffers"])), largest_frame_bytes())
+        # Qt's image writers encode outside the interpreter, so one worker per core by default
+        workers = int(settings["encode_workers"]) or os.cpu_count() or 2
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot")
+        self._bursts = []
+        # Queued so a request from a hotkey worker runs the grab on the GUI thread
+        self.capture_requested.connect(self._start_capture, Qt.QueuedConnection)
+
+    def request(self, burst_count=1, all_monitors=False):
+        """
+        Queue a capture on the GUI thread.
+
+        Args:
+            burst_count (int): Number of frames to take at the configured
+                               burst interval.
+            all_monitors (bool): Grab every monitor for each frame.
+
+        Returns:
+            None
+        """
+        self.capture_requested.emit(max(1, int(burst_count)), bool(all_monitors))
+
+    def _start_capture(self, burst_count, all_monitors):
+        """
+        Take the first frame now and schedule the rest of a burst.
+
+        Args:
+            burst_count (int): Number of frames to take.
+            all_monitors (bool): Grab every monitor for each frame.
+
+        Returns:
+            None
+        """
+        play_shutter(self.sound_file)
+        self._capture_frame(all_monitors, 0 if burst_count > 1 else None)
+        if burst_count <= 1:
+            return
+
+        timer = QTimer(self)
+        timer.setTimerType(Qt.PreciseTimer)
+        burst = {"timer": timer, "taken": 1}
+
+        def next_frame():
+            self._capture_frame(all_monitors, burst["taken"])
+            burst["taken"] += 1
+            if burst["taken"] >= burst_count:
+                timer.stop()
+                self._bursts.remove(burst)
+                timer.deleteLater()
+
+        timer.timeout.connect(next_frame)
+        timer.start(max(1, int(self.settings["burst_interval"] * 1000)))
+        self._bursts.append(burst)
+
+    def _capture_frame(self, all_monitors, frame_number=None):
+        """
+        Grab one frame and hand it to the encoder pool.
+
+        Args:
+            all_monitors (bool): Grab every monitor.
+            frame_number (int, optional): Position in a burst, from 0.
+
+        Returns:
+            None
+        """
+        captured_at = datetime.now()
+        for monitor_index, image in grab_screens(self.settings["monitor_index"], all_monitors):
+            suffix = f"-monitor{monitor_index + 1}" if all_monitors else ""
+            if frame_number is not None:
+                suffix += f"-{frame_number + 1:02d}"
+            frame = self.pool.store(image, captured_at, suffix)
+            self._executor.submit(self._save_frame, frame)
+
+    def _save_frame(self, frame):
+        """
+        Encode and save a raw frame on a worker thread.
+
+        Args:
+            frame (RawFrame): The frame to save.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        try:
+            stem = screenshot_stem(self.settings["file_name"], frame.captured_at, frame.suffix)
+            return save_screenshot(frame.to_image(), self.settings["file_location"], stem, self.settings)
+        except Exception as e:
+            log_message(f"Failed to save screenshot: {e}", "SCREENSHOT")
+            return False
+        finally:
+            self.pool.release(frame)
+
+    def shutdown(self):
+        """
+        Stop running bursts and wait for pending screenshots to be written.
+
+        Returns:
+            None
+        """
+        for burst in self._bursts:
+            burst["timer"].stop()
+        self._executor.shutdown(wait=True)
+
+_service = None
+
+def start_screenshot_service(settings=None):
+    """
+    Start the resident screenshot service on the calling thread.
+
+    Must be called from the main thread, which then has to run
+    run_event_loop() for captures to be processed.
+
+    Args:
+        settings (dict, optional): Settings from load_screenshot_config().
+
+    Returns:
+        ScreenshotService: The running service, or None if it is disabled or
+                           no display is available.
+    """
+    global _service
+    if _service is not None:
+        return _service
+
+    if settings is None:
+        settings = load_screenshot_config()
+    if not settings["resident"]:
+        return None
+    if not display_available():
+        log_message("No display available, screenshots will run as a separate process", "SCREENSHOT")
+        return None
+
+    if QApplication.instance() is None:
+        QApplication(sys.argv[:1])
+    _service = ScreenshotService(settings)
+    log_message("Screenshot service started", "SCREENSHOT")
+    return _service
+
+def get_screenshot_service():
+    """
+    Get the running screenshot service.
+
+    Returns:
+        ScreenshotService: The service, or None if it was not started.
+    """
+    return _service
+
+def request_screenshot(burst_count=1, all_monitors=False):
+    """
+    Take a screenshot through the resident service.
+
+    Falls back to starting monitor_screenshot.py when the service is not
+    running in this process.
+
+    Args:
+        burst_count (int): Number of frames to take at the burst interval.
+        all_monitors (bool): Grab every monitor for each frame.
+
+    Returns:
+        subprocess.Popen: The fallback process, or None if the capture was
+                          queued on the resident service.
+    """
+    if _service is not None:
+        _service.request(burst_count, all_monitors)
+        return None
+
+    extra_args = []
+    if burst_count > 1:
+        extra_args.append(f"--burst={burst_count}")
+    if all_monitors:
+        extra_args.append("--all-monitors")
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monitor_screenshot.py')
+    return launch_script(script_path, extra_args=extra_args)
+
+def request_burst_screenshot():
+    """
+    Take a burst of screenshots with the configured frame count.
+
+    Returns:
+        subprocess.Popen: The fallback process, or None.
+    """
+    return request_screenshot(burst_count=load_screenshot_config()["burst_count"])
+
+def request_all_monitors_screenshot():
+    """
+    Take a screenshot of every monitor at the same instant.
+
+    Returns:
+        subprocess.Popen: The fallback process, or None.
+    """
+    return request_screenshot(all_monitors=True)
+
+def run_event_loop():
+    """
+    Run the Qt event loop until Ctrl+C, then flush pending screenshots.
+
+    Returns:
+        None
+    """
+    app = QApplication.instance()
+    signal.signal(signal.SIGINT, lambda *args: app.quit())
+
+    # Qt blocks in native code; wake regularly so Python can run the signal handler
+    timer = QTimer()
+    timer.timeout.connect(lambda: None)
+    timer.start(250)
+
+    app.exec_()
+    timer.stop()
+    if _service is not None:
+        _service.shutdown()
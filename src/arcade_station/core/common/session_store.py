@@ -0,0 +1,461 @@
+"""
+Session Store Module for Arcade Station.
+
+This module keeps a local history of game sessions in a SQLite database so
+launch times, session lengths and failures can be compared over time. Each
+session records the game id, when the launch started, when the game became
+ready, when it exited, its exit code and the reset reason if the session was
+ended by a reset.
+
+Writes are queued and committed by a background writer thread in batches,
+so recording an event never blocks a launch on disk I/O. The queue is
+flushed when the process exits.
+
+The database lives in the log directory unless a path is configured in the
+[telemetry] section of default_config.toml.
+
+Usage:
+    python session_store.py report [--days DAYS] [--game GAME]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import sqlite3
+import argparse
+import threading
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import load_toml_config, log_message
+from arcade_station.core.common.launch_readiness import DEFAULT_LAUNCH_SETTINGS
+
+SESSION_DATABASE_FILE = "arcade_station_sessions.db"
+
+# Seconds after a game exits during which a reset is attributed to its session
+RESET_ATTRIBUTION_WINDOW = 10.0
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        game_id TEXT NOT NULL,
+        launch_start REAL NOT NULL,
+        ready_time REAL,
+        exit_time REAL,
+        exit_code INTEGER,
+        reset_reason TEXT,
+        outcome TEXT,
+        stages TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_game ON sessions (game_id, launch_start)",
+)
+
+def load_telemetry_config():
+    """
+    Load the [telemetry] settings from default_config.toml.
+
+    Returns:
+        dict: Settings with enabled, supervise, database_path,
+              batch_size and flush_interval keys.
+    """
+    try:
+        config = load_toml_config('default_config.toml')
+    except Exception as e:
+        log_message(f"Failed to load telemetry configuration: {e}", "TELEMETRY")
+        config = {}
+
+    telemetry = config.get('telemetry', {})
+    database_path = telemetry.get('database_path', '')
+    if not database_path:
+        log_directory = config.get('logging', {}).get('logdirectory', '')
+        database_path = os.path.join(log_directory, SESSION_DATABASE_FILE) if log_directory else SESSION_DATABASE_FILE
+
+    return {
+        "enabled": telemetry.get('enabled', True),
+        "supervise": telemetry.get('supervise', True),
+        "database_path": database_path,
+        "batch_size": int(telemetry.get('batch_size', 32)),
+        "flush_interval": float(telemetry.get('flush_interval', 1.0)),
+    }
+
+def _connect(database_path):
+    """
+    Open the session database, creating its schema if needed.
+
+    Args:
+        database_path (str): Path to the SQLite database.
+
+    Returns:
+        sqlite3.Connection: An open connection.
+    """
+    directory = os.path.dirname(database_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(database_path, timeout=5.0)
+    # WAL lets the launcher, reset scripts and reports use the database at once
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        connection.execute(statement)
+    connection.commit()
+    return connection
+
+class SessionStore:
+    """
+    Batched writer for the session database.
+
+    Statements are queued by record calls and committed by a daemon thread,
+    one transaction per batch.
+
+    Attributes:
+        database_path (str): Path to the SQLite database.
+    """
+
+    _STOP = object()
+
+    def __init__(self, database_path, batch_size=32, flush_interval=1.0):
+        """
+        Create the store and start its writer thread.
+
+        Args:
+            database_path (str): Path to the SQLite database.
+            batch_size (int): Maximum number of statements per transaction.
+            flush_interval (float): Maximum seconds a statement waits in the queue.
+        """
+        self.database_path = database_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="SessionStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _run(self):
+        """
+        Commit queued statements in batches until the store is closed.
+
+        Returns:
+            None
+        """
+        try:
+            connection = _connect(self.database_path)
+        except Exception as e:
+            log_message(f"Failed to open session database {self.database_path}: {e}", "TELEMETRY")
+            return
+
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not self._STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if batch[-1] is self._STOP:
+                batch.pop()
+                stopping = True
+
+            if batch:
+                try:
+                    with connection:
+                        for sql, params in batch:
+                            connection.execute(sql, params)
+                except sqlite3.Error as e:
+                    log_message(f"Failed to write {len(batch)} session records: {e}", "TELEMETRY")
+
+        connection.close()
+
+    def execute(self, sql, params=()):
+        """
+        Queue a statement for the writer thread.
+
+        Args:
+            sql (str): The SQL statement.
+            params (tuple): Statement parameters.
+
+        Returns:
+            None
+        """
+        if not self._closed:
+            self._queue.put((sql, params))
+
+    def close(self, timeout=5.0):
+        """
+        Flush queued statements and stop the writer thread.
+
+        Args:
+            timeout (float): Maximum seconds to wait for the flush.
+
+        Returns:
+            None
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._writer.join(timeout)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_session_store():
+    """
+    Get the process-wide session store, creating it on first use.
+
+    Returns:
+        SessionStore: The store, or None if telemetry is disabled.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            settings = load_telemetry_config()
+            if not settings["enabled"]:
+                return None
+            _store = SessionStore(settings["database_path"], settings["batch_size"], settings["flush_interval"])
+            atexit.register(_store.close)
+        return _store
+
+def start_session(game_id, launch_start=None):
+    """
+    Record the start of a game launch.
+
+    Args:
+        game_id (str): The game being launched.
+        launch_start (float, optional): Epoch time the launch started.
+
+    Returns:
+        str: The new session id, or None if telemetry is disabled.
+    """
+    store = get_session_store()
+    if not store:
+        return None
+
+    session_id = uuid.uuid4().hex
+    store.execute(
+        "INSERT INTO sessions (session_id, game_id, launch_start) VALUES (?, ?, ?)",
+        (session_id, game_id, launch_start or time.time())
+    )
+    return session_id
+
+def record_launch_result(session_id, timeline):
+    """
+    Record the outcome of a launch from its timeline.
+
+    The ready time is only set for launches that reached the ready stage.
+
+    Args:
+        session_id (str): Id returned by start_session().
+        timeline (LaunchTimeline): The finished launch timeline.
+
+    Returns:
+        None
+    """
+    store = get_session_store()
+    if not store or not session_id:
+        return
+
+    ready_time = timeline.started_at + timeline.total() if timeline.outcome.startswith("ready") else None
+    store.execute(
+        "UPDATE sessions SET ready_time = ?, outcome = ?, stages = ? WHERE session_id = ?",
+        (ready_time, timeline.outcome, json.dumps(timeline.durations()), session_id)
+    )
+
+def record_exit(session_id, exit_code=None, exit_time=None):
+    """
+    Record that a game session ended.
+
+    Args:
+        session_id (str): Id returned by start_session().
+        exit_code (int, optional): The game's exit code, if known.
+        exit_time (float, optional): Epoch time the game exited.
+
+    Returns:
+        None
+    """
+    store = get_session_store()
+    if not store or not session_id:
+        return
+
+    store.execute(
+        "UPDATE sessions SET exit_time = ?, exit_code = ? WHERE session_id = ?",
+        (exit_time or time.time(), exit_code, session_id)
+    )
+
+def record_reset(reason):
+    """
+    Attribute a reset to the session it ended.
+
+    The most recent session that is still open, or that exited within the
+    last few seconds, is tagged with the reason. Open sessions are closed at
+    the current time in case their launcher is no longer supervising them.
+
+    Args:
+        reason (str): Why the reset happened, such as "reset" or "kill_all".
+
+    Returns:
+        None
+    """
+    store = get_session_store()
+    if not store:
+        return
+
+    now = time.time()
+    store.execute(
+        """
+        UPDATE sessions SET reset_reason = ?, exit_time = COALESCE(exit_time, ?)
+        WHERE session_id = (
+            SELECT session_id FROM sessions
+            WHERE reset_reason IS NULL AND (exit_time IS NULL OR exit_time >= ?)
+            ORDER BY launch_start DESC LIMIT 1
+        )
+        """,
+        (reason, now, now - RESET_ATTRIBUTION_WINDOW)
+    )
+
+def _percentile(values, percent):
+    """
+    Calculate a percentile of a sorted list with linear interpolation.
+
+    Args:
+        values (list): Sorted numbers.
+        percent (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or None if values is empty.
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * percent / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+# A launch with no recorded result after this long is assumed to have died
+# with its launcher; twice the default readiness timeouts leaves room for
+# games that raise them
+PENDING_LAUNCH_SECONDS = 2 * (DEFAULT_LAUNCH_SETTINGS["alive_timeout"] + DEFAULT_LAUNCH_SETTINGS["ready_timeout"])
+
+def get_launch_stats(since=None, game_id=None, database_path=None, now=None):
+    """
+    Summarize launch times and sessions per game.
+
+    Args:
+        since (float, optional): Only include launches after this epoch time.
+        game_id (str, optional): Only include this game.
+        database_path (str, optional): Database to read. Defaults to the
+                                       configured session database.
+        now (float, optional): Current epoch time, used to tell launches
+                               still in progress from abandoned ones.
+
+    Returns:
+        list: One dict per game with launches, failures, pending, resets,
+              p50, p95 (launch seconds) and median_session (seconds) keys.
+              Launches still in progress are counted as pending, not as
+              failures.
+    """
+    if database_path is None:
+        database_path = load_telemetry_config()["database_path"]
+
+    now = time.time() if now is None else now
+    query = "SELECT game_id, launch_start, ready_time, exit_time, reset_reason, outcome FROM sessions WHERE launch_start >= ?"
+    params = [since or 0]
+    if game_id:
+        query += " AND game_id = ?"
+        params.append(game_id)
+
+    connection = _connect(database_path)
+    try:
+        rows = connection.execute(query, params).fetchall()
+    finally:
+        connection.close()
+
+    games = {}
+    for game, launch_start, ready_time, exit_time, reset_reason, outcome in rows:
+        entry = games.setdefault(game, {"launches": 0, "failures": 0, "pending": 0, "resets": 0, "launch_times": [], "session_times": []})
+        entry["launches"] += 1
+        if reset_reason:
+            entry["resets"] += 1
+        if ready_time is None:
+            # Only a launch that ended without becoming ready is a failure
+            ended = outcome or exit_time or reset_reason or now - launch_start > PENDING_LAUNCH_SECONDS
+            entry["failures" if ended else "pending"] += 1
+            continue
+        entry["launch_times"].append(ready_time - launch_start)
+        if exit_time:
+            entry["session_times"].append(exit_time - ready_time)
+
+    stats = []
+    for game in sorted(games):
+        entry = games[game]
+        launch_times = sorted(entry["launch_times"])
+        session_times = sorted(entry["session_times"])
+        stats.append({
+            "game_id": game,
+            "launches": entry["launches"],
+            "failures": entry["failures"],
+            "pending": entry["pending"],
+            "resets": entry["resets"],
+            "p50": _percentile(launch_times, 50),
+            "p95": _percentile(launch_times, 95),
+            "median_session": _percentile(session_times, 50),
+        })
+    return stats
+
+def print_report(stats):
+    """
+    Print a launch time report as a table.
+
+    Args:
+        stats (list): Output of get_launch_stats().
+
+    Returns:
+        None
+    """
+    def seconds(value):
+        return f"{value:.2f}s" if value is not None else "-"
+
+    print(f"{'Game':<24} {'Launches':>8} {'Failed':>6} {'Resets':>6} {'p50':>8} {'p95':>8} {'Session':>9}")
+    for entry in stats:
+        print(
+            f"{entry['game_id']:<24} {entry['launches']:>8} {entry['failures']:>6} {entry['resets']:>6} "
+            f"{seconds(entry['p50']):>8} {seconds(entry['p95']):>8} {seconds(entry['median_session']):>9}"
+        )
+
+def main():
+    """
+    Print launch statistics from the session database.
+
+    Command-line Arguments:
+        report: Print p50/p95 launch time per game.
+        --days: Only include launches from the last DAYS days.
+        --game: Only include one game.
+        --database: Read a specific database file.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description='Report game launch times from the session history.')
+    parser.add_argument('command', choices=['report'], help='Report to print')
+    parser.add_argument('--days', type=float, default=None, help='Only include launches from the last DAYS days')
+    parser.add_argument('--game', default=None, help='Only include this game')
+    parser.add_argument('--database', default=None, help='Path to the session database')
+    args = parser.parse_args()
+
+    since = time.time() - args.days * 86400 if args.days else None
+    print_report(get_launch_stats(since, args.game, args.database))
+
+if __name__ == "__main__":
+    main()
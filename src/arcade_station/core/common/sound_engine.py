@@ -0,0 +1,818 @@
+"""
+Sound Engine Module for Arcade Station.
+
+This module plays short sound effects from inside the calling process. The
+configured WAV files are decoded once into memory, and every play hands the
+decoded samples straight to the audio device, so a click or shutter sound
+no longer costs a PowerShell, afplay or mpg123 process and the hundreds of
+milliseconds it takes to start one. Sounds can overlap up to a fixed number
+of voices.
+
+Backends:
+
+- winmm: Windows waveOut through ctypes, one output handle per voice
+- alsa: Linux libasound through ctypes, one PCM stream per voice
+- command: starts afplay, paplay or aplay per sound (macOS, or as a fallback)
+- null: plays nothing and records each play, for headless machines and tests
+
+Any component can play a sample by name:
+
+    from arcade_station.core.common.sound_engine import play_sound
+    play_sound("shutter")
+
+Samples and settings are read from the [sounds] section of
+default_config.toml. Relative sample paths are resolved from the
+installation directory.
+
+Usage:
+    python sound_engine.py list
+    python sound_engine.py play NAME [--backend BACKEND]
+"""
+
+import os
+import sys
+import time
+import wave
+import array
+import ctypes
+import ctypes.util
+import argparse
+import threading
+import subprocess
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import load_toml_config, log_message
+
+# Defaults used when default_config.toml does not configure sounds
+DEFAULT_SOUND_SETTINGS = {
+    "enabled": True,
+    "backend": "auto",
+    "volume": 1.0,
+    "max_voices": 8,
+    "hotkey": "",
+    "reset": "",
+}
+
+DEFAULT_SAMPLES = {
+    "click": "assets/sounds/megatouch_click.wav",
+    "shutter": "assets/sounds/megatouch_shutter.wav",
+    "yahoo": "assets/sounds/megatouch_yahoo.wav",
+}
+
+VALID_BACKENDS = ("auto", "winmm", "alsa", "command", "null")
+
+# Installation directory that relative sample paths are resolved from
+BASE_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+
+def load_sound_config():
+    """
+    Load the [sounds] settings from default_config.toml.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_SOUND_SETTINGS present,
+              plus a "samples" dict of sample name to absolute path.
+    """
+    settings = dict(DEFAULT_SOUND_SETTINGS)
+    try:
+        config = load_toml_config('default_config.toml').get('sounds', {})
+    except Exception as e:
+        log_message(f"Failed to load sound configuration: {e}", "SOUND")
+        config = {}
+
+    for key in settings:
+        if key in config:
+            settings[key] = config[key]
+
+    if settings["backend"] not in VALID_BACKENDS:
+        log_message(f"Unknown sound backend '{settings['backend']}', using 'auto'", "SOUND")
+        settings["backend"] = "auto"
+
+    samples = dict(config.get('samples', DEFAULT_SAMPLES))
+    settings["samples"] = {name: os.path.join(BASE_DIRECTORY, path) for name, path in samples.items() if path}
+    return settings
+
+class Sample:
+    """
+    A decoded WAV file.
+
+    Attributes:
+        name (str): Name the sample is played by.
+        path (str): The WAV file it was decoded from.
+        channels (int): Number of channels.
+        sample_width (int): Bytes per sample.
+        rate (int): Frames per second.
+        data (bytes): Interleaved PCM frames.
+    """
+
+    def __init__(self, name, path, channels, sample_width, rate, data):
+        self.name = name
+        self.path = path
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+        self.data = data
+        # Set by backends that keep their own copy of the frames
+        self.handle = None
+
+    @property
+    def frames(self):
+        """
+        int: Number of frames in the sample.
+        """
+        return len(self.data) // (self.channels * self.sample_width)
+
+    @property
+    def duration(self):
+        """
+        float: Length of the sample in seconds.
+        """
+        return self.frames / float(self.rate)
+
+def decode_wav(name, path, volume=1.0):
+    """
+    Decode a PCM WAV file into memory.
+
+    Args:
+        name (str): Name the sample is played by.
+        path (str): Path to the WAV file.
+        volume (float): Gain applied once at decode time. Only 16-bit
+                        samples are scaled.
+
+    Returns:
+        Sample: The decoded sample.
+
+    Raises:
+        OSError: If the file cannot be read.
+        wave.Error: If the file is not a PCM WAV file.
+    """
+    with wave.open(path, 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        data = wav.readframes(wav.getnframes())
+
+    if volume != 1.0 and sample_width == 2:
+        samples = array.array('h', data)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        for i, value in enumerate(samples):
+            samples[i] = max(-32768, min(32767, int(value * volume)))
+        if sys.byteorder == "big":
+            samples.byteswap()
+        data = samples.tobytes()
+
+    return Sample(name, path, channels, sample_width, rate, data)
+
+class SoundBackend:
+    """
+    Base class for audio output.
+
+    Subclasses implement play(); prepare(), wait() and close() are optional.
+    """
+
+    name = "base"
+
+    def __init__(self, max_voices=8):
+        """
+        Create the backend.
+
+        Args:
+            max_voices (int): Maximum number of sounds playing at once.
+        """
+        self.max_voices = max(1, max_voices)
+
+    def prepare(self, sample):
+        """
+        Get a decoded sample ready for playback.
+
+        Args:
+            sample (Sample): The decoded sample.
+
+        Returns:
+            None
+        """
+
+    def play(self, sample):
+        """
+        Start playing a sample without waiting for it to finish.
+
+        Args:
+            sample (Sample): A prepared sample.
+
+        Returns:
+            bool: True if playback started.
+        """
+        raise NotImplementedError
+
+    def wait(self, timeout=None):
+        """
+        Wait for playing sounds to finish.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            None
+        """
+
+    def close(self):
+        """
+        Stop playback and release the audio device.
+
+        Returns:
+            None
+        """
+
+class NullBackend(SoundBackend):
+    """
+    Backend that plays nothing.
+
+    Every play is recorded in played as (sample name, perf_counter time) so
+    headless machines and tests can check which sounds were triggered.
+    """
+
+    name = "null"
+
+    def __init__(self, max_voices=8):
+        super().__init__(max_voices)
+        self.played = []
+        self._lock = threading.Lock()
+
+    def play(self, sample):
+        with self._lock:
+            self.played.append((sample.name, time.perf_counter()))
+        return True
+
+class ThreadedVoiceBackend(SoundBackend):
+    """
+    Backend that plays each sound on its own short-lived thread.
+
+    Subclasses implement _play_blocking(). A voice that would exceed
+    max_voices is dropped.
+    """
+
+    def __init__(self, max_voices=8):
+        super().__init__(max_voices)
+        self._voices = threading.BoundedSemaphore(self.max_voices)
+        self._threads = set()
+        self._lock = threading.Lock()
+
+    def play(self, sample):
+        if not self._voices.acquire(blocking=False):
+            log_message(f"All {self.max_voices} voices busy, dropping {sample.name}", "SOUND")
+            return False
+
+        thread = threading.Thread(target=self._voice, args=(sample,), name="SoundVoice", daemon=True)
+        with self._lock:
+            self._threads.add(thread)
+        thread.start()
+        return True
+
+    def _voice(self, sample):
+        """
+        Play one sample, then free its voice.
+
+        Args:
+            sample (Sample): The sample to play.
+
+        Returns:
+            None
+        """
+        try:
+            self._play_blocking(sample)
+        except Exception as e:
+            log_message(f"Error playing {sample.name}: {e}", "SOUND")
+        finally:
+            with self._lock:
+                self._threads.discard(threading.current_thread())
+            self._voices.release()
+
+    def _play_blocking(self, sample):
+        """
+        Play a sample and return when it has finished.
+
+        Args:
+            sample (Sample): The sample to play.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                threads = list(self._threads)
+            if not threads:
+                return
+            for thread in threads:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                thread.join(remaining)
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+class AlsaBackend(ThreadedVoiceBackend):
+    """
+    Linux backend that writes samples to the ALSA default device.
+
+    Each voice opens its own PCM stream, so overlapping sounds are mixed by
+    the sound server or ALSA's dmix plugin.
+    """
+
+    name = "alsa"
+
+    SND_PCM_STREAM_PLAYBACK = 0
+    SND_PCM_ACCESS_RW_INTERLEAVED = 3
+    # ALSA sample formats for 8, 16, 24 (packed) and 32-bit little-endian PCM
+    PCM_FORMATS = {1: 1, 2: 2, 3: 32, 4: 10}
+    LATENCY_US = 50000
+
+    def __init__(self, max_voices=8, device="default"):
+        """
+        Load libasound.
+
+        Args:
+            max_voices (int): Maximum number of sounds playing at once.
+            device (str): ALSA device name.
+
+        Raises:
+            OSError: If libasound is not installed.
+        """
+        super().__init__(max_voices)
+        self.device = device.encode()
+        library = ctypes.util.find_library('asound') or 'libasound.so.2'
+        self._lib = ctypes.CDLL(library)
+        self._lib.snd_pcm_open.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_char_p, ctypes.c_int, ctypes.c_int]
+        self._lib.snd_pcm_set_params.argtypes = [
+            ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_uint, ctypes.c_uint, ctypes.c_int, ctypes.c_uint
+        ]
+        self._lib.snd_pcm_writei.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_ulong]
+        self._lib.snd_pcm_writei.restype = ctypes.c_long
+        self._lib.snd_pcm_recover.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+        self._lib.snd_pcm_drain.argtypes = [ctypes.c_void_p]
+        self._lib.snd_pcm_close.argtypes = [ctypes.c_void_p]
+
+    def prepare(self, sample):
+        if sample.sample_width not in self.PCM_FORMATS:
+            raise ValueError(f"unsupported sample width {sample.sample_width}")
+        # Keep the frames in a C buffer so voices can write them without copying
+        sample.handle = ctypes.create_string_buffer(sample.data, len(sample.data))
+
+    def _play_blocking(self, sample):
+        pcm = ctypes.c_void_p()
+        error = self._lib.snd_pcm_open(ctypes.byref(pcm), self.device, self.SND_PCM_STREAM_PLAYBACK, 0)
+        if error < 0:
+            raise OSError(f"snd_pcm_open failed ({error})")
+
+        try:
+            error = self._lib.snd_pcm_set_params(
+                pcm,
+                self.PCM_FORMATS[sample.sample_width],
+                self.SND_PCM_ACCESS_RW_INTERLEAVED,
+                sample.channels,
+                sample.rate,
+                1,
+                self.LATENCY_US
+            )
+            if error < 0:
+                raise OSError(f"snd_pcm_set_params failed ({error})")
+
+            frame_bytes = sample.channels * sample.sample_width
+            address = ctypes.addressof(sample.handle)
+            offset = 0
+            total = sample.frames
+            while offset < total:
+                written = self._lib.snd_pcm_writei(pcm, address + offset * frame_bytes, total - offset)
+                if written < 0:
+                    if self._lib.snd_pcm_recover(pcm, written, 1) < 0:
+                        raise OSError(f"snd_pcm_writei failed ({written})")
+                    continue
+                offset += written
+            self._lib.snd_pcm_drain(pcm)
+        finally:
+            self._lib.snd_pcm_close(pcm)
+
+class WAVEFORMATEX(ctypes.Structure):
+    _fields_ = [
+        ("wFormatTag", ctypes.c_ushort),
+        ("nChannels", ctypes.c_ushort),
+        ("nSamplesPerSec", ctypes.c_uint),
+        ("nAvgBytesPerSec", ctypes.c_uint),
+        ("nBlockAlign", ctypes.c_ushort),
+        ("wBitsPerSample", ctypes.c_ushort),
+        ("cbSize", ctypes.c_ushort),
+    ]
+
+class WAVEHDR(ctypes.Structure):
+    _fields_ = [
+        ("lpData", ctypes.c_void_p),
+        ("dwBufferLength", ctypes.c_uint),
+        ("dwBytesRecorded", ctypes.c_uint),
+        ("dwUser", ctypes.c_size_t),
+        ("dwFlags", ctypes.c_uint),
+        ("dwLoops", ctypes.c_uint),
+        ("lpNext", ctypes.c_void_p),
+        ("reserved", ctypes.c_size_t),
+    ]
+
+class WinmmBackend(SoundBackend):
+    """
+    Windows backend that writes samples to waveOut handles.
+
+    Every voice opens its own handle on the default device, which Windows
+    mixes. waveOutWrite() returns immediately; finished voices are closed by
+    a reaper thread, and the oldest voice is stopped when all are busy.
+    """
+
+    name = "winmm"
+
+    WAVE_MAPPER = 0xFFFFFFFF
+    WAVE_FORMAT_PCM = 1
+    WHDR_DONE = 0x00000001
+    REAP_INTERVAL = 0.05
+
+    def __init__(self, max_voices=8):
+        """
+        Load winmm.dll and start the reaper thread.
+
+        Args:
+            max_voices (int): Maximum number of sounds playing at once.
+
+        Raises:
+            OSError: If winmm.dll cannot be loaded.
+        """
+        super().__init__(max_voices)
+        self._winmm = ctypes.WinDLL('winmm')
+        self._voices = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._reaper = threading.Thread(target=self._reap_loop, name="SoundReaper", daemon=True)
+        self._reaper.start()
+
+    def prepare(self, sample):
+        sample.handle = ctypes.create_string_buffer(sample.data, len(sample.data))
+
+    def play(self, sample):
+        with self._lock:
+            if len(self._voices) >= self.max_voices:
+                self._stop_voice(self._voices.pop(0))
+
+        block_align = sample.channels * sample.sample_width
+        wave_format = WAVEFORMATEX(
+            self.WAVE_FORMAT_PCM,
+            sample.channels,
+            sample.rate,
+            sample.rate * block_align,
+            block_align,
+            sample.sample_width * 8,
+            0
+        )
+        device = ctypes.c_void_p()
+        result = self._winmm.waveOutOpen(ctypes.byref(device), ctypes.c_uint(self.WAVE_MAPPER), ctypes.byref(wave_format), None, None, 0)
+        if result != 0:
+            log_message(f"waveOutOpen failed ({result}) for {sample.name}", "SOUND")
+            return False
+
+        header = WAVEHDR()
+        header.lpData = ctypes.addressof(sample.handle)
+        header.dwBufferLength = len(sample.data)
+        self._winmm.waveOutPrepareHeader(device, ctypes.byref(header), ctypes.sizeof(header))
+        result = self._winmm.waveOutWrite(device, ctypes.byref(header), ctypes.sizeof(header))
+        if result != 0:
+            log_message(f"waveOutWrite failed ({result}) for {sample.name}", "SOUND")
+            self._stop_voice((device, header))
+            return False
+
+        with self._lock:
+            self._voices.append((device, header))
+        return True
+
+    def _stop_voice(self, voice):
+        """
+        Stop a voice and close its handle.
+
+        Args:
+            voice (tuple): (device handle, WAVEHDR) of the voice.
+
+        Returns:
+            None
+        """
+        device, header = voice
+        self._winmm.waveOutReset(device)
+        self._winmm.waveOutUnprepareHeader(device, ctypes.byref(header), ctypes.sizeof(header))
+        self._winmm.waveOutClose(device)
+
+    def _reap_loop(self):
+        """
+        Close the handles of voices that finished playing.
+
+        Returns:
+            None
+        """
+        while not self._closed.wait(self.REAP_INTERVAL):
+            with self._lock:
+                finished = [voice for voice in self._voices if voice[1].dwFlags & self.WHDR_DONE]
+                self._voices = [voice for voice in self._voices if not voice[1].dwFlags & self.WHDR_DONE]
+            for voice in finished:
+                self._stop_voice(voice)
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            with self._lock:
+                if not self._voices:
+                    return
+            time.sleep(self.REAP_INTERVAL)
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            voices, self._voices = self._voices, []
+        for voice in voices:
+            self._stop_voice(voice)
+
+class CommandBackend(ThreadedVoiceBackend):
+    """
+    Backend that starts a command-line player for every sound.
+
+    Used on macOS and wherever no in-process backend is available; each play
+    still costs a process, but it never blocks the caller.
+    """
+
+    name = "command"
+
+    def __init__(self, max_voices=8):
+        super().__init__(max_voices)
+        self._command = self._find_command()
+
+    @staticmethod
+    def _find_command():
+        """
+        Pick the player command for this platform.
+
+        Returns:
+            list: Command prefix the sample path is appended to.
+        """
+        if sys.platform.startswith('win'):
+            return ['powershell', '-WindowStyle', 'Hidden', '-c']
+        if sys.platform.startswith('darwin'):
+            return ['afplay']
+        for player in ('paplay', 'aplay'):
+            for directory in os.environ.get('PATH', '').split(os.pathsep):
+                if os.path.exists(os.path.join(directory, player)):
+                    return [player, '-q'] if player == 'aplay' else [player]
+        return ['aplay', '-q']
+
+    def _play_blocking(self, sample):
+        if sys.platform.startswith('win'):
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = 0  # 0 means SW_HIDE
+            subprocess.run(
+                self._command + [f'(New-Object Media.SoundPlayer "{sample.path}").PlaySync();'],
+                startupinfo=startupinfo,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+        else:
+            subprocess.run(self._command + [sample.path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def create_backend(name="auto", max_voices=8):
+    """
+    Create an audio backend, falling back to the null backend on failure.
+
+    Args:
+        name (str): One of VALID_BACKENDS.
+        max_voices (int): Maximum number of sounds playing at once.
+
+    Returns:
+        SoundBackend: The backend.
+    """
+    if name == "auto":
+        if sys.platform.startswith('win'):
+            name = "winmm"
+        elif sys.platform.startswith('linux'):
+            name = "alsa" if os.path.exists('/dev/snd') else "null"
+        else:
+            name = "command"
+
+    try:
+        if name == "winmm":
+            return WinmmBackend(max_voices)
+        if name == "alsa":
+            return AlsaBackend(max_voices)
+        if name == "command":
+            return CommandBackend(max_voices)
+    except Exception as e:
+        log_message(f"Sound backend {name} unavailable, sounds are disabled: {e}", "SOUND")
+    return NullBackend(max_voices)
+
+class SoundEngine:
+    """
+    Decoded samples and the backend that plays them.
+
+    Attributes:
+        backend (SoundBackend): The audio output.
+        volume (float): Gain applied when samples are decoded.
+    """
+
+    def __init__(self, backend, volume=1.0):
+        """
+        Create an engine with no samples loaded.
+
+        Args:
+            backend (SoundBackend): The audio output.
+            volume (float): Gain applied when samples are decoded.
+        """
+        self.backend = backend
+        self.volume = volume
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def load(self, name, path):
+        """
+        Decode a WAV file and register it under a name.
+
+        Args:
+            name (str): Name the sample is played by.
+            path (str): Path to the WAV file.
+
+        Returns:
+            bool: True if the sample was loaded.
+        """
+        try:
+            sample = decode_wav(name, path, self.volume)
+            self.backend.prepare(sample)
+        except (OSError, EOFError, ValueError, wave.Error) as e:
+            log_message(f"Failed to load sound {name} from {path}: {e}", "SOUND")
+            return False
+
+        with self._lock:
+            self._samples[name] = sample
+        return True
+
+    def names(self):
+        """
+        Get the names of the loaded samples.
+
+        Returns:
+            list: Sample names in sorted order.
+        """
+        with self._lock:
+            return sorted(self._samples)
+
+    def play(self, name):
+        """
+        Start playing a loaded sample.
+
+        Args:
+            name (str): Name of the sample.
+
+        Returns:
+            bool: True if playback started.
+        """
+        with self._lock:
+            sample = self._samples.get(name)
+        if sample is None:
+            log_message(f"Unknown sound: {name}", "SOUND")
+            return False
+        return self.backend.play(sample)
+
+    def play_file(self, path):
+        """
+        Play a WAV file, decoding it on first use.
+
+        The file is registered under its absolute path, so later plays come
+        from memory.
+
+        Args:
+            path (str): Path to the WAV file.
+
+        Returns:
+            bool: True if playback started.
+        """
+        name = os.path.abspath(path)
+        with self._lock:
+            loaded = name in self._samples
+        if not loaded and not self.load(name, name):
+            return False
+        return self.play(name)
+
+    def wait(self, timeout=None):
+        """
+        Wait for playing sounds to finish.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            None
+        """
+        self.backend.wait(timeout)
+
+    def close(self):
+        """
+        Stop playback and release the audio device.
+
+        Returns:
+            None
+        """
+        self.backend.close()
+
+_engine = None
+_engine_settings = None
+_engine_lock = threading.Lock()
+
+def get_sound_engine():
+    """
+    Get the process-wide sound engine, loading every configured sample on
+    first use.
+
+    Returns:
+        SoundEngine: The engine. It uses the null backend if sounds are
+                     disabled.
+    """
+    global _engine, _engine_settings
+    with _engine_lock:
+        if _engine is None:
+            settings = load_sound_config()
+            backend_name = settings["backend"] if settings["enabled"] else "null"
+            _engine = SoundEngine(create_backend(backend_name, int(settings["max_voices"])), float(settings["volume"]))
+            for name, path in settings["samples"].items():
+                _engine.load(name, path)
+            _engine_settings = settings
+            log_message(f"Sound engine started with the {_engine.backend.name} backend: {', '.join(_engine.names())}", "SOUND")
+        return _engine
+
+def play_sound(name):
+    """
+    Play a configured sample by name.
+
+    Args:
+        name (str): Name of the sample, such as "shutter".
+
+    Returns:
+        bool: True if playback started.
+    """
+    return get_sound_engine().play(name)
+
+def play_event_sound(event):
+    """
+    Play the sample configured for a station event, if any.
+
+    Args:
+        event (str): A key of the [sounds] section that names a sample, such
+                     as "hotkey" or "reset".
+
+    Returns:
+        bool: True if playback started.
+    """
+    # Reading the config is cheap; starting the engine decodes every sample,
+    # so one-shot callers like the reset scripts only pay for it when needed
+    settings = _engine_settings or load_sound_config()
+    name = settings.get(event)
+    if not name or not settings["enabled"]:
+        return False
+    return get_sound_engine().play(name)
+
+def main():
+    """
+    List or play the configured samples.
+
+    Command-line Arguments:
+        list: Show every configured sample with its format and length.
+        play NAME: Play a sample and wait for it to finish.
+        --backend: Override the configured backend.
+
+    Returns:
+        None. Exits with status code 1 if the sample could not be played.
+    """
+    parser = argparse.ArgumentParser(description='Play Arcade Station sound effects.')
+    parser.add_argument('command', choices=['list', 'play'], help='Action to perform')
+    parser.add_argument('name', nargs='?', default=None, help='Sample to play')
+    parser.add_argument('--backend', choices=VALID_BACKENDS, default=None, help='Override the configured backend')
+    args = parser.parse_args()
+
+    settings = load_sound_config()
+    engine = SoundEngine(create_backend(args.backend or settings["backend"], int(settings["max_voices"])), float(settings["volume"]))
+    for name, path in settings["samples"].items():
+        engine.load(name, path)
+
+    if args.command == 'list':
+        print(f"Backend: {engine.backend.name}")
+        for name in engine.names():
+            sample = engine._samples[name]
+            print(f"{name:<12} {sample.channels}ch {sample.sample_width * 8}-bit {sample.rate} Hz {sample.duration:.2f}s  {sample.path}")
+        return
+
+    started = time.perf_counter()
+    if not args.name or not engine.play(args.name):
+        sys.exit(1)
+    print(f"Playback started in {(time.perf_counter() - started) * 1000:.2f} ms")
+    engine.wait()
+    engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+"""
+Upload Backends Module for Arcade Station.
+
+This module copies screenshot and replay files to a remote store. Every
+backend uploads in fixed-size chunks, records its progress so an
+interrupted upload resumes from the last completed chunk, retries failed
+chunks with exponential backoff and full jitter, and reads the file through
+a shared bandwidth limiter.
+
+Backends:
+
+- local: a directory, typically a mounted NAS share. Chunks are appended to
+  a .part file that is renamed into place when complete.
+- webdav: chunked PUT requests with Content-Range to a .part resource that
+  is moved into place when complete. Servers that reject ranged PUTs get
+  the whole file in one streamed PUT instead.
+- s3: S3-compatible object storage (AWS, MinIO, Backblaze, R2) using
+  multipart uploads signed with AWS Signature Version 4.
+
+Only the standard library is used, so no SDK has to be installed on the
+station.
+"""
+
+import os
+import json
+import time
+import hmac
+import base64
+import random
+import hashlib
+import datetime
+import threading
+import http.client
+import urllib.parse
+import xml.etree.ElementTree as ET
+
+from arcade_station.core.common.core_functions import log_message
+
+# Bytes read from disk and sent per throttling step
+BLOCK_SIZE = 64 * 1024
+
+# S3 rejects multipart parts smaller than this, except the last one
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+class UploadError(Exception):
+    """
+    An upload step failed.
+
+    Attributes:
+        retryable (bool): Whether repeating the step may succeed.
+    """
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by every transfer of a queue.
+
+    The rate is read on every call, so it tightens as soon as a game
+    starts and relaxes when it ends.
+    """
+
+    def __init__(self, bytes_per_second=0, game_bytes_per_second=0, service=None):
+        """
+        Create the limiter.
+
+        Args:
+            bytes_per_second (int): Rate while no game is running; 0 is unlimited.
+            game_bytes_per_second (int): Rate while a game is running; 0 is unlimited.
+            service (BackgroundService, optional): Game mode registration.
+        """
+        self.bytes_per_second = bytes_per_second
+        self.game_bytes_per_second = game_bytes_per_second
+        self.service = service
+        self._lock = threading.Lock()
+        self._allowance = 0.0
+        self._last = time.monotonic()
+
+    def current_rate(self):
+        """
+        Get the rate that applies right now.
+
+        Returns:
+            int: Bytes per second, 0 for unlimited.
+        """
+        if self.service and self.service.game_active:
+            return self.game_bytes_per_second
+        return self.bytes_per_second
+
+    def consume(self, size):
+        """
+        Block until size bytes may be sent.
+
+        Args:
+            size (int): Number of bytes about to be sent.
+
+        Returns:
+            None
+        """
+        while True:
+            rate = self.current_rate()
+            if rate <= 0:
+                return
+            with self._lock:
+                now = time.monotonic()
+                # Allow at most one second of burst after an idle period
+                self._allowance = min(float(rate), self._allowance + (now - self._last) * rate)
+                self._last = now
+                if self._allowance >= size or self._allowance >= rate:
+                    self._allowance -= size
+                    return
+                wait = (min(size, rate) - self._allowance) / rate
+            time.sleep(min(wait, 1.0))
+
+def with_retries(action, description, attempts=5, base_delay=1.0, max_delay=60.0):
+    """
+    Run an upload step, retrying failures with exponential backoff and full jitter.
+
+    Args:
+        action (callable): The step to run.
+        description (str): What the step does, for the log.
+        attempts (int): Maximum number of tries.
+        base_delay (float): Backoff base in seconds.
+        max_delay (float): Backoff cap in seconds.
+
+    Returns:
+        The return value of action.
+
+    Raises:
+        UploadError: If the step failed on every attempt or cannot be retried.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return action()
+        except (UploadError, OSError, http.client.HTTPException) as e:
+            if isinstance(e, UploadError) and not e.retryable or attempt == attempts:
+                raise UploadError(f"{description} failed after {attempt} attempts: {e}", retryable=False)
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            log_message(f"{description} failed ({e}), retrying in {delay:.1f}s", "UPLOAD")
+            time.sleep(delay)
+
+def read_blocks(path, offset, length, limiter):
+    """
+    Read part of a file in throttled blocks.
+
+    Args:
+        path (str): The file to read.
+        offset (int): Byte offset to start at.
+        length (int): Number of bytes to read.
+        limiter (BandwidthLimiter): Throttle applied to each block.
+
+    Yields:
+        bytes: Consecutive blocks of the range.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                raise UploadError(f"{path} shrank during upload", retryable=False)
+            limiter.consume(len(block))
+            remaining -= len(block)
+            yield block
+
+class ResumeStore:
+    """
+    Persistent progress of unfinished uploads, keyed by backend and object key.
+
+    An entry is only reused while the source file keeps the size and mtime
+    it had when the upload started.
+    """
+
+    def __init__(self, path):
+        """
+        Load the store, starting empty if it does not exist.
+
+        Args:
+            path (str): Path to the JSON file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            self._entries = {}
+
+    def get(self, name, source):
+        """
+        Get the progress of an upload.
+
+        Args:
+            name (str): Backend and object key.
+            source (os.stat_result): Current stat of the source file.
+
+        Returns:
+            dict: The saved progress, or an empty dict to start over.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry and entry.get("size") == source.st_size and entry.get("mtime") == source.st_mtime:
+                return dict(entry.get("progress", {}))
+        return {}
+
+    def put(self, name, source, progress):
+        """
+        Save the progress of an upload.
+
+        Args:
+            name (str): Backend and object key.
+            source (os.stat_result): Stat of the source file.
+            progress (dict): Backend-specific progress.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries[name] = {"size": source.st_size, "mtime": source.st_mtime, "progress": progress}
+            self._save()
+
+    def discard(self, name):
+        """
+        Forget an upload that completed or must start over.
+
+        Args:
+            name (str): Backend and object key.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            log_message(f"Failed to write upload progress {self.path}: {e}", "UPLOAD")
+
+class HttpClient:
+    """
+    Keep-alive HTTP connections, one per thread and host.
+    """
+
+    def __init__(self, timeout=30.0):
+        """
+        Create the client.
+
+        Args:
+            timeout (float): Socket timeout in seconds.
+        """
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method, url, body=None, headers=None):
+        """
+        Send a request and read the whole response.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            body (bytes or iterable, optional): Request body. Iterables must
+                                                come with a Content-Length header.
+            headers (dict, optional): Request headers.
+
+        Returns:
+            tuple: (status, headers, body) of the response.
+        """
+        parts = urllib.parse.urlsplit(url)
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        key = (parts.scheme, parts.netloc)
+        connection = connections.get(key)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            connection = connections[key] = connection_class(parts.netloc, timeout=self.timeout)
+
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        try:
+            connection.request(method, target, body=body, headers=headers or {})
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            del connections[key]
+            raise
+
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+            del connections[key]
+        return response.status, {k.lower(): v for k, v in response.getheaders()}, data
+
+class UploadBackend:
+    """
+    Base class of the upload backends.
+
+    Attributes:
+        name (str): The backend name used in configuration.
+        chunk_size (int): Bytes per chunk.
+    """
+
+    name = "base"
+
+    def __init__(self, settings, resume, chunk_size, retry_settings):
+        """
+        Create the backend.
+
+        Args:
+            settings (dict): The backend's configuration table.
+            resume (ResumeStore): Progress of unfinished uploads.
+            chunk_size (int): Bytes per chunk.
+            retry_settings (dict): attempts, base_delay and max_delay for with_retries().
+        """
+        self.settings = settings
+        self.resume = resume
+        self.chunk_size = max(BLOCK_SIZE, int(chunk_size))
+        self.retry_settings = retry_settings
+
+    def retry(self, action, description):
+        return with_retries(action, description, **self.retry_settings)
+
+    def upload(self, path, key, limiter):
+        """
+        Upload a file.
+
+        Args:
+            path (str): The file to upload.
+            key (str): Destination key, a relative path with forward slashes.
+            limiter (BandwidthLimiter): Throttle for the transfer.
+
+        Returns:
+            int: Number of bytes sent, excluding resumed chunks.
+        """
+        raise NotImplementedError
+
+class LocalBackend(UploadBackend):
+    """
+    Copies files into a directory, typically a mounted NAS share.
+    """
+
+    name = "local"
+
+    def upload(self, path, key, limiter):
+        root = self.settings.get("path", "")
+        if not root:
+            raise UploadError("No local upload path configured", retryable=False)
+
+        source = os.stat(path)
+        destination = os.path.join(root, *key.split("/"))
+        part_path = destination + ".part"
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+        name = f"{self.name}:{key}"
+        progress = self.resume.get(name, source)
+        offset = progress.get("offset", 0)
+        try:
+            if os.path.getsize(part_path) < offset:
+                offset = 0
+        except OSError:
+            offset = 0
+
+        sent = 0
+        while offset < source.st_size:
+            length = min(self.chunk_size, source.st_size - offset)
+
+            def write_chunk(offset=offset, length=length):
+                with open(part_path, 'r+b' if offset else 'wb') as f:
+                    f.seek(offset)
+                    f.truncate()
+                    for block in read_blocks(path, offset, length, limiter):
+                        f.write(block)
+
+            self.retry(write_chunk, f"Copying {key} at {offset}")
+            offset += length
+            sent += length
+            self.resume.put(name, source, {"offset": offset})
+
+        if source.st_size == 0:
+            open(part_path, 'wb').close()
+        os.replace(part_path, destination)
+        self.resume.discard(name)
+        return sent
+
+class WebDavBackend(UploadBackend):
+    """
+    Uploads to a WebDAV collection with ranged PUT requests.
+    """
+
+    name = "webdav"
+
+    def __init__(self, settings, resume, chunk_size, retry_settings, client=None):
+        super().__init__(settings, resume, chunk_size, retry_settings)
+        self.client = client or HttpClient()
+        self.base_url = settings.get("url", "").rstrip("/")
+        self._collections = set()
+        self._collections_lock = threading.Lock()
+        self._ranged_put = True
+
+    def _headers(self, extra=None):
+        headers = dict(extra or {})
+        username = self.settings.get("username", "")
+        if username:
+            token = base64.b64encode(f"{username}:{self.settings.get('password', '')}".encode()).decode()
+            headers["Authorization"] = f"Basic {token}"
+        return headers
+
+    def _url(self, key):
+        return f"{self.base_url}/{urllib.parse.quote(key)}"
+
+    def _request(self, method, url, body=None, headers=None, ok=(200, 201, 204)):
+        status, response_headers, data = self.client.request(method, url, body, self._headers(headers))
+        if status not in ok:
+            # Client errors other than timeouts and throttling will not fix themselves
+            retryable = status >= 500 or status in (408, 429)
+            raise UploadError(f"{method} {url} returned {status}", retryable=retryable)
+        return status, response_headers
+
+    def _make_collections(self, key):
+        parts = key.split("/")[:-1]
+        for depth in range(1, len(parts) + 1):
+            collection = "/".join(parts[:depth])
+            with self._collections_lock:
+                if collection in self._collections:
+                    continue
+            # 405 means the collection already exists
+            self.retry(lambda: self._request("MKCOL", self._url(collection) + "/", ok=(200, 201, 405)), f"Creating {collection}")
+            with self._collections_lock:
+                self._collections.add(collection)
+
+    def _put_whole(self, path, url, size, limiter):
+        self._request("PUT", url, read_blocks(path, 0, size, limiter), {"Content-Length": str(size)})
+
+    def upload(self, path, key, limiter):
+        if not self.base_url:
+            raise UploadError("No WebDAV url configured", retryable=False)
+
+        source = os.stat(path)
+        url = self._url(key)
+        self._make_collections(key)
+
+        if source.st_size <= self.chunk_size or not self._ranged_put:
+            self.retry(lambda: self._put_whole(path, url, source.st_size, limiter), f"Uploading {key}")
+            return source.st_size
+
+        name = f"{self.name}:{key}"
+        part_url = url + ".part"
+        offset = 0
+        if self.resume.get(name, source):
+            # The server's copy of the part is the authority on how much arrived
+            try:
+                status, headers = self._request("HEAD", part_url, ok=(200, 404))
+                if status == 200:
+                    offset = int(headers.get("content-length", 0)) // self.chunk_size * self.chunk_size
+            except (UploadError, OSError, http.client.HTTPException, ValueError):
+                offset = 0
+
+        sent = 0
+        while offset < source.st_size:
+            length = min(self.chunk_size, source.st_size - offset)
+            headers = {
+                "Content-Length": str(length),
+                "Content-Range": f"bytes {offset}-{offset + length - 1}/{source.st_size}",
+            }
+
+            def put_chunk(offset=offset, length=length, headers=headers):
+                self._request("PUT", part_url, read_blocks(path, offset, length, limiter), headers)
+
+            try:
+                self.retry(put_chunk, f"Uploading {key} at {offset}")
+            except UploadError as e:
+                if offset or "returned 400" not in str(e) and "returned 501" not in str(e):
+                    raise
+                log_message("WebDAV server rejected a ranged PUT, uploading whole files", "UPLOAD")
+                self._ranged_put = False
+                self.retry(lambda: self._put_whole(path, url, source.st_size, limiter), f"Uploading {key}")
+                return source.st_size
+
+            offset += length
+            sent += length
+            self.resume.put(name, source, {"offset": offset})
+
+        self.retry(
+            lambda: self._request("MOVE", part_url, headers={"Destination": url, "Overwrite": "T"}),
+            f"Finishing {key}"
+        )
+        self.resume.discard(name)
+        return sent
+
+class S3Backend(UploadBackend):
+    """
+    Uploads to S3-compatible object storage with multipart uploads.
+    """
+
+    name = "s3"
+
+    def __init__(self, settings, resume, chunk_size, retry_settings, client=None):
+        super().__init__(settings, resume, max(chunk_size, S3_MIN_PART_SIZE), retry_settings)
+        self.client = client or HttpClient()
+        self.endpoint = settings.get("endpoint", "").rstrip("/")
+        self.bucket = settings.get("bucket", "")
+        self.region = settings.get("region", "us-east-1")
+        self.prefix = settings.get("prefix", "").strip("/")
+
+    def _sign(self, method, path, query, payload_hash):
+        """
+        Build the AWS Signature Version 4 headers for a request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): URL-encoded request path.
+            query (dict): Query parameters.
+            payload_hash (str): Hex SHA-256 of the body, or UNSIGNED-PAYLOAD.
+
+        Returns:
+            dict: Headers to send with the request.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = now.strftime("%Y%m%d")
+        host = urllib.parse.urlsplit(self.endpoint).netloc
+
+        canonical_query = "&".join(
+            f"{urllib.parse.quote(k, safe='-_.~')}={urllib.parse.quote(str(v), safe='-_.~')}"
+            for k, v in sorted(query.items())
+        )
+        canonical_headers = f"host:{host}\nx-amz-content-sha256:{payload_hash}\nx-amz-date:{amz_date}\n"
+        signed_headers = "host;x-amz-content-sha256;x-amz-date"
+        canonical_request = "\n".join([method, path, canonical_query, canonical_headers, signed_headers, payload_hash])
+
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+
+        key = f"AWS4{self.settings.get('secret_key', '')}".encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        return {
+            "x-amz-date": amz_date,
+            "x-amz-content-sha256": payload_hash,
+            "Authorization": (
+                f"AWS4-HMAC-SHA256 Credential={self.settings.get('access_key', '')}/{scope}, "
+                f"SignedHeaders={signed_headers}, Signature={signature}"
+            ),
+        }
+
+    def _request(self, method, key, query=None, body=b"", ok=None):
+        query = query or {}
+        path = urllib.parse.quote(f"/{self.bucket}/{key}", safe="/-_.~")
+        headers = self._sign(method, path, query, hashlib.sha256(body).hexdigest())
+        headers["Content-Length"] = str(len(body))
+
+        url = self.endpoint + path
+        if query:
+            url += "?" + "&".join(
+                f"{urllib.parse.quote(k, safe='-_.~')}={urllib.parse.quote(str(v), safe='-_.~')}" if v != "" else k
+                for k, v in sorted(query.items())
+            )
+        status, response_headers, data = self.client.request(method, url, body or None, headers)
+        # Any 2xx is success unless the caller lists the statuses it accepts
+        if not (status in ok if ok else 200 <= status < 300):
+            retryable = status >= 500 or status in (408, 429)
+            raise UploadError(f"{method} {key} returned {status}: {data[:200]!r}", retryable=retryable)
+        return status, response_headers, data
+
+    @staticmethod
+    def _xml_text(data, tag):
+        for element in ET.fromstring(data).iter():
+            if element.tag.rsplit("}", 1)[-1] == tag:
+                return element.text
+        return None
+
+    def _read_chunk(self, path, offset, length, limiter):
+        # Parts are signed with their hash, so each one is read into memory
+        return b"".join(read_blocks(path, offset, length, limiter))
+
+    def upload(self, path, key, limiter):
+        if not self.endpoint or not self.bucket:
+            raise UploadError("No S3 endpoint or bucket configured", retryable=False)
+
+        source = os.stat(path)
+        object_key = f"{self.prefix}/{key}" if self.prefix else key
+
+        if source.st_size <= self.chunk_size:
+            self.retry(
+                lambda: self._request("PUT", object_key, body=self._read_chunk(path, 0, source.st_size, limiter)),
+                f"Uploading {key}"
+            )
+            return source.st_size
+
+        name = f"{self.name}:{object_key}"
+        progress = self.resume.get(name, source)
+        upload_id = progress.get("upload_id")
+        parts = {int(number): etag for number, etag in progress.get("parts", {}).items()}
+        if not upload_id:
+            _, _, data = self.retry(lambda: self._request("POST", object_key, {"uploads": ""}), f"Starting {key}")
+            upload_id = self._xml_text(data, "UploadId")
+            if not upload_id:
+                raise UploadError(f"No upload id returned for {key}", retryable=False)
+            parts = {}
+            self.resume.put(name, source, {"upload_id": upload_id, "parts": {}})
+
+        sent = 0
+        count = (source.st_size + self.chunk_size - 1) // self.chunk_size
+        for number in range(1, count + 1):
+            if number in parts:
+                continue
+            offset = (number - 1) * self.chunk_size
+            length = min(self.chunk_size, source.st_size - offset)
+
+            def put_part(number=number, offset=offset, length=length):
+                body = self._read_chunk(path, offset, length, limiter)
+                _, headers, _ = self._request("PUT", object_key, {"partNumber": number, "uploadId": upload_id}, body)
+                return headers.get("etag", "")
+
+            try:
+                parts[number] = self.retry(put_part, f"Uploading {key} part {number}/{count}")
+            except UploadError as e:
+                if "returned 404" in str(e):
+                    # The multipart upload expired on the server; start over next time
+                    self.resume.discard(name)
+                raise
+            sent += length
+            self.resume.put(name, source, {"upload_id": upload_id, "parts": {str(n): etag for n, etag in parts.items()}})
+
+        body = "<CompleteMultipartUpload>" + "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{parts[number]}</ETag></Part>" for number in sorted(parts)
+        ) + "</CompleteMultipartUpload>"
+        self.retry(lambda: self._request("POST", object_key, {"uploadId": upload_id}, body.encode()), f"Finishing {key}")
+        self.resume.discard(name)
+        return sent
+
+BACKENDS = {
+    LocalBackend.name: LocalBackend,
+    WebDavBackend.name: WebDavBackend,
+    S3Backend.name: S3Backend,
+}
+
+def create_backend(name, settings, resume, chunk_size, retry_settings):
+    """
+    Create an upload backend by name.
+
+    Args:
+        name (str): One of BACKENDS.
+        settings (dict): The backend's configuration table.
+        resume (ResumeStore): Progress of unfinished uploads.
+        chunk_size (int): Bytes per chunk.
+        retry_settings (dict): attempts, base_delay and max_delay for with_retries().
+
+    Returns:
+        UploadBackend: The backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown upload backend '{name}', expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](settings, resume, chunk_size, retry_settings)
@@ -0,0 +1,438 @@
+"""
+Upload Manager Module for Arcade Station.
+
+This module hands the files that appear in an upload directory to an upload
+mechanism and deletes them only once their upload is confirmed. Each file
+moves through these states, kept in a small persistent index so nothing is
+lost or deleted early across restarts:
+
+- new: the file appeared (or changed) and has not been handed off yet
+- handed_off: the file was given to the uploader
+- confirmed: the uploader confirmed the file; it may now be deleted
+- failed: the uploader rejected the file and will not retry it; it is kept
+  and goes back to new if it is rewritten
+
+A file is only handed off once it has stopped changing for settle_seconds,
+and handoffs are batched at most once per handoff_interval. Files that
+arrive after a handoff wait for the next one instead of being deleted with
+the previous batch.
+
+The manager does not poll. It sleeps on operating system change
+notifications for the directory (see directory_watcher.py) with a timeout
+set to the next moment a file is due to settle, be handed off or be
+confirmed, and with no timeout at all when there is nothing to do.
+"""
+
+import os
+import json
+import time
+
+from arcade_station.core.common.core_functions import load_toml_config, log_message
+from arcade_station.core.common.directory_watcher import create_watcher
+
+UPLOAD_INDEX_FILE = "upload_index.json"
+
+# Defaults used when the upload configuration does not set a key
+DEFAULT_UPLOAD_SETTINGS = {
+    "settle_seconds": 5.0,
+    "handoff_interval": 300.0,
+    "confirm_seconds": 120.0,
+    "delete_after_upload": True,
+    "index_path": "",
+}
+
+STATE_NEW = "new"
+STATE_HANDED_OFF = "handed_off"
+STATE_CONFIRMED = "confirmed"
+STATE_FAILED = "failed"
+
+def default_index_path(file_name=UPLOAD_INDEX_FILE):
+    """
+    Get the default path of an upload index, next to the station logs.
+
+    Args:
+        file_name (str): Name of the index file. Each upload service needs
+                         its own index.
+
+    Returns:
+        str: Path to the index file.
+    """
+    try:
+        log_directory = load_toml_config('default_config.toml').get('logging', {}).get('logdirectory', '')
+    except Exception:
+        log_directory = ''
+    return os.path.join(log_directory, file_name) if log_directory else file_name
+
+class UploadIndex:
+    """
+    Persistent record of every file's upload state.
+
+    Entries are keyed by path relative to the upload directory and hold the
+    file's size and mtime when it was last seen, its state and the time it
+    entered that state.
+    """
+
+    def __init__(self, path):
+        """
+        Load the index, starting empty if it does not exist.
+
+        Args:
+            path (str): Path to the index file.
+        """
+        self.path = path
+        self.files = {}
+        self.last_handoff = 0.0
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = dict(data.get("files", {}))
+            self.last_handoff = float(data.get("last_handoff", 0.0))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def update(self, scan, now):
+        """
+        Reconcile the index with a scan of the upload directory.
+
+        New files are added as new, files whose size or mtime changed go
+        back to new, and files that no longer exist are dropped.
+
+        Args:
+            scan (dict): Relative path to (size, mtime) for every file.
+            now (float): The current time.
+
+        Returns:
+            None
+        """
+        for name in list(self.files):
+            if name not in scan:
+                del self.files[name]
+                self._dirty = True
+
+        for name, (size, mtime) in scan.items():
+            entry = self.files.get(name)
+            if entry and entry["size"] == size and entry["mtime"] == mtime:
+                continue
+            if entry and entry["state"] != STATE_NEW:
+                log_message(f"{name} changed after it was handed off, uploading it again", "UPLOAD")
+            self.files[name] = {"size": size, "mtime": mtime, "state": STATE_NEW, "since": now}
+            self._dirty = True
+
+    def in_state(self, state):
+        """
+        Get the files in a state.
+
+        Args:
+            state (str): STATE_NEW, STATE_HANDED_OFF, STATE_CONFIRMED or STATE_FAILED.
+
+        Returns:
+            dict: Relative path to index entry.
+        """
+        return {name: entry for name, entry in self.files.items() if entry["state"] == state}
+
+    def set_state(self, name, state, now):
+        """
+        Move a file to a new state.
+
+        Args:
+            name (str): Relative path of the file.
+            state (str): The new state.
+            now (float): The current time.
+
+        Returns:
+            None
+        """
+        entry = self.files.get(name)
+        if entry and entry["state"] != state:
+            entry["state"] = state
+            entry["since"] = now
+            self._dirty = True
+
+    def remove(self, name):
+        """
+        Forget a file.
+
+        Args:
+            name (str): Relative path of the file.
+
+        Returns:
+            None
+        """
+        if self.files.pop(name, None) is not None:
+            self._dirty = True
+
+    def mark_handoff(self, now):
+        """
+        Record the time of a handoff.
+
+        Args:
+            now (float): The current time.
+
+        Returns:
+            None
+        """
+        self.last_handoff = now
+        self._dirty = True
+
+    def save(self):
+        """
+        Write the index if it changed.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        if not self._dirty:
+            return False
+
+        directory = os.path.dirname(self.path)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"last_handoff": self.last_handoff, "files": self.files}, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            log_message(f"Failed to write upload index {self.path}: {e}", "UPLOAD")
+            return False
+
+        self._dirty = False
+        return True
+
+class UploadManager:
+    """
+    Event-driven loop that hands off, confirms and cleans up uploads.
+
+    The upload mechanism is supplied as two callables:
+
+    - handoff(paths) starts uploading a batch and returns the paths it
+      accepted
+    - confirm(paths), optional, returns the paths whose upload is known to
+      be complete. Without it a file is confirmed confirm_seconds after its
+      handoff.
+    - rejected(paths), optional, returns the paths the uploader gave up on.
+      They are marked failed and no longer polled.
+
+    Attributes:
+        directory (str): The upload directory.
+        index (UploadIndex): Persistent file states.
+        settings (dict): Settings with every key of DEFAULT_UPLOAD_SETTINGS.
+    """
+
+    def __init__(self, directory, handoff, settings, confirm=None, service=None, watcher=None, index=None,
+                 rejected=None):
+        """
+        Create the manager.
+
+        Args:
+            directory (str): The upload directory.
+            handoff (callable): Hands a list of absolute paths to the uploader.
+            settings (dict): Upload settings.
+            confirm (callable, optional): Reports completed uploads.
+            service (BackgroundService, optional): Game mode registration;
+                                                   handoffs wait while it is paused.
+            watcher (DirectoryWatcher, optional): Change notifications.
+                                                  Defaults to create_watcher().
+            index (UploadIndex, optional): State index. Defaults to the
+                                           configured index file.
+            rejected (callable, optional): Reports uploads that will not be retried.
+        """
+        self.directory = os.path.abspath(directory)
+        self.handoff = handoff
+        self.confirm = confirm
+        self.rejected = rejected
+        self.settings = dict(DEFAULT_UPLOAD_SETTINGS)
+        self.settings.update(settings)
+        self.service = service
+        self.watcher = watcher
+        self.index = index or UploadIndex(self.settings["index_path"] or default_index_path())
+        # Earliest retry after the uploader deferred a handoff
+        self.deferred_until = 0.0
+
+    def scan(self):
+        """
+        List every file in the upload directory.
+
+        Returns:
+            dict: Relative path to (size, mtime).
+        """
+        files = {}
+        for root, directories, names in os.walk(self.directory):
+            if self.watcher:
+                for directory in directories:
+                    self.watcher.add(os.path.join(root, directory))
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[os.path.relpath(path, self.directory)] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _hand_off(self, names, now):
+        """
+        Hand settled files to the uploader.
+
+        Args:
+            names (list): Relative paths of the files.
+            now (float): The current time.
+
+        Returns:
+            None
+        """
+        if self.service and self.service.policy == "pause" and self.service.game_active:
+            log_message("Game running, holding uploads until it ends", "UPLOAD")
+            # Returns once the game has ended
+            self.service.sleep(0)
+            return
+
+        log_message(f"Handing off {len(names)} files", "UPLOAD")
+        try:
+            accepted = self.handoff([self._path(name) for name in names]) or []
+        except Exception as e:
+            log_message(f"Upload handoff failed: {e}", "UPLOAD")
+            return
+
+        accepted = set(accepted)
+        if not accepted:
+            # Deferred (for example while a game runs); retry once the files
+            # would have settled again instead of waiting out the interval
+            self.deferred_until = now + self.settings["settle_seconds"]
+            return
+        self.index.mark_handoff(now)
+        for name in names:
+            if self._path(name) in accepted:
+                self.index.set_state(name, STATE_HANDED_OFF, now)
+
+    def _confirm(self, handed_off, now):
+        """
+        Move handed off files whose upload is complete to confirmed, and
+        files the uploader gave up on to failed.
+
+        Args:
+            handed_off (dict): Index entries of handed off files.
+            now (float): The current time.
+
+        Returns:
+            None
+        """
+        if self.confirm:
+            try:
+                confirmed = set(self.confirm([self._path(name) for name in handed_off]) or [])
+            except Exception as e:
+                log_message(f"Upload confirmation failed: {e}", "UPLOAD")
+                return
+            names = [name for name in handed_off if self._path(name) in confirmed]
+        else:
+            names = [name for name, entry in handed_off.items() if now - entry["since"] >= self.settings["confirm_seconds"]]
+
+        for name in names:
+            self.index.set_state(name, STATE_CONFIRMED, now)
+
+        if self.rejected:
+            try:
+                rejected = set(self.rejected([self._path(name) for name in handed_off if name not in names]) or [])
+            except Exception as e:
+                log_message(f"Upload rejection check failed: {e}", "UPLOAD")
+                return
+            for name in handed_off:
+                if self._path(name) in rejected:
+                    log_message(f"Upload of {name} failed permanently, keeping the file", "UPLOAD")
+                    self.index.set_state(name, STATE_FAILED, now)
+
+    def _clean(self):
+        """
+        Delete confirmed files that have not changed since they were confirmed.
+
+        Returns:
+            int: Number of files deleted.
+        """
+        if not self.settings["delete_after_upload"]:
+            return 0
+
+        deleted = 0
+        for name, entry in self.index.in_state(STATE_CONFIRMED).items():
+            path = self._path(name)
+            try:
+                stat = os.stat(path)
+                if stat.st_size != entry["size"] or stat.st_mtime != entry["mtime"]:
+                    # Rewritten after confirmation; the next scan marks it new
+                    continue
+                os.remove(path)
+                deleted += 1
+                log_message(f"Deleted uploaded file: {path}", "UPLOAD")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log_message(f"Failed to delete {path}: {e}", "UPLOAD")
+                continue
+            self.index.remove(name)
+        return deleted
+
+    def run_once(self, now=None):
+        """
+        Process the upload directory once.
+
+        Args:
+            now (float, optional): The current time. Defaults to time.time().
+
+        Returns:
+            float: Seconds until something is next due, or None if nothing
+                   is pending and the manager can wait for a change.
+        """
+        now = time.time() if now is None else now
+        self.index.update(self.scan(), now)
+
+        settle = self.settings["settle_seconds"]
+        new = self.index.in_state(STATE_NEW)
+        settled = [name for name, entry in new.items() if now - entry["mtime"] >= settle and now - entry["since"] >= settle]
+        next_handoff = max(self.index.last_handoff + self.settings["handoff_interval"], self.deferred_until)
+        if settled and now >= next_handoff:
+            self._hand_off(settled, now)
+
+        handed_off = self.index.in_state(STATE_HANDED_OFF)
+        if handed_off:
+            self._confirm(handed_off, now)
+        self._clean()
+        self.index.save()
+
+        # Work out when the next file becomes due
+        next_handoff = max(self.index.last_handoff + self.settings["handoff_interval"], self.deferred_until)
+        deadlines = []
+        for name, entry in self.index.in_state(STATE_NEW).items():
+            settles_at = max(entry["mtime"], entry["since"]) + settle
+            deadlines.append(max(settles_at, next_handoff))
+        for entry in self.index.in_state(STATE_HANDED_OFF).values():
+            deadlines.append(entry["since"] + self.settings["confirm_seconds"] if not self.confirm else now + settle)
+
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - now)
+
+    def run(self):
+        """
+        Process the upload directory until the process exits.
+
+        Returns:
+            None
+        """
+        if not os.path.isdir(self.directory):
+            log_message(f"Upload directory does not exist: {self.directory}", "UPLOAD")
+            return
+
+        if self.watcher is None:
+            self.watcher = create_watcher(self.directory)
+        log_message(f"Watching {self.directory} for uploads", "UPLOAD")
+
+        while True:
+            try:
+                delay = self.run_once()
+            except Exception as e:
+                log_message(f"Error processing uploads: {e}", "UPLOAD")
+                delay = 30.0
+            self.watcher.wait(delay)
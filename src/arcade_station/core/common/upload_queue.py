@@ -0,0 +1,583 @@
+"""
+Upload Queue Module for Arcade Station.
+
+This module offloads screenshots and replays to a NAS directory, a WebDAV
+server or S3-compatible storage without the iCloud desktop client. The
+upload manager watches the upload directory and hands settled files to a
+queue that runs a configurable number of transfers at once through one of
+the backends in upload_backends.py. Files are deleted only after their
+upload completes.
+
+All transfers share one bandwidth limit, which tightens to
+game_bandwidth_kbps while a game is running so uploads do not compete with
+netplay or streaming.
+
+Settings are read from the [upload] section of screenshot_config.toml, with
+one sub-table per backend ([upload.local], [upload.webdav], [upload.s3]).
+
+The bench command measures queue throughput offline against a local HTTP
+stand-in that speaks the subset of WebDAV and S3 the backends use. The
+stand-in can add latency and fail a share of requests to exercise retries.
+
+Usage:
+    python upload_queue.py
+    python upload_queue.py bench [--backend webdav|s3|local] [--files N] [--size-kb KB]
+                                 [--concurrency N] [--latency-ms MS] [--fail-rate RATE]
+                                 [--kbps KBPS]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import urllib.parse
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from arcade_station.core.common.core_functions import load_toml_config, log_message
+from arcade_station.core.common.game_mode import register_background_service
+from arcade_station.core.common.upload_backends import (
+    BandwidthLimiter,
+    ResumeStore,
+    UploadError,
+    create_backend
+)
+from arcade_station.core.common.upload_manager import DEFAULT_UPLOAD_SETTINGS, UploadManager, default_index_path
+
+UPLOAD_QUEUE_INDEX_FILE = "upload_queue_index.json"
+UPLOAD_RESUME_FILE = "upload_resume.json"
+
+# Defaults used when screenshot_config.toml does not configure uploads
+DEFAULT_UPLOAD_QUEUE_SETTINGS = {
+    "enabled": False,
+    "backend": "local",
+    "upload_directory": "",
+    "concurrency": 3,
+    "chunk_kb": 4096,
+    "retries": 5,
+    "retry_base_seconds": 1.0,
+    "retry_max_seconds": 60.0,
+    "bandwidth_kbps": 0,
+    "game_bandwidth_kbps": 256,
+    "resume_path": "",
+}
+
+def load_upload_config():
+    """
+    Load the [upload] settings from screenshot_config.toml.
+
+    Returns:
+        dict: Queue settings with every key of DEFAULT_UPLOAD_QUEUE_SETTINGS
+              and DEFAULT_UPLOAD_SETTINGS, plus the backend tables.
+    """
+    settings = dict(DEFAULT_UPLOAD_SETTINGS)
+    settings.update(DEFAULT_UPLOAD_QUEUE_SETTINGS)
+    try:
+        settings.update(load_toml_config('screenshot_config.toml').get('upload', {}))
+    except Exception as e:
+        log_message(f"Failed to load upload configuration: {e}", "UPLOAD")
+    # Kept apart from the iCloud manager's index, which watches another directory
+    settings["index_path"] = settings["index_path"] or default_index_path(UPLOAD_QUEUE_INDEX_FILE)
+    return settings
+
+def backend_from_settings(settings):
+    """
+    Create the configured backend.
+
+    Args:
+        settings (dict): Settings from load_upload_config().
+
+    Returns:
+        UploadBackend: The backend.
+    """
+    resume_path = settings["resume_path"] or os.path.join(os.path.dirname(default_index_path()), UPLOAD_RESUME_FILE)
+    retry_settings = {
+        "attempts": max(1, int(settings["retries"])),
+        "base_delay": float(settings["retry_base_seconds"]),
+        "max_delay": float(settings["retry_max_seconds"]),
+    }
+    return create_backend(
+        settings["backend"],
+        settings.get(settings["backend"], {}),
+        ResumeStore(resume_path),
+        int(settings["chunk_kb"]) * 1024,
+        retry_settings
+    )
+
+class UploadQueue:
+    """
+    Runs uploads through a backend with a fixed number of concurrent transfers.
+
+    The handoff(), confirm() and rejected() methods plug the queue into
+    UploadManager.
+
+    Attributes:
+        backend (UploadBackend): Where files are uploaded.
+        root (str): Directory that object keys are relative to.
+        limiter (BandwidthLimiter): Throttle shared by every transfer.
+    """
+
+    def __init__(self, backend, root, concurrency=3, limiter=None):
+        """
+        Create the queue.
+
+        Args:
+            backend (UploadBackend): Where files are uploaded.
+            root (str): Directory that object keys are relative to.
+            concurrency (int): Number of transfers to run at once.
+            limiter (BandwidthLimiter, optional): Throttle. Defaults to unlimited.
+        """
+        self.backend = backend
+        self.root = os.path.abspath(root)
+        self.limiter = limiter or BandwidthLimiter()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, int(concurrency)),
+            thread_name_prefix="upload"
+        )
+        self._futures = {}
+        # Paths whose upload failed in a way retrying cannot fix
+        self._rejected = set()
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.completed = 0
+        self.failed = 0
+
+    def key_for(self, path):
+        """
+        Get the object key of a file.
+
+        Args:
+            path (str): Absolute path of the file.
+
+        Returns:
+            str: The path relative to the root, with forward slashes.
+        """
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _upload(self, path):
+        key = self.key_for(path)
+        started = time.perf_counter()
+        try:
+            sent = self.backend.upload(path, key, self.limiter)
+        except (UploadError, OSError) as e:
+            log_message(f"Upload of {key} failed: {e}", "UPLOAD")
+            permanent = (
+                isinstance(e, UploadError) and not e.retryable
+                or isinstance(e, (FileNotFoundError, PermissionError, IsADirectoryError))
+            )
+            with self._lock:
+                self.failed += 1
+                if permanent:
+                    self._rejected.add(path)
+            raise
+
+        with self._lock:
+            self.bytes_sent += sent
+            self.completed += 1
+        log_message(f"Uploaded {key} ({sent} bytes) in {time.perf_counter() - started:.2f}s", "UPLOAD")
+        return sent
+
+    def submit(self, path):
+        """
+        Queue a file for upload, unless it is already queued.
+
+        Args:
+            path (str): Absolute path of the file.
+
+        Returns:
+            concurrent.futures.Future: The pending upload.
+        """
+        with self._lock:
+            future = self._futures.get(path)
+            if future is None or future.done() and future.exception() is not None:
+                self._rejected.discard(path)
+                future = self._futures[path] = self._executor.submit(self._upload, path)
+            return future
+
+    def handoff(self, paths):
+        """
+        Queue a batch of files; used as the UploadManager handoff.
+
+        Args:
+            paths (list): Absolute paths of the files.
+
+        Returns:
+            list: The paths that were queued.
+        """
+        for path in paths:
+            self.submit(path)
+        return list(paths)
+
+    def confirm(self, paths):
+        """
+        Report finished uploads; used as the UploadManager confirmation.
+
+        Failed uploads are queued again, so a file stays handed off until
+        it uploads, unless the failure cannot be fixed by retrying (see
+        rejected()).
+
+        Args:
+            paths (list): Absolute paths of handed off files.
+
+        Returns:
+            list: The paths whose upload completed.
+        """
+        confirmed = []
+        for path in paths:
+            with self._lock:
+                future = self._futures.get(path)
+                if path in self._rejected:
+                    continue
+            if future is None or future.done() and future.exception() is not None:
+                # Not queued by this process (it restarted) or failed
+                self.submit(path)
+            elif future.done():
+                confirmed.append(path)
+                with self._lock:
+                    self._futures.pop(path, None)
+        return confirmed
+
+    def rejected(self, paths):
+        """
+        Report uploads that will not be retried; used as the UploadManager
+        rejection check.
+
+        These failed with a non-retryable backend error (such as 403
+        Forbidden) or because the file could not be read. The queue forgets
+        them, so a file that is rewritten later is uploaded again.
+
+        Args:
+            paths (list): Absolute paths of handed off files.
+
+        Returns:
+            list: The paths that failed permanently.
+        """
+        rejected = []
+        with self._lock:
+            for path in paths:
+                if path in self._rejected:
+                    self._rejected.discard(path)
+                    self._futures.pop(path, None)
+                    rejected.append(path)
+        return rejected
+
+    def wait(self):
+        """
+        Block until every queued upload has finished.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            futures = list(self._futures.values())
+        concurrent.futures.wait(futures)
+
+    def close(self):
+        """
+        Finish queued uploads and stop the workers.
+
+        Returns:
+            None
+        """
+        self._executor.shutdown(wait=True)
+
+def run_upload_queue():
+    """
+    Watch the upload directory and upload new files until the process exits.
+
+    Returns:
+        None
+    """
+    settings = load_upload_config()
+    directory = settings["upload_directory"]
+    if not directory:
+        log_message("No upload directory configured, upload queue not started", "UPLOAD")
+        return
+
+    try:
+        backend = backend_from_settings(settings)
+    except ValueError as e:
+        log_message(str(e), "UPLOAD")
+        return
+
+    service = register_background_service("upload")
+    limiter = BandwidthLimiter(
+        int(settings["bandwidth_kbps"]) * 1024,
+        int(settings["game_bandwidth_kbps"]) * 1024,
+        service
+    )
+    queue = UploadQueue(backend, directory, settings["concurrency"], limiter)
+    log_message(
+        f"Uploading {directory} to {backend.name} with {settings['concurrency']} concurrent transfers",
+        "UPLOAD"
+    )
+
+    manager = UploadManager(
+        directory,
+        queue.handoff,
+        settings,
+        confirm=queue.confirm,
+        service=service,
+        rejected=queue.rejected
+    )
+    manager.run()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the stand-in upload server.
+
+    Objects are kept in memory on the server. Signatures and credentials
+    are not checked.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _prepare(self):
+        """
+        Read the request body and apply the simulated latency and failures.
+
+        Returns:
+            tuple: (path, query, body), or None if the request was failed.
+        """
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        self.server.received_bytes += len(body)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.fail_rate and random.random() < self.server.fail_rate:
+            self._reply(503)
+            return None
+        parts = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parts.query, keep_blank_values=True))
+        return urllib.parse.unquote(parts.path), query, body
+
+    def do_HEAD(self):
+        request = self._prepare()
+        if request:
+            data = self.server.objects.get(request[0])
+            if data is None:
+                self._reply(404)
+            else:
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+
+    def do_MKCOL(self):
+        if self._prepare():
+            self._reply(201)
+
+    def do_MOVE(self):
+        request = self._prepare()
+        if request:
+            destination = urllib.parse.unquote(urllib.parse.urlsplit(self.headers.get("Destination", "")).path)
+            with self.server.lock:
+                data = self.server.objects.pop(request[0], None)
+                if data is not None:
+                    self.server.objects[destination] = data
+            self._reply(201 if data is not None else 404)
+
+    def do_PUT(self):
+        request = self._prepare()
+        if not request:
+            return
+        path, query, body = request
+        with self.server.lock:
+            if "uploadId" in query:
+                upload = self.server.multipart.get(query["uploadId"])
+                if upload is None:
+                    self._reply(404)
+                    return
+                upload[int(query["partNumber"])] = body
+                self._reply(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+                return
+
+            content_range = self.headers.get("Content-Range")
+            if content_range:
+                start = int(content_range.split()[1].split("-")[0])
+                data = self.server.objects.setdefault(path, bytearray())
+                if start > len(data):
+                    self._reply(416)
+                    return
+                del data[start:]
+                data.extend(body)
+            else:
+                self.server.objects[path] = bytearray(body)
+        # S3 answers a plain object PUT with 200, WebDAV with 201 Created
+        self._reply(200 if "x-amz-date" in self.headers else 201)
+
+    def do_POST(self):
+        request = self._prepare()
+        if not request:
+            return
+        path, query, body = request
+        with self.server.lock:
+            if "uploads" in query:
+                upload_id = hashlib.md5(f"{path}{time.perf_counter()}".encode()).hexdigest()
+                self.server.multipart[upload_id] = {}
+                self._reply(200, f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>".encode())
+                return
+            upload = self.server.multipart.pop(query.get("uploadId", ""), None)
+            if upload is None:
+                self._reply(404)
+                return
+            self.server.objects[path] = bytearray(b"".join(upload[number] for number in sorted(upload)))
+        self._reply(200, b"<CompleteMultipartUploadResult></CompleteMultipartUploadResult>")
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Local HTTP server standing in for a WebDAV or S3 endpoint.
+
+    Attributes:
+        objects (dict): Stored objects by request path.
+        received_bytes (int): Request body bytes received.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, fail_rate=0.0):
+        """
+        Bind to a free port on the loopback interface.
+
+        Args:
+            latency (float): Seconds added to every request.
+            fail_rate (float): Share of requests answered with 503.
+        """
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.objects = {}
+        self.multipart = {}
+        self.lock = threading.Lock()
+        self.received_bytes = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+def run_bench(args):
+    """
+    Measure queue throughput against the stand-in server.
+
+    Args:
+        args (argparse.Namespace): Parsed bench arguments.
+
+    Returns:
+        bool: True if every file was uploaded without failures and arrived intact.
+    """
+    source_dir = tempfile.mkdtemp(prefix="upload_bench_")
+    target_dir = tempfile.mkdtemp(prefix="upload_bench_target_")
+    server = StandInServer(args.latency_ms / 1000.0, args.fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        paths = []
+        digests = {}
+        for index in range(args.files):
+            path = os.path.join(source_dir, "bench", f"shot_{index:04d}.jpg")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = os.urandom(args.size_kb * 1024)
+            with open(path, 'wb') as f:
+                f.write(data)
+            paths.append(path)
+            digests[path] = hashlib.sha256(data).hexdigest()
+
+        settings = dict(DEFAULT_UPLOAD_QUEUE_SETTINGS)
+        settings.update({
+            "backend": args.backend,
+            "chunk_kb": args.chunk_kb,
+            "retry_base_seconds": 0.05,
+            "retry_max_seconds": 1.0,
+            "resume_path": os.path.join(target_dir, UPLOAD_RESUME_FILE),
+            "local": {"path": target_dir},
+            "webdav": {"url": f"{server.url}/dav"},
+            "s3": {"endpoint": server.url, "bucket": "arcade", "access_key": "bench", "secret_key": "bench"},
+        })
+        backend = backend_from_settings(settings)
+        queue = UploadQueue(backend, source_dir, args.concurrency, BandwidthLimiter(args.kbps * 1024))
+
+        started = time.perf_counter()
+        futures = [queue.submit(path) for path in paths]
+        concurrent.futures.wait(futures)
+        elapsed = time.perf_counter() - started
+        queue.close()
+
+        intact = 0
+        for path in paths:
+            key = queue.key_for(path)
+            if args.backend == "local":
+                try:
+                    with open(os.path.join(target_dir, *key.split("/")), 'rb') as f:
+                        data = f.read()
+                except OSError:
+                    data = None
+            else:
+                data = server.objects.get(f"/dav/{key}" if args.backend == "webdav" else f"/arcade/{key}")
+            if data is not None and hashlib.sha256(bytes(data)).hexdigest() == digests[path]:
+                intact += 1
+
+        total_mib = args.files * args.size_kb / 1024.0
+        print(f"Backend: {args.backend}, {args.concurrency} concurrent transfers, {args.chunk_kb} KiB chunks")
+        print(f"Stand-in: {args.latency_ms:.0f} ms latency, {args.fail_rate:.0%} failed requests")
+        print(f"Uploaded {queue.completed}/{args.files} files ({total_mib:.1f} MiB) in {elapsed:.2f}s")
+        print(f"Throughput: {total_mib / elapsed if elapsed else 0.0:.1f} MiB/s")
+        print(f"Intact: {intact}/{args.files}, failed: {queue.failed}")
+        return intact == args.files and queue.completed == args.files and not queue.failed
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(source_dir, ignore_errors=True)
+        shutil.rmtree(target_dir, ignore_errors=True)
+
+def main():
+    """
+    Run the upload queue, or benchmark it.
+
+    Command-line Arguments:
+        bench: Measure throughput against a local stand-in server.
+
+    Returns:
+        None. The bench command exits with status code 1 if any upload
+        failed or any file did not arrive intact.
+    """
+    parser = argparse.ArgumentParser(description='Upload new screenshots and replays to a NAS, WebDAV or S3.')
+    parser.add_argument('--identifier', help='Process identifier, set by launch_script')
+    subparsers = parser.add_subparsers(dest='command')
+    bench = subparsers.add_parser('bench', help='Measure throughput against a local stand-in server')
+    bench.add_argument('--backend', choices=('webdav', 's3', 'local'), default='webdav', help='Backend to measure')
+    bench.add_argument('--files', type=int, default=20, help='Number of files to upload')
+    bench.add_argument('--size-kb', type=int, default=2048, help='Size of each file in KiB')
+    bench.add_argument('--chunk-kb', type=int, default=DEFAULT_UPLOAD_QUEUE_SETTINGS["chunk_kb"], help='Chunk size in KiB')
+    bench.add_argument('--concurrency', type=int, default=DEFAULT_UPLOAD_QUEUE_SETTINGS["concurrency"], help='Concurrent transfers')
+    bench.add_argument('--latency-ms', type=float, default=20.0, help='Latency the stand-in adds to every request')
+    bench.add_argument('--fail-rate', type=float, default=0.0, help='Share of requests the stand-in fails with 503')
+    bench.add_argument('--kbps', type=int, default=0, help='Bandwidth limit in KiB/s, 0 for unlimited')
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        if not run_bench(args):
+            sys.exit(1)
+        return
+
+    run_upload_queue()
+
+if __name__ == "__main__":
+    main()
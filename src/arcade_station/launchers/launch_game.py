@@ -33,58 +33,34 @@ from arcade_station.core.common.core_functions import (
     run_powershell_script
 )
 from arcade_station.core.common.light_control import launch_mame_lights
+from arcade_station.core.common.launch_readiness import (
+    LaunchTimeline,
+    get_launch_settings,
+    find_game_process,
+    wait_for_process_alive,
+    wait_for_game_ready,
+    focus_process_window
+)
+from arcade_station.core.common.launch_mame import launch_mame, resolve_mame_executable
+from arcade_station.core.common.prewarm import start_prewarm
+from arcade_station.core.common.launch_lock import acquire_launch_lock
+from arcade_station.core.common.session_store import (
+    load_telemetry_config,
+    start_session,
+    record_launch_result,
+    record_exit
+)
+from arcade_station.core.common.process_tuning import (
+    get_performance_profile,
+    apply_performance_profile
+)
 from arcade_station.core.common.display_image import display_image
+from arcade_station.core.common.asset_store import resolve_asset
+from arcade_station.core.common.game_mode import clear_game_active, set_game_active
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def set_process_priority(pid, priority="high"):
-    """
-    Set the priority of a process to improve performance and responsiveness.
-    
-    Adjusts the operating system's scheduling priority for the specified process,
-    which can help ensure games receive appropriate CPU time and resources.
-    
-    Args:
-        pid (int): Process ID of the target process.
-        priority (str): Priority level to set. Options are "low", "below_normal",
-                       "normal", "above_normal", "high", or "realtime".
-                       Defaults to "high".
-    
-    Returns:
-        bool: True if priority was set successfully, False otherwise.
-        
-    Note:
-        Setting a process to "realtime" priority can cause system instability
-        and should be used with caution.
-    """
-    try:
-        if not pid:
-            return False
-            
-        process = psutil.Process(pid)
-        
-        # Map priority levels to psutil constants
-        priority_map = {
-            "low": psutil.IDLE_PRIORITY_CLASS,
-            "below_normal": psutil.BELOW_NORMAL_PRIORITY_CLASS,
-            "normal": psutil.NORMAL_PRIORITY_CLASS,
-            "above_normal": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
-            "high": psutil.HIGH_PRIORITY_CLASS,
-            "realtime": psutil.REALTIME_PRIORITY_CLASS
-        }
-        
-        # Set priority if valid level
-        if priority in priority_map:
-            process.nice(priority_map[priority])
-            log_message(f"Set process {pid} priority to {priority}", "GAME")
-            return True
-            
-        return False
-    except Exception as e:
-        log_message(f"Failed to set process priority: {e}", "GAME")
-        return False
-
 def force_window_focus():
     """
     Force Windows to refresh window focus by simulating Alt key press.
@@ -113,147 +89,354 @@ def force_window_focus():
     except Exception as e:
         log_message(f"Failed to force window focus: {e}", "GAME")
 
-def launch_game(game_name):
+def _launch_mame_game(game_config):
     """
-    Launch a game from the Arcade Station configuration.
+    Start a MAME game.
     
-    This is the main function for launching games from the Arcade Station frontend.
-    It handles different game types (MAME ROMs, standalone executables, etc.),
-    displays appropriate marquee/banner images, manages the Pegasus frontend
-    lifecycle, and sets up the environment for optimal game performance.
+    By default MAME is started directly as a child process using the command
+    line built from mame_config.toml. Setting ``launcher = "powershell"`` in
+    the [mame] section uses the start_mame.ps1 helper script instead.
     
     Args:
-        game_name (str): The name of the game to launch, as defined in the
-                        installed_games.toml configuration file.
+        game_config (dict): The game's entry from installed_games.toml.
     
     Returns:
-        None
+        tuple: (process, executable_path, direct) where process is the
+               subprocess.Popen for MAME or the PowerShell helper (or None on
+               failure), executable_path is the full path to the MAME
+               executable and direct is True if process is MAME itself.
+    """
+    rom = game_config['rom']
+    state = game_config.get('state', '')
+    log_message(f"Launching MAME game - ROM: {rom}, State: {state}", "GAME_LAUNCH")
+    
+    # Load MAME configuration
+    mame_config = load_mame_config()
+    log_message(f"Loaded MAME config: {mame_config}", "GAME")
+    mame_settings = mame_config['mame']
+    executable_full_path = resolve_mame_executable(mame_settings)
+    launcher = mame_settings.get('launcher', 'native')
+    
+    # Launch MAME lights if configured
+    launch_mame_lights()
+    
+    if launcher != "powershell" or platform.system() != "Windows":
+        process = launch_mame(rom, state, mame_settings)
+        if not process:
+            log_message(f"Failed to start MAME for game: {rom}", "GAME_LAUNCH")
+        return process, executable_full_path, True
+    
+    mame_script = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'core', 'windows', 'start_mame.ps1'))
+    
+    # Log the full script path for troubleshooting
+    log_message(f"MAME script path: {mame_script}", "GAME_LAUNCH")
+    
+    # Pass parameters to PowerShell script
+    process = run_powershell_script(
+        script_path=mame_script,
+        params={
+            "ROM": rom, 
+            "State": state,
+            "ExecutablePath": os.path.dirname(executable_full_path), 
+            "Executable": os.path.basename(executable_full_path), 
+            "IniPath": mame_settings['ini_path']
+        }
+    )
+    
+    if process:
+        log_message(f"Started MAME launcher for game: {rom}", "GAME_LAUNCH")
+    else:
+        log_message(f"Failed to get process handle for MAME game: {rom}", "GAME_LAUNCH")
+    
+    return process, executable_full_path, False
+
+def _launch_binary_game(game_path):
+    """
+    Start a standalone game executable.
+    
+    On Windows the game is started silently through PowerShell, so no process
+    handle is returned and the game process must be located afterwards. On
+    other platforms the game is started directly.
+    
+    Args:
+        game_path (str): Full path to the game executable.
+    
+    Returns:
+        subprocess.Popen: The game process on non-Windows platforms, otherwise None.
         
-    Note:
-        This function will:
-        1. Display a game-specific banner/marquee if configured
-        2. Kill the Pegasus frontend if necessary
-        3. Launch the game with appropriate parameters
-        4. Set process priority for better performance
-        5. Handle platform-specific window focus issues
+    Raises:
+        Exception: If the game could not be started.
     """
-    # Log game launch attempt with timestamp
-    log_message(f"Attempting to launch game: {game_name}", "GAME_LAUNCH")
+    # Change the working directory to the directory of the executable
+    game_dir = os.path.dirname(game_path)
+    
+    # Check if we're on Windows and use PowerShell if so
+    if platform.system() == "Windows":
+        # Log detailed info about game launch
+        log_message(f"Launching via PowerShell - Path: {game_path}, Dir: {game_dir}", "GAME_LAUNCH")
+        
+        # Use PowerShell to start the process
+        success = start_process_with_powershell(
+            file_path=game_path,
+            working_dir=game_dir
+        )
+        
+        if not success:
+            log_message("Failed to start game with PowerShell", "GAME_LAUNCH")
+            raise Exception("Failed to start game with PowerShell")
+        
+        log_message(f"Successfully launched game via PowerShell: {game_path}", "GAME_LAUNCH")
+        return None
+    
+    # For non-Windows platforms, use the original approach
+    log_message(f"Launching via subprocess on non-Windows platform", "GAME_LAUNCH")
+    os.chdir(game_dir)
+    process = subprocess.Popen(game_path)
+    log_message(f"Successfully launched game via subprocess: {game_path}", "GAME_LAUNCH")
+    return process
+
+def _wait_for_launch(timeline, game_name, settings, profile, executable_path, launcher_process=None, direct=False, session_id=None):
+    """
+    Drive the post-spawn launch stages using readiness signals.
+    
+    Waits for the game process to be alive, then for it to become ready,
+    then forces window focus and finally tears down the Pegasus frontend.
+    If the game never comes up or exits during startup, the frontend is
+    left running so the player is not stranded on a black screen.
+    
+    Args:
+        timeline (LaunchTimeline): Timeline recording stage durations.
+        game_name (str): The game being launched.
+        settings (dict): Launch settings from get_launch_settings().
+        profile (dict): Performance profile from get_performance_profile().
+        executable_path (str): Full path to the game executable.
+        launcher_process (subprocess.Popen, optional): The spawned process.
+        direct (bool): True if launcher_process is the game itself rather
+                       than an intermediate launcher.
+        session_id (str, optional): Telemetry session id, published with
+                                    the game session.
+    
+    Returns:
+        psutil.Process: The running game process, or None if the launch failed.
+    """
+    poll_interval = settings["poll_interval"]
+    
+    # Stage: the game process exists and is running
+    if direct and launcher_process:
+        game_process = wait_for_process_alive(
+            launcher_process.pid, settings["alive_timeout"], poll_interval
+        )
+    else:
+        game_process = find_game_process(
+            executable_path,
+            parent_pid=launcher_process.pid if launcher_process else None,
+            started_after=timeline.started_at,
+            timeout=settings["alive_timeout"],
+            poll_interval=poll_interval
+        )
+    timeline.mark("alive")
+    
+    if not game_process:
+        timeline.outcome = "not_started"
+        log_message(f"Game process did not start within {settings['alive_timeout']}s: {executable_path}", "GAME_LAUNCH")
+        return None
+    
+    log_message(f"Game process is alive with PID: {game_process.pid}", "GAME_LAUNCH")
+    apply_performance_profile(game_process.pid, profile)
+    timeline.mark("tuning")
+    
+    # Stage: the game has a window or has reached the activity threshold
+    ready_signal = wait_for_game_ready(game_process, settings)
+    timeline.mark("ready")
+    log_message(f"Game readiness signal: {ready_signal}", "GAME_LAUNCH")
+    
+    if ready_signal == "exited":
+        timeline.outcome = "exited_during_startup"
+        log_message("Game exited during startup, keeping the frontend running", "GAME_LAUNCH")
+        return None
+    
+    # Stage: hand focus to the game window, falling back to the Alt key nudge
+    if platform.system() == "Windows" and not focus_process_window(game_process):
+        force_window_focus()
+    timeline.mark("focus")
+    
+    # Stage: tear down the frontend now that the game owns the screen
+    kill_pegasus()
+    timeline.mark("frontend_teardown")
+    
+    # Publish the session so background services throttle themselves
+    set_game_active(game_name, game_process.pid, session_id, timeline.started_at)
+    
+    timeline.outcome = f"ready:{ready_signal}"
+    return game_process
+
+def _supervise_game(game_process, launcher_process=None):
+    """
+    Block until a launched game exits.
+    
+    Args:
+        game_process (psutil.Process): The running game process.
+        launcher_process (subprocess.Popen, optional): The spawned process,
+                                                       reaped directly if it
+                                                       is the game itself.
+    
+    Returns:
+        int: The game's exit code, or None if it could not be determined
+             (for example, a game that is not a child process on Linux).
+    """
+    try:
+        if launcher_process is not None and launcher_process.pid == game_process.pid:
+            return launcher_process.wait()
+        return game_process.wait()
+    except psutil.NoSuchProcess:
+        return None
+    except Exception as e:
+        log_message(f"Failed to wait for game exit: {e}", "GAME_LAUNCH")
+        return None
+
+def _run_launch(game_name):
+    """
+    Run the launch stages for a game while the launch lock is held.
+    
+    Args:
+        game_name (str): The name of the game to launch.
+    
+    Returns:
+        tuple: (timeline, session_id, game_process, process) where game_process
+               is the running game (None if the launch failed) and process is
+               the spawned process. None if the game could not be launched at all.
+    """
+    timeline = LaunchTimeline(game_name)
     
     # Load game configuration
     config = load_game_config()
     game_config = config['games'].get(game_name, {})    
+    
+    # Pull the game's files into the page cache while the banner and spawn run
+    prewarmer = start_prewarm(game_name, game_config) if game_name in config['games'] else None
+    
     # Check if dynamic marquee is enabled
     display_config = load_toml_config('display_config.toml')
     dynamic_marquee_enabled = display_config.get('dynamic_marquee', {}).get('enabled', False)
     
     # Display banner if configured
     if dynamic_marquee_enabled and 'banner' in game_config:
-        banner_path = game_config['banner']
+        banner_path = resolve_asset(game_config['banner']) if game_config['banner'] else None
         if banner_path and os.path.exists(banner_path):
             logging.debug(f"Displaying banner: {banner_path}")
             kill_process_by_identifier("marquee_image")  # Use standardized identifier
             display_image(banner_path, display_config['display']['background_color'])
+    timeline.mark("banner")
+    
+    if game_name not in config['games']:
+        log_message(f"Game '{game_name}' not found in configuration.", "GAME_LAUNCH")
+        return None
+    
+    game_config = config['games'][game_name]
+    settings = get_launch_settings(game_config)
+    profile = get_performance_profile(game_config)
+    session_id = start_session(game_name, timeline.started_at)
+    process = None
+    game_process = None
     
-    # Existing logic to launch the game...
-    if game_name in config['games']:
-        game_config = config['games'][game_name]
-        if isinstance(game_config, dict) and 'rom' in game_config:
-            # MAME game logic
-            rom = game_config['rom']
-            state = game_config.get('state', '')
-            log_message(f"Launching MAME game - ROM: {rom}, State: {state}", "GAME_LAUNCH")
-            mame_script = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'core', 'windows', 'start_mame.ps1'))
-            
-            # Log the full script path for troubleshooting
-            log_message(f"MAME script path: {mame_script}", "GAME_LAUNCH")
-            
-            # Load MAME configuration
-            mame_config = load_mame_config()
-            log_message(f"Loaded MAME config: {mame_config}", "GAME")
-            executable_path = mame_config['mame']['executable_path']
-            executable = mame_config['mame']['executable']
-            ini_path = mame_config['mame']['ini_path']
-            
-            # If executable_path includes the executable name, strip it
-            if executable_path.endswith(executable):
-                executable_path = os.path.dirname(executable_path)
-            
-            # Launch MAME lights if configured
-            launch_mame_lights()
-            
-            # Pass parameters to PowerShell script
-            process = run_powershell_script(
-                script_path=mame_script,
-                params={
-                    "ROM": rom, 
-                    "State": state,
-                    "ExecutablePath": executable_path, 
-                    "Executable": executable, 
-                    "IniPath": ini_path
-                }
+    if isinstance(game_config, dict) and 'rom' in game_config:
+        # MAME game logic
+        process, executable_path, direct = _launch_mame_game(game_config)
+        timeline.mark("spawn")
+        if process:
+            game_process = _wait_for_launch(
+                timeline, game_name, settings, profile, executable_path,
+                launcher_process=process, direct=direct, session_id=session_id
             )
-            
-            # Set priority and force focus
-            if process:
-                set_process_priority(process.pid, "high")
-                log_message(f"Successfully launched MAME game: {rom}", "GAME_LAUNCH")
-            else:
-                log_message(f"Failed to get process handle for MAME game: {rom}", "GAME_LAUNCH")
-            
-            # Give process time to start and then force window focus
-            time.sleep(2)
-            force_window_focus()
-            
-            # Kill Pegasus after launching the game
-            kill_pegasus()
         else:
-            # Binary game logic
-            game_path = game_config.get('path', '') if isinstance(game_config, dict) else game_config
-            if game_path and os.path.exists(game_path):
-                log_message(f"Launching binary game: {game_path}", "GAME_LAUNCH")
-                try:
-                    # Change the working directory to the directory of the executable
-                    game_dir = os.path.dirname(game_path)
-                    
-                    # Check if we're on Windows and use PowerShell if so
-                    if platform.system() == "Windows":
-                        # Log detailed info about game launch
-                        log_message(f"Launching via PowerShell - Path: {game_path}, Dir: {game_dir}", "GAME_LAUNCH")
-                        
-                        # Use PowerShell to start the process
-                        success = start_process_with_powershell(
-                            file_path=game_path,
-                            working_dir=game_dir
-                        )
-                        
-                        if not success:
-                            log_message("Failed to start game with PowerShell", "GAME_LAUNCH")
-                            raise Exception("Failed to start game with PowerShell")
-                        else:
-                            log_message(f"Successfully launched game via PowerShell: {game_path}", "GAME_LAUNCH")
-                    else:
-                        # For non-Windows platforms, use the original approach
-                        log_message(f"Launching via subprocess on non-Windows platform", "GAME_LAUNCH")
-                        os.chdir(game_dir)
-                        process = subprocess.Popen(game_path)
-                        # Set priority
-                        set_process_priority(process.pid, "high")
-                        log_message(f"Successfully launched game via subprocess: {game_path}", "GAME_LAUNCH")
-                    
-                    # Give process time to start and then force window focus
-                    time.sleep(2)
-                    force_window_focus()
-                    
-                except Exception as e:
-                    log_message(f"Failed to launch game: {e}", "GAME_LAUNCH")
-                
-                # Kill Pegasus after launching the game
-                kill_pegasus()
-            else:
-                log_message(f"Game path not found or invalid: {game_path}", "GAME_LAUNCH")
+            timeline.outcome = "spawn_failed"
     else:
-        log_message(f"Game '{game_name}' not found in configuration.", "GAME_LAUNCH")
+        # Binary game logic
+        game_path = game_config.get('path', '') if isinstance(game_config, dict) else game_config
+        if not (game_path and os.path.exists(game_path)):
+            log_message(f"Game path not found or invalid: {game_path}", "GAME_LAUNCH")
+            if prewarmer:
+                prewarmer.cancel()
+            timeline.outcome = "invalid_path"
+            record_launch_result(session_id, timeline)
+            return None
+        
+        log_message(f"Launching binary game: {game_path}", "GAME_LAUNCH")
+        try:
+            process = _launch_binary_game(game_path)
+            timeline.mark("spawn")
+            game_process = _wait_for_launch(
+                timeline, game_name, settings, profile, game_path,
+                launcher_process=process, direct=process is not None,
+                session_id=session_id
+            )
+        except Exception as e:
+            timeline.outcome = "spawn_failed"
+            log_message(f"Failed to launch game: {e}", "GAME_LAUNCH")
+    
+    # The game now reads its own files; stop prewarming so it never competes
+    if prewarmer:
+        prewarmer.cancel()
+    
+    timeline.log_summary()
+    record_launch_result(session_id, timeline)
+    return timeline, session_id, game_process, process
+
+def launch_game(game_name):
+    """
+    Launch a game from the Arcade Station configuration.
+    
+    This is the main function for launching games from the Arcade Station frontend.
+    It handles different game types (MAME ROMs, standalone executables, etc.),
+    displays appropriate marquee/banner images, manages the Pegasus frontend
+    lifecycle, and sets up the environment for optimal game performance.
+    
+    Args:
+        game_name (str): The name of the game to launch, as defined in the
+                        installed_games.toml configuration file.
+    
+    Returns:
+        LaunchTimeline: The recorded stage durations for this launch, or None
+                        if the game is not configured or the request was
+                        dropped because of another launch.
+        
+    Note:
+        This function will:
+        1. Take the station-wide launch lock, dropping repeated requests
+        2. Display a game-specific banner/marquee if configured
+        3. Launch the game with appropriate parameters
+        4. Wait for the game process to be alive and ready
+        5. Apply the game's performance profile and handle window focus
+        6. Kill the Pegasus frontend once the game is ready
+        7. Record the session and, if telemetry supervision is enabled,
+           stay running until the game exits to record its exit code
+    """
+    # Log game launch attempt with timestamp
+    log_message(f"Attempting to launch game: {game_name}", "GAME_LAUNCH")
+    
+    # Serialize launches so repeated Start presses cannot race each other
+    lock = acquire_launch_lock(game_name)
+    if lock is None:
+        return None
+    
+    result = None
+    try:
+        result = _run_launch(game_name)
+    finally:
+        # A failed launch must not make the player's retry look like a repeat press
+        lock.release(launched=result is not None and result[2] is not None)
+    
+    if result is None:
+        return None
+    
+    timeline, session_id, game_process, process = result
+    if game_process and load_telemetry_config()["supervise"]:
+        exit_code = _supervise_game(game_process, process)
+        log_message(f"Game [{game_name}] exited with code: {exit_code}", "GAME_LAUNCH")
+        record_exit(session_id, exit_code)
+        clear_game_active("exit", pid=game_process.pid)
+    
+    return timeline
 
 if __name__ == "__main__":
     # Check if a game name was provided as a command-line argument
@@ -23,6 +23,7 @@ from arcade_station.core.common.core_functions import (
     kill_process_by_identifier
 )
 from arcade_station.core.common.display_image import display_image
+from arcade_station.core.common.game_mode import register_background_service
 
 def ensure_required_packages():
     """
@@ -164,6 +165,9 @@ def monitor_itgmania_log(config_path='display_config.toml'):
         
         log_message(f"Monitoring ITGMania log file: {log_file}", "BANNER")
         
+        # Follow the station's game mode policy while games are running
+        service = register_background_service("itgmania_monitor")
+        
         # Main monitoring loop
         while True:
             try:
@@ -209,7 +213,7 @@ def monitor_itgmania_log(config_path='display_config.toml'):
                 log_message(f"Error monitoring ITGMania log file: {str(e)}", "BANNER")
             
             # Sleep to prevent high CPU usage
-            time.sleep(0.5)
+            service.sleep(0.5)
             
     except Exception as e:
         log_message(f"Failed to monitor ITGMania log file: {str(e)}", "BANNER")
@@ -0,0 +1,820 @@
+"""
+Input Backends for the Arcade Station Key Listener.
+
+The key listener turns input events into hotkey presses for the dispatcher.
+Each input source is a backend with the same interface, so a cabinet can
+use whichever inputs it actually has:
+
+- keyboard: the global hook from the `keyboard` package (the original
+  behaviour; needs root on Linux)
+- evdev: reads /dev/input/event* devices directly on Linux, blocking in
+  select() on the device file descriptors instead of polling. Handles
+  keyboards, pads and arcade button encoders
+- joystick: gamepad and joystick buttons through the Linux joystick API
+  (/dev/input/js*, blocking in select()) or winmm on Windows
+- replay: feeds a recorded event stream, so dispatch latency and CPU use
+  can be measured on a headless machine
+
+Except for the keyboard backend, bindings are chords: a binding fires when
+its last button is pressed while the others are held. Button names follow
+the keyboard package where a key has one ("ctrl", "space", "f9", "+") and
+use evdev names for pad buttons ("btn_start", "btn_select", "btn_tl") or
+"button<N>" for joystick buttons, for example:
+
+    [key_mappings]
+    "ctrl+space" = "builtin:reset"
+    "btn_start+btn_select" = "builtin:reset"
+    "button8+button9" = "builtin:kill_all"
+
+Backends are chosen in the [input] section of key_listener.toml. Events
+seen by the evdev and joystick backends can be recorded to a file in the
+replay format, one JSON object per line:
+
+    {"t": 0.512, "name": "btn_start", "down": true}
+
+Usage:
+    python input_backends.py replay <events.jsonl> [--speed SPEED] [--repeat N] [--execute]
+    python input_backends.py record <events.jsonl> [--backend evdev|joystick] [--seconds SECONDS]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import select
+import struct
+import ctypes
+import argparse
+import threading
+
+# Add the parent directory to the Python path to allow relative module imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from arcade_station.core.common.core_functions import load_toml_config, log_message
+
+# Defaults used when key_listener.toml does not configure input
+DEFAULT_INPUT_SETTINGS = {
+    "backends": ["keyboard"],
+    "evdev_devices": [],
+    "joystick_devices": [],
+    "joystick_poll_interval": 0.01,
+    "replay_file": "",
+    "replay_speed": 1.0,
+    "replay_repeat": 1,
+    "record_file": "",
+}
+
+# Linux input event types and the struct layouts of the two device APIs
+EV_KEY = 0x01
+INPUT_EVENT_FORMAT = "llHHi"
+INPUT_EVENT_SIZE = struct.calcsize(INPUT_EVENT_FORMAT)
+JS_EVENT_FORMAT = "IhBB"
+JS_EVENT_SIZE = struct.calcsize(JS_EVENT_FORMAT)
+JS_EVENT_BUTTON = 0x01
+JS_EVENT_INIT = 0x80
+
+# evdev key codes, named the way the keyboard package names them
+EVDEV_KEY_NAMES = {
+    1: "esc", 2: "1", 3: "2", 4: "3", 5: "4", 6: "5", 7: "6", 8: "7", 9: "8",
+    10: "9", 11: "0", 12: "-", 13: "=", 14: "backspace", 15: "tab",
+    16: "q", 17: "w", 18: "e", 19: "r", 20: "t", 21: "y", 22: "u", 23: "i",
+    24: "o", 25: "p", 26: "[", 27: "]", 28: "enter", 29: "ctrl",
+    30: "a", 31: "s", 32: "d", 33: "f", 34: "g", 35: "h", 36: "j", 37: "k",
+    38: "l", 39: ";", 40: "'", 41: "`", 42: "shift", 43: "\\",
+    44: "z", 45: "x", 46: "c", 47: "v", 48: "b", 49: "n", 50: "m",
+    51: ",", 52: ".", 53: "/", 54: "shift", 55: "*", 56: "alt", 57: "space",
+    58: "caps lock", 59: "f1", 60: "f2", 61: "f3", 62: "f4", 63: "f5",
+    64: "f6", 65: "f7", 66: "f8", 67: "f9", 68: "f10", 69: "num lock",
+    70: "scroll lock", 71: "7", 72: "8", 73: "9", 74: "-", 75: "4", 76: "5",
+    77: "6", 78: "+", 79: "1", 80: "2", 81: "3", 82: "0", 83: ".",
+    87: "f11", 88: "f12", 96: "enter", 97: "ctrl", 98: "/", 100: "alt",
+    102: "home", 103: "up", 104: "page up", 105: "left", 106: "right",
+    107: "end", 108: "down", 109: "page down", 110: "insert", 111: "delete",
+    125: "windows", 126: "windows",
+    0x120: "btn_trigger", 0x121: "btn_thumb", 0x122: "btn_thumb2",
+    0x123: "btn_top", 0x124: "btn_top2", 0x125: "btn_pinkie",
+    0x126: "btn_base", 0x127: "btn_base2", 0x128: "btn_base3",
+    0x129: "btn_base4", 0x12a: "btn_base5", 0x12b: "btn_base6",
+    0x130: "btn_south", 0x131: "btn_east", 0x132: "btn_c",
+    0x133: "btn_north", 0x134: "btn_west", 0x135: "btn_z",
+    0x136: "btn_tl", 0x137: "btn_tr", 0x138: "btn_tl2", 0x139: "btn_tr2",
+    0x13a: "btn_select", 0x13b: "btn_start", 0x13c: "btn_mode",
+    0x13d: "btn_thumbl", 0x13e: "btn_thumbr",
+}
+
+# Alternative spellings accepted in key_listener.toml
+NAME_ALIASES = {
+    "control": "ctrl",
+    "left ctrl": "ctrl",
+    "right ctrl": "ctrl",
+    "left shift": "shift",
+    "right shift": "shift",
+    "left alt": "alt",
+    "right alt": "alt",
+    "alt gr": "alt",
+    "return": "enter",
+    "escape": "esc",
+    "win": "windows",
+    "cmd": "windows",
+    "command": "windows",
+    "del": "delete",
+    "plus": "+",
+    "btn_a": "btn_south",
+    "btn_b": "btn_east",
+    "btn_x": "btn_north",
+    "btn_y": "btn_west",
+}
+
+def evdev_key_name(code):
+    """
+    Get the binding name for an evdev key or button code.
+
+    Args:
+        code (int): The EV_KEY event code.
+
+    Returns:
+        str: The key name, or "code_<n>" for codes without a name.
+    """
+    if code in EVDEV_KEY_NAMES:
+        return EVDEV_KEY_NAMES[code]
+    if 0x100 <= code <= 0x109:
+        return f"btn_{code - 0x100}"
+    if 0x2c0 <= code <= 0x2e7:
+        return f"btn_trigger_happy{code - 0x2c0 + 1}"
+    return f"code_{code}"
+
+def parse_hotkey(hotkey):
+    """
+    Split a hotkey string into the set of names that make up its chord.
+
+    A "+" on its own (or doubled, as in "ctrl++") is the plus key.
+
+    Args:
+        hotkey (str): The hotkey from key_listener.toml.
+
+    Returns:
+        frozenset: Normalized names that must all be held.
+    """
+    parts = hotkey.lower().split('+')
+    names = {NAME_ALIASES.get(part.strip(), part.strip()) for part in parts if part.strip()}
+    if '' in parts:
+        names.add('+')
+    return frozenset(names)
+
+def load_input_config(toml_file_path='key_listener.toml'):
+    """
+    Load the [input] settings from the key listener configuration.
+
+    Args:
+        toml_file_path (str): Name of the key listener TOML file.
+
+    Returns:
+        dict: Settings with every key from DEFAULT_INPUT_SETTINGS present.
+    """
+    settings = dict(DEFAULT_INPUT_SETTINGS)
+    try:
+        config = load_toml_config(toml_file_path).get('input', {})
+    except Exception as e:
+        log_message(f"Failed to load input configuration: {e}", "INPUT")
+        config = {}
+
+    for key, value in config.items():
+        if key in settings:
+            settings[key] = value
+
+    return settings
+
+class InputBackend:
+    """
+    Base class for input backends.
+
+    A backend is bound to a set of hotkeys and a callback, then started.
+    The callback is called as callback(hotkey, hook_time) where hook_time is
+    the time.perf_counter() value of the input event.
+
+    Attributes:
+        name (str): Backend name used in key_listener.toml.
+        settings (dict): Settings from load_input_config().
+    """
+
+    name = "base"
+
+    def __init__(self, settings):
+        """
+        Create the backend.
+
+        Args:
+            settings (dict): Settings from load_input_config().
+        """
+        self.settings = settings
+        self.callback = None
+        self.hotkeys = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def bind(self, hotkeys, callback):
+        """
+        Set the hotkeys this backend reports and the function to call.
+
+        Args:
+            hotkeys (iterable): Hotkey strings from key_listener.toml.
+            callback (callable): Called with (hotkey, hook_time) on a press.
+
+        Returns:
+            None
+        """
+        self.hotkeys = list(hotkeys)
+        self.callback = callback
+
+    def start(self):
+        """
+        Start delivering hotkey presses from a daemon thread.
+
+        Returns:
+            None
+        """
+        self._thread = threading.Thread(target=self._run_safely, name=f"input-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _run_safely(self):
+        """
+        Run the backend loop, logging any failure.
+
+        Returns:
+            None
+        """
+        try:
+            self.run()
+        except Exception as e:
+            log_message(f"Input backend {self.name} stopped: {e}", "INPUT")
+
+    def run(self):
+        """
+        Read input until stopped. Implemented by each backend.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def stop(self):
+        """
+        Ask the backend to stop.
+
+        Returns:
+            None
+        """
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        """
+        Wait for the backend thread to finish.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            None
+        """
+        if self._thread:
+            self._thread.join(timeout)
+
+class KeyboardBackend(InputBackend):
+    """
+    Global keyboard hook from the `keyboard` package.
+    """
+
+    name = "keyboard"
+
+    def start(self):
+        """
+        Register each hotkey with the keyboard hook.
+
+        Hotkeys the keyboard package does not understand (such as pad
+        button chords) are left to the other backends.
+
+        Returns:
+            None
+        """
+        import keyboard
+
+        for hotkey in self.hotkeys:
+            try:
+                keyboard.add_hotkey(hotkey, lambda hotkey=hotkey: self.callback(hotkey, None))
+            except (ValueError, ImportError) as e:
+                log_message(f"Keyboard backend skipping [{hotkey}]: {e}", "INPUT")
+
+    def stop(self):
+        """
+        Remove the hotkeys registered by this backend.
+
+        Returns:
+            None
+        """
+        import keyboard
+
+        keyboard.unhook_all_hotkeys()
+
+class ChordBackend(InputBackend):
+    """
+    Base class for backends that report individual button events.
+
+    Tracks which buttons are held and fires a binding when the press of its
+    last button completes the chord. Auto-repeat and releases never fire.
+    """
+
+    def __init__(self, settings):
+        """
+        Create the backend.
+
+        Args:
+            settings (dict): Settings from load_input_config().
+        """
+        super().__init__(settings)
+        self._chords = []
+        self._held = {}
+        self._record_file = None
+        self._record_start = None
+        self._wake_write = None
+
+    def bind(self, hotkeys, callback):
+        """
+        Set the hotkeys this backend reports and the function to call.
+
+        Args:
+            hotkeys (iterable): Hotkey strings from key_listener.toml.
+            callback (callable): Called with (hotkey, hook_time) on a press.
+
+        Returns:
+            None
+        """
+        super().bind(hotkeys, callback)
+        self._chords = [(hotkey, parse_hotkey(hotkey)) for hotkey in self.hotkeys]
+
+    def stop(self):
+        """
+        Stop the backend and wake it if it is blocked in select().
+
+        Returns:
+            None
+        """
+        super().stop()
+        if self._wake_write is not None:
+            try:
+                os.write(self._wake_write, b"x")
+            except OSError:
+                pass
+
+    def start_recording(self, path):
+        """
+        Append every event this backend sees to a replay file.
+
+        Args:
+            path (str): File to write JSON lines to.
+
+        Returns:
+            None
+        """
+        self._record_file = open(path, 'a', encoding='utf-8')
+        self._record_start = time.perf_counter()
+
+    def emit(self, name, down, hook_time=None, source=None):
+        """
+        Handle one button event and fire any chord it completes.
+
+        Args:
+            name (str): The button name.
+            down (bool): True for a press, False for a release.
+            hook_time (float, optional): perf_counter() time of the event.
+            source (object, optional): Device the event came from, so the
+                                       same button on two devices is
+                                       tracked separately.
+
+        Returns:
+            list: Hotkeys fired by this event.
+        """
+        if hook_time is None:
+            hook_time = time.perf_counter()
+
+        if self._record_file:
+            self._record_file.write(json.dumps({"t": round(hook_time - self._record_start, 6), "name": name, "down": down}) + "\n")
+            self._record_file.flush()
+
+        held = self._held.setdefault(name, set())
+        if not down:
+            held.discard(source)
+            return []
+        if source in held:
+            return []
+        held.add(source)
+
+        pressed = {button for button, sources in self._held.items() if sources}
+        fired = []
+        for hotkey, chord in self._chords:
+            if name in chord and chord <= pressed:
+                fired.append(hotkey)
+                self.callback(hotkey, hook_time)
+        return fired
+
+class EvdevBackend(ChordBackend):
+    """
+    Linux evdev devices read directly from /dev/input/event*.
+
+    Blocks in select() on the device file descriptors and a wake-up pipe,
+    so it uses no CPU while idle.
+    """
+
+    name = "evdev"
+
+    def _open_devices(self):
+        """
+        Open the configured devices, or every readable event device.
+
+        Returns:
+            dict: Mapping of file descriptor to device path.
+        """
+        paths = self.settings.get("evdev_devices") or sorted(glob.glob('/dev/input/event*'))
+        devices = {}
+        for path in paths:
+            try:
+                devices[os.open(path, os.O_RDONLY | os.O_NONBLOCK)] = path
+            except OSError as e:
+                log_message(f"Cannot open input device {path}: {e}", "INPUT")
+        return devices
+
+    def run(self):
+        """
+        Read key events from every device until stopped.
+
+        Returns:
+            None
+        """
+        if not sys.platform.startswith("linux"):
+            log_message("The evdev input backend is only available on Linux", "INPUT")
+            return
+
+        devices = self._open_devices()
+        if not devices:
+            log_message("No readable evdev devices; check permissions on /dev/input", "INPUT")
+            return
+        log_message(f"Evdev backend reading: {list(devices.values())}", "INPUT")
+
+        wake_read, self._wake_write = os.pipe()
+        pending = {fd: b"" for fd in devices}
+        try:
+            while not self._stop_event.is_set() and devices:
+                readable, _, _ = select.select(list(devices) + [wake_read], [], [])
+                read_time = time.perf_counter()
+                wall_time = time.time()
+                for fd in readable:
+                    if fd == wake_read:
+                        continue
+                    try:
+                        data = pending[fd] + os.read(fd, INPUT_EVENT_SIZE * 64)
+                    except BlockingIOError:
+                        continue
+                    except OSError:
+                        log_message(f"Input device removed: {devices[fd]}", "INPUT")
+                        os.close(fd)
+                        del devices[fd]
+                        continue
+
+                    usable = len(data) - len(data) % INPUT_EVENT_SIZE
+                    pending[fd] = data[usable:]
+                    for seconds, microseconds, event_type, code, value in struct.iter_unpack(INPUT_EVENT_FORMAT, data[:usable]):
+                        # value 2 is auto-repeat
+                        if event_type != EV_KEY or value == 2:
+                            continue
+                        # Kernel timestamps are wall clock; convert to the perf_counter timeline
+                        age = max(0.0, wall_time - (seconds + microseconds / 1000000.0))
+                        self.emit(evdev_key_name(code), value == 1, read_time - age, (fd, code))
+        finally:
+            for fd in devices:
+                os.close(fd)
+            os.close(wake_read)
+            os.close(self._wake_write)
+            self._wake_write = None
+
+class JoystickBackend(ChordBackend):
+    """
+    Gamepad and joystick buttons, reported as "button<N>".
+
+    On Linux the joystick API devices (/dev/input/js*) are read with a
+    blocking select(). On Windows winmm has no event interface, so the
+    configured joysticks are polled at joystick_poll_interval.
+    """
+
+    name = "joystick"
+
+    def run(self):
+        """
+        Read joystick buttons until stopped.
+
+        Returns:
+            None
+        """
+        if sys.platform.startswith("linux"):
+            self._run_linux()
+        elif sys.platform == "win32":
+            self._run_windows()
+        else:
+            log_message("The joystick input backend is not available on this platform", "INPUT")
+
+    def _run_linux(self):
+        """
+        Read button events from Linux joystick devices.
+
+        Returns:
+            None
+        """
+        paths = self.settings.get("joystick_devices") or sorted(glob.glob('/dev/input/js*'))
+        devices = {}
+        for path in paths:
+            try:
+                devices[os.open(path, os.O_RDONLY | os.O_NONBLOCK)] = path
+            except OSError as e:
+                log_message(f"Cannot open joystick {path}: {e}", "INPUT")
+        if not devices:
+            log_message("No readable joystick devices", "INPUT")
+            return
+        log_message(f"Joystick backend reading: {list(devices.values())}", "INPUT")
+
+        wake_read, self._wake_write = os.pipe()
+        pending = {fd: b"" for fd in devices}
+        try:
+            while not self._stop_event.is_set() and devices:
+                readable, _, _ = select.select(list(devices) + [wake_read], [], [])
+                read_time = time.perf_counter()
+                for fd in readable:
+                    if fd == wake_read:
+                        continue
+                    try:
+                        data = pending[fd] + os.read(fd, JS_EVENT_SIZE * 64)
+                    except BlockingIOError:
+                        continue
+                    except OSError:
+                        log_message(f"Joystick removed: {devices[fd]}", "INPUT")
+                        os.close(fd)
+                        del devices[fd]
+                        continue
+
+                    usable = len(data) - len(data) % JS_EVENT_SIZE
+                    pending[fd] = data[usable:]
+                    for _, value, event_type, number in struct.iter_unpack(JS_EVENT_FORMAT, data[:usable]):
+                        # Initial state events describe buttons already held at open
+                        if event_type & JS_EVENT_INIT or not event_type & JS_EVENT_BUTTON:
+                            continue
+                        self.emit(f"button{number}", value != 0, read_time, fd)
+        finally:
+            for fd in devices:
+                os.close(fd)
+            os.close(wake_read)
+            os.close(self._wake_write)
+            self._wake_write = None
+
+    def _run_windows(self):
+        """
+        Poll joystick buttons through winmm on Windows.
+
+        Returns:
+            None
+        """
+        class JOYINFOEX(ctypes.Structure):
+            _fields_ = [(field, ctypes.c_uint32) for field in (
+                "dwSize", "dwFlags", "dwXpos", "dwYpos", "dwZpos", "dwRpos", "dwUpos",
+                "dwVpos", "dwButtons", "dwButtonNumber", "dwPOV", "dwReserved1", "dwReserved2"
+            )]
+
+        JOY_RETURNBUTTONS = 0x80
+        JOYERR_NOERROR = 0
+        winmm = ctypes.windll.winmm
+
+        joystick_ids = [int(device) for device in self.settings.get("joystick_devices", [])] or list(range(winmm.joyGetNumDevs()))
+        info = JOYINFOEX()
+        info.dwSize = ctypes.sizeof(JOYINFOEX)
+        info.dwFlags = JOY_RETURNBUTTONS
+        previous = {joystick_id: 0 for joystick_id in joystick_ids}
+        interval = self.settings.get("joystick_poll_interval", 0.01)
+
+        while not self._stop_event.wait(interval):
+            for joystick_id in joystick_ids:
+                if winmm.joyGetPosEx(joystick_id, ctypes.byref(info)) != JOYERR_NOERROR:
+                    continue
+                buttons = info.dwButtons
+                changed = buttons ^ previous[joystick_id]
+                if not changed:
+                    continue
+                previous[joystick_id] = buttons
+                now = time.perf_counter()
+                for number in range(32):
+                    if changed & (1 << number):
+                        self.emit(f"button{number}", bool(buttons & (1 << number)), now, joystick_id)
+
+class ReplayBackend(ChordBackend):
+    """
+    Replays a recorded event stream from a JSON lines file.
+
+    Attributes:
+        events_replayed (int): Number of events fed so far.
+        finished (threading.Event): Set when the replay is complete.
+    """
+
+    name = "replay"
+
+    def __init__(self, settings):
+        """
+        Create the backend.
+
+        Args:
+            settings (dict): Settings from load_input_config(). Uses
+                             replay_file, replay_speed (0 replays as fast
+                             as possible) and replay_repeat.
+        """
+        super().__init__(settings)
+        self.events_replayed = 0
+        self.finished = threading.Event()
+
+    def load_events(self):
+        """
+        Read the events from the replay file.
+
+        Returns:
+            list: (offset_seconds, name, down) tuples in file order.
+        """
+        events = []
+        with open(self.settings["replay_file"], 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                event = json.loads(line)
+                events.append((float(event.get("t", 0.0)), NAME_ALIASES.get(event["name"], event["name"]), bool(event.get("down", True))))
+        return events
+
+    def run(self):
+        """
+        Feed the recorded events until done or stopped.
+
+        Returns:
+            None
+        """
+        try:
+            events = self.load_events()
+            speed = float(self.settings.get("replay_speed", 1.0))
+            for _ in range(int(self.settings.get("replay_repeat", 1))):
+                start = time.perf_counter()
+                first = events[0][0] if events else 0.0
+                for offset, name, down in events:
+                    if self._stop_event.is_set():
+                        return
+                    if speed > 0:
+                        delay = (offset - first) / speed - (time.perf_counter() - start)
+                        if delay > 0:
+                            self._stop_event.wait(delay)
+                    self.emit(name, down)
+                    self.events_replayed += 1
+        finally:
+            self.finished.set()
+
+BACKENDS = {
+    "keyboard": KeyboardBackend,
+    "evdev": EvdevBackend,
+    "joystick": JoystickBackend,
+    "replay": ReplayBackend,
+}
+
+def create_backends(settings):
+    """
+    Create the backends listed in the input settings.
+
+    Args:
+        settings (dict): Settings from load_input_config().
+
+    Returns:
+        list: The backend instances, not yet bound or started.
+    """
+    backends = []
+    for name in settings.get("backends", ["keyboard"]):
+        backend_class = BACKENDS.get(name)
+        if not backend_class:
+            log_message(f"Unknown input backend: {name}", "INPUT")
+            continue
+        backend = backend_class(settings)
+        if settings.get("record_file") and isinstance(backend, ChordBackend) and name != "replay":
+            backend.start_recording(settings["record_file"])
+        backends.append(backend)
+    return backends
+
+def _replay(args):
+    """
+    Replay an event file through the dispatcher and report latency and CPU use.
+
+    Unless --execute is given, every binding runs a no-op action so only
+    input handling and dispatch are measured.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        None
+    """
+    from arcade_station.core.common.core_functions import load_key_mappings_from_toml
+    from arcade_station.core.common.hotkey_dispatcher import (
+        HotkeyDispatcher,
+        create_dispatcher_from_mappings,
+        load_dispatcher_config
+    )
+    from arcade_station.core.common.hotkey_latency import LatencyTracker, print_stats
+
+    key_mappings = load_key_mappings_from_toml('key_listener.toml')
+    dispatcher_settings = load_dispatcher_config()
+    dispatcher_settings["stats_interval"] = 0
+
+    if args.execute:
+        dispatcher = create_dispatcher_from_mappings(key_mappings, dispatcher_settings)
+    else:
+        tracker = LatencyTracker(dispatcher_settings["latency_window"], dispatcher_settings["slow_threshold_ms"])
+        dispatcher = HotkeyDispatcher(dispatcher_settings["max_workers"], dispatcher_settings["debounce_seconds"], tracker)
+        for hotkey in key_mappings:
+            dispatcher.register(hotkey, lambda: None, dispatcher_settings["debounce"].get(hotkey))
+
+    settings = dict(load_input_config(), replay_file=args.file, replay_speed=args.speed, replay_repeat=args.repeat)
+    backend = ReplayBackend(settings)
+    fired = []
+    backend.bind(key_mappings, lambda hotkey, hook_time: fired.append(dispatcher.trigger(hotkey, hook_time)))
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    backend.start()
+    backend.finished.wait()
+    dispatcher.shutdown()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    print(f"Replayed {backend.events_replayed} events in {wall:.3f}s ({backend.events_replayed / wall if wall else 0:.0f} events/s)")
+    print(f"Hotkey presses: {len(fired)} ({fired.count(True)} dispatched, {fired.count(False)} debounced or coalesced)")
+    print(f"CPU time: {cpu * 1000:.1f} ms ({cpu / wall * 100 if wall else 0:.1f}% of one core)")
+    if dispatcher.tracker:
+        print_stats({"bindings": dispatcher.tracker.snapshot()})
+
+def _record(args):
+    """
+    Record events from a live backend to a replay file.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        None
+    """
+    settings = dict(load_input_config(), backends=[args.backend], record_file=args.file)
+    backends = create_backends(settings)
+    for backend in backends:
+        backend.bind([], lambda hotkey, hook_time: None)
+        backend.start()
+
+    print(f"Recording {args.backend} events to {args.file} for {args.seconds}s...")
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    for backend in backends:
+        backend.stop()
+        backend.join(1.0)
+
+def main():
+    """
+    Replay or record input event streams from the command line.
+
+    Command-line Arguments:
+        replay FILE: Replay events through the dispatcher and report
+                     latency and CPU use. --speed 0 replays as fast as
+                     possible; --execute runs the real actions.
+        record FILE: Record events from the evdev or joystick backend.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description='Replay or record key listener input events.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = subparsers.add_parser('replay', help='Replay an event file through the dispatcher')
+    replay_parser.add_argument('file', help='JSON lines event file')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='Playback speed; 0 replays as fast as possible')
+    replay_parser.add_argument('--repeat', type=int, default=1, help='Number of times to replay the file')
+    replay_parser.add_argument('--execute', action='store_true', help='Run the configured actions instead of no-ops')
+
+    record_parser = subparsers.add_parser('record', help='Record events from a live backend')
+    record_parser.add_argument('file', help='JSON lines event file to append to')
+    record_parser.add_argument('--backend', choices=['evdev', 'joystick'], default='evdev', help='Backend to record from')
+    record_parser.add_argument('--seconds', type=float, default=30.0, help='How long to record')
+
+    args = parser.parse_args()
+    if args.command == 'replay':
+        _replay(args)
+    else:
+        _record(args)
+
+if __name__ == "__main__":
+    main()
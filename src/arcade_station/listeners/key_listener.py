@@ -8,7 +8,9 @@ processes.
 
 The listener runs in the background and monitors for configured key combinations,
 allowing users to control the Arcade Station system without needing to access
-the frontend directly.
+the frontend directly. Input comes from the backends configured in the [input]
+section of key_listener.toml (see input_backends.py), so cabinets with only
+pads and buttons can use evdev or joystick chords instead of the keyboard hook.
 """
 
 import sys
@@ -18,5 +20,9 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
 from arcade_station.core.common.core_functions import start_listening_to_keybinds_from_toml
+from arcade_station.core.common.game_mode import throttle_station_helpers
+
+# The listener is resident, so it lowers helper app priority during games
+throttle_station_helpers()
 
 start_listening_to_keybinds_from_toml('key_listener.toml') 
\ No newline at end of file
@@ -195,6 +195,16 @@ def start_conditional_scripts():
                 log_message(f"Error starting iCloud manager: {e}", "STARTUP")
                 log_message(traceback.format_exc(), "STARTUP")
         
+        # Upload queue for NAS, WebDAV or S3 offload (any platform)
+        if screenshot_config.get('upload', {}).get('enabled', False):
+            try:
+                upload_script = os.path.join(base_dir, "core", "common", "upload_queue.py")
+                upload_process = launch_script(upload_script, identifier="upload_queue")
+                log_message(f"Launched upload queue with PID: {upload_process.pid}", "STARTUP")
+            except Exception as e:
+                log_message(f"Error starting upload queue: {e}", "STARTUP")
+                log_message(traceback.format_exc(), "STARTUP")
+        
         # Other conditional scripts can be added here based on configuration
         
     except Exception as e: